@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.models import TiposDenuncia
+
+from .tipos_index import invalidar_tipos
+
+
+@receiver(post_save, sender=TiposDenuncia)
+@receiver(post_delete, sender=TiposDenuncia)
+def tipos_denuncia_changed(sender, **kwargs):
+    # nombre / sinónimos / activo pudieron cambiar
+    invalidar_tipos()
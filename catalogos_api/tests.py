@@ -1,3 +1,89 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from catalogos_api.tipos_index import IndiceTipos, normalizar
+
+TIPOS = [
+    (1, "Baches en la vía", ""),
+    (2, "Alumbrado público", ""),
+    (3, "Basura", ""),
+    (4, "Ruido", ""),
+    (5, "Parque sucio", ""),
+    (6, "Parque dañado", ""),
+    (7, "Vía obstruida", "derrumbe, deslave"),
+]
+
+
+class IndiceTiposTests(SimpleTestCase):
+    """IndiceTipos.buscar es puro: se arma con tuplas, sin base ni cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.indice = IndiceTipos(TIPOS)
+
+    def test_normalizar(self):
+        self.assertEqual(normalizar("  Vía   Pública!! "), "via publica")
+        self.assertEqual(normalizar(None), "")
+
+    def test_palabras_mal_escritas(self):
+        self.assertEqual(self.indice.buscar("hay un vache"), 1)
+        self.assertEqual(self.indice.buscar("se fue el alumbrao"), 2)
+
+    def test_plural_y_mayusculas(self):
+        self.assertEqual(self.indice.buscar("BACHES"), 1)
+
+    def test_sinonimos_base_y_de_la_columna(self):
+        self.assertEqual(self.indice.buscar("luminaria"), 2)
+        self.assertEqual(self.indice.buscar("deslave en la via"), 7)
+
+    def test_empate_devuelve_none(self):
+        # "parque" pesa igual para Parque sucio y Parque dañado: no se adivina
+        self.assertIsNone(self.indice.buscar("el parque"))
+
+    def test_ids_numericos(self):
+        self.assertEqual(self.indice.buscar("3"), 3)
+        self.assertEqual(self.indice.buscar(" 7 "), 7)
+        # nunca inventa ids
+        self.assertIsNone(self.indice.buscar("99"))
+
+    def test_sin_coincidencia(self):
+        self.assertIsNone(self.indice.buscar(""))
+        self.assertIsNone(self.indice.buscar("zzzz"))
+
+
+# catálogo real: varios tipos comparten palabra clave de SINONIMOS_BASE
+SOLAPADOS = [
+    (10, "Falta de agua potable", ""),
+    (11, "Fuga de agua", ""),
+    (12, "Acumulación de basura", ""),
+    (13, "Botadero clandestino", ""),
+    (14, "Falta de alumbrado público", ""),
+    (15, "Luminarias dañadas", ""),
+]
+
+
+class IndiceTiposSolapadosTests(SimpleTestCase):
+    def _buscar(self, texto):
+        # el resultado no puede depender del orden de las filas
+        resultados = {IndiceTipos(orden).buscar(texto) for orden in (SOLAPADOS, SOLAPADOS[::-1])}
+        self.assertEqual(len(resultados), 1, texto)
+        return resultados.pop()
+
+    def test_sinonimo_compartido_no_es_frase_exacta(self):
+        indice = IndiceTipos(SOLAPADOS)
+        self.assertNotIn("fuga", indice.frases)
+        self.assertNotIn("tuberia", indice.frases)
+        self.assertEqual(indice.frases["sin agua"], 10)
+
+    def test_agua(self):
+        self.assertEqual(self._buscar("hay una fuga"), 11)
+        self.assertEqual(self._buscar("sin agua"), 10)
+        self.assertEqual(self._buscar("se corto el agua potable"), 10)
+
+    def test_nombre_propio_gana_al_sinonimo(self):
+        self.assertEqual(self._buscar("botadero"), 13)
+        self.assertEqual(self._buscar("la luminaria no prende"), 15)
+        self.assertEqual(self._buscar("no hay luz en el barrio"), 14)
+
+    def test_nombre_exacto(self):
+        self.assertEqual(self._buscar("falta de alumbrado publico en mi calle"), 14)
@@ -0,0 +1,309 @@
+# catalogos_api/tipos_index.py
+"""
+Índice en memoria para resolver texto libre -> TiposDenuncia (chatbot).
+
+Antes cada _match_tipo_to_id() traía todos los tipos activos y los comparaba
+en Python (substring / Jaccard). Ahora el índice se arma una vez por versión
+del catálogo y resolver_tipo() no toca la base:
+
+- Frases exactas: primero el nombre normalizado de cada tipo, después sus
+  sinónimos (columna tipos_denuncia.sinonimos + SINONIMOS_BASE por palabra
+  clave). Un sinónimo solo es frase exacta si apunta a un único tipo y no
+  choca con el nombre de otro ("luminaria" no le gana a "Luminarias dañadas");
+  si no, queda solo como palabra para BM25.
+- Palabras sueltas: cada palabra de la consulta se compara por trigramas de
+  caracteres (Dice) con el vocabulario del catálogo, así "vache" -> "bache"
+  o "alumbrao" -> "alumbrado"; los tipos se puntúan con BM25 ponderado por
+  esa similitud. Las palabras del nombre pesan NOMBRE_PESO veces más que las
+  de un sinónimo.
+
+La versión del catálogo vive en el cache compartido (signals de TiposDenuncia
+la suben); cada proceso la revisa cada TIPOS_INDEX_CHECK segundos.
+"""
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+
+from config.cache import espacio
+from db.models import TiposDenuncia
+
+_VERSION = espacio("tipos_index")
+
+SIM_MINIMA = 0.55      # Dice de trigramas para aceptar una palabra parecida
+BM25_K1 = 1.2
+BM25_B = 0.75
+NOMBRE_PESO = 2        # tf de una palabra del nombre frente a la de un sinónimo
+
+STOPWORDS = {
+    "a", "al", "de", "del", "el", "la", "las", "los", "lo", "en", "por", "para",
+    "un", "una", "unos", "unas", "y", "o", "con", "sin", "mi", "mis", "su", "sus",
+    "que", "hay", "es", "esta", "este", "se", "me", "muy", "tipo", "denuncia",
+}
+
+# palabras de relato que no dicen nada del tipo: no cuentan para la cobertura de puntuar()
+RELLENO = {
+    "no", "funciona", "sirve", "hace", "dia", "semana", "barrio", "sector", "casa", "ya",
+    "aqui", "aca", "ahi", "otra", "vez", "todo", "toda", "mucho", "mucha", "grande",
+    "quiero", "reportar", "denunciar", "favor", "problema",
+}
+
+# sinónimos comunes por palabra clave del nombre del tipo
+SINONIMOS_BASE = {
+    "basura": ["aseo", "desechos", "desperdicios", "recoleccion", "basurero", "botadero"],
+    "bache": ["hueco", "huecos", "calle danada", "via danada", "asfalto"],
+    "alumbrado": ["luz", "luminaria", "poste", "foco", "lampara", "apagon", "oscuro"],
+    "agua": ["fuga", "tuberia", "potable"],
+    "potable": ["sin agua", "no hay agua", "corte de agua"],
+    "alcantarillado": ["alcantarilla", "desague", "aguas servidas", "cloaca", "sumidero"],
+    "quema": ["humo", "incendio", "fuego", "quemando"],
+    "ruido": ["bulla", "escandalo", "musica alta", "parlantes"],
+    "animal": ["perro", "perros", "gato", "gatos", "mascota"],
+    "arbol": ["arboles", "rama", "ramas", "tala"],
+}
+
+
+# =========================================================
+# Normalización
+# =========================================================
+def normalizar(s) -> str:
+    """minúsculas, sin tildes, solo letras/números/espacios."""
+    if not s:
+        return ""
+    x = unicodedata.normalize("NFKD", str(s).strip().lower())
+    x = "".join(ch for ch in x if not unicodedata.combining(ch))
+    x = re.sub(r"[^a-z0-9\s]", " ", x)
+    return re.sub(r"\s+", " ", x).strip()
+
+
+def _singular(w: str) -> str:
+    # plural simple: "baches" -> "bache", "huecos" -> "hueco"
+    return w[:-1] if len(w) > 3 and w.endswith("s") else w
+
+
+def _palabras(texto: str) -> list[str]:
+    return [_singular(w) for w in texto.split() if len(w) > 1 and w not in STOPWORDS]
+
+
+def _trigramas(palabra: str) -> set[str]:
+    p = f" {palabra} "
+    return {p[i:i + 3] for i in range(len(p) - 2)}
+
+
+def _dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+# =========================================================
+# Índice
+# =========================================================
+class IndiceTipos:
+    def __init__(self, tipos):
+        """tipos: iterable de (id, nombre, sinonimos_texto), en orden estable (por id)."""
+        self.ids: set[int] = set()
+        self.nombres: dict[int, str] = {}
+        self.frases_nombre: dict[str, int] = {}          # nombre normalizado -> id
+        self.frases: dict[str, int] = {}                 # sinónimo inequívoco -> id
+        self.tf: dict[str, dict[int, float]] = defaultdict(dict)
+        self.largo: dict[int, float] = {}
+        self.gramas: dict[str, set[str]] = defaultdict(set)   # trigrama -> palabras
+        self.gramas_de: dict[str, set[str]] = {}
+
+        palabras_nombre: dict[int, set[str]] = {}
+        sinonimos_de: dict[int, list[str]] = {}
+        for tid, nombre, sinonimos in tipos:
+            tid = int(tid)
+            self.ids.add(tid)
+            self.nombres[tid] = nombre
+            nombre_n = normalizar(nombre)
+            if nombre_n:
+                self.frases_nombre.setdefault(nombre_n, tid)
+            # con stopwords: "sin agua" no es el nombre "Fuga de agua"
+            palabras_nombre[tid] = {_singular(w) for w in nombre_n.split()}
+            frases = [normalizar(x) for x in (sinonimos or "").split(",")]
+            for clave, extra in SINONIMOS_BASE.items():
+                if clave in nombre_n:
+                    frases += extra
+            sinonimos_de[tid] = list(dict.fromkeys(filter(None, frases)))
+
+        # un sinónimo es frase exacta solo si es de un único tipo y no es
+        # (en sus palabras) el nombre de otro tipo
+        duenos = defaultdict(set)
+        for tid, frases in sinonimos_de.items():
+            for f in frases:
+                duenos[f].add(tid)
+        for f, tids in duenos.items():
+            if len(tids) != 1 or f in self.frases_nombre:
+                continue
+            (tid,) = tids
+            ps = {_singular(w) for w in f.split()}
+            if any(ps <= nombre for otro, nombre in palabras_nombre.items() if otro != tid):
+                continue
+            self.frases[f] = tid
+
+        for tid in self.nombres:
+            pesos = [(w, NOMBRE_PESO) for w in _palabras(normalizar(self.nombres[tid]))]
+            pesos += [(w, 1) for f in sinonimos_de[tid] for w in _palabras(f)]
+            for w, peso in pesos:
+                self.tf[w][tid] = self.tf[w].get(tid, 0) + peso
+            self.largo[tid] = sum(peso for _, peso in pesos) or 1
+
+        for w in self.tf:
+            g = _trigramas(w)
+            self.gramas_de[w] = g
+            for t in g:
+                self.gramas[t].add(w)
+
+        n = len(self.ids) or 1
+        self.largo_medio = sum(self.largo.values()) / n
+        self.idf = {
+            w: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for w, docs in self.tf.items()
+        }
+        # frases largas primero: "aguas servidas" antes que "agua"
+        self._nombres_orden = sorted(self.frases_nombre, key=len, reverse=True)
+        self._frases_orden = sorted(self.frases, key=len, reverse=True)
+
+    # ---------- palabras parecidas ----------
+    def _parecida(self, palabra: str) -> tuple[str | None, float]:
+        if palabra in self.tf:
+            return palabra, 1.0
+        g = _trigramas(palabra)
+        candidatas = set()
+        for t in g:
+            candidatas |= self.gramas.get(t, set())
+        mejor, mejor_sim = None, 0.0
+        for w in candidatas:
+            sim = _dice(g, self.gramas_de[w])
+            if sim > mejor_sim:
+                mejor, mejor_sim = w, sim
+        return (mejor, mejor_sim) if mejor_sim >= SIM_MINIMA else (None, 0.0)
+
+    def _bm25(self, palabra: str, tid: int) -> float:
+        tf = self.tf[palabra].get(tid, 0)
+        if not tf:
+            return 0.0
+        norma = 1 - BM25_B + BM25_B * self.largo[tid] / self.largo_medio
+        return self.idf[palabra] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norma)
+
+    # ---------- búsqueda ----------
+    def buscar(self, texto) -> int | None:
+        return self.puntuar(texto)[0]
+
+    def puntuar(self, texto) -> tuple[int | None, float]:
+        """
+        (id, confianza 0..1). La confianza sube con la parte del texto que
+        explica el tipo (cobertura) y, en BM25, con el margen sobre el segundo.
+        """
+        q = normalizar(texto)
+        if not q:
+            return None, 0.0
+
+        if q.isdigit():
+            return (int(q), 1.0) if int(q) in self.ids else (None, 0.0)
+
+        palabras = [w for w in _palabras(q) if w not in RELLENO]
+
+        def cobertura(usadas: dict) -> float:
+            if not palabras:
+                return 1.0
+            return sum(usadas.get(w, 0.0) for w in palabras) / len(palabras)
+
+        # frase exacta del catálogo dentro del texto: el nombre antes que un sinónimo
+        envuelto = f" {q} "
+        for base, orden, frases in (
+            (0.6, self._nombres_orden, self.frases_nombre),
+            (0.5, self._frases_orden, self.frases),
+        ):
+            for f in orden:
+                if f" {f} " in envuelto:
+                    usadas = dict.fromkeys(_palabras(f), 1.0)
+                    return frases[f], base + 0.4 * cobertura(usadas)
+
+        puntajes = defaultdict(float)
+        usadas = defaultdict(dict)
+        for palabra in _palabras(q):
+            w, sim = self._parecida(palabra)
+            if w is None:
+                continue
+            for tid in self.tf[w]:
+                puntajes[tid] += sim * self._bm25(w, tid)
+                usadas[tid][palabra] = sim
+
+        if not puntajes:
+            return None, 0.0
+        orden = sorted(puntajes.items(), key=lambda x: x[1], reverse=True)
+        primero = orden[0][1]
+        segundo = orden[1][1] if len(orden) > 1 else 0.0
+        # empate: mejor no adivinar
+        if math.isclose(primero, segundo):
+            return None, 0.0
+        tid = orden[0][0]
+        margen = 1 - segundo / primero
+        return tid, margen * (0.4 + 0.5 * cobertura(usadas[tid]))
+
+
+# =========================================================
+# Índice por proceso + versión compartida
+# =========================================================
+_lock = threading.Lock()
+_estado = {"indice": None, "version": None, "revisado": 0.0, "armado": 0.0}
+
+
+def invalidar_tipos():
+    """Sube la versión del catálogo (todos los workers rearman el índice)."""
+    _VERSION.set("v", str(time.time_ns()), timeout=None)
+    with _lock:
+        _estado["indice"] = None
+
+
+def _armar() -> IndiceTipos:
+    # orden fijo: los empates de frases no dependen del orden físico de las filas
+    qs = TiposDenuncia.objects.filter(activo=True).order_by("id").values_list("id", "nombre", "sinonimos")
+    return IndiceTipos(list(qs))
+
+
+def indice() -> IndiceTipos:
+    ahora = time.monotonic()
+    chequeo = float(getattr(settings, "TIPOS_INDEX_CHECK", 5))
+    ttl = float(getattr(settings, "TIPOS_INDEX_TTL", 300))
+
+    idx = _estado["indice"]
+    if idx is not None and ahora - _estado["revisado"] < chequeo and ahora - _estado["armado"] < ttl:
+        return idx
+
+    with _lock:
+        version = str(_VERSION.get("v") or "0")
+        idx = _estado["indice"]
+        if idx is None or version != _estado["version"] or ahora - _estado["armado"] >= ttl:
+            idx = _armar()
+            _estado.update(indice=idx, version=version, armado=ahora)
+        _estado["revisado"] = ahora
+        return idx
+
+
+def resolver_tipo(texto) -> int | None:
+    """Id real de un TiposDenuncia activo que corresponde al texto, o None. Nunca inventa ids."""
+    if not texto:
+        return None
+    return indice().buscar(texto)
+
+
+def puntuar_tipo(texto) -> tuple[int | None, float]:
+    """(id, confianza) con la misma regla que resolver_tipo()."""
+    if not texto:
+        return None, 0.0
+    return indice().puntuar(texto)
+
+
+def nombre_tipo(tipo_id) -> str | None:
+    try:
+        return indice().nombres.get(int(tipo_id))
+    except (TypeError, ValueError):
+        return None
@@ -4,11 +4,18 @@ from django.shortcuts import render
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from config.conditional import condicional, version_de
 from db.models import TiposDenuncia
 
+
+def _version_tipos(request):
+    return version_de(TiposDenuncia.objects.filter(activo=True))
+
+
 class TiposDenunciaView(APIView):
     permission_classes = [AllowAny]
 
+    @condicional(_version_tipos)
     def get(self, request):
         qs = TiposDenuncia.objects.filter(activo=True).order_by("nombre")
         data = [{"id": x.id, "nombre": x.nombre, "descripcion": x.descripcion} for x in qs]
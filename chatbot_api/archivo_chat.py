@@ -0,0 +1,144 @@
+# chatbot_api/archivo_chat.py
+"""
+Mantenimiento de chat_mensajes particionada por mes (schema.sql sección 21).
+
+- crear_particiones(): deja creados los meses siguientes (la función SQL
+  chat_mensajes_particion hace el CREATE TABLE ... PARTITION OF). Si un mes
+  no existe las filas caen en chat_mensajes_default y ese mes ya no se puede
+  crear sin moverlas: por eso se crean con anticipación.
+- archivar(): los meses más viejos que CHAT_ARCHIVO_MESES se desprenden de
+  chat_mensajes (DETACH) y se cuelgan de chat_mensajes_archivo (ATTACH), sin
+  copiar filas. Opcionalmente se mueven a CHAT_ARCHIVO_TABLESPACE (disco
+  barato). El chatbot solo toca meses calientes; el archivo sigue consultable.
+- transcripcion(): mensajes de una conversación, calientes + archivados.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from db.models import ChatMensajes, ChatMensajesArchivo
+
+logger = logging.getLogger(__name__)
+
+TABLA = "chat_mensajes"
+TABLA_ARCHIVO = "chat_mensajes_archivo"
+_re_mes = re.compile(r"^chat_mensajes_(\d{4})(\d{2})$")
+
+
+def _sumar_meses(d: date, n: int) -> date:
+    total = d.year * 12 + (d.month - 1) + n
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _inicio_utc(d: date) -> datetime:
+    return datetime.combine(d, time.min, tzinfo=dt_timezone.utc)
+
+
+def _particiones(cursor, padre: str) -> list[str]:
+    cursor.execute(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+        """,
+        [padre],
+    )
+    return [r[0] for r in cursor.fetchall()]
+
+
+def meses_calientes() -> list[tuple[str, date]]:
+    """(nombre, primer día) de cada partición mensual de chat_mensajes."""
+    with connection.cursor() as cur:
+        nombres = _particiones(cur, TABLA)
+    out = []
+    for nombre in nombres:
+        m = _re_mes.match(nombre)
+        if m:
+            out.append((nombre, date(int(m.group(1)), int(m.group(2)), 1)))
+    return out
+
+
+def filas_en_default() -> int:
+    with connection.cursor() as cur:
+        cur.execute("SELECT count(*) FROM chat_mensajes_default")
+        return cur.fetchone()[0]
+
+
+def crear_particiones(adelante: int | None = None, hoy: date | None = None) -> list[str]:
+    """Crea el mes actual y los `adelante` siguientes. Devuelve los creados."""
+    if adelante is None:
+        adelante = int(getattr(settings, "CHAT_PARTICIONES_ADELANTE", 3))
+    base = (hoy or date.today()).replace(day=1)
+    existentes = {n for n, _ in meses_calientes()}
+
+    creadas = []
+    with connection.cursor() as cur:
+        for i in range(adelante + 1):
+            mes = _sumar_meses(base, i)
+            cur.execute("SELECT chat_mensajes_particion(%s)", [mes])
+            nombre = cur.fetchone()[0]
+            if nombre not in existentes:
+                creadas.append(nombre)
+    return creadas
+
+
+def archivar(meses: int | None = None, tablespace: str | None = None,
+             hoy: date | None = None, simular: bool = False) -> list[str]:
+    """Mueve a chat_mensajes_archivo los meses que terminaron hace más de `meses`."""
+    if meses is None:
+        meses = int(getattr(settings, "CHAT_ARCHIVO_MESES", 12))
+    if tablespace is None:
+        tablespace = getattr(settings, "CHAT_ARCHIVO_TABLESPACE", "") or ""
+    # el mes actual nunca: como mínimo se conserva un mes completo
+    frontera = _sumar_meses((hoy or date.today()).replace(day=1), -max(meses, 1))
+
+    q = connection.ops.quote_name
+    movidas = []
+    for nombre, mes in meses_calientes():
+        if _sumar_meses(mes, 1) > frontera:
+            continue
+        destino = f"{TABLA_ARCHIVO}_{mes:%Y%m}"
+        if simular:
+            movidas.append(destino)
+            continue
+
+        desde, hasta = _inicio_utc(mes), _inicio_utc(_sumar_meses(mes, 1))
+        # DETACH toma un lock breve sobre chat_mensajes; una partición por transacción
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(f"ALTER TABLE {q(TABLA)} DETACH PARTITION {q(nombre)}")
+            cur.execute(f"ALTER TABLE {q(nombre)} RENAME TO {q(destino)}")
+            # DDL sin parámetros: los límites salen de fechas calculadas aquí
+            cur.execute(
+                f"ALTER TABLE {q(TABLA_ARCHIVO)} ATTACH PARTITION {q(destino)} "
+                f"FOR VALUES FROM ('{desde.isoformat()}') TO ('{hasta.isoformat()}')"
+            )
+            if tablespace:
+                cur.execute(f"ALTER TABLE {q(destino)} SET TABLESPACE {q(tablespace)}")
+        logger.info("chat_mensajes: %s archivada como %s", nombre, destino)
+        movidas.append(destino)
+    return movidas
+
+
+def transcripcion(conv) -> list:
+    """Todos los mensajes de una conversación en orden, incluidos los archivados."""
+    campos = ("emisor", "mensaje", "created_at")
+    calientes = list(
+        ChatMensajes.objects
+        .filter(conversacion_id=conv.id, created_at__gte=conv.created_at)
+        .order_by("created_at")
+        .values(*campos)
+    )
+    archivados = list(
+        ChatMensajesArchivo.objects
+        .filter(conversacion_id=conv.id, created_at__gte=conv.created_at)
+        .order_by("created_at")
+        .values(*campos)
+    )
+    return archivados + calientes
@@ -0,0 +1,233 @@
+# chatbot_api/bench.py
+"""
+Benchmark del chatbot contra chatbot_api/mock_openai.py (sin red).
+
+Recorre conversaciones de denuncia con varios turnos sobre:
+  - chatbot  -> ChatbotMessageView (motor local + LLM con tools)
+  - v2       -> ChatbotMessageV2View (sin LLM; la app manda bot_response)
+  - llm_response (borrador IA del panel, web/views.py)
+y mide por turno: latencia, consultas a la base y tokens enviados al mock.
+
+Las vistas se llaman directo (sin middleware ni JWT real). Cada conversación
+corre dentro de una transacción que se revierte al final: no queda nada en la
+base salvo con conservar=True. Tampoco sale a Nominatim: los turnos con
+coordenadas geocodifican contra DIRECCION_BENCH (sin_red()), si no la
+latencia mediría la red. Usado por: manage.py bench_chatbot
+"""
+from __future__ import annotations
+
+import json
+import math
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+# turnos realistas: mezcla de rutinarios (motor local) y de LLM con tools
+CONVERSACIONES = [
+    [
+        "hola",
+        "hay mucha basura acumulada frente a la escuela del barrio",
+        "lat: -1.0453 lng: -78.5901",
+        "ya envié la foto",
+        "gracias",
+    ],
+    [
+        "buenas tardes",
+        "¿qué tipos de denuncia puedo hacer?",
+        "quiero reportar un bache enorme en la avenida principal",
+        "referencia: junto al parque central",
+        "latitud -1.0460 longitud -78.5912",
+    ],
+    [
+        "necesito ayuda con algo que pasa en mi calle",
+        "los perros botan la basura todas las noches y nadie recoge",
+        "¿cómo sé si ya la revisaron?",
+        "lat: -1.0448 lng: -78.5889",
+        "no",
+    ],
+]
+
+BOT_V2 = "Entendido, sigamos con tu denuncia."
+
+DIRECCION_BENCH = "Av. Principal y Sucre, Salcedo (bench)"
+# módulos que importaron reverse_geocode_nominatim por nombre
+GEOCODIFICADORES = (
+    "chatbot_api.views",
+    "chatbot_api.views_chatbot_mejorado",
+    "denuncias_api.views",
+    "denuncias_api.views_borradores",
+)
+
+
+@contextmanager
+def sin_red():
+    """Geocodificación inversa fija mientras dura el bench (nada sale a Nominatim)."""
+    with ExitStack() as pila:
+        for modulo in GEOCODIFICADORES:
+            pila.enter_context(patch(f"{modulo}.reverse_geocode_nominatim", return_value=DIRECCION_BENCH))
+        yield
+
+
+@dataclass
+class Medicion:
+    vista: str
+    ms: float
+    consultas: int
+    tokens: int
+    llamadas_llm: int
+    status: int
+
+
+@dataclass
+class Resultado:
+    mediciones: list[Medicion] = field(default_factory=list)
+
+    def resumen(self) -> dict:
+        out = {}
+        for vista in sorted({m.vista for m in self.mediciones}):
+            ms = [m.ms for m in self.mediciones if m.vista == vista]
+            cs = [m.consultas for m in self.mediciones if m.vista == vista]
+            tk = [m.tokens for m in self.mediciones if m.vista == vista]
+            llm = [m.llamadas_llm for m in self.mediciones if m.vista == vista]
+            errores = sum(1 for m in self.mediciones if m.vista == vista and m.status >= 400)
+            out[vista] = {
+                "turnos": len(ms),
+                "p50_ms": round(percentil(ms, 50), 1),
+                "p95_ms": round(percentil(ms, 95), 1),
+                "max_ms": round(max(ms), 1),
+                "consultas_p50": percentil(cs, 50),
+                "consultas_p95": percentil(cs, 95),
+                "tokens_medio": round(sum(tk) / len(tk), 1),
+                "tokens_total": sum(tk),
+                "turnos_con_llm": sum(1 for x in llm if x),
+                "errores": errores,
+            }
+        return out
+
+    def a_json(self) -> str:
+        return json.dumps(
+            {"resumen": self.resumen(), "mediciones": [asdict(m) for m in self.mediciones]},
+            ensure_ascii=False,
+            indent=2,
+        )
+
+
+def percentil(valores, p: float):
+    """Percentil por rango más cercano (sin interpolar)."""
+    if not valores:
+        return 0
+    orden = sorted(valores)
+    k = max(math.ceil(p / 100 * len(orden)) - 1, 0)
+    return orden[k]
+
+
+class Banco:
+    def __init__(self, mock, ciudadano_uid, staff_user=None, denuncia_id=None,
+                 conservar: bool = False, sin_cache: bool = False):
+        from rest_framework.test import APIRequestFactory
+
+        self.mock = mock
+        self.uid = str(ciudadano_uid)
+        self.staff_user = staff_user
+        self.denuncia_id = denuncia_id
+        self.conservar = conservar
+        self.sin_cache = sin_cache
+        self.api = APIRequestFactory()
+        self.resultado = Resultado()
+
+    # ---------- medición ----------
+    def _medir(self, vista: str, fn):
+        antes = self.mock.snapshot() if self.mock else {}
+        with CaptureQueriesContext(connection) as q:
+            inicio = time.perf_counter()
+            resp = fn()
+            # StreamingHttpResponse: el turno termina cuando se consume
+            if getattr(resp, "streaming", False):
+                for _ in resp.streaming_content:
+                    pass
+            ms = (time.perf_counter() - inicio) * 1000
+        despues = self.mock.snapshot() if self.mock else {}
+        self.resultado.mediciones.append(Medicion(
+            vista=vista,
+            ms=ms,
+            consultas=len(q.captured_queries),
+            tokens=despues.get("tokens_entrada", 0) - antes.get("tokens_entrada", 0),
+            llamadas_llm=despues.get("llamadas", 0) - antes.get("llamadas", 0),
+            status=resp.status_code,
+        ))
+        return resp
+
+    def _post(self, view_cls, path: str, data: dict):
+        from rest_framework.test import force_authenticate
+
+        request = self.api.post(path, data, format="json")
+        force_authenticate(
+            request,
+            user=SimpleNamespace(is_authenticated=True, pk=self.uid),
+            token={"uid": self.uid, "tipo": "ciudadano"},
+        )
+        resp = view_cls.as_view()(request)
+        if hasattr(resp, "render"):
+            resp.render()
+        return resp
+
+    def _aislado(self, fn):
+        """Corre fn en una transacción que se revierte (salvo conservar)."""
+        with transaction.atomic():
+            fn()
+            if not self.conservar:
+                transaction.set_rollback(True)
+
+    # ---------- escenarios ----------
+    def conversacion(self, turnos: list[str], v2: bool = False):
+        from chatbot_api.views import ChatbotMessageView, ChatbotStartView
+        from chatbot_api.views_chatbot_mejorado import ChatbotMessageV2View, ChatbotStartV2View
+
+        inicio_cls, mensaje_cls = (ChatbotStartV2View, ChatbotMessageV2View) if v2 else (ChatbotStartView, ChatbotMessageView)
+        vista = "v2" if v2 else "chatbot"
+        prefijo = "/web/api/chatbot/v2" if v2 else "/web/api/chatbot"
+
+        def correr():
+            r = self._post(inicio_cls, f"{prefijo}/start/", {})
+            if r.status_code != 201:
+                raise RuntimeError(f"start respondió {r.status_code}: {r.data}")
+            conv_id = r.data["conversacion_id"]
+            for texto in turnos:
+                data = {"conversacion_id": conv_id, "mensaje": texto}
+                if v2:
+                    data["bot_response"] = BOT_V2
+                self._medir(vista, lambda d=data: self._post(mensaje_cls, f"{prefijo}/message/", d))
+
+        self._aislado(correr)
+
+    def llm_response(self, veces: int):
+        from django.test import RequestFactory
+
+        from web.views import llm_response
+
+        if not (self.staff_user and self.denuncia_id):
+            return
+        factory = RequestFactory()
+        body = json.dumps({"regenerar": True} if self.sin_cache else {})
+
+        def una():
+            request = factory.post(f"/web/api/generate-llm-response/{self.denuncia_id}/", data=body, content_type="application/json")
+            request.user = self.staff_user
+            return llm_response(request, self.denuncia_id)
+
+        for _ in range(veces):
+            self._aislado(lambda: self._medir("llm_response", una))
+
+    def correr(self, conversaciones: int = 3, llm_response: int = 5, v2: bool = True) -> Resultado:
+        with sin_red():
+            for i in range(conversaciones):
+                self.conversacion(CONVERSACIONES[i % len(CONVERSACIONES)])
+                if v2:
+                    self.conversacion(CONVERSACIONES[i % len(CONVERSACIONES)], v2=True)
+            self.llm_response(llm_response)
+        return self.resultado
@@ -0,0 +1,306 @@
+# chatbot_api/intenciones.py
+"""
+Motor local de intenciones y slots del chatbot (sin LLM).
+
+Muchos turnos son rutinarios: saludos, "gracias", compartir ubicación,
+"ya envié la foto" o "hay un bache frente a la escuela". Esos se resuelven
+aquí con plantillas y solo lo que no se entiende con confianza va a OpenAI.
+
+- Reglas (regex + índice de tipos de catalogos_api/tipos_index.py). Un
+  reporte toma la confianza del índice (cobertura y margen sobre el segundo
+  tipo); las correcciones ("no es basura, es alumbrado") van siempre al LLM.
+- Si ninguna regla aplica: Naive Bayes multinomial (palabras + bigramas)
+  entrenado con `manage.py entrenar_intenciones` sobre SEMILLAS y los
+  mensajes históricos de ciudadanos que las reglas etiquetan. El modelo es
+  un JSON (CHATBOT_INTENCIONES_MODELO); si no existe, solo reglas.
+- Debajo de CHATBOT_INTENCION_UMBRAL se escala al LLM.
+
+metrics_snapshot(): turnos locales vs LLM (llm_share) por proceso.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+from catalogos_api.tipos_index import STOPWORDS, nombre_tipo, normalizar, puntuar_tipo
+
+logger = logging.getLogger(__name__)
+
+SALUDO = "saludo"
+AGRADECIMIENTO = "agradecimiento"
+REPORTAR = "reportar"
+UBICACION = "ubicacion"
+EVIDENCIA = "evidencia"
+OTRO = "otro"
+
+_re_saludo = re.compile(r"^(hola+|holi|buen[oa]s?( (dias|tardes|noches))?|saludos|que tal|hey)\b")
+_re_gracias = re.compile(r"^(muchas |mil |ok |listo |vale )?(gracias|grax|perfecto|genial|excelente)\b")
+_re_evidencia = re.compile(
+    r"\b(envie|mande|adjunte|subi|pase|envio|mando|adjunto)\b.*\b(foto|fotos|video|videos|imagen|imagenes|evidencia|archivo)\b"
+    r"|\b(foto|fotos|video|imagen|evidencia)\b.*\b(enviad[ao]s?|adjuntad[ao]s?|subid[ao]s?)\b"
+)
+_re_pregunta = re.compile(r"^(como|que|cual|cuales|donde|cuando|por que|puedo|se puede)\b")
+_re_correccion = re.compile(
+    r"\b(no es|no era|cambia|cambiar|cambialo|corrige|corregir|mejor|en realidad|me equivoque|quise decir|mas bien)\b"
+)
+# sobre el texto original (con tildes), no el normalizado
+_re_referencia = re.compile(
+    r"\b((?:frente|junto|cerca|atr[aá]s|detr[aá]s|diagonal) (?:a|al|de|del) .+"
+    r"|(?:en la esquina|al lado|a lado) (?:de|del) .+"
+    r"|(?:en|por) (?:la )?(?:calle|avenida|av\.?|barrio|sector) .+)$",
+    re.IGNORECASE,
+)
+
+# ejemplos base para entrenar (el histórico etiquetado por reglas se suma)
+SEMILLAS = {
+    SALUDO: ["hola", "buenas", "buenos dias", "buenas tardes", "hola que tal", "holi", "saludos"],
+    AGRADECIMIENTO: ["gracias", "muchas gracias", "ok gracias", "mil gracias", "perfecto gracias",
+                     "listo muchas gracias", "genial"],
+    EVIDENCIA: ["ya envie la foto", "te mande el video", "adjunte la imagen", "ahi esta la foto",
+                "ya subi la evidencia", "le envie las fotos", "mande foto"],
+    OTRO: ["quien es el alcalde", "cuanto cuesta el impuesto predial", "como estas", "que hora es",
+           "me puedes ayudar con un tramite", "donde pago el agua", "cuentame un chiste"],
+}
+
+
+@dataclass
+class Intencion:
+    nombre: str
+    confianza: float
+    slots: dict = field(default_factory=dict)
+    origen: str = "regla"
+
+
+# =========================================================
+# Métricas
+# =========================================================
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+def contar(clave: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[clave] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        m = dict(_metrics)
+    total = m.get("local", 0) + m.get("llm", 0)
+    m["llm_share"] = round(m.get("llm", 0) / total, 4) if total else None
+    return m
+
+
+# =========================================================
+# Rasgos + Naive Bayes
+# =========================================================
+def rasgos(texto: str) -> list[str]:
+    palabras = normalizar(texto).split()
+    return palabras + [f"{a}_{b}" for a, b in zip(palabras, palabras[1:])]
+
+
+def entrenar(ejemplos) -> dict:
+    """ejemplos: iterable de (texto, intencion). Devuelve el modelo serializable."""
+    docs = Counter()
+    conteos = defaultdict(Counter)
+    vocab = set()
+    for texto, clase in ejemplos:
+        fs = rasgos(texto)
+        if not fs:
+            continue
+        docs[clase] += 1
+        conteos[clase].update(fs)
+        vocab.update(fs)
+
+    # priors uniformes: el histórico viene muy cargado a saludos
+    v = len(vocab) or 1
+    modelo = {"clases": {}, "vocab_size": v}
+    for clase in docs:
+        total = sum(conteos[clase].values())
+        modelo["clases"][clase] = {
+            "prior": math.log(1 / len(docs)),
+            "desconocido": math.log(1 / (total + v)),
+            "logp": {f: math.log((c + 1) / (total + v)) for f, c in conteos[clase].items()},
+        }
+    return modelo
+
+
+def predecir(modelo: dict, texto: str) -> tuple[str | None, float]:
+    fs = rasgos(texto)
+    clases = (modelo or {}).get("clases") or {}
+    if not fs or not clases:
+        return None, 0.0
+    puntajes = {
+        clase: m["prior"] + sum(m["logp"].get(f, m["desconocido"]) for f in fs)
+        for clase, m in clases.items()
+    }
+    mejor = max(puntajes, key=puntajes.get)
+    # softmax estable -> probabilidad de la mejor clase
+    tope = puntajes[mejor]
+    z = sum(math.exp(p - tope) for p in puntajes.values())
+    return mejor, 1 / z
+
+
+_modelo_lock = threading.Lock()
+_modelo = {"path": None, "mtime": None, "data": None}
+
+
+def ruta_modelo() -> str:
+    return str(getattr(settings, "CHATBOT_INTENCIONES_MODELO", "") or "")
+
+
+def cargar_modelo() -> dict | None:
+    """Modelo del disco, recargado si cambió el archivo (entrenar_intenciones)."""
+    path = ruta_modelo()
+    if not path:
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _modelo["path"] == path and _modelo["mtime"] == mtime:
+        return _modelo["data"]
+    with _modelo_lock:
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            logger.warning("chatbot: no se pudo leer el modelo de intenciones %s", path, exc_info=True)
+            data = None
+        _modelo.update(path=path, mtime=mtime, data=data)
+        return data
+
+
+# =========================================================
+# Clasificación
+# =========================================================
+def _contenido(q: str) -> list[str]:
+    return [w for w in q.split() if w not in STOPWORDS]
+
+
+def por_reglas(texto: str, extraidos: dict | None = None) -> Intencion | None:
+    extraidos = extraidos or {}
+    q = normalizar(texto)
+    if not q:
+        return None
+    n = len(q.split())
+
+    if extraidos.get("latitud") is not None and extraidos.get("longitud") is not None:
+        return Intencion(UBICACION, 0.95)
+
+    if _re_evidencia.search(q):
+        return Intencion(EVIDENCIA, 0.9)
+
+    if n <= 4 and _re_gracias.match(q):
+        return Intencion(AGRADECIMIENTO, 0.9)
+
+    if n <= 4 and _re_saludo.match(q):
+        return Intencion(SALUDO, 0.95)
+
+    # negaciones y correcciones cambian lo ya dicho: eso lo interpreta el LLM
+    if _re_correccion.search(q):
+        return None
+
+    # preguntas ("¿cómo denuncio la basura?") no son un reporte: eso lo contesta el LLM
+    if len(_contenido(q)) >= 2 and "?" not in texto and not _re_pregunta.match(q):
+        texto = texto.strip()
+        m = _re_referencia.search(texto)
+        # el tipo sale del relato, no de la ubicación: "vive en la calle Sucre" no es un bache
+        tipo_id, confianza = puntuar_tipo(texto[: m.start()] if m else texto)
+        if tipo_id:
+            slots = {"tipo_denuncia_id": tipo_id}
+            # lo que escribió el ciudadano sirve de descripción si es una frase
+            if len(_contenido(q)) >= 3:
+                slots["descripcion"] = texto
+            if m:
+                slots["referencia"] = m.group(1).strip(" .,;")
+            return Intencion(REPORTAR, round(confianza, 3), slots)
+
+    return None
+
+
+def clasificar(texto: str, extraidos: dict | None = None) -> Intencion | None:
+    """Intención con confianza >= CHATBOT_INTENCION_UMBRAL, o None (-> LLM)."""
+    if not getattr(settings, "CHATBOT_MOTOR_LOCAL", True):
+        return None
+    umbral = float(getattr(settings, "CHATBOT_INTENCION_UMBRAL", 0.8))
+
+    intencion = por_reglas(texto, extraidos)
+    if intencion is None:
+        clase, prob = predecir(cargar_modelo(), texto)
+        # reportar sin tipo resuelto no se puede llenar: eso lo decide el LLM
+        if clase in (SALUDO, AGRADECIMIENTO, EVIDENCIA):
+            intencion = Intencion(clase, prob, origen="modelo")
+
+    if intencion is None or intencion.confianza < umbral:
+        return None
+    return intencion
+
+
+# =========================================================
+# Respuestas con plantilla
+# =========================================================
+def faltantes(datos: dict) -> list[str]:
+    out = []
+    if not datos.get("tipo_denuncia_id"):
+        out.append("tipo")
+    if not datos.get("descripcion"):
+        out.append("descripcion")
+    if datos.get("latitud") is None or datos.get("longitud") is None:
+        out.append("ubicacion")
+    return out
+
+
+def siguiente_paso(datos: dict, listo: bool) -> str:
+    falta = faltantes(datos)
+    if listo or not falta:
+        return "✅ Ya tengo todo. ¿Deseas enviar la denuncia? Responde 'sí' para enviarla."
+    if falta[0] == "tipo":
+        return "¿Qué tipo de problema deseas denunciar? (Ej: basura, alumbrado, baches...)"
+    if falta[0] == "descripcion":
+        return "Cuéntame brevemente qué pasó."
+    return "📍 Por favor envía tu ubicación con el botón de Ubicación."
+
+
+def responder(intencion: Intencion, borrador=None, archivos: int = 0) -> str:
+    datos = (borrador.datos_json if borrador else {}) or {}
+    listo = bool(borrador.listo_para_enviar) if borrador else False
+    siguiente = siguiente_paso(datos, listo)
+
+    if intencion.nombre == SALUDO:
+        if borrador is None:
+            return "Hola 👋 ¿Qué deseas denunciar hoy? (Ej: basura, alumbrado, vías...)"
+        return f"Hola 👋 Sigamos con tu denuncia. {siguiente}"
+
+    if intencion.nombre == AGRADECIMIENTO:
+        if borrador is None:
+            return "¡Con gusto! 🙂 Si necesitas reportar algo, cuéntame qué pasó."
+        return f"¡Con gusto! 🙂 {siguiente}"
+
+    if intencion.nombre == EVIDENCIA:
+        if archivos:
+            return f"📷 Recibí {archivos} archivo(s) de evidencia. {siguiente}"
+        return ("Aún no veo archivos adjuntos 🤔. Usa el botón de Adjuntar para enviar la foto o video. "
+                f"{siguiente}")
+
+    if intencion.nombre == UBICACION:
+        direccion = datos.get("direccion_texto")
+        base = f"📍 Ubicación registrada: {direccion}." if direccion else "📍 Ubicación registrada."
+        return f"{base} {siguiente}"
+
+    if intencion.nombre == REPORTAR:
+        tipo = nombre_tipo(datos.get("tipo_denuncia_id"))
+        base = f"Entendido, registré una denuncia de tipo «{tipo}»." if tipo else "Entendido."
+        if datos.get("referencia"):
+            base += f" Referencia: {datos['referencia']}."
+        return f"{base} {siguiente}"
+
+    return siguiente
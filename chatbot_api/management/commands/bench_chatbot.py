@@ -0,0 +1,129 @@
+# chatbot_api/management/commands/bench_chatbot.py
+"""
+Benchmark del chatbot sin red (chatbot_api/bench.py + mock_openai.py).
+
+    python manage.py bench_chatbot
+    python manage.py bench_chatbot --conversaciones 10 --latencia 600 --jitter 200
+    python manage.py bench_chatbot --json bench.json --max-p95-ms 1500 --max-consultas 12
+
+Necesita la base con el esquema (docker compose up db) y un ciudadano; en
+una base vacía (CI) --ciudadano-temporal crea uno que se borra al terminar.
+llm_response usa la denuncia más reciente y el primer superusuario.
+Todo se revierte al terminar salvo --conservar. Con --max-p95-ms /
+--max-consultas termina con error si alguna vista se pasa (para CI).
+"""
+import uuid
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from chatbot_api.bench import Banco
+from chatbot_api.mock_openai import MockOpenAI
+from db.models import Ciudadanos, Denuncias, Usuarios
+
+COLUMNAS = ("turnos", "p50_ms", "p95_ms", "max_ms", "consultas_p50", "consultas_p95",
+            "tokens_medio", "turnos_con_llm", "errores")
+
+
+def _ciudadano_temporal():
+    ahora = timezone.now()
+    usuario = Usuarios.objects.create(tipo="ciudadano", correo=f"bench-{uuid.uuid4()}@bench.local", password_hash="!")
+    Ciudadanos.objects.create(
+        usuario=usuario, cedula=str(usuario.id.int)[:10], nombres="Bench", apellidos="Chatbot",
+        created_at=ahora, updated_at=ahora,
+    )
+    return usuario.id
+
+
+class Command(BaseCommand):
+    help = "Mide latencia, consultas y tokens por turno del chatbot contra un OpenAI simulado."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--conversaciones", type=int, default=3)
+        parser.add_argument("--llm-response", type=int, default=5, help="llamadas al borrador IA del panel")
+        parser.add_argument("--sin-v2", action="store_true", help="no medir el chatbot v2")
+        parser.add_argument("--ciudadano", default="", help="usuario_id (default: el primero)")
+        parser.add_argument("--ciudadano-temporal", action="store_true",
+                            help="crear un ciudadano para el bench y revertirlo al final (ignora --conservar)")
+        parser.add_argument("--denuncia", default="", help="id para llm_response (default: la más reciente)")
+        parser.add_argument("--latencia", type=int, default=300, help="ms por llamada al mock")
+        parser.add_argument("--jitter", type=int, default=0)
+        parser.add_argument("--semilla", type=int, default=0)
+        parser.add_argument("--base-url", default="", help="usar un mock ya levantado (manage.py mock_openai)")
+        parser.add_argument("--json", default="", help="escribe resumen + mediciones en este archivo")
+        parser.add_argument("--max-p95-ms", type=float, default=None)
+        parser.add_argument("--max-consultas", type=int, default=None, help="tope de consultas p95 por turno")
+        parser.add_argument("--conservar", action="store_true", help="no revertir lo creado")
+        parser.add_argument("--sin-cache", action="store_true", help="llm_response siempre regenera")
+
+    def handle(self, *args, **opts):
+        temporal = opts["ciudadano_temporal"]
+        with transaction.atomic() if temporal else nullcontext():
+            resultado, staff, denuncia_id = self._correr(opts)
+            if temporal:
+                transaction.set_rollback(True)
+        self._reportar(opts, resultado, staff, denuncia_id)
+
+    def _correr(self, opts):
+        uid = opts["ciudadano"] or (
+            Ciudadanos.objects.order_by("usuario_id").values_list("usuario_id", flat=True).first()
+        )
+        if not uid and opts["ciudadano_temporal"]:
+            uid = _ciudadano_temporal()
+        if not uid:
+            raise CommandError("No hay ciudadanos: crear uno, pasar --ciudadano o usar --ciudadano-temporal")
+        denuncia_id = opts["denuncia"] or (
+            Denuncias.objects.order_by("-created_at").values_list("id", flat=True).first()
+        )
+        staff = get_user_model().objects.filter(is_superuser=True).first()
+
+        # antes de la primera llamada: config/llm.py arma el cliente con estos valores
+        mock = None
+        if opts["base_url"]:
+            settings.OPENAI_BASE_URL = opts["base_url"]
+        else:
+            mock = MockOpenAI(latencia_ms=opts["latencia"], jitter_ms=opts["jitter"],
+                              semilla=opts["semilla"]).iniciar()
+            settings.OPENAI_BASE_URL = mock.base_url
+        settings.OPENAI_API_KEY = settings.OPENAI_API_KEY or "mock"
+        self.stdout.write(f"OpenAI -> {settings.OPENAI_BASE_URL}")
+
+        banco = Banco(mock, uid, staff_user=staff, denuncia_id=denuncia_id,
+                      conservar=opts["conservar"], sin_cache=opts["sin_cache"])
+        try:
+            resultado = banco.correr(opts["conversaciones"], opts["llm_response"], v2=not opts["sin_v2"])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        finally:
+            if mock:
+                mock.detener()
+        return resultado, staff, denuncia_id
+
+    def _reportar(self, opts, resultado, staff, denuncia_id):
+        resumen = resultado.resumen()
+        self.stdout.write("vista".ljust(14) + "".join(c.rjust(15) for c in COLUMNAS))
+        for vista, fila in resumen.items():
+            self.stdout.write(vista.ljust(14) + "".join(str(fila[c]).rjust(15) for c in COLUMNAS))
+        if not staff or not denuncia_id:
+            self.stdout.write(self.style.WARNING("llm_response omitido: falta superusuario o denuncia"))
+
+        if opts["json"]:
+            with open(opts["json"], "w", encoding="utf-8") as f:
+                f.write(resultado.a_json())
+            self.stdout.write(f"Detalle en {opts['json']}")
+
+        fallas = []
+        for vista, fila in resumen.items():
+            if opts["max_p95_ms"] is not None and fila["p95_ms"] > opts["max_p95_ms"]:
+                fallas.append(f"{vista}: p95 {fila['p95_ms']} ms > {opts['max_p95_ms']}")
+            if opts["max_consultas"] is not None and fila["consultas_p95"] > opts["max_consultas"]:
+                fallas.append(f"{vista}: {fila['consultas_p95']} consultas p95 > {opts['max_consultas']}")
+            if fila["errores"]:
+                fallas.append(f"{vista}: {fila['errores']} respuestas con error")
+        if fallas:
+            raise CommandError("; ".join(fallas))
+        self.stdout.write(self.style.SUCCESS("OK"))
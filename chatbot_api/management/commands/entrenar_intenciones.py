@@ -0,0 +1,69 @@
+# chatbot_api/management/commands/entrenar_intenciones.py
+"""
+Entrena el clasificador local de intenciones del chatbot.
+
+    python manage.py entrenar_intenciones --limite 20000
+
+Junta SEMILLAS + mensajes de ciudadanos de chat_mensajes etiquetados por las
+reglas (intenciones.por_reglas), entrena Naive Bayes y escribe el JSON en
+CHATBOT_INTENCIONES_MODELO (los workers lo recargan al cambiar el archivo).
+"""
+import json
+import os
+import random
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_api import intenciones
+from db.models import ChatMensajes
+
+# el modelo solo decide entre estas; reportar/ubicación quedan en reglas
+CLASES = {intenciones.SALUDO, intenciones.AGRADECIMIENTO, intenciones.EVIDENCIA, intenciones.OTRO}
+
+
+class Command(BaseCommand):
+    help = "Entrena el clasificador de intenciones del chatbot con el histórico de chat_mensajes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limite", type=int, default=20000, help="mensajes recientes a leer")
+        parser.add_argument("--max-por-clase", type=int, default=500)
+        parser.add_argument("--salida", default="", help="ruta del JSON (default: CHATBOT_INTENCIONES_MODELO)")
+
+    def handle(self, *args, **opts):
+        salida = opts["salida"] or intenciones.ruta_modelo()
+        if not salida:
+            raise CommandError("Definir --salida o CHATBOT_INTENCIONES_MODELO")
+
+        ejemplos = [(t, clase) for clase, textos in intenciones.SEMILLAS.items() for t in textos]
+
+        textos = (
+            ChatMensajes.objects.filter(emisor="usuario")
+            .order_by("-created_at")
+            .values_list("mensaje", flat=True)[: opts["limite"]]
+        )
+        por_clase = Counter()
+        historicos = []
+        for texto in textos.iterator(chunk_size=2000):
+            regla = intenciones.por_reglas(texto or "")
+            if regla is None or regla.nombre not in CLASES:
+                continue
+            if por_clase[regla.nombre] >= opts["max_por_clase"]:
+                continue
+            por_clase[regla.nombre] += 1
+            historicos.append((texto, regla.nombre))
+
+        ejemplos += historicos
+        random.shuffle(ejemplos)
+        modelo = intenciones.entrenar(ejemplos)
+
+        aciertos = sum(1 for t, c in ejemplos if intenciones.predecir(modelo, t)[0] == c)
+        os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+        tmp = f"{salida}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(modelo, fh, ensure_ascii=False)
+        os.replace(tmp, salida)  # atómico: los workers nunca leen un archivo a medias
+
+        self.stdout.write(f"Ejemplos: {len(ejemplos)} (histórico: {dict(por_clase)})")
+        self.stdout.write(f"Acierto sobre entrenamiento: {aciertos / max(len(ejemplos), 1):.1%}")
+        self.stdout.write(self.style.SUCCESS(f"Modelo guardado en {salida}"))
@@ -0,0 +1,44 @@
+# chatbot_api/management/commands/mantener_chat_mensajes.py
+"""
+Particiones mensuales de chat_mensajes (cron diario o mensual).
+
+    python manage.py mantener_chat_mensajes
+    python manage.py mantener_chat_mensajes --meses 6 --simular
+
+1) crea el mes actual + CHAT_PARTICIONES_ADELANTE meses siguientes;
+2) mueve a chat_mensajes_archivo los meses con más de CHAT_ARCHIVO_MESES;
+3) avisa si chat_mensajes_default tiene filas (faltó crear un mes a tiempo).
+"""
+from django.core.management.base import BaseCommand
+
+from chatbot_api import archivo_chat
+
+
+class Command(BaseCommand):
+    help = "Crea las particiones futuras de chat_mensajes y archiva los meses viejos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adelante", type=int, default=None, help="meses futuros a crear")
+        parser.add_argument("--meses", type=int, default=None, help="meses que quedan calientes")
+        parser.add_argument("--tablespace", default=None, help="tablespace para lo archivado")
+        parser.add_argument("--simular", action="store_true", help="solo muestra qué se archivaría")
+        parser.add_argument("--sin-archivar", action="store_true")
+
+    def handle(self, *args, **opts):
+        if not opts["simular"]:
+            creadas = archivo_chat.crear_particiones(opts["adelante"])
+            self.stdout.write(f"Particiones creadas: {', '.join(creadas) or 'ninguna'}")
+
+        if not opts["sin_archivar"]:
+            movidas = archivo_chat.archivar(opts["meses"], opts["tablespace"], simular=opts["simular"])
+            verbo = "Se archivarían" if opts["simular"] else "Archivadas"
+            self.stdout.write(f"{verbo}: {', '.join(movidas) or 'ninguna'}")
+
+        en_default = archivo_chat.filas_en_default()
+        if en_default:
+            self.stdout.write(self.style.WARNING(
+                f"chat_mensajes_default tiene {en_default} filas: crear los meses que faltan "
+                "y moverlas antes de que crezca."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("chat_mensajes al día"))
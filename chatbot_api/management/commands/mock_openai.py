@@ -0,0 +1,55 @@
+# chatbot_api/management/commands/mock_openai.py
+"""
+Levanta el servidor que imita a OpenAI (chatbot_api/mock_openai.py).
+
+    python manage.py mock_openai --puerto 8765 --latencia 400 --jitter 150
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock gunicorn ...
+
+Sirve para cargar la app entera (gunicorn + locust/k6) sin gastar tokens.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_api.mock_openai import MockOpenAI
+
+
+class Command(BaseCommand):
+    help = "Servidor local con respuestas deterministas de la API de OpenAI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--puerto", type=int, default=8765)
+        parser.add_argument("--latencia", type=int, default=300, help="ms por llamada")
+        parser.add_argument("--jitter", type=int, default=0, help="± ms aleatorios (según --semilla)")
+        parser.add_argument("--semilla", type=int, default=0)
+        parser.add_argument("--delta", type=int, default=0, help="ms entre eventos delta del stream")
+        parser.add_argument("--guion", default="", help="JSON con la lista de reglas (default: GUION_BASE)")
+
+    def handle(self, *args, **opts):
+        guion = None
+        if opts["guion"]:
+            try:
+                with open(opts["guion"], encoding="utf-8") as f:
+                    guion = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer el guion: {e}")
+            if not isinstance(guion, list):
+                raise CommandError("El guion debe ser una lista de reglas")
+
+        mock = MockOpenAI(
+            host=opts["host"],
+            puerto=opts["puerto"],
+            latencia_ms=opts["latencia"],
+            jitter_ms=opts["jitter"],
+            semilla=opts["semilla"],
+            guion=guion,
+            delta_ms=opts["delta"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"mock de OpenAI en {mock.base_url} (Ctrl+C para salir)"))
+        try:
+            mock.servir()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stdout.write(f"stats: {json.dumps(mock.snapshot())}")
@@ -0,0 +1,264 @@
+# chatbot_api/memoria.py
+"""
+Memoria de conversación del chatbot con presupuesto de tokens.
+
+Antes cada turno leía TODO chat_mensajes de la conversación y reenviaba los
+últimos 30 mensajes: el prompt crecía con la conversación.
+
+Ahora cada turno arma la entrada de una de dos formas:
+
+- Encadenada: si la conversación tiene ultima_respuesta_id reciente y su
+  contexto (usage de esa respuesta) no pasa de CHATBOT_CADENA_MAX_TOKENS,
+  se manda previous_response_id + solo los mensajes nuevos desde entonces.
+- Rearmada: resumen acumulado + ventana de los últimos mensajes que entran
+  en CHATBOT_MEMORIA_TOKENS. Lo que sale de la ventana se pliega al resumen
+  (LLM barato vía config/llm.py; si falla o tarda, resumen extractivo truncado).
+
+En ambos casos se agrega el estado del borrador (datos_json compacto), que es
+la fuente de verdad de lo ya recolectado. Los tokens se estiman (~4 chars).
+
+Dentro de un turno los mensajes recientes vienen de EstadoTurno.recientes()
+(chatbot_api/turno.py): una sola lectura, con los mensajes del turno que aún
+no se guardaron.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from config import externos, llm
+from db.models import ChatConversaciones, ChatMensajes
+
+logger = logging.getLogger(__name__)
+
+CHARS_POR_TOKEN = 4
+TOKENS_POR_MENSAJE = 4          # overhead de rol/formato por mensaje
+MAX_NUEVOS_ENCADENADO = 10      # más mensajes sueltos que esto: mejor rearmar
+RESUMEN_LOTE = 40               # mensajes que se pliegan al resumen por vez
+RESUMEN_DEADLINE = 8            # seg.: el resumen no puede comerse el turno
+
+RESUMEN_INSTRUCTIONS = (
+    "Resume en español, en pocas líneas, lo importante de esta conversación entre un "
+    "ciudadano y el asistente de denuncias del GAD: qué quiere denunciar, datos ya dados "
+    "(tipo, descripción, ubicación, referencia) y qué falta. Sin saludos ni relleno."
+)
+
+
+def _conf(nombre: str, default: int) -> int:
+    return int(getattr(settings, nombre, default))
+
+
+def estimar_tokens(texto: str) -> int:
+    return len(texto or "") // CHARS_POR_TOKEN + TOKENS_POR_MENSAJE
+
+
+def _recortar(texto: str, tokens: int) -> str:
+    max_chars = max(tokens, 1) * CHARS_POR_TOKEN
+    texto = texto or ""
+    return texto if len(texto) <= max_chars else texto[: max_chars - 1] + "…"
+
+
+def _rol(m) -> str:
+    return "user" if m.emisor == "usuario" else "assistant"
+
+
+def contexto_borrador(borrador) -> dict:
+    """Mensaje interno con el estado estructurado del borrador."""
+    if borrador is None:
+        return {"role": "user", "content": "(contexto interno: borrador_id=None)"}
+
+    datos = borrador.datos_json or {}
+    estado = {
+        k: datos.get(k)
+        for k in ("tipo_denuncia_id", "descripcion", "referencia", "latitud", "longitud")
+        if datos.get(k) not in (None, "")
+    }
+    if "descripcion" in estado:
+        estado["descripcion"] = _recortar(str(estado["descripcion"]), 100)
+    estado["listo_para_enviar"] = bool(borrador.listo_para_enviar)
+    return {
+        "role": "user",
+        "content": (
+            f"(contexto interno: borrador_id={borrador.id}; "
+            f"datos={json.dumps(estado, ensure_ascii=False, default=str)})"
+        ),
+    }
+
+
+# =========================================================
+# Memoria
+# =========================================================
+class MemoriaConversacion:
+    def __init__(self, conv: ChatConversaciones, recientes=None):
+        """recientes: callable -> mensajes más nuevos primero; None -> se consultan."""
+        self.conv = conv
+        self._recientes = recientes
+
+    # ---------- encadenado ----------
+    def _puede_encadenar(self) -> bool:
+        c = self.conv
+        if not c.ultima_respuesta_id or not c.ultima_respuesta_at:
+            return False
+        if timezone.now() - c.ultima_respuesta_at > timedelta(seconds=_conf("CHATBOT_CADENA_TTL", 6 * 3600)):
+            return False
+        return (c.ultima_respuesta_tokens or 0) <= _conf("CHATBOT_CADENA_MAX_TOKENS", 6000)
+
+    def _nuevos_desde_respuesta(self):
+        """Mensajes posteriores a la última respuesta del LLM (None si son demasiados)."""
+        if self._recientes is not None:
+            # recientes() trae al menos MAX_NUEVOS_ENCADENADO + 1: si todos son nuevos, son demasiados
+            desde = self.conv.ultima_respuesta_at
+            msgs = [m for m in self._recientes() if m.created_at > desde][: MAX_NUEVOS_ENCADENADO + 1]
+            msgs.reverse()
+        else:
+            msgs = list(
+                ChatMensajes.objects
+                .filter(conversacion_id=self.conv.id, created_at__gt=self.conv.ultima_respuesta_at)
+                .order_by("created_at")
+                .only("emisor", "mensaje", "created_at")[: MAX_NUEVOS_ENCADENADO + 1]
+            )
+        if not msgs or len(msgs) > MAX_NUEVOS_ENCADENADO:
+            return None
+        presupuesto = _conf("CHATBOT_MEMORIA_TOKENS", 1500)
+        out = [{"role": _rol(m), "content": _recortar(m.mensaje, presupuesto)} for m in msgs]
+        if sum(estimar_tokens(x["content"]) for x in out) > presupuesto:
+            return None
+        return out
+
+    # ---------- ventana + resumen ----------
+    def _ventana(self):
+        """(mensajes de la ventana en orden, created_at del más viejo incluido)."""
+        presupuesto = _conf("CHATBOT_MEMORIA_TOKENS", 1500)
+        turnos = _conf("CHATBOT_MEMORIA_TURNOS", 12)
+        if self._recientes is not None:
+            recientes = self._recientes()[:turnos]
+        else:
+            recientes = list(
+                ChatMensajes.objects
+                .filter(conversacion_id=self.conv.id, created_at__gte=self.conv.created_at)
+                .order_by("-created_at")
+                .only("emisor", "mensaje", "created_at")[:turnos]
+            )
+
+        elegidos, usados = [], 0
+        for m in recientes:
+            contenido = m.mensaje or ""
+            costo = estimar_tokens(contenido)
+            if usados + costo > presupuesto:
+                if elegidos:
+                    break
+                # el último mensaje siempre entra, aunque sea recortado
+                contenido = _recortar(contenido, presupuesto - TOKENS_POR_MENSAJE)
+                costo = presupuesto
+            elegidos.append((m, contenido))
+            usados += costo
+
+        elegidos.reverse()
+        desde = elegidos[0][0].created_at if elegidos else None
+        return [{"role": _rol(m), "content": c} for m, c in elegidos], desde
+
+    def _plegar_resumen(self, desde):
+        """Pliega al resumen los mensajes anteriores a `desde` que aún no estén en él."""
+        if desde is None:
+            return
+        # created_at >= inicio de la conversación: el planner descarta los meses anteriores
+        qs = ChatMensajes.objects.filter(
+            conversacion_id=self.conv.id, created_at__gte=self.conv.created_at, created_at__lt=desde,
+        )
+        if self.conv.resumen_hasta:
+            qs = qs.filter(created_at__gt=self.conv.resumen_hasta)
+        # los más recientes; lo más viejo que no entre ya está (o no cabe) en el resumen
+        pendientes = list(qs.order_by("-created_at").only("emisor", "mensaje")[:RESUMEN_LOTE])
+        if not pendientes:
+            return
+        pendientes.reverse()
+
+        tope = _conf("CHATBOT_RESUMEN_TOKENS", 300)
+        resumen = self._resumir_llm(pendientes, tope) or self._resumir_extractivo(pendientes, tope)
+        resumen = _recortar(resumen, tope)
+        hasta = desde - timedelta(microseconds=1)
+
+        ChatConversaciones.objects.filter(pk=self.conv.pk).update(resumen=resumen, resumen_hasta=hasta)
+        self.conv.resumen, self.conv.resumen_hasta = resumen, hasta
+
+    def _resumir_llm(self, pendientes, tope: int) -> str | None:
+        texto = "\n".join(
+            f"{'Ciudadano' if m.emisor == 'usuario' else 'Asistente'}: {_recortar(m.mensaje, 150)}"
+            for m in pendientes
+        )
+        if self.conv.resumen:
+            texto = f"Resumen previo:\n{self.conv.resumen}\n\nMensajes nuevos:\n{texto}"
+        try:
+            resp = llm.llamar(
+                "responses.create",
+                deadline=RESUMEN_DEADLINE,
+                model=getattr(settings, "CHATBOT_RESUMEN_MODEL", None) or settings.OPENAI_MODEL,
+                instructions=RESUMEN_INSTRUCTIONS,
+                input=texto,
+                max_output_tokens=tope * 2,
+                store=False,
+            )
+            return (resp.output_text or "").strip() or None
+        except externos.ServicioNoDisponible as e:
+            logger.info("chatbot memoria: resumen sin LLM (%s)", e.motivo)
+        except Exception:
+            logger.warning("chatbot memoria: falló el resumen con LLM", exc_info=True)
+        return None
+
+    def _resumir_extractivo(self, pendientes, tope: int) -> str:
+        # respaldo: resumen previo + lo último que dijo el ciudadano, truncado
+        lineas = [f"- {_recortar(m.mensaje, 40)}" for m in pendientes if m.emisor == "usuario"]
+        previo = self.conv.resumen or ""
+        cuerpo = "\n".join(lineas[-8:])
+        texto = f"{previo}\n{cuerpo}".strip() if previo else cuerpo
+        # si no cabe, se conserva lo más reciente
+        max_chars = tope * CHARS_POR_TOKEN
+        return texto[-max_chars:] if len(texto) > max_chars else texto
+
+    # ---------- API ----------
+    def preparar(self, borrador, encadenar: bool = True) -> dict:
+        """kwargs de entrada para responses.create: input (+ previous_response_id)."""
+        ctx = contexto_borrador(borrador)
+
+        if encadenar and self._puede_encadenar():
+            nuevos = self._nuevos_desde_respuesta()
+            if nuevos is not None:
+                return {"previous_response_id": self.conv.ultima_respuesta_id, "input": nuevos + [ctx]}
+
+        ventana, desde = self._ventana()
+        self._plegar_resumen(desde)
+
+        entrada = []
+        if self.conv.resumen:
+            entrada.append({
+                "role": "user",
+                "content": f"(contexto interno: resumen de la conversación anterior)\n{self.conv.resumen}",
+            })
+        return {"input": entrada + ventana + [ctx]}
+
+    def registrar(self, resp, cuando, guardar: bool = True) -> dict:
+        """
+        Guarda la respuesta final del turno para encadenar el siguiente.
+        guardar=False: solo la deja en self.conv y devuelve los campos (EstadoTurno los escribe).
+        """
+        usage = getattr(resp, "usage", None)
+        tokens = int(getattr(usage, "input_tokens", 0) or 0) + int(getattr(usage, "output_tokens", 0) or 0)
+        campos = {
+            "ultima_respuesta_id": getattr(resp, "id", None),
+            "ultima_respuesta_at": cuando,
+            "ultima_respuesta_tokens": tokens,
+        }
+        if guardar:
+            ChatConversaciones.objects.filter(pk=self.conv.pk).update(**campos)
+        for k, v in campos.items():
+            setattr(self.conv, k, v)
+        return campos
+
+    def olvidar_cadena(self):
+        """La respuesta guardada ya no sirve (expiró en OpenAI): el próximo turno rearma."""
+        ChatConversaciones.objects.filter(pk=self.conv.pk).update(ultima_respuesta_id=None)
+        self.conv.ultima_respuesta_id = None
@@ -0,0 +1,314 @@
+# chatbot_api/mock_openai.py
+"""
+Servidor local que imita a OpenAI (Responses + Chat Completions) para
+benchmarks y CI sin red ni costo.
+
+    python manage.py mock_openai --puerto 8765 --latencia 400 --jitter 150
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock ...
+
+Determinista: la respuesta depende solo de la entrada y del guion, y la
+latencia de (latencia, jitter, semilla). El guion es una lista de reglas que
+se evalúan sobre el último mensaje del usuario; la primera que calza decide:
+
+    {"si": "regex", "tool": "update_borrador", "args": {"descripcion": "$texto"}}
+    {"si": "regex", "texto": "respuesta fija"}
+
+En args, "$texto" se reemplaza por el mensaje del usuario y "$borrador_id"
+por el id del contexto interno; una tool que necesita borrador_id y no lo
+tiene se salta. Si la entrada trae function_call_output se responde texto
+(TEXTO_TRAS_TOOL). stats guarda llamadas y tokens estimados (~4 chars).
+"""
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_POR_TOKEN = 4
+TEXTO_TRAS_TOOL = "Listo, registré esos datos en tu denuncia."
+TEXTO_POR_DEFECTO = "¿Me cuentas qué problema deseas denunciar y dónde ocurre?"
+
+GUION_BASE = [
+    {"si": r"\b(lat|latitud)\b", "tool": "update_borrador",
+     "args": {"borrador_id": "$borrador_id", "latitud": -1.0453, "longitud": -78.5901}},
+    {"si": r"\b(basura|bache|huecos?|luz|alumbrado|agua|ruido|perros?)\b", "tool": "update_borrador",
+     "args": {"borrador_id": "$borrador_id", "descripcion": "$texto"}},
+    {"si": r"\b(tipos?|opciones|categor[ií]as?)\b", "tool": "get_tipos_denuncia", "args": {}},
+    {"si": r"\b(como|cómo|cuanto|cuánto|donde|dónde)\b",
+     "texto": "Puedo ayudarte a registrar tu denuncia: dime el tipo, una descripción y tu ubicación."},
+]
+
+_re_borrador = re.compile(r"borrador_id=([0-9a-fA-F-]{36})")
+
+
+def estimar_tokens(obj) -> int:
+    texto = obj if isinstance(obj, str) else json.dumps(obj, ensure_ascii=False, default=str)
+    return max(len(texto) // CHARS_POR_TOKEN, 1)
+
+
+# =========================================================
+# Decisión (sin HTTP)
+# =========================================================
+def _textos(entrada) -> list[tuple[str, str]]:
+    """[(rol, texto)] de input (Responses) o messages (Chat Completions)."""
+    if isinstance(entrada, str):
+        return [("user", entrada)]
+    out = []
+    for item in entrada or []:
+        if not isinstance(item, dict):
+            continue
+        contenido = item.get("content")
+        if isinstance(contenido, list):
+            contenido = " ".join(str(c.get("text", "")) for c in contenido if isinstance(c, dict))
+        if contenido:
+            out.append((item.get("role", "user"), str(contenido)))
+    return out
+
+
+def decidir(guion: list, entrada) -> dict:
+    """{"tool": nombre, "args": {...}} o {"texto": ...} según el guion."""
+    items = entrada if isinstance(entrada, list) else []
+    if any(isinstance(i, dict) and i.get("type") == "function_call_output" for i in items):
+        return {"texto": TEXTO_TRAS_TOOL}
+
+    textos = _textos(entrada)
+    borrador_id = None
+    for _rol, t in textos:
+        m = _re_borrador.search(t)
+        if m:
+            borrador_id = m.group(1)
+    # el contexto interno también va con rol user: el último "de verdad" es el que no lo es
+    usuario = next((t for rol, t in reversed(textos) if rol == "user" and "contexto interno" not in t), "")
+
+    for regla in guion:
+        if not re.search(regla["si"], usuario, re.IGNORECASE):
+            continue
+        if "texto" in regla:
+            return {"texto": regla["texto"]}
+        args = {}
+        for k, v in (regla.get("args") or {}).items():
+            if v == "$texto":
+                v = usuario
+            elif v == "$borrador_id":
+                if not borrador_id:
+                    break
+                v = borrador_id
+            args[k] = v
+        else:
+            return {"tool": regla["tool"], "args": args}
+    return {"texto": TEXTO_POR_DEFECTO}
+
+
+# =========================================================
+# Payloads con el formato de la API
+# =========================================================
+def _usage_responses(entrada_tokens: int, salida: str) -> dict:
+    sal = estimar_tokens(salida)
+    return {
+        "input_tokens": entrada_tokens,
+        "input_tokens_details": {"cached_tokens": 0},
+        "output_tokens": sal,
+        "output_tokens_details": {"reasoning_tokens": 0},
+        "total_tokens": entrada_tokens + sal,
+    }
+
+
+def respuesta_responses(n: int, modelo: str, decision: dict, entrada_tokens: int) -> dict:
+    if "tool" in decision:
+        salida = json.dumps(decision["args"], ensure_ascii=False)
+        item = {
+            "type": "function_call",
+            "id": f"fc_mock_{n}",
+            "call_id": f"call_mock_{n}",
+            "name": decision["tool"],
+            "arguments": salida,
+            "status": "completed",
+        }
+    else:
+        salida = decision["texto"]
+        item = {
+            "type": "message",
+            "id": f"msg_mock_{n}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": salida, "annotations": []}],
+        }
+    return {
+        "id": f"resp_mock_{n}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": modelo,
+        "status": "completed",
+        "output": [item],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": _usage_responses(entrada_tokens, salida),
+    }
+
+
+def respuesta_chat(n: int, modelo: str, texto: str, entrada_tokens: int) -> dict:
+    sal = estimar_tokens(texto)
+    return {
+        "id": f"chatcmpl-mock-{n}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": modelo,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": texto},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": entrada_tokens, "completion_tokens": sal, "total_tokens": entrada_tokens + sal},
+    }
+
+
+def eventos_stream(resp: dict, trozo: int = 12):
+    """Eventos SSE de la Responses API para `resp` (texto en trozos de `trozo` chars)."""
+    seq = 0
+
+    def ev(tipo, **data):
+        nonlocal seq
+        seq += 1
+        return tipo, {"type": tipo, "sequence_number": seq, **data}
+
+    en_curso = {**resp, "status": "in_progress", "output": []}
+    yield ev("response.created", response=en_curso)
+    for i, item in enumerate(resp["output"]):
+        yield ev("response.output_item.added", output_index=i, item={**item, "status": "in_progress"})
+        if item["type"] == "message":
+            texto = item["content"][0]["text"]
+            for j in range(0, len(texto), trozo):
+                yield ev("response.output_text.delta", item_id=item["id"], output_index=i,
+                         content_index=0, delta=texto[j:j + trozo], logprobs=[])
+        yield ev("response.output_item.done", output_index=i, item=item)
+    yield ev("response.completed", response=resp)
+
+
+# =========================================================
+# Servidor
+# =========================================================
+class MockOpenAI:
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 0, latencia_ms: int = 0,
+                 jitter_ms: int = 0, semilla: int = 0, guion: list | None = None,
+                 delta_ms: int = 0):
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.delta_ms = delta_ms
+        self.guion = guion or GUION_BASE
+        self._azar = random.Random(semilla)
+        self._lock = threading.Lock()
+        self.stats = {"llamadas": 0, "tokens_entrada": 0, "tokens_salida": 0, "tools": 0}
+        self._n = 0
+        self._httpd = ThreadingHTTPServer((host, puerto), self._handler())
+        self._httpd.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def base_url(self) -> str:
+        host, puerto = self._httpd.server_address[:2]
+        return f"http://{host}:{puerto}/v1"
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._httpd.serve_forever, name="mock-openai", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def servir(self):
+        self._httpd.serve_forever()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def _siguiente(self, entrada_tokens: int) -> tuple[int, float]:
+        # bajo lock: mismo orden de llamadas -> mismas latencias
+        with self._lock:
+            self._n += 1
+            self.stats["llamadas"] += 1
+            self.stats["tokens_entrada"] += entrada_tokens
+            jitter = self._azar.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            return self._n, max(self.latencia_ms + jitter, 0) / 1000
+
+    def _contar_salida(self, resp_usage_tokens: int, tool: bool):
+        with self._lock:
+            self.stats["tokens_salida"] += resp_usage_tokens
+            self.stats["tools"] += int(tool)
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status: int, data: dict):
+                cuerpo = json.dumps(data, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def do_POST(self):
+                largo = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(largo) or b"{}")
+                except ValueError:
+                    return self._json(400, {"error": {"message": "JSON inválido", "type": "invalid_request_error"}})
+
+                ruta = self.path.split("?", 1)[0].rstrip("/")
+                if ruta.endswith("/responses"):
+                    return self._responses(body)
+                if ruta.endswith("/chat/completions"):
+                    return self._chat(body)
+                return self._json(404, {"error": {"message": f"ruta {ruta} no simulada", "type": "not_found"}})
+
+            def _responses(self, body: dict):
+                entrada = body.get("input")
+                tokens = estimar_tokens([body.get("instructions"), entrada, body.get("tools")])
+                n, espera = mock._siguiente(tokens)
+                decision = decidir(mock.guion, entrada)
+                resp = respuesta_responses(n, body.get("model", "mock"), decision, tokens)
+                mock._contar_salida(resp["usage"]["output_tokens"], "tool" in decision)
+                time.sleep(espera)
+
+                if not body.get("stream"):
+                    return self._json(200, resp)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    for tipo, data in eventos_stream(resp):
+                        self.wfile.write(f"event: {tipo}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode())
+                        self.wfile.flush()
+                        if mock.delta_ms and tipo == "response.output_text.delta":
+                            time.sleep(mock.delta_ms / 1000)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # el cliente canceló (deadline / desconexión)
+                self.close_connection = True
+
+            def _chat(self, body: dict):
+                mensajes = body.get("messages")
+                tokens = estimar_tokens(mensajes)
+                n, espera = mock._siguiente(tokens)
+                pedido = next((t for rol, t in reversed(_textos(mensajes)) if rol == "user"), "")
+                texto = f"Estimado/a ciudadano/a: su caso fue revisado. (mock {n}, {len(pedido)} chars)"
+                resp = respuesta_chat(n, body.get("model", "mock"), texto, tokens)
+                mock._contar_salida(resp["usage"]["completion_tokens"], False)
+                time.sleep(espera)
+                return self._json(200, resp)
+
+        return Handler
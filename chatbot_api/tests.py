@@ -1,3 +1,224 @@
-from django.test import TestCase
+import json
+import uuid
+from io import StringIO
+from types import SimpleNamespace
+from unittest import SkipTest, mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from catalogos_api.tipos_index import IndiceTipos
+from chatbot_api import bench, intenciones, views
+from chatbot_api.intenciones import (
+    AGRADECIMIENTO,
+    EVIDENCIA,
+    OTRO,
+    REPORTAR,
+    SALUDO,
+    UBICACION,
+    SEMILLAS,
+    Intencion,
+    entrenar,
+    por_reglas,
+    predecir,
+)
+from chatbot_api.mock_openai import GUION_BASE, TEXTO_POR_DEFECTO, TEXTO_TRAS_TOOL, decidir
+
+_INDICE = IndiceTipos([
+    (1, "Baches en la vía", ""),
+    (2, "Alumbrado público", ""),
+    (3, "Basura", ""),
+    (4, "Calles en mal estado", ""),
+])
+
+
+@override_settings(CHATBOT_MOTOR_LOCAL=True, CHATBOT_INTENCIONES_MODELO="", CHATBOT_INTENCION_UMBRAL=0.8)
+@mock.patch("chatbot_api.intenciones.puntuar_tipo", _INDICE.puntuar)
+class ReglasTests(SimpleTestCase):
+    """por_reglas / clasificar con un catálogo fijo (sin base ni cache)."""
+
+    def test_saludo_y_agradecimiento(self):
+        self.assertEqual(por_reglas("Hola, buenas tardes").nombre, SALUDO)
+        self.assertEqual(por_reglas("muchas gracias").nombre, AGRADECIMIENTO)
+
+    def test_evidencia(self):
+        self.assertEqual(por_reglas("Ya envié la foto").nombre, EVIDENCIA)
+        self.assertEqual(por_reglas("las fotos ya están subidas").nombre, EVIDENCIA)
+
+    def test_ubicacion_por_coordenadas_extraidas(self):
+        intencion = por_reglas("aquí", {"latitud": -1.04, "longitud": -78.59})
+        self.assertEqual(intencion.nombre, UBICACION)
+        self.assertIsNone(por_reglas("aquí", {"latitud": -1.04}))
+
+    def test_reporte_con_referencia(self):
+        texto = "Hay un bache frente a la escuela Simón Bolívar"
+        intencion = por_reglas(texto)
+        self.assertEqual(intencion.nombre, REPORTAR)
+        self.assertEqual(intencion.slots, {
+            "tipo_denuncia_id": 1,
+            "descripcion": texto,
+            "referencia": "frente a la escuela Simón Bolívar",
+        })
+
+    def test_reporte_con_calle(self):
+        intencion = por_reglas("hay basura en la calle Sucre")
+        self.assertEqual(intencion.slots["tipo_denuncia_id"], 3)
+        self.assertEqual(intencion.slots["referencia"], "en la calle Sucre")
+
+    def test_preguntas_escalan_al_llm(self):
+        self.assertIsNone(por_reglas("¿Cómo denuncio la basura?"))
+        self.assertIsNone(por_reglas("como denuncio basura aqui"))
+        self.assertIsNone(intenciones.clasificar("¿Dónde reporto un bache?"))
+
+    def test_una_sola_palabra_no_es_reporte(self):
+        self.assertIsNone(por_reglas("basura"))
+
+    def test_confianza_sale_del_indice(self):
+        self.assertGreaterEqual(por_reglas("hay un bache en mi barrio").confianza, 0.8)
+        # "luz" es sinónimo exacto, pero explica una palabra de cuatro
+        self.assertLess(por_reglas("la factura de luz vino alta").confianza, 0.8)
+        self.assertIsNone(intenciones.clasificar("la factura de luz vino alta"))
+
+    def test_la_ubicacion_no_decide_el_tipo(self):
+        # "en la calle sucre" es referencia, no un reporte de "Calles en mal estado"
+        self.assertIsNone(por_reglas("mi vecino vive en la calle sucre y me debe plata"))
+
+    def test_correcciones_escalan_al_llm(self):
+        for texto in (
+            "no es basura, es un problema de alumbrado",
+            "mejor ponle alumbrado",
+            "quiero cambiar el tipo a baches",
+        ):
+            self.assertIsNone(por_reglas(texto), texto)
+
+    def test_clasificar_respeta_el_motor_local(self):
+        self.assertEqual(intenciones.clasificar("hola").nombre, SALUDO)
+        with self.settings(CHATBOT_MOTOR_LOCAL=False):
+            self.assertIsNone(intenciones.clasificar("hola"))
+
+
+class NaiveBayesTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.modelo = entrenar((texto, clase) for clase, textos in SEMILLAS.items() for texto in textos)
+
+    def test_predice_las_semillas(self):
+        for texto, esperada in [
+            ("hola buenas", SALUDO),
+            ("mil gracias", AGRADECIMIENTO),
+            ("ya mande las fotos", EVIDENCIA),
+            ("quien es el alcalde", OTRO),
+        ]:
+            clase, prob = predecir(self.modelo, texto)
+            self.assertEqual(clase, esperada, texto)
+            self.assertGreater(prob, 0.5)
+
+    def test_sin_texto_o_sin_modelo(self):
+        self.assertEqual(predecir(self.modelo, ""), (None, 0.0))
+        self.assertEqual(predecir({}, "hola"), (None, 0.0))
+        self.assertEqual(predecir(None, "hola"), (None, 0.0))
+
+    def test_modelo_serializable(self):
+        self.assertEqual(json.loads(json.dumps(self.modelo)), self.modelo)
+
+
+class TurnoLocalTests(SimpleTestCase):
+    """_turno_local completa el borrador sin pisar lo que ya dio el ciudadano, salvo el tipo."""
+
+    def _estado(self, datos):
+        borrador = SimpleNamespace(id=uuid.uuid4(), datos_json=datos, listo_para_enviar=False)
+        estado = mock.Mock(borrador=borrador, borrador_nuevo=False, conv_id=uuid.uuid4())
+        estado.asegurar_borrador.return_value = borrador
+        estado.borrador_json.return_value = {}
+        return estado
+
+    def _turno(self, estado, slots):
+        intencion = Intencion(REPORTAR, 0.9, slots)
+        with mock.patch.object(intenciones, "clasificar", return_value=intencion), \
+                mock.patch.object(intenciones, "nombre_tipo", return_value="Alumbrado público"), \
+                mock.patch.object(views, "_execute_tool") as tool:
+            resp = views._turno_local(estado, "texto", {})
+        self.assertEqual(resp.status_code, 200)
+        return tool
+
+    def test_tipo_nuevo_reemplaza_al_anterior(self):
+        estado = self._estado({"tipo_denuncia_id": 3, "descripcion": "basura en la esquina"})
+        tool = self._turno(estado, {"tipo_denuncia_id": 2, "descripcion": "no hay luz en el barrio"})
+        tool.assert_called_once_with(
+            estado, "update_borrador", {"borrador_id": str(estado.borrador.id), "tipo_denuncia_id": 2}
+        )
+
+    def test_mismo_tipo_no_actualiza(self):
+        estado = self._estado({"tipo_denuncia_id": 2, "descripcion": "no hay luz"})
+        self._turno(estado, {"tipo_denuncia_id": 2, "descripcion": "sigue sin luz"}).assert_not_called()
+
+
+class DecidirTests(SimpleTestCase):
+    """mock_openai.decidir: la respuesta depende solo de la entrada y del guion."""
+
+    BORRADOR = "6f1c2b7e-0a51-4d8e-9a5e-3c1f2d4b5a69"
+
+    def _entrada(self, texto, con_borrador=True):
+        entrada = [{"role": "user", "content": texto}]
+        if con_borrador:
+            entrada.insert(0, {"role": "user", "content": f"(contexto interno) borrador_id={self.BORRADOR}"})
+        return entrada
+
+    def test_tool_con_texto_y_borrador(self):
+        decision = decidir(GUION_BASE, self._entrada("hay basura en la esquina"))
+        self.assertEqual(decision, {
+            "tool": "update_borrador",
+            "args": {"borrador_id": self.BORRADOR, "descripcion": "hay basura en la esquina"},
+        })
+
+    def test_sin_borrador_se_salta_la_tool(self):
+        decision = decidir(GUION_BASE, self._entrada("¿dónde queda la basura?", con_borrador=False))
+        self.assertIn("texto", decision)
+
+    def test_tras_la_tool_responde_texto(self):
+        entrada = self._entrada("hay basura") + [{"type": "function_call_output", "output": "{}"}]
+        self.assertEqual(decidir(GUION_BASE, entrada), {"texto": TEXTO_TRAS_TOOL})
+
+    def test_sin_regla_y_chat_completions(self):
+        self.assertEqual(decidir(GUION_BASE, "quien es el alcalde"), {"texto": TEXTO_POR_DEFECTO})
+        mensajes = [{"role": "user", "content": [{"type": "text", "text": "qué tipos hay"}]}]
+        self.assertEqual(decidir(GUION_BASE, mensajes), {"tool": "get_tipos_denuncia", "args": {}})
+
+    def test_guion_propio(self):
+        guion = [{"si": "hola", "texto": "fijo"}]
+        self.assertEqual(decidir(guion, "hola"), {"texto": "fijo"})
+
+
+class SinRedTests(SimpleTestCase):
+    def test_geocodificacion_fija(self):
+        original = views.reverse_geocode_nominatim
+        with bench.sin_red():
+            self.assertEqual(views.reverse_geocode_nominatim(-1.04, -78.59), bench.DIRECCION_BENCH)
+        self.assertIs(views.reverse_geocode_nominatim, original)
+
+
+class BenchChatbotCommandTests(TestCase):
+    """Humo: el comando corre completo contra el mock. Requiere tesis/schema.sql."""
+
+    @classmethod
+    def setUpClass(cls):
+        if "ciudadanos" not in connection.introspection.table_names():
+            raise SkipTest("requiere la base de pruebas creada con tesis/schema.sql")
+        super().setUpClass()
+
+    @override_settings(OPENAI_BASE_URL="", OPENAI_API_KEY="")
+    def test_una_conversacion(self):
+        salida = StringIO()
+        # cliente nuevo apuntando al mock (config/llm.py lo arma una vez por proceso)
+        with mock.patch.multiple("config.llm", _loop=None, _client=None, _cupos=None), \
+                mock.patch("denuncias_api.utils_geo.requests.get", side_effect=AssertionError("salió a la red")):
+            call_command(
+                "bench_chatbot", "--ciudadano-temporal", "--conversaciones", "1", "--llm-response", "0",
+                "--latencia", "0", stdout=salida,
+            )
+        texto = salida.getvalue()
+        self.assertIn("chatbot", texto)
+        self.assertIn("v2", texto)
+        self.assertTrue(texto.rstrip().endswith("OK"))
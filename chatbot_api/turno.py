@@ -0,0 +1,164 @@
+# chatbot_api/turno.py
+"""
+Estado de un turno del chatbot (unidad de trabajo).
+
+Antes un turno consultaba DenunciaBorradores hasta tres veces (borr,
+refresh_from_db, borr2), insertaba cada ChatMensajes por separado y cada
+update_borrador guardaba el borrador: ~10 idas a la base por turno.
+
+Ahora:
+- cargar(): conversación + borrador en UNA consulta (select_related del
+  OneToOne inverso). Los mensajes recientes para la memoria se leen una sola
+  vez y solo si el turno llega al LLM (recientes()).
+- Los mensajes del turno y los cambios de las tools quedan en memoria.
+- guardar(): al final del turno, en una transacción: bulk_create de los
+  mensajes + un insert/update del borrador + los campos de la conversación
+  (cadena de chatbot_api/memoria.py).
+
+finalizar_denuncia es la excepción: escribe el borrador antes de bloquearlo,
+porque finalize_borrador_to_denuncia lee la fila y la borra.
+"""
+from __future__ import annotations
+
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from chatbot_api.memoria import MAX_NUEVOS_ENCADENADO
+from db.models import ChatConversaciones, ChatMensajes, DenunciaBorradores
+
+
+class EstadoTurno:
+    def __init__(self, uid, conv: ChatConversaciones, borrador: DenunciaBorradores | None = None):
+        self.uid = str(uid)
+        self.conv = conv
+        self.borrador = borrador
+        # campos de ChatConversaciones que se escriben en guardar()
+        self.conv_campos: dict = {}
+        self._nuevos: list[ChatMensajes] = []
+        self._recientes: list | None = None
+        self._borrador_nuevo = False
+        self._borrador_sucio = False
+
+    @classmethod
+    def cargar(cls, uid, conv_id) -> EstadoTurno | None:
+        """Conversación del ciudadano + su borrador (si existe), o None."""
+        conv = (
+            ChatConversaciones.objects
+            .select_related("denunciaborradores")
+            .filter(id=conv_id, ciudadano_id=uid)
+            .first()
+        )
+        if conv is None:
+            return None
+        # sin borrador el acceso inverso lanza RelatedObjectDoesNotExist (AttributeError)
+        borr = getattr(conv, "denunciaborradores", None)
+        if borr is not None and str(borr.ciudadano_id) != str(uid):
+            borr = None
+        return cls(uid, conv, borr)
+
+    @property
+    def conv_id(self):
+        return self.conv.id
+
+    # ---------- mensajes ----------
+    def agregar_mensaje(self, emisor: str, texto: str) -> ChatMensajes:
+        m = ChatMensajes(
+            id=uuid.uuid4(),
+            conversacion_id=self.conv.id,
+            emisor=emisor,
+            mensaje=texto,
+            created_at=timezone.now(),
+        )
+        self._nuevos.append(m)
+        if self._recientes is not None:
+            self._recientes.insert(0, m)
+        return m
+
+    def recientes(self) -> list:
+        """Mensajes más nuevos primero, incluidos los de este turno aún sin guardar."""
+        if self._recientes is None:
+            limite = max(int(getattr(settings, "CHATBOT_MEMORIA_TURNOS", 12)), MAX_NUEVOS_ENCADENADO + 1)
+            guardados = list(
+                ChatMensajes.objects
+                # el límite inferior deja fuera las particiones de meses anteriores al chat
+                .filter(conversacion_id=self.conv.id, created_at__gte=self.conv.created_at)
+                .order_by("-created_at")
+                .only("emisor", "mensaje", "created_at")[:limite]
+            )
+            self._recientes = self._nuevos[::-1] + guardados
+        return self._recientes
+
+    # ---------- borrador ----------
+    def asegurar_borrador(self) -> DenunciaBorradores:
+        """Crea el borrador en memoria si no existe (se inserta en guardar())."""
+        if self.borrador is None:
+            now = timezone.now()
+            self.borrador = DenunciaBorradores(
+                id=uuid.uuid4(),
+                ciudadano_id=self.uid,
+                conversacion_id=self.conv.id,
+                datos_json={"origen": "chat"},
+                listo_para_enviar=False,
+                created_at=now,
+                updated_at=now,
+            )
+            self._borrador_nuevo = True
+        return self.borrador
+
+    @property
+    def borrador_nuevo(self) -> bool:
+        """Creado en este turno y aún sin insertar."""
+        return self._borrador_nuevo
+
+    def es_borrador(self, borrador_id) -> bool:
+        return self.borrador is not None and str(self.borrador.id) == str(borrador_id)
+
+    def marcar_borrador(self):
+        self.borrador.updated_at = timezone.now()
+        self._borrador_sucio = True
+
+    def borrador_json(self) -> dict | None:
+        b = self.borrador
+        if b is None:
+            return None
+        return {
+            "id": str(b.id),
+            "listo_para_enviar": bool(b.listo_para_enviar),
+            "datos": b.datos_json or {},
+        }
+
+    def guardar_borrador(self):
+        """Escribe ya el borrador pendiente (antes de que otra consulta lo lea)."""
+        b = self.borrador
+        if b is None:
+            return
+        if self._borrador_nuevo:
+            b.save(force_insert=True)
+        elif self._borrador_sucio:
+            DenunciaBorradores.objects.filter(pk=b.pk).update(
+                datos_json=b.datos_json,
+                listo_para_enviar=b.listo_para_enviar,
+                updated_at=b.updated_at,
+            )
+        self._borrador_nuevo = self._borrador_sucio = False
+
+    def borrador_finalizado(self):
+        """finalize_borrador_to_denuncia ya borró la fila."""
+        self.borrador = None
+        self._borrador_nuevo = self._borrador_sucio = False
+
+    # ---------- flush ----------
+    def guardar(self):
+        if not (self._nuevos or self._borrador_nuevo or self._borrador_sucio or self.conv_campos):
+            return
+        with transaction.atomic():
+            if self._nuevos:
+                ChatMensajes.objects.bulk_create(self._nuevos)
+                self._nuevos = []
+            self.guardar_borrador()
+            if self.conv_campos:
+                ChatConversaciones.objects.filter(pk=self.conv.pk).update(**self.conv_campos)
+                self.conv_campos = {}
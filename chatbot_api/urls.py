@@ -1,9 +1,10 @@
 from django.urls import path, include
-from .views import ChatbotMessageView, ChatbotStartView
+from .views import ChatbotMessageStreamView, ChatbotMessageView, ChatbotStartView
 
 urlpatterns = [
     path("start/", ChatbotStartView.as_view(), name="chatbot_start"),
     path("message/", ChatbotMessageView.as_view(), name="chatbot_message"),
+    path("message/stream/", ChatbotMessageStreamView.as_view(), name="chatbot_message_stream"),
 
     # V2
     path("", include("chatbot_api.urls_mejorado")),
@@ -1,19 +1,28 @@
 import json
+import logging
 import re
+import time
 import uuid
 
 from django.conf import settings
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from openai import OpenAI
+from openai import BadRequestError, NotFoundError
+
+from config import externos, llm
+from chatbot_api import intenciones
+from chatbot_api.memoria import MemoriaConversacion
+from chatbot_api.turno import EstadoTurno
 
 from denuncias_api.views_borradores import finalize_borrador_to_denuncia
 from denuncias_api.utils_geo import reverse_geocode_nominatim
+from catalogos_api.tipos_index import resolver_tipo
 
 from db.models import (
     Ciudadanos,
@@ -21,8 +30,11 @@ from db.models import (
     ChatConversaciones,
     ChatMensajes,
     DenunciaBorradores,
+    BorradorArchivo,
 )
 
+logger = logging.getLogger(__name__)
+
 # =========================================================
 # Helpers JWT
 # =========================================================
@@ -36,12 +48,6 @@ def get_claim(request, key: str, default=None):
         return default
 
 
-# =========================================================
-# OpenAI client
-# =========================================================
-def _client():
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
-
 
 # =========================================================
 # Tools (Responses API format)
@@ -249,32 +255,6 @@ CONFIRM_WORDS = {"si", "sí", "si.", "sí.", "enviar", "confirmo", "confirmo env
 CANCEL_WORDS = {"no", "no.", "cancelar", "anular", "aun no", "aún no"}
 
 
-def _match_tipo_to_id(nombre: str):
-    if not nombre:
-        return None
-
-    n = str(nombre).strip().lower()
-
-    if n.isdigit():
-        t = TiposDenuncia.objects.filter(activo=True, id=int(n)).first()
-        if t:
-            return int(t.id)
-
-    qs = TiposDenuncia.objects.filter(activo=True)
-    for t in qs:
-        if t.nombre:
-            tn = t.nombre.strip().lower()
-            if tn in n or n in tn:
-                return int(t.id)
-
-    if "basura" in n or "aseo" in n:
-        t = TiposDenuncia.objects.filter(activo=True, nombre__icontains="basura").first()
-        if t:
-            return int(t.id)
-
-    return None
-
-
 def _extract_fields_from_text(text: str):
     out = {}
 
@@ -313,16 +293,19 @@ def _extract_fields_from_text(text: str):
 # =========================================================
 # Tools backend
 # =========================================================
-def _execute_tool(uid: str, tool_name: str, args: dict):
+def _execute_tool(estado, tool_name: str, args: dict):
+    """
+    Tools sobre el estado del turno (chatbot_api/turno.py): los cambios al
+    borrador quedan en memoria hasta estado.guardar().
+    """
     if tool_name == "get_tipos_denuncia":
         qs = TiposDenuncia.objects.filter(activo=True).order_by("nombre")
         return {"tipos": [{"id": int(x.id), "nombre": x.nombre} for x in qs]}
 
     if tool_name == "get_borrador":
-        borrador_id = args["borrador_id"]
-        b = DenunciaBorradores.objects.filter(id=borrador_id, ciudadano_id=uid).first()
-        if not b:
+        if not estado.es_borrador(args.get("borrador_id")):
             return {"error": "borrador_no_existe"}
+        b = estado.borrador
         return {
             "borrador_id": str(b.id),
             "datos": b.datos_json or {},
@@ -330,10 +313,9 @@ def _execute_tool(uid: str, tool_name: str, args: dict):
         }
 
     if tool_name == "update_borrador":
-        borrador_id = args["borrador_id"]
-        b = DenunciaBorradores.objects.filter(id=borrador_id, ciudadano_id=uid).first()
-        if not b:
+        if not estado.es_borrador(args.get("borrador_id")):
             return {"error": "borrador_no_existe"}
+        b = estado.borrador
 
         data = b.datos_json or {}
 
@@ -371,22 +353,24 @@ def _execute_tool(uid: str, tool_name: str, args: dict):
 
         b.datos_json = data
         b.listo_para_enviar = bool(ok)
-        b.updated_at = timezone.now()
-        b.save(update_fields=["datos_json", "listo_para_enviar", "updated_at"])
+        estado.marcar_borrador()
 
         return {"updated": True, "listo_para_enviar": bool(ok), "datos": data}
 
     if tool_name == "finalizar_denuncia":
-        borrador_id = args["borrador_id"]
         confirm = bool(args.get("confirmacion"))
 
         if not confirm:
             return {"error": "no_confirmado"}
+        if not estado.es_borrador(args.get("borrador_id")):
+            return {"error": "borrador_no_existe"}
 
         with transaction.atomic():
+            # finalize lee la fila: primero lo pendiente del turno
+            estado.guardar_borrador()
             b = DenunciaBorradores.objects.select_for_update().filter(
-                id=borrador_id,
-                ciudadano_id=uid,
+                id=estado.borrador.id,
+                ciudadano_id=estado.uid,
             ).first()
             if not b:
                 return {"error": "borrador_no_existe"}
@@ -395,24 +379,15 @@ def _execute_tool(uid: str, tool_name: str, args: dict):
             if not d:
                 return {"error": "borrador_incompleto", "datos": (b.datos_json or {})}
 
+        estado.borrador_finalizado()
         return {"ok": True, "denuncia_id": str(d.id)}
 
     return {"error": "tool_desconocida"}
 
 
 # =========================================================
-# Historial -> input messages
+# Respuestas del LLM
 # =========================================================
-def _to_openai_messages(conv_id: str):
-    qs = ChatMensajes.objects.filter(conversacion_id=conv_id).order_by("created_at")
-    msgs = list(qs)[-30:]
-    out = []
-    for m in msgs:
-        role = "user" if m.emisor == "usuario" else "assistant"
-        out.append({"role": role, "content": m.mensaje})
-    return out
-
-
 def _iter_function_calls(resp):
     for item in (resp.output or []):
         if isinstance(item, dict):
@@ -432,24 +407,396 @@ def _iter_function_calls(resp):
 
 
 # =========================================================
-# NUEVO helper: crear borrador SOLO cuando haya datos
+# Turno: parte sin LLM
 # =========================================================
-def _crear_borrador_si_no_existe(uid: str, conv_id: str):
-    b = DenunciaBorradores.objects.filter(conversacion_id=conv_id, ciudadano_id=uid).first()
-    if b:
-        return b
-
-    now = timezone.now()
-    return DenunciaBorradores.objects.create(
-        id=uuid.uuid4(),
-        ciudadano_id=uid,
-        conversacion_id=conv_id,
-        datos_json={"origen": "chat"},
-        listo_para_enviar=False,
-        created_at=now,
-        updated_at=now,
+def _turno_local(estado, text: str, extracted: dict):
+    """Responde con plantilla si la intención es clara; None -> se escala al LLM."""
+    intencion = intenciones.clasificar(text, extracted)
+    if intencion is None:
+        return None
+
+    if intencion.nombre == intenciones.REPORTAR:
+        borr = estado.asegurar_borrador()
+        datos = borr.datos_json or {}
+        # solo completa lo que falta: no pisa lo que el ciudadano ya dio...
+        payload = {k: v for k, v in intencion.slots.items() if not datos.get(k)}
+        # ...salvo el tipo: si el mensaje nombra otro, manda el nuevo
+        tipo_id = intencion.slots.get("tipo_denuncia_id")
+        if tipo_id and tipo_id != datos.get("tipo_denuncia_id"):
+            payload["tipo_denuncia_id"] = tipo_id
+        if payload:
+            _execute_tool(estado, "update_borrador", {"borrador_id": str(borr.id), **payload})
+
+    borr = estado.borrador
+    archivos = 0
+    # un borrador recién creado en este turno todavía no puede tener archivos
+    if intencion.nombre == intenciones.EVIDENCIA and borr is not None and not estado.borrador_nuevo:
+        archivos = BorradorArchivo.objects.filter(borrador_id=borr.id, tipo__in=("foto", "video")).count()
+
+    bot_text = intenciones.responder(intencion, borr, archivos=archivos)
+    estado.agregar_mensaje("bot", bot_text)
+    intenciones.contar(f"intencion.{intencion.nombre}")
+    intenciones.contar(f"origen.{intencion.origen}")
+
+    return Response(
+        {
+            "respuesta": bot_text,
+            "conversacion_id": str(estado.conv_id),
+            "borrador": estado.borrador_json(),
+        },
+        status=200,
+    )
+
+
+def _iniciar_turno(request):
+    """
+    Parte común de message/ y message/stream/: valida, carga el estado del
+    turno y resuelve lo que no necesita LLM (extracción, enviar, cancelar).
+    Devuelve un Response si el turno ya quedó resuelto (y guardado), o el
+    EstadoTurno con el mensaje del usuario pendiente de guardar.
+    """
+    uid = get_claim(request, "uid")
+    tipo = get_claim(request, "tipo")
+    if not uid or tipo != "ciudadano":
+        return Response({"detail": "Solo ciudadanos"}, status=403)
+
+    conv_id = (request.data.get("conversacion_id") or "").strip()
+    text = (request.data.get("mensaje") or "").strip()
+    if not conv_id or not text:
+        return Response({"detail": "conversacion_id y mensaje son obligatorios"}, status=400)
+
+    estado = EstadoTurno.cargar(uid, conv_id)
+    if estado is None:
+        return Response({"detail": "Conversación no existe"}, status=404)
+
+    estado.agregar_mensaje("usuario", text)
+
+    resuelto = _resolver_sin_llm(estado, text)
+    if resuelto is not None:
+        estado.guardar()
+        return resuelto
+    return estado
+
+
+def _resolver_sin_llm(estado, text: str):
+    """Extracción rápida, enviar/cancelar y motor local. None -> turno con LLM."""
+    conv_id = estado.conv_id
+    texto_norm = text.strip().lower()
+
+    #  Importante: NO crear borrador automáticamente por cualquier mensaje.
+    # Solo lo creamos si detectamos datos útiles (tipo/desc/ubicación/ref),
+    # o si el usuario intenta "enviar" (porque ya está en flujo de denuncia).
+    extracted = _extract_fields_from_text(text)
+    hay_datos_utiles = any(
+        k in extracted for k in ("tipo_texto", "descripcion", "latitud", "longitud", "referencia")
     )
 
+    if estado.borrador is None and (hay_datos_utiles or (texto_norm in CONFIRM_WORDS)):
+        estado.asegurar_borrador()
+    borr = estado.borrador
+
+    # ========= extracción rápida (sin LLM) =========
+    if borr is not None and extracted:
+        update_payload = {"borrador_id": str(borr.id)}
+
+        if extracted.get("tipo_texto"):
+            tipo_id = resolver_tipo(extracted["tipo_texto"])
+            if tipo_id:
+                update_payload["tipo_denuncia_id"] = tipo_id
+
+        for k in ["descripcion", "referencia", "latitud", "longitud"]:
+            if k in extracted:
+                update_payload[k] = extracted[k]
+
+        if len(update_payload.keys()) > 1:
+            _execute_tool(estado, "update_borrador", update_payload)
+
+    # ========= finalizar si listo + confirmación =========
+    if borr is not None and borr.listo_para_enviar and texto_norm in CONFIRM_WORDS:
+        r = _execute_tool(
+            estado,
+            "finalizar_denuncia",
+            {"borrador_id": str(borr.id), "confirmacion": True},
+        )
+
+        if r.get("ok"):
+            msg_ok = f"  Denuncia enviada. ID: {r['denuncia_id']}"
+            estado.agregar_mensaje("bot", msg_ok)
+            return Response(
+                {
+                    "respuesta": msg_ok,
+                    "conversacion_id": str(conv_id),
+                    "denuncia_id": r["denuncia_id"],
+                },
+                status=200,
+            )
+
+        err = r.get("error") or "error_finalizando"
+        bot_text = f"❌ No se pudo enviar: {err}. Revisa si falta tipo, descripción o ubicación."
+        estado.agregar_mensaje("bot", bot_text)
+
+        return Response(
+            {
+                "respuesta": bot_text,
+                "conversacion_id": str(conv_id),
+                "borrador": estado.borrador_json() or {
+                    "id": None,
+                    "listo_para_enviar": False,
+                    "datos": {},
+                },
+            },
+            status=200,
+        )
+
+    # Si el usuario dice "enviar/sí" pero aún NO hay borrador o no está listo, no creamos denuncia vacía:
+    if texto_norm in CONFIRM_WORDS and (borr is None or not borr.listo_para_enviar):
+        bot_text = (
+            "Antes de enviar necesito estos datos: tipo de denuncia, una breve descripción y tu ubicación 📍.\n"
+            "Cuéntame qué pasó y envía tu ubicación con el botón de Ubicación."
+        )
+        estado.agregar_mensaje("bot", bot_text)
+        return Response(
+            {
+                "respuesta": bot_text,
+                "conversacion_id": str(conv_id),
+                "borrador": estado.borrador_json(),
+            },
+            status=200,
+        )
+
+    # ========= cancelar =========
+    if texto_norm in CANCEL_WORDS:
+        bot_text = "Está bien 🙂 Cuando quieras continuamos. Si deseas enviar, dime 'sí' o presiona Enviar."
+        estado.agregar_mensaje("bot", bot_text)
+
+        return Response(
+            {
+                "respuesta": bot_text,
+                "conversacion_id": str(conv_id),
+                "borrador": estado.borrador_json(),
+            },
+            status=200,
+        )
+
+    # ========= motor local (intenciones rutinarias, sin LLM) =========
+    return _turno_local(estado, text, extracted)
+
+
+def _contar_turno(turno):
+    """Métrica llm_share: turnos válidos resueltos localmente vs. con OpenAI."""
+    if not isinstance(turno, Response):
+        intenciones.contar("llm")
+    elif turno.status_code == 200:
+        intenciones.contar("local")
+
+
+# =========================================================
+# Turno: LLM (compartido por message/ y message/stream/)
+# =========================================================
+MAX_TOOL_ROUNDS = 5
+
+MSG_LLM_ERROR = "El asistente tuvo un problema. Intenta de nuevo en unos minutos."
+MSG_SIN_TEXTO = "¿Me confirmas el tipo de denuncia y una breve descripción?"
+
+
+MSG_DEMORA = "⏳ El asistente está tardando más de lo normal."
+
+
+def _limite_turno() -> float:
+    """Hora (monotonic) en la que vence el turno completo: todas las rondas juntas."""
+    return time.monotonic() + float(getattr(settings, "CHATBOT_TURNO_DEADLINE", 40))
+
+
+def _crear_respuesta(limite: float, stream: bool = False, **kwargs):
+    # cada llamada solo dispone de lo que le queda al turno
+    restante = limite - time.monotonic()
+    if restante <= 0:
+        raise externos.ServicioNoDisponible("openai", "deadline")
+    return (llm.stream if stream else llm.llamar)(
+        "responses.create",
+        deadline=restante,
+        model=getattr(settings, "OPENAI_MODEL", "gpt-5"),
+        instructions=INSTRUCTIONS,
+        tools=TOOLS,
+        **kwargs,
+    )
+
+
+def _primera_respuesta(memoria, estado, limite: float, stream: bool = False):
+    """Primera llamada del turno; si la cadena guardada venció en OpenAI, rearma."""
+    entrada = memoria.preparar(estado.borrador)
+    try:
+        return _crear_respuesta(limite, stream=stream, **entrada)
+    except (BadRequestError, NotFoundError):
+        if "previous_response_id" not in entrada:
+            raise
+        # la respuesta guardada ya no existe en OpenAI: rearmar sin encadenar
+        logger.info("chatbot: cadena vencida en conversación %s, se rearma", estado.conv_id)
+        memoria.olvidar_cadena()
+        return _crear_respuesta(limite, stream=stream, **memoria.preparar(estado.borrador, encadenar=False))
+
+
+def _respuesta_degradada(estado) -> dict:
+    """
+    OpenAI lento, saturado o con el circuito abierto: en vez de un 503 se
+    responde con plantilla el siguiente paso del borrador y se guarda como
+    mensaje del bot (sin tocar la cadena de la memoria).
+    """
+    borr = estado.borrador
+    if borr is None:
+        siguiente = "Mientras tanto, cuéntame qué deseas denunciar (Ej: basura, alumbrado, vías...)."
+    else:
+        siguiente = intenciones.siguiente_paso(borr.datos_json or {}, bool(borr.listo_para_enviar))
+    bot_text = f"{MSG_DEMORA} {siguiente}"
+
+    estado.agregar_mensaje("bot", bot_text)
+    return {
+        "respuesta": bot_text,
+        "conversacion_id": str(estado.conv_id),
+        "degradado": True,
+        "borrador": estado.borrador_json(),
+    }
+
+
+def _ejecutar_calls(estado, calls):
+    """Ejecuta las function calls del modelo. Devuelve [(nombre, result, output_item)]."""
+    out = []
+    for c in calls:
+        name = c["name"]
+
+        try:
+            args = json.loads(c["arguments"] or "{}")
+        except Exception:
+            args = {}
+
+        #   seguridad extra: si no hay borrador, no permitimos update/finalize aunque el modelo lo intente
+        if estado.borrador is None and name in ("update_borrador", "finalizar_denuncia"):
+            result = {"error": "sin_borrador"}
+        else:
+            result = _execute_tool(estado, name, args)
+
+        out.append((name, result, {
+            "type": "function_call_output",
+            "call_id": c["call_id"],
+            "output": json.dumps(result, ensure_ascii=False),
+        }))
+    return out
+
+
+def _cerrar_turno(estado, memoria, resp, texto: str) -> dict:
+    """Agrega las ayudas, deja el mensaje del bot en el estado y arma el payload final."""
+    bot_text = (texto or "").strip() or MSG_SIN_TEXTO
+
+    # ayuda extra si falta ubicación/evidencia (solo si ya hay borrador)
+    borr = estado.borrador
+    if borr:
+        data = borr.datos_json or {}
+        falta_ubic = (data.get("latitud") is None) or (data.get("longitud") is None)
+        if falta_ubic and "ubic" not in bot_text.lower():
+            bot_text += "\n\n📍 Por favor envía tu ubicación con el botón de Ubicación."
+        if "evidencia" not in bot_text.lower():
+            bot_text += "\n\n📷 Si tienes, adjunta una foto o video con el botón de Adjuntar."
+    else:
+        # sin borrador todavía: empuja a dar datos para recién crear uno
+        if "ubic" not in bot_text.lower():
+            bot_text += "\n\n📍 Cuando estés listo, envía tu ubicación con el botón de Ubicación."
+
+    m = estado.agregar_mensaje("bot", bot_text)
+    # el siguiente turno encadena desde esta respuesta (mensajes > created_at son nuevos)
+    estado.conv_campos.update(memoria.registrar(resp, m.created_at, guardar=False))
+
+    return {
+        "respuesta": bot_text,
+        "conversacion_id": str(estado.conv_id),
+        "borrador": estado.borrador_json(),
+    }
+
+
+# =========================================================
+# SSE
+# =========================================================
+def _sse(evento: str, data) -> str:
+    return f"event: {evento}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def _stream_respuesta(stream):
+    """Recorre un stream de la Responses API: ("delta", txt) / ("tool", nombre) / ("fin", response)."""
+    final = None
+    for ev in stream:
+        t = getattr(ev, "type", "")
+        if t == "response.output_text.delta":
+            yield "delta", ev.delta
+        elif t == "response.output_item.added" and getattr(ev.item, "type", None) == "function_call":
+            yield "tool", ev.item.name
+        elif t == "response.completed":
+            final = ev.response
+        elif t in ("response.failed", "response.incomplete", "error"):
+            raise RuntimeError(f"stream del LLM terminó con {t}")
+    if final is None:
+        raise RuntimeError("stream del LLM sin response.completed")
+    yield "fin", final
+
+
+def _eventos_turno(estado):
+    """
+    Generador SSE del turno con LLM: tool -> delta* -> done (o error).
+    Si el cliente se desconecta Django cierra el generador y llm.stream()
+    cancela la llamada en curso; lo acumulado del turno se guarda igual.
+    """
+    try:
+        yield from _eventos_llm(estado)
+    finally:
+        estado.guardar()
+
+
+def _eventos_llm(estado):
+    limite = _limite_turno()
+    memoria = MemoriaConversacion(estado.conv, recientes=estado.recientes)
+    partes = []
+    resp = None
+
+    try:
+        stream = _primera_respuesta(memoria, estado, limite, stream=True)
+        for ronda in range(MAX_TOOL_ROUNDS + 1):
+            for tipo, valor in _stream_respuesta(stream):
+                if tipo == "delta":
+                    partes.append(valor)
+                    yield _sse("delta", {"texto": valor})
+                elif tipo == "tool":
+                    yield _sse("tool", {"nombre": valor, "estado": "inicio"})
+                else:
+                    resp = valor
+
+            calls = list(_iter_function_calls(resp))
+            if not calls or ronda == MAX_TOOL_ROUNDS:
+                break
+
+            outputs = []
+            for name, result, item in _ejecutar_calls(estado, calls):
+                outputs.append(item)
+                yield _sse("tool", {"nombre": name, "estado": "fin", "ok": "error" not in result})
+
+            # lo que el modelo dijo antes de las tools no va en el mensaje final
+            partes = []
+            stream = _crear_respuesta(limite, stream=True, previous_response_id=resp.id, input=outputs)
+    except externos.ServicioNoDisponible as e:
+        # lento/saturado/circuito abierto: done degradado (reemplaza lo que alcanzó a llegar)
+        logger.warning("chatbot: LLM no disponible (%s), respuesta degradada", e.motivo)
+        yield _sse("done", _respuesta_degradada(estado))
+        return
+    except Exception:
+        logger.exception("chatbot: error en el stream del LLM")
+        yield _sse("error", {"detail": MSG_LLM_ERROR, "conversacion_id": str(estado.conv_id)})
+        return
+
+    texto = "".join(partes)
+    payload = _cerrar_turno(estado, memoria, resp, texto)
+    # las ayudas (ubicación/evidencia) que se agregaron al final también se emiten
+    extra = payload["respuesta"][len(texto.strip()):] if texto.strip() else payload["respuesta"]
+    if extra:
+        yield _sse("delta", {"texto": extra})
+    yield _sse("done", payload)
+
 
 # =========================================================
 # Views
@@ -498,256 +845,70 @@ class ChatbotMessageView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        uid = get_claim(request, "uid")
-        tipo = get_claim(request, "tipo")
-        if not uid or tipo != "ciudadano":
-            return Response({"detail": "Solo ciudadanos"}, status=403)
-
-        conv_id = (request.data.get("conversacion_id") or "").strip()
-        text = (request.data.get("mensaje") or "").strip()
-        if not conv_id or not text:
-            return Response({"detail": "conversacion_id y mensaje son obligatorios"}, status=400)
-
-        conv = ChatConversaciones.objects.filter(id=conv_id, ciudadano_id=uid).first()
-        if not conv:
-            return Response({"detail": "Conversación no existe"}, status=404)
-
-        now = timezone.now()
-
-        ChatMensajes.objects.create(
-            id=uuid.uuid4(),
-            conversacion_id=conv_id,
-            emisor="usuario",
-            mensaje=text,
-            created_at=now,
-        )
-
-        texto_norm = text.strip().lower()
-
-        #  Importante: NO crear borrador automáticamente por cualquier mensaje.
-        # Solo lo creamos si detectamos datos útiles (tipo/desc/ubicación/ref),
-        # o si el usuario intenta "enviar" (porque ya está en flujo de denuncia).
-        borr = DenunciaBorradores.objects.filter(conversacion_id=conv_id, ciudadano_id=uid).first()
-
-        extracted = _extract_fields_from_text(text)
-        hay_datos_utiles = any(
-            k in extracted for k in ("tipo_texto", "descripcion", "latitud", "longitud", "referencia")
-        )
-
-        if borr is None and (hay_datos_utiles or (texto_norm in CONFIRM_WORDS)):
-            borr = _crear_borrador_si_no_existe(str(uid), str(conv_id))
-
-        # ========= extracción rápida (sin LLM) =========
-        if borr is not None and extracted:
-            update_payload = {"borrador_id": str(borr.id)}
-
-            if extracted.get("tipo_texto"):
-                tipo_id = _match_tipo_to_id(extracted["tipo_texto"])
-                if tipo_id:
-                    update_payload["tipo_denuncia_id"] = tipo_id
-
-            for k in ["descripcion", "referencia", "latitud", "longitud"]:
-                if k in extracted:
-                    update_payload[k] = extracted[k]
-
-            if len(update_payload.keys()) > 1:
-                _execute_tool(str(uid), "update_borrador", update_payload)
-                borr.refresh_from_db()
-
-        # ========= finalizar si listo + confirmación =========
-        if borr is not None and borr.listo_para_enviar and texto_norm in CONFIRM_WORDS:
-            r = _execute_tool(
-                str(uid),
-                "finalizar_denuncia",
-                {"borrador_id": str(borr.id), "confirmacion": True},
-            )
-
-            if r.get("ok"):
-                msg_ok = f"  Denuncia enviada. ID: {r['denuncia_id']}"
-                ChatMensajes.objects.create(
-                    id=uuid.uuid4(),
-                    conversacion_id=conv_id,
-                    emisor="bot",
-                    mensaje=msg_ok,
-                    created_at=timezone.now(),
-                )
-                return Response(
-                    {
-                        "respuesta": msg_ok,
-                        "conversacion_id": str(conv_id),
-                        "denuncia_id": r["denuncia_id"],
-                    },
-                    status=200,
-                )
-
-            err = r.get("error") or "error_finalizando"
-            bot_text = f"❌ No se pudo enviar: {err}. Revisa si falta tipo, descripción o ubicación."
-            ChatMensajes.objects.create(
-                id=uuid.uuid4(),
-                conversacion_id=conv_id,
-                emisor="bot",
-                mensaje=bot_text,
-                created_at=timezone.now(),
-            )
-
-            borr2 = DenunciaBorradores.objects.filter(conversacion_id=conv_id, ciudadano_id=uid).first()
-            datos = (borr2.datos_json if borr2 else {}) or {}
-
-            return Response(
-                {
-                    "respuesta": bot_text,
-                    "conversacion_id": str(conv_id),
-                    "borrador": {
-                        "id": str(borr2.id) if borr2 else None,
-                        "listo_para_enviar": bool(borr2.listo_para_enviar) if borr2 else False,
-                        "datos": datos,
-                    },
-                },
-                status=200,
-            )
-
-        # Si el usuario dice "enviar/sí" pero aún NO hay borrador o no está listo, no creamos denuncia vacía:
-        if texto_norm in CONFIRM_WORDS and (borr is None or not borr.listo_para_enviar):
-            bot_text = (
-                "Antes de enviar necesito estos datos: tipo de denuncia, una breve descripción y tu ubicación 📍.\n"
-                "Cuéntame qué pasó y envía tu ubicación con el botón de Ubicación."
-            )
-            ChatMensajes.objects.create(
-                id=uuid.uuid4(),
-                conversacion_id=conv_id,
-                emisor="bot",
-                mensaje=bot_text,
-                created_at=timezone.now(),
-            )
-            return Response(
-                {
-                    "respuesta": bot_text,
-                    "conversacion_id": str(conv_id),
-                    "borrador": None if borr is None else {
-                        "id": str(borr.id),
-                        "listo_para_enviar": bool(borr.listo_para_enviar),
-                        "datos": (borr.datos_json or {}),
-                    },
-                },
-                status=200,
-            )
-
-        # ========= cancelar =========
-        if texto_norm in CANCEL_WORDS:
-            bot_text = "Está bien 🙂 Cuando quieras continuamos. Si deseas enviar, dime 'sí' o presiona Enviar."
-            ChatMensajes.objects.create(
-                id=uuid.uuid4(),
-                conversacion_id=conv_id,
-                emisor="bot",
-                mensaje=bot_text,
-                created_at=timezone.now(),
-            )
-
-            borr2 = DenunciaBorradores.objects.filter(conversacion_id=conv_id, ciudadano_id=uid).first()
-            datos = (borr2.datos_json if borr2 else {}) or {}
-
-            return Response(
-                {
-                    "respuesta": bot_text,
-                    "conversacion_id": str(conv_id),
-                    "borrador": {
-                        "id": str(borr2.id) if borr2 else None,
-                        "listo_para_enviar": bool(borr2.listo_para_enviar) if borr2 else False,
-                        "datos": datos,
-                    } if borr2 else None,
-                },
-                status=200,
-            )
-
-        # ========= LLM =========
-        client = _client()
-        history = _to_openai_messages(conv_id)
-
-        #   Solo pasamos borrador_id si existe (regla de instrucciones)
-        if borr is not None:
-            history.append({"role": "user", "content": f"(contexto interno: borrador_id={borr.id})"})
-        else:
-            history.append({"role": "user", "content": "(contexto interno: borrador_id=None)"})
-
-        resp = client.responses.create(
-            model=getattr(settings, "OPENAI_MODEL", "gpt-5"),
-            instructions=INSTRUCTIONS,
-            tools=TOOLS,
-            input=history,
-        )
-
-        for _ in range(5):
-            calls = list(_iter_function_calls(resp))
-            if not calls:
-                break
-
-            tool_outputs = []
-            for c in calls:
-                name = c["name"]
-                call_id = c["call_id"]
-
-                try:
-                    args = json.loads(c["arguments"] or "{}")
-                except Exception:
-                    args = {}
-
-                #   seguridad extra: si no hay borrador, no permitimos update/finalize aunque el modelo lo intente
-                if borr is None and name in ("update_borrador", "finalizar_denuncia"):
-                    result = {"error": "sin_borrador"}
-                else:
-                    result = _execute_tool(str(uid), name, args)
-
-                tool_outputs.append(
-                    {
-                        "type": "function_call_output",
-                        "call_id": call_id,
-                        "output": json.dumps(result, ensure_ascii=False),
-                    }
-                )
-
-            resp = client.responses.create(
-                model=getattr(settings, "OPENAI_MODEL", "gpt-5"),
-                instructions=INSTRUCTIONS,
-                tools=TOOLS,
-                previous_response_id=resp.id,
-                input=tool_outputs,
-            )
+        turno = _iniciar_turno(request)
+        _contar_turno(turno)
+        if isinstance(turno, Response):
+            return turno
+        estado = turno
+
+        # un solo flush al final del turno, pase lo que pase con el LLM
+        try:
+            return self._turno_llm(estado)
+        finally:
+            estado.guardar()
+
+    def _turno_llm(self, estado):
+        # todas las rondas (tools incluidas) comparten el deadline del turno
+        limite = _limite_turno()
+        # ventana + resumen + estado del borrador (o encadenado con previous_response_id);
+        # borrador_id solo viaja si existe (regla de instrucciones)
+        memoria = MemoriaConversacion(estado.conv, recientes=estado.recientes)
+
+        try:
+            resp = _primera_respuesta(memoria, estado, limite)
+
+            for _ in range(MAX_TOOL_ROUNDS):
+                calls = list(_iter_function_calls(resp))
+                if not calls:
+                    break
+
+                tool_outputs = [item for _n, _r, item in _ejecutar_calls(estado, calls)]
+                resp = _crear_respuesta(limite, previous_response_id=resp.id, input=tool_outputs)
+        except externos.ServicioNoDisponible as e:
+            logger.warning("chatbot: LLM no disponible (%s), respuesta degradada", e.motivo)
+            return Response(_respuesta_degradada(estado), status=200)
+        except Exception:
+            logger.exception("chatbot: error llamando al LLM")
+            return Response({"detail": MSG_LLM_ERROR, "conversacion_id": str(estado.conv_id)}, status=503)
+
+        return Response(_cerrar_turno(estado, memoria, resp, resp.output_text), status=200)
+
+
+class ChatbotMessageStreamView(APIView):
+    """
+    Igual que message/ pero responde Server-Sent Events:
+      event: tool   {"nombre", "estado": "inicio"|"fin", "ok"}
+      event: delta  {"texto"}           (tokens del asistente a medida que llegan)
+      event: done   {...}               (mismo payload que message/: respuesta completa + borrador;
+                                         con "degradado": true si OpenAI no respondió a tiempo)
+      event: error  {"detail", "conversacion_id"}
+    Los errores de validación (403/400/404) responden JSON normal, antes del stream.
+    """
+    permission_classes = [IsAuthenticated]
 
-        bot_text = (resp.output_text or "").strip() or "¿Me confirmas el tipo de denuncia y una breve descripción?"
-
-        # ayuda extra si falta ubicación/evidencia (solo si ya hay borrador)
-        borr2 = DenunciaBorradores.objects.filter(conversacion_id=conv_id, ciudadano_id=uid).first()
-        if borr2:
-            data = borr2.datos_json or {}
-            falta_ubic = (data.get("latitud") is None) or (data.get("longitud") is None)
-            if falta_ubic and "ubic" not in bot_text.lower():
-                bot_text += "\n\n📍 Por favor envía tu ubicación con el botón de Ubicación."
-            if "evidencia" not in bot_text.lower():
-                bot_text += "\n\n📷 Si tienes, adjunta una foto o video con el botón de Adjuntar."
+    def post(self, request):
+        turno = _iniciar_turno(request)
+        _contar_turno(turno)
+        if isinstance(turno, Response):
+            if turno.status_code != 200:
+                return turno
+            # resuelto sin LLM (enviar/cancelar/...): un solo evento done
+            eventos = iter([_sse("done", turno.data)])
         else:
-            # sin borrador todavía: empuja a dar datos para recién crear uno
-            if "ubic" not in bot_text.lower():
-                bot_text += "\n\n📍 Cuando estés listo, envía tu ubicación con el botón de Ubicación."
-
-        ChatMensajes.objects.create(
-            id=uuid.uuid4(),
-            conversacion_id=conv_id,
-            emisor="bot",
-            mensaje=bot_text,
-            created_at=timezone.now(),
-        )
+            eventos = _eventos_turno(turno)
 
-        datos = (borr2.datos_json if borr2 else {}) or {}
-
-        return Response(
-            {
-                "respuesta": bot_text,
-                "conversacion_id": str(conv_id),
-                "borrador": None if not borr2 else {
-                    "id": str(borr2.id),
-                    "listo_para_enviar": bool(borr2.listo_para_enviar),
-                    "datos": datos,
-                },
-            },
-            status=200,
-        )
+        response = StreamingHttpResponse(eventos, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # que nginx/proxies no acumulen el stream
+        response["X-Accel-Buffering"] = "no"
+        return response
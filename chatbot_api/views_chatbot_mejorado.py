@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 
 from denuncias_api.views_borradores import finalize_borrador_to_denuncia
 from denuncias_api.utils_geo import reverse_geocode_nominatim
+from catalogos_api.tipos_index import resolver_tipo
 
 from db.models import (
     Ciudadanos,
@@ -47,87 +48,6 @@ CONFIRM_WORDS = {"si", "sí", "si.", "sí.", "enviar", "confirmo", "enviar denun
 CANCEL_WORDS = {"no", "no.", "cancelar", "anular", "aun no", "aún no"}
 
 
-# =========================
-# Normalización para matching
-# =========================
-def _norm(s: str) -> str:
-    if not s:
-        return ""
-    x = str(s).strip().lower()
-    # quitar tildes simple
-    x = x.replace("á", "a").replace("à", "a").replace("ä", "a").replace("â", "a")
-    x = x.replace("é", "e").replace("è", "e").replace("ë", "e").replace("ê", "e")
-    x = x.replace("í", "i").replace("ì", "i").replace("ï", "i").replace("î", "i")
-    x = x.replace("ó", "o").replace("ò", "o").replace("ö", "o").replace("ô", "o")
-    x = x.replace("ú", "u").replace("ù", "u").replace("ü", "u").replace("û", "u")
-    x = x.replace("ñ", "n")
-    # solo letras/números/espacios
-    x = re.sub(r"[^a-z0-9\s]", " ", x)
-    x = re.sub(r"\s+", " ", x).strip()
-    return x
-
-
-def _score_match(query: str, candidate: str) -> int:
-    q = _norm(query)
-    c = _norm(candidate)
-    if not q or not c:
-        return 0
-    if q == c:
-        return 100
-    if c in q or q in c:
-        return 85
-
-    q_tokens = set(q.split())
-    c_tokens = set(c.split())
-    inter = len(q_tokens.intersection(c_tokens))
-    union = len(q_tokens.union(c_tokens)) or 1
-    jacc = inter / union
-
-    bonus = 0
-    # bonus por keywords comunes
-    for k in ["basura", "quema", "agua", "bache", "alumbrado", "alcantarillado", "fuga"]:
-        if k in q and k in c:
-            bonus += 8
-
-    return int(50 * jacc + bonus)
-
-
-def _match_tipo_to_id(nombre: str):
-    """
-    Devuelve id real de TiposDenuncia (activo=True) si hace match.
-    Nunca inventa ids.
-    """
-    if not nombre:
-        return None
-
-    raw = str(nombre).strip()
-    n = _norm(raw)
-
-    # si viene número
-    if n.isdigit():
-        t = TiposDenuncia.objects.filter(activo=True, id=int(n)).first()
-        if t:
-            return int(t.id)
-
-    # scoring sobre todos los tipos activos
-    qs = TiposDenuncia.objects.filter(activo=True).only("id", "nombre")
-    best_id = None
-    best_score = 0
-
-    for t in qs:
-        tn = (t.nombre or "").strip()
-        s = _score_match(n, tn)
-        if s > best_score:
-            best_score = s
-            best_id = int(t.id)
-
-    # umbral: si es fuerte, aceptamos; si no, None
-    if best_id is not None and best_score >= 70:
-        return best_id
-
-    return None
-
-
 def _extract_fields_from_text(text: str):
     out = {}
 
@@ -343,11 +263,11 @@ class ChatbotMessageV2View(APIView):
                 except Exception:
                     pass
             elif extracted_client.get("tipo_texto"):
-                tid = _match_tipo_to_id(extracted_client["tipo_texto"])
+                tid = resolver_tipo(extracted_client["tipo_texto"])
                 if tid:
                     updates["tipo_denuncia_id"] = tid
             elif extracted_text.get("tipo_texto"):
-                tid = _match_tipo_to_id(extracted_text["tipo_texto"])
+                tid = resolver_tipo(extracted_text["tipo_texto"])
                 if tid:
                     updates["tipo_denuncia_id"] = tid
 
@@ -0,0 +1,234 @@
+# config/cache.py
+"""
+Capa de cache compartida (entre workers de gunicorn) con espacios de nombres.
+
+    MENUS = espacio("menus", timeout=300)
+    arbol = MENUS.get_or_set(clave, construir)
+    MENUS.invalidar()        # sube la versión del espacio: todo lo viejo queda huérfano
+
+- El backend real lo define CACHES["default"] en settings (Redis si hay
+  REDIS_URL, si no la tabla django_cache). Ya no es LocMemCache por proceso.
+- Claves: "<espacio>:<versión>:<clave>". La versión vive en el mismo cache,
+  así que invalidar en un worker vale para todos. Cada proceso la recuerda
+  CACHE_VERSION_MEMO segundos para no pagar una ida al backend extra por
+  operación: en el worker que invalida el cambio es inmediato, en los demás
+  tarda como mucho eso.
+- get_or_set() calcula una sola vez por cluster: el primero toma un candado
+  (cache.add) y los demás esperan un momento a que aparezca el valor.
+- Si el backend falla (Redis caído) se cuenta el error y se trata como miss:
+  el cache nunca tumba una petición.
+- Contadores hits / misses / sets / errors / latencia por espacio en
+  metrics_snapshot() (ver config/metrics.py).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT = object()
+_MISS = object()
+
+LOCK_TIMEOUT = 10       # segundos que dura el candado de cálculo
+LOCK_ESPERA = 2.0       # cuánto espera un worker a que otro termine de calcular
+LOCK_PASO = 0.05
+
+_metrics_lock = threading.Lock()
+_metrics = defaultdict(lambda: defaultdict(float))
+
+_espacios: dict[str, "CacheNamespace"] = {}
+
+
+# =========================================================
+# Métricas
+# =========================================================
+def _medir(nombre: str, evento: str, inicio: float | None = None, n: int = 1):
+    with _metrics_lock:
+        m = _metrics[nombre]
+        m[evento] += n
+        if inicio is not None:
+            ms = (time.perf_counter() - inicio) * 1000
+            m["ops"] += 1
+            m["tiempo_ms"] += ms
+            if ms > m["max_ms"]:
+                m["max_ms"] = ms
+
+
+def metrics_snapshot() -> dict:
+    """Contadores del proceso actual, por espacio."""
+    out = {}
+    with _metrics_lock:
+        for nombre, m in _metrics.items():
+            hits, misses = m["hits"], m["misses"]
+            lecturas = hits + misses
+            out[nombre] = {
+                "hits": int(hits),
+                "misses": int(misses),
+                "sets": int(m["sets"]),
+                "deletes": int(m["deletes"]),
+                "errors": int(m["errors"]),
+                "invalidaciones": int(m["invalidaciones"]),
+                "hit_rate": round(hits / lecturas, 4) if lecturas else None,
+                "avg_ms": round(m["tiempo_ms"] / m["ops"], 3) if m["ops"] else None,
+                "max_ms": round(m["max_ms"], 3),
+            }
+    return out
+
+
+# =========================================================
+# Espacio de nombres
+# =========================================================
+class CacheNamespace:
+    def __init__(self, nombre: str, alias: str = "default", timeout=DEFAULT):
+        self.nombre = nombre
+        self.alias = alias
+        self.timeout = timeout
+        # (versión, monotonic en que vence); una tupla se reemplaza de una vez
+        self._memo: tuple[str, float] | None = None
+
+    @property
+    def _cache(self):
+        return caches[self.alias]
+
+    def _timeout(self, timeout):
+        if timeout is DEFAULT:
+            timeout = self.timeout
+        return {} if timeout is DEFAULT else {"timeout": timeout}
+
+    # ---------- versión ----------
+    @property
+    def _version_key(self) -> str:
+        return f"{self.nombre}:__version__"
+
+    def _recordar(self, version: str):
+        memo = float(getattr(settings, "CACHE_VERSION_MEMO", 2))
+        self._memo = (version, time.monotonic() + memo) if memo > 0 else None
+
+    def _version(self) -> str:
+        memo = self._memo
+        if memo is not None and time.monotonic() < memo[1]:
+            return memo[0]
+        try:
+            version = str(self._cache.get(self._version_key) or "0")
+        except Exception:
+            logger.warning("cache %s: no se pudo leer la versión", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+            return "0"
+        self._recordar(version)
+        return version
+
+    def _key(self, key) -> str:
+        return f"{self.nombre}:{self._version()}:{key}"
+
+    def invalidar(self):
+        """Invalida todo el espacio (en todos los workers)."""
+        version = str(time.time_ns())
+        try:
+            self._cache.set(self._version_key, version, timeout=None)
+            self._recordar(version)
+            _medir(self.nombre, "invalidaciones")
+        except Exception:
+            logger.warning("cache %s: no se pudo invalidar", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+
+    # ---------- operaciones ----------
+    def get(self, key, default=None):
+        inicio = time.perf_counter()
+        try:
+            value = self._cache.get(self._key(key), _MISS)
+        except Exception:
+            logger.warning("cache %s: get falló", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+            return default
+        if value is _MISS:
+            _medir(self.nombre, "misses", inicio)
+            return default
+        _medir(self.nombre, "hits", inicio)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT):
+        inicio = time.perf_counter()
+        try:
+            self._cache.set(self._key(key), value, **self._timeout(timeout))
+            _medir(self.nombre, "sets", inicio)
+        except Exception:
+            logger.warning("cache %s: set falló", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+
+    def add(self, key, value, timeout=DEFAULT):
+        """cache.add() del espacio (sirve de candado). None si el backend falló."""
+        try:
+            return self._cache.add(self._key(key), value, **self._timeout(timeout))
+        except Exception:
+            logger.warning("cache %s: add falló", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+            return None
+
+    def incr(self, key, delta: int = 1):
+        """
+        Suma delta a un contador existente (atómico en Redis). None si la
+        clave no existe o el backend falló: el que lee recalcula.
+        """
+        try:
+            return self._cache.incr(self._key(key), delta)
+        except ValueError:
+            return None  # no existe: no se crea aquí para no pisar un recálculo
+        except Exception:
+            logger.warning("cache %s: incr falló", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+            return None
+
+    def delete(self, *keys):
+        keys = [k for k in keys if k is not None]
+        if not keys:
+            return
+        inicio = time.perf_counter()
+        try:
+            version = self._version()
+            self._cache.delete_many([f"{self.nombre}:{version}:{k}" for k in keys])
+            _medir(self.nombre, "deletes", inicio, n=len(keys))
+        except Exception:
+            logger.warning("cache %s: delete falló", self.nombre, exc_info=True)
+            _medir(self.nombre, "errors")
+
+    def get_or_set(self, key, func, timeout=DEFAULT):
+        """Devuelve el valor cacheado o lo calcula una sola vez para todo el cluster."""
+        value = self.get(key, _MISS)
+        if value is not _MISS:
+            return value
+
+        lock_key = f"__lock__:{key}"
+        tengo_lock = self.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+        if tengo_lock is None:
+            tengo_lock = True  # sin cache: calcular y seguir
+
+        if not tengo_lock:
+            # otro worker está calculando: esperar un poco su resultado
+            limite = time.monotonic() + LOCK_ESPERA
+            while time.monotonic() < limite:
+                time.sleep(LOCK_PASO)
+                value = self.get(key, _MISS)
+                if value is not _MISS:
+                    return value
+
+        try:
+            value = func()
+            self.set(key, value, timeout=timeout)
+            return value
+        finally:
+            if tengo_lock:
+                self.delete(lock_key)
+
+
+def espacio(nombre: str, alias: str = "default", timeout=DEFAULT) -> CacheNamespace:
+    """Devuelve (y registra) el espacio de nombres `nombre`."""
+    ns = _espacios.get(nombre)
+    if ns is None:
+        ns = _espacios[nombre] = CacheNamespace(nombre, alias=alias, timeout=timeout)
+    return ns
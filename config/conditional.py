@@ -0,0 +1,116 @@
+# config/conditional.py
+"""
+GET condicional (ETag / Last-Modified) para las APIs de lectura de la app.
+
+Cada vista define un "validador" barato (ej: max(updated_at) + count de la
+denuncia y sus hijos). Si el cliente manda If-None-Match / If-Modified-Since
+y nada cambió, se responde 304 sin ejecutar la serialización.
+
+Uso:
+
+    class MisDenunciasView(APIView):
+        @condicional(validador_mis_denuncias)
+        def get(self, request): ...
+
+El validador recibe (request, *args, **kwargs) y devuelve
+(version: str, last_modified: datetime | None) o None para no aplicar
+(ej: usuario sin permiso -> la vista responde su 403 normal).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+def version_de(qs, campo_fecha: str = "updated_at"):
+    """(count:max) de un queryset; sirve como versión de una colección."""
+    agg = qs.order_by().aggregate(ultimo=Max(campo_fecha), total=Count("pk"))
+    ultimo = agg["ultimo"]
+    return f"{agg['total']}:{ultimo.isoformat() if ultimo else '-'}", ultimo
+
+
+def combinar(*versiones):
+    """Junta varias (version, last_modified) en una sola."""
+    partes = [v for v, _ in versiones]
+    fechas = [lm for _, lm in versiones if lm is not None]
+    return "|".join(partes), (max(fechas) if fechas else None)
+
+
+def _principal(request) -> str:
+    auth = getattr(request, "auth", None)
+    try:
+        uid = auth.get("uid") if auth is not None else None
+    except Exception:
+        uid = None
+    if uid:
+        return str(uid)
+    user = getattr(request, "user", None)
+    return str(getattr(user, "id", "") or "anon")
+
+
+def _etag(request, version: str) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.items()))
+    raw = f"{request.path}?{query}|{_principal(request)}|{version}"
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def _no_modificado(request, etag: str, last_modified) -> bool:
+    inm = request.headers.get("If-None-Match")
+    if inm:
+        # si hay If-None-Match, If-Modified-Since se ignora (RFC 9110)
+        etags = parse_etags(inm)
+        return "*" in etags or etag in etags or f"W/{etag}" in etags
+
+    ims = request.headers.get("If-Modified-Since")
+    if ims and last_modified is not None:
+        ims_ts = parse_http_date_safe(ims)
+        return ims_ts is not None and int(last_modified.timestamp()) <= ims_ts
+
+    return False
+
+
+def _headers(resp, etag: str, last_modified):
+    resp["ETag"] = etag
+    if last_modified is not None:
+        resp["Last-Modified"] = http_date(last_modified.timestamp())
+    # privado (depende del token) y siempre revalidar
+    resp["Cache-Control"] = "private, no-cache"
+    resp["Vary"] = "Authorization"
+
+
+def condicional(validador):
+    def deco(method):
+        @wraps(method)
+        def _wrapped(self, request, *args, **kwargs):
+            try:
+                val = validador(request, *args, **kwargs)
+            except Exception:
+                logger.exception("Validador condicional falló; se responde completo")
+                val = None
+
+            if val is None:
+                return method(self, request, *args, **kwargs)
+
+            version, last_modified = val
+            etag = _etag(request, version)
+
+            if _no_modificado(request, etag, last_modified):
+                resp = Response(status=304)
+                _headers(resp, etag, last_modified)
+                return resp
+
+            resp = method(self, request, *args, **kwargs)
+            if getattr(resp, "status_code", None) == 200:
+                _headers(resp, etag, last_modified)
+            return resp
+
+        return _wrapped
+
+    return deco
@@ -0,0 +1,260 @@
+# config/db_router.py
+"""
+Router de lectura hacia la réplica (opcional).
+
+- Todo lo que escribe va a "default".
+- Solo las vistas marcadas como "solo lectura" (dashboard, listados, mapa,
+  exportaciones) leen de "replica", y solo si el alias existe en DATABASES.
+- Read-your-writes: después de una escritura el usuario queda "pegado" a
+  "default" durante REPLICA_STICKY_SECONDS, para que vea lo que acaba de crear
+  aunque la réplica vaya con retraso.
+- Las tablas de infraestructura (DatabaseCache, sesiones) siempre leen y
+  escriben en "default" y sus escrituras no cuentan como escritura de la
+  petición: un cache.set() en una página de solo lectura no debe activar la
+  ventana sticky, y leerlas con atraso devolvería valores viejos.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+from config.cache import espacio
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = "replica"
+DEFAULT_ALIAS = "default"
+STICKY_COOKIE = "db_sticky_until"
+
+# app_label de los modelos que nunca van a la réplica ni marcan la petición
+# ("django_cache" es el CacheEntry interno de DatabaseCache)
+SIEMPRE_DEFAULT = {"django_cache", "sessions"}
+
+_state = threading.local()
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+_STICKY = espacio("db_sticky")
+
+
+# =========================================================
+# Helpers
+# =========================================================
+def replica_configurada() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def sticky_seconds() -> int:
+    return int(getattr(settings, "REPLICA_STICKY_SECONDS", 10))
+
+
+def _inc(key: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    """Contadores del proceso actual (lecturas a réplica/default, escrituras, sticky)."""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def _reset_state():
+    _state.read_only = False
+    _state.sticky = False
+    _state.wrote = False
+
+
+def _principal_key(user) -> str | None:
+    """
+    Identidad estable para la ventana sticky:
+    - usuario web (sesión): "web:<pk>"
+    - usuario móvil (JWT):  "<tipo>:<uuid>"
+    """
+    if user is None or not getattr(user, "is_authenticated", False):
+        return None
+    tipo = getattr(user, "tipo", None)
+    if tipo:
+        return f"{tipo}:{user.id}"
+    pk = getattr(user, "pk", None)
+    return f"web:{pk}" if pk is not None else None
+
+
+def _sticky_por_usuario(user) -> bool:
+    key = _principal_key(user)
+    if not key:
+        return False
+    return bool(_STICKY.get(key))
+
+
+def _sticky_por_cookie(request) -> bool:
+    raw = request.COOKIES.get(STICKY_COOKIE)
+    if not raw:
+        return False
+    try:
+        return time.time() < float(raw)
+    except (TypeError, ValueError):
+        return False
+
+
+# =========================================================
+# Marcado de vistas de solo lectura
+# =========================================================
+@contextmanager
+def leer_de_replica(request=None, etiqueta: str = ""):
+    """
+    Dentro del bloque, las lecturas van a la réplica salvo que el usuario
+    esté en su ventana sticky (escribió hace poco).
+    """
+    prev_read_only = getattr(_state, "read_only", False)
+    prev_sticky = getattr(_state, "sticky", False)
+
+    sticky = False
+    if request is not None:
+        sticky = _sticky_por_cookie(request) or _sticky_por_usuario(getattr(request, "user", None))
+
+    _state.read_only = True
+    _state.sticky = sticky
+
+    if replica_configurada():
+        destino = DEFAULT_ALIAS if sticky else REPLICA_ALIAS
+        _inc(f"vista.{destino}")
+        if sticky:
+            _inc("sticky.hit")
+        logger.debug("db_router: %s -> %s%s", etiqueta or "vista", destino, " (sticky)" if sticky else "")
+
+    try:
+        yield
+    finally:
+        _state.read_only = prev_read_only
+        _state.sticky = prev_sticky
+
+
+def usar_replica(view_func):
+    """Decorador para vistas función de solo lectura."""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        with leer_de_replica(request, etiqueta=view_func.__name__):
+            return view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+class ReplicaReadMixin:
+    """
+    Mixin para CBV (Django y DRF) de solo lectura.
+    En DRF la autenticación JWT ocurre en initial(), por eso se engancha ahí.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # DRF: aquí ya existe request.user (JWT)
+        self._replica_ctx = leer_de_replica(request, etiqueta=self.__class__.__name__)
+        self._replica_ctx.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        ctx = getattr(self, "_replica_ctx", None)
+        if ctx is not None:
+            self._replica_ctx = None
+            ctx.__exit__(None, None, None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        # DRF APIView tiene initial(); las vistas genéricas de Django no.
+        if hasattr(super(), "initial"):
+            return super().dispatch(request, *args, **kwargs)
+
+        with leer_de_replica(request, etiqueta=self.__class__.__name__):
+            response = super().dispatch(request, *args, **kwargs)
+            # TemplateResponse se renderiza fuera de la vista: forzar aquí
+            if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                response.render()
+            return response
+
+
+# =========================================================
+# Router
+# =========================================================
+def _infraestructura(model) -> bool:
+    return getattr(getattr(model, "_meta", None), "app_label", None) in SIEMPRE_DEFAULT
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_configurada() or _infraestructura(model):
+            return DEFAULT_ALIAS
+        if not getattr(_state, "read_only", False):
+            return DEFAULT_ALIAS
+        if getattr(_state, "sticky", False) or getattr(_state, "wrote", False):
+            # read-your-writes dentro de la misma petición o ventana sticky
+            _inc("read.default")
+            return DEFAULT_ALIAS
+        _inc("read.replica")
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _infraestructura(model):
+            return DEFAULT_ALIAS
+        _state.wrote = True
+        _inc("write.default")
+        return DEFAULT_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # réplica y primario son la misma base
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_ALIAS
+
+
+# =========================================================
+# Middleware: ventana sticky tras escribir
+# =========================================================
+class ReplicaStickinessMiddleware:
+    """
+    Si la petición escribió en la BD (o fue POST/PUT/PATCH/DELETE exitoso),
+    deja al usuario leyendo de "default" unos segundos:
+    - cookie para el panel web
+    - clave en cache por usuario para la app móvil (JWT, sin cookies)
+    """
+
+    UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _reset_state()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = getattr(_state, "wrote", False)
+            _reset_state()
+
+        if not replica_configurada():
+            return response
+
+        if (wrote or request.method in self.UNSAFE_METHODS) and response.status_code < 400:
+            ttl = sticky_seconds()
+            if ttl > 0:
+                response.set_cookie(
+                    STICKY_COOKIE,
+                    str(time.time() + ttl),
+                    max_age=ttl,
+                    httponly=True,
+                    samesite="Lax",
+                    secure=not settings.DEBUG,
+                )
+                key = _principal_key(getattr(request, "user", None))
+                if key:
+                    _STICKY.set(key, 1, timeout=ttl)
+                _inc("sticky.set")
+                logger.debug("db_router: sticky %ss (%s %s)", ttl, request.method, request.path)
+
+        return response
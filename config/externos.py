@@ -0,0 +1,240 @@
+# config/externos.py
+"""
+Llamadas a servicios de terceros (Nominatim, OpenAI, Gmail, FCM) con
+rate limit y circuit breaker compartidos entre workers (config/cache.py).
+
+    texto = externos.llamar("openai", client.chat.completions.create, **kwargs)
+
+    @externos.protegido("nominatim", fallback=None)
+    def reverse_geocode_nominatim(lat, lng): ...
+
+- Token bucket por servicio: `rate` tokens/seg, hasta `burst` acumulados.
+  Si no hay token se espera como máximo `espera_max` seg; si no alcanza,
+  ServicioNoDisponible("rate_limit") sin llamar al tercero.
+- Circuit breaker: `fallos` errores dentro de `ventana` seg abren el circuito
+  durante `enfriamiento` seg; mientras está abierto se responde el fallback
+  al instante. Pasado el enfriamiento se deja pasar UNA llamada de prueba.
+  Los errores 4xx (salvo 408/429) no cuentan como fallo: la petición estaba
+  mal pero el servicio respondió, así que cuentan como éxito.
+- Si el cache falla, se deja pasar (nunca bloquea por culpa del cache).
+
+Parámetros por servicio en settings.SERVICIOS_EXTERNOS.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+
+from config.cache import espacio
+
+logger = logging.getLogger(__name__)
+
+_BUCKETS = espacio("rl_bucket")
+_CIRCUITOS = espacio("circuito")
+
+DEFAULTS = {
+    "rate": 5.0,
+    "burst": 5,
+    "espera_max": 0.5,
+    "timeout": 10,
+    "fallos": 5,
+    "ventana": 60,
+    "enfriamiento": 30,
+}
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+class ServicioNoDisponible(Exception):
+    def __init__(self, servicio: str, motivo: str):
+        super().__init__(f"{servicio}: {motivo}")
+        self.servicio = servicio
+        self.motivo = motivo
+
+
+def _inc(key: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def config_de(servicio: str) -> dict:
+    conf = dict(DEFAULTS)
+    conf.update((getattr(settings, "SERVICIOS_EXTERNOS", {}) or {}).get(servicio, {}))
+    return conf
+
+
+def timeout_de(servicio: str) -> float:
+    return float(config_de(servicio)["timeout"])
+
+
+# =========================================================
+# Candado corto (read-modify-write del bucket)
+# =========================================================
+def _con_candado(ns, nombre: str, fn, espera: float = 0.2):
+    lock = f"__lock__:{nombre}"
+    limite = time.monotonic() + espera
+    while True:
+        tomado = ns.add(lock, 1, timeout=1)
+        if tomado is None:
+            return fn()  # sin cache: no coordinar
+        if tomado:
+            break
+        if time.monotonic() >= limite:
+            return fn()  # candado trabado: mejor aproximado que bloqueado
+        time.sleep(0.005)
+    try:
+        return fn()
+    finally:
+        ns.delete(lock)
+
+
+# =========================================================
+# Token bucket
+# =========================================================
+def _tomar_token(servicio: str, conf: dict) -> float:
+    """0 si se tomó un token; si no, segundos hasta el próximo."""
+    rate = float(conf["rate"])
+    burst = float(conf["burst"])
+    if rate <= 0:
+        return 0.0
+
+    def _op():
+        ahora = time.time()
+        tokens, ts = _BUCKETS.get(servicio) or (burst, ahora)
+        tokens = min(burst, tokens + (ahora - ts) * rate)
+        if tokens >= 1:
+            _BUCKETS.set(servicio, (tokens - 1, ahora), timeout=int(burst / rate) + 60)
+            return 0.0
+        _BUCKETS.set(servicio, (tokens, ahora), timeout=int(burst / rate) + 60)
+        return (1 - tokens) / rate
+
+    return _con_candado(_BUCKETS, servicio, _op)
+
+
+def adquirir(servicio: str, conf: dict | None = None) -> bool:
+    conf = conf or config_de(servicio)
+    limite = time.monotonic() + float(conf["espera_max"])
+    while True:
+        falta = _tomar_token(servicio, conf)
+        if falta <= 0:
+            return True
+        if time.monotonic() + falta > limite:
+            return False
+        time.sleep(falta)
+
+
+# =========================================================
+# Circuit breaker
+# =========================================================
+def circuito_abierto(servicio: str) -> bool:
+    abierto_hasta = _CIRCUITOS.get(f"{servicio}:abierto") or 0
+    if not abierto_hasta:
+        return False
+    if time.time() < abierto_hasta:
+        return True
+    # medio abierto: una sola llamada de prueba cada 10 s
+    return _CIRCUITOS.add(f"{servicio}:prueba", 1, timeout=10) is False
+
+
+def _registrar_exito(servicio: str):
+    if _CIRCUITOS.get(f"{servicio}:abierto"):
+        logger.info("externos: circuito %s cerrado", servicio)
+    _CIRCUITOS.delete(f"{servicio}:abierto", f"{servicio}:fallos")
+
+
+def _registrar_fallo(servicio: str, conf: dict):
+    def _op():
+        fallos = (_CIRCUITOS.get(f"{servicio}:fallos") or 0) + 1
+        _CIRCUITOS.set(f"{servicio}:fallos", fallos, timeout=int(conf["ventana"]))
+        return fallos
+
+    fallos = _con_candado(_CIRCUITOS, f"fallos:{servicio}", _op)
+    if fallos >= int(conf["fallos"]):
+        enfriamiento = int(conf["enfriamiento"])
+        _CIRCUITOS.set(f"{servicio}:abierto", time.time() + enfriamiento, timeout=enfriamiento * 4)
+        _inc(f"{servicio}.aperturas")
+        logger.warning("externos: circuito %s abierto %ss (%s fallos)", servicio, enfriamiento, fallos)
+
+
+def error_del_cliente(exc) -> bool:
+    """
+    4xx salvo 408/429 (openai.APIStatusError.status_code, requests
+    .response.status_code, firebase_admin .http_response.status_code).
+    """
+    status = getattr(exc, "status_code", None)
+    for attr in ("response", "http_response"):
+        if status is not None:
+            break
+        status = getattr(getattr(exc, attr, None), "status_code", None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return False
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+# =========================================================
+# API
+# =========================================================
+def llamar(servicio: str, fn, *args, **kwargs):
+    """Ejecuta fn(*args, **kwargs) respetando rate limit y circuito."""
+    conf = config_de(servicio)
+
+    if circuito_abierto(servicio):
+        _inc(f"{servicio}.circuito_abierto")
+        raise ServicioNoDisponible(servicio, "circuito_abierto")
+
+    if not adquirir(servicio, conf):
+        _inc(f"{servicio}.rate_limit")
+        raise ServicioNoDisponible(servicio, "rate_limit")
+
+    inicio = time.perf_counter()
+    try:
+        resultado = fn(*args, **kwargs)
+    except Exception as e:
+        if error_del_cliente(e):
+            _inc(f"{servicio}.error_cliente")
+            _registrar_exito(servicio)
+        else:
+            _inc(f"{servicio}.fallos")
+            _registrar_fallo(servicio, conf)
+        raise
+    finally:
+        _inc(f"{servicio}.tiempo_ms", int((time.perf_counter() - inicio) * 1000))
+
+    _inc(f"{servicio}.ok")
+    _registrar_exito(servicio)
+    return resultado
+
+
+def protegido(servicio: str, fallback=None):
+    """
+    Decorador: la función envuelta debe LANZAR excepción si falla.
+    Ante error, rate limit o circuito abierto devuelve `fallback`
+    (o fallback(*args, **kwargs) si es invocable).
+    """
+    def deco(fn):
+        @wraps(fn)
+        def _wrapped(*args, **kwargs):
+            try:
+                return llamar(servicio, fn, *args, **kwargs)
+            except ServicioNoDisponible as e:
+                logger.info("externos: %s", e)
+            except Exception:
+                logger.warning("externos: %s falló", servicio, exc_info=True)
+            return fallback(*args, **kwargs) if callable(fallback) else fallback
+
+        return _wrapped
+
+    return deco
@@ -0,0 +1,232 @@
+# config/llm.py
+"""
+Capa de ejecución de OpenAI fuera del pool de hilos de gunicorn.
+
+Antes cada vista llamaba al cliente síncrono `OpenAI` desde su propio hilo
+gthread: un modelo lento dejaba ese hilo ocupado hasta el timeout.
+
+Ahora todas las llamadas corren en UN event loop dedicado (hilo "llm-loop")
+con `AsyncOpenAI`:
+
+    resp = llm.llamar("responses.create", deadline=20, model=..., input=...)
+    for ev in llm.stream("responses.create", deadline=40, model=..., input=...):
+        ...
+
+- Tope global de llamadas en vuelo por proceso (LLM_MAX_INFLIGHT). El hilo
+  del request sigue esperando el resultado, así que el tope queda por debajo
+  de los hilos de gunicorn (GUNICORN_THREADS): lleno se responde
+  ServicioNoDisponible("openai", "saturado") al instante, sin encolar, y
+  quedan hilos para el resto del sitio.
+- Deadline por llamada (LLM_DEADLINE por defecto). Al vencer se CANCELA la
+  corrutina (se corta el HTTP a OpenAI) y se lanza
+  ServicioNoDisponible("openai", "deadline"): cada vista responde su
+  texto degradado con plantilla.
+- stream(): abre la llamada antes de devolver el generador, así los errores
+  HTTP de la apertura (400/404) salen en la llamada misma. Si el cliente SSE
+  se desconecta, el generador se cierra y la llamada en curso se cancela.
+- Pasa por config/externos.py (rate limit + circuit breaker).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from config import externos
+
+logger = logging.getLogger(__name__)
+
+_FIN = object()
+
+_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+_client = None
+_cupos: threading.BoundedSemaphore | None = None
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+def _inc(key: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def configurado() -> bool:
+    return bool(getattr(settings, "OPENAI_API_KEY", ""))
+
+
+def deadline_por_defecto() -> float:
+    return float(getattr(settings, "LLM_DEADLINE", 25))
+
+
+# =========================================================
+# Event loop dedicado
+# =========================================================
+def _arrancar():
+    global _loop, _client, _cupos
+    if _loop is not None:
+        return
+    with _lock:
+        if _loop is not None:
+            return
+        from openai import AsyncOpenAI
+
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True).start()
+        # sin reintentos del SDK: el circuito de externos decide cuándo dejar de insistir
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=getattr(settings, "OPENAI_BASE_URL", None) or None,
+            timeout=externos.timeout_de("openai"),
+            max_retries=0,
+        )
+        _cupos = threading.BoundedSemaphore(int(getattr(settings, "LLM_MAX_INFLIGHT", 2)))
+        _loop = loop
+
+
+def _metodo(ruta: str):
+    obj = _client
+    for parte in ruta.split("."):
+        obj = getattr(obj, parte)
+    return obj
+
+
+class _Cupo:
+    """
+    Lugar en el tope de llamadas en vuelo. Se toma ANTES de externos.llamar
+    (saturarnos no es un fallo de OpenAI y no debe abrir el circuito) y se
+    libera cuando termina la corrutina, o al salir si nunca se agendó.
+    """
+
+    def __init__(self):
+        _arrancar()
+        if not _cupos.acquire(blocking=False):
+            _inc("saturado")
+            raise externos.ServicioNoDisponible("openai", "saturado")
+        self.agendado = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.agendado:
+            _cupos.release()
+
+    def agendar(self, coro_factory):
+        futuro = asyncio.run_coroutine_threadsafe(coro_factory(), _loop)
+        self.agendado = True
+        _inc("en_vuelo")
+        futuro.add_done_callback(lambda _f: (_cupos.release(), _inc("en_vuelo", -1)))
+        return futuro
+
+
+# =========================================================
+# API
+# =========================================================
+def _esperar(cupo: _Cupo, ruta: str, deadline: float, kwargs: dict):
+    futuro = cupo.agendar(lambda: asyncio.wait_for(_metodo(ruta)(**kwargs), deadline))
+    inicio = time.perf_counter()
+    try:
+        # margen para que el wait_for del loop gane y la cancelación ocurra allá
+        return futuro.result(timeout=deadline + 1)
+    except (asyncio.TimeoutError, TimeoutError):
+        futuro.cancel()
+        _inc("deadline")
+        raise externos.ServicioNoDisponible("openai", "deadline")
+    finally:
+        _inc("tiempo_ms", int((time.perf_counter() - inicio) * 1000))
+
+
+def llamar(ruta: str, deadline: float | None = None, **kwargs):
+    """
+    Ejecuta client.<ruta>(**kwargs) de AsyncOpenAI en el loop dedicado y espera
+    el resultado como máximo `deadline` segundos.
+    """
+    deadline = deadline_por_defecto() if deadline is None else max(float(deadline), 0.1)
+    _inc("llamadas")
+    with _Cupo() as cupo:
+        return externos.llamar("openai", _esperar, cupo, ruta, deadline, kwargs)
+
+
+def _abrir_stream(cupo: _Cupo, ruta: str, deadline: float, kwargs: dict):
+    """Abre el stream y lo bombea a una cola. Devuelve (cola, future)."""
+    cola: queue.Queue = queue.Queue()
+
+    async def _bombear():
+        try:
+            async with asyncio.timeout(deadline):
+                stream = await _metodo(ruta)(stream=True, **kwargs)
+                cola.put(("ok", None))
+                async for ev in stream:
+                    cola.put(("ev", ev))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:  # noqa: BLE001 - se reenvía al hilo del request
+            cola.put(("error", e))
+        finally:
+            cola.put(("fin", _FIN))
+
+    futuro = cupo.agendar(_bombear)
+    # esperar la apertura: los errores HTTP (400/404...) salen aquí, dentro del circuito
+    tipo, valor = _tomar(cola, futuro, time.monotonic() + deadline)
+    if tipo == "error":
+        raise valor
+    return cola, futuro
+
+
+def _tomar(cola, futuro, limite: float):
+    restante = limite - time.monotonic()
+    try:
+        return cola.get(timeout=max(restante, 0.01))
+    except queue.Empty:
+        futuro.cancel()
+        _inc("deadline")
+        raise externos.ServicioNoDisponible("openai", "deadline")
+
+
+def stream(ruta: str, deadline: float | None = None, **kwargs):
+    """
+    Abre un stream de AsyncOpenAI y devuelve un generador (síncrono) de sus
+    eventos. La apertura ocurre aquí y no al iterar: quien llama puede
+    capturar BadRequest/NotFound y reintentar. Si quien consume el generador
+    lo cierra (cliente SSE desconectado) se cancela la llamada.
+    """
+    deadline = deadline_por_defecto() if deadline is None else max(float(deadline), 0.1)
+    limite = time.monotonic() + deadline
+    _inc("streams")
+    with _Cupo() as cupo:
+        cola, futuro = externos.llamar("openai", _abrir_stream, cupo, ruta, deadline, kwargs)
+    return _eventos(cola, futuro, limite)
+
+
+def _eventos(cola, futuro, limite: float):
+    terminado = False
+    try:
+        while True:
+            tipo, valor = _tomar(cola, futuro, limite)
+            if tipo == "ev":
+                yield valor
+            elif tipo == "error":
+                terminado = True
+                if isinstance(valor, (asyncio.TimeoutError, TimeoutError)):
+                    _inc("deadline")
+                    raise externos.ServicioNoDisponible("openai", "deadline")
+                raise valor
+            elif tipo == "fin":
+                terminado = True
+                return
+    finally:
+        if not terminado and not futuro.done():
+            futuro.cancel()
+            _inc("cancelados")
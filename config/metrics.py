@@ -0,0 +1,55 @@
+# config/metrics.py
+"""
+GET /metrics/  ->  contadores del proceso que atiende la petición.
+
+Cada worker de gunicorn tiene los suyos (se informa el pid). Acceso:
+superusuario con sesión, o header X-Metrics-Token == METRICS_TOKEN.
+"""
+import os
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from config import cache as cache_layer
+from chatbot_api import intenciones
+from config import db_router, externos, llm
+from notificaciones import fcm
+from usuarios_api import hashing
+from web import tiempo_real
+from web.utils import llm_cache
+
+
+def _autorizado(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    enviado = request.headers.get("X-Metrics-Token", "")
+    if token and enviado and constant_time_compare(token, enviado):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and user.is_superuser)
+
+
+@require_GET
+def metrics_view(request):
+    if not _autorizado(request):
+        raise Http404()
+
+    backend = settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1]
+    return JsonResponse(
+        {
+            "pid": os.getpid(),
+            "cache": {
+                "backend": backend,
+                "espacios": cache_layer.metrics_snapshot(),
+            },
+            "db_router": db_router.metrics_snapshot(),
+            "password_verify": hashing.metrics_snapshot(),
+            "externos": externos.metrics_snapshot(),
+            "chatbot": intenciones.metrics_snapshot(),
+            "llm_cache": llm_cache.metrics_snapshot(),
+            "llm": llm.metrics_snapshot(),
+            "fcm": fcm.metrics_snapshot(),
+            "tiempo_real": tiempo_real.metrics_snapshot(),
+        }
+    )
@@ -37,6 +37,11 @@ ALLOWED_HOSTS = [h.strip() for h in config(
     default="localhost,127.0.0.1,.onrender.com,10.10.80.189,www.salcedo.gob.ec,.gob.ec,salcedo.gob.ec"
 ).split(",") if h.strip()]
 
+# hilos por worker de gunicorn (entrypoint.sh --threads). Los topes por
+# proceso de SSE, llamadas a OpenAI y verificación de contraseñas se
+# calculan por debajo de este número: siempre queda un hilo para lo demás.
+GUNICORN_THREADS = config("GUNICORN_THREADS", cast=int, default=4)
+
 # ------------------------------------------------------------
 # Application definition
 # ------------------------------------------------------------
@@ -59,6 +64,7 @@ INSTALLED_APPS = [
     "usuarios_api",
     "denuncias_api",
     "catalogos_api",
+    "chatbot_api",
     "db",
     "web.apps.WebConfig",
 
@@ -84,8 +90,13 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # principal del panel (funcionario/depto/grupos) una vez por request
+    "web.utils.authz.StaffPrincipalMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+
+    # read-your-writes para la réplica (después de auth)
+    "config.db_router.ReplicaStickinessMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -134,6 +145,21 @@ DATABASES = {
         "PORT": config("DB_PORT", default="5432"),
     }
 }
+
+# Réplica de solo lectura (opcional): dashboard, listados, mapa y exportaciones.
+# Si DB_REPLICA_HOST no está definido todo sigue yendo a "default".
+DB_REPLICA_HOST = config("DB_REPLICA_HOST", default="")
+if DB_REPLICA_HOST:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": DB_REPLICA_HOST,
+        "PORT": config("DB_REPLICA_PORT", default=DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+# segundos que un usuario lee de "default" después de escribir
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", cast=int, default=10)
 # ------------------------------------------------------------
 # CORS
 # ------------------------------------------------------------
@@ -220,17 +246,111 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=6),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+# ------------------------------------------------------------
+# Servicios de terceros: rate limit + circuit breaker (config/externos.py)
+# ------------------------------------------------------------
+# rate/burst: tokens por segundo y ráfaga (compartidos entre workers)
+# espera_max: cuánto se espera un token antes de rendirse (seg)
+# fallos/ventana/enfriamiento: N errores en `ventana` seg abren el circuito
+SERVICIOS_EXTERNOS = {
+    # política de Nominatim: 1 req/s por aplicación
+    "nominatim": {"rate": 1, "burst": 1, "espera_max": 1.0, "timeout": 4,
+                  "fallos": 3, "ventana": 60, "enfriamiento": 60},
+    "openai": {"rate": 5, "burst": 10, "espera_max": 0.5, "timeout": 30,
+               "fallos": 5, "ventana": 60, "enfriamiento": 30},
+    "gmail": {"rate": 2, "burst": 5, "espera_max": 1.0, "timeout": 10,
+              "fallos": 3, "ventana": 120, "enfriamiento": 60},
+    "fcm": {"rate": 10, "burst": 20, "espera_max": 0.5, "timeout": 10,
+            "fallos": 5, "ventana": 60, "enfriamiento": 30},
+}
 
 # ------------------------------------------------------------
-# django-select2 cache (no Redis)
+# Contraseñas (usuarios_api/hashing.py)
 # ------------------------------------------------------------
+# Parámetros calibrados con: python manage.py calibrar_hashers
+# (0 = valores por defecto de Django). Los hashes viejos se actualizan solos
+# en el siguiente login.
+PASSWORD_HASHERS = [
+    "usuarios_api.hashing.CalibratedPBKDF2PasswordHasher",
+    "usuarios_api.hashing.CalibratedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if config("PASSWORD_HASHER", default="pbkdf2") == "argon2":
+    # argon2 como preferido (requiere argon2-cffi)
+    PASSWORD_HASHERS[0], PASSWORD_HASHERS[1] = PASSWORD_HASHERS[1], PASSWORD_HASHERS[0]
+
+PASSWORD_PBKDF2_ITERATIONS = config("PASSWORD_PBKDF2_ITERATIONS", cast=int, default=0)
+PASSWORD_ARGON2_TIME_COST = config("PASSWORD_ARGON2_TIME_COST", cast=int, default=0)
+PASSWORD_ARGON2_MEMORY_COST = config("PASSWORD_ARGON2_MEMORY_COST", cast=int, default=0)
+PASSWORD_ARGON2_PARALLELISM = config("PASSWORD_ARGON2_PARALLELISM", cast=int, default=0)
+
+# pool de verificación del login: hilos, cola máxima y espera (segundos).
+# hilos + cola se recortan a GUNICORN_THREADS - 1 (cada uno retiene un hilo del request)
+PASSWORD_VERIFY_WORKERS = config("PASSWORD_VERIFY_WORKERS", cast=int, default=2)
+PASSWORD_VERIFY_QUEUE = config("PASSWORD_VERIFY_QUEUE", cast=int, default=1)
+PASSWORD_VERIFY_TIMEOUT = config("PASSWORD_VERIFY_TIMEOUT", cast=float, default=5)
+
+# segundos que se cachea (activo, tipo, token_version) del usuario del JWT;
+# una baja sin signal (update masivo) tarda como máximo esto en aplicarse
+AUTH_PRINCIPAL_CACHE_TTL = config("AUTH_PRINCIPAL_CACHE_TTL", cast=int, default=15)
+# segundos que el principal del panel vive en la sesión sin revalidar
+# (los signals lo invalidan antes si cambian grupos / departamento)
+STAFF_PRINCIPAL_TTL = config("STAFF_PRINCIPAL_TTL", cast=int, default=300)
+# borradores de IA del panel cacheados por hash de (prompt, modelo, contexto)
+LLM_CACHE_TTL = config("LLM_CACHE_TTL", cast=int, default=24 * 3600)
+# árbol de menús cacheado por conjunto de grupos (los signals lo invalidan)
+MENUS_CACHE_TTL = config("MENUS_CACHE_TTL", cast=int, default=300)
+# índice de tipos de denuncia del chatbot: cada cuánto un worker revisa la
+# versión del catálogo y vida máxima del índice (seg)
+TIPOS_INDEX_CHECK = config("TIPOS_INDEX_CHECK", cast=int, default=5)
+TIPOS_INDEX_TTL = config("TIPOS_INDEX_TTL", cast=int, default=300)
+
+# ------------------------------------------------------------
+# Cache compartido entre workers (config/cache.py)
+# ------------------------------------------------------------
+# REDIS_URL definido -> Redis (docker compose levanta el servicio "redis").
+# Sin REDIS_URL -> tabla django_cache en Postgres (createcachetable).
+# CACHE_VERSION: subirlo invalida todo el cache del cluster de una vez.
+REDIS_URL = config("REDIS_URL", default="")
+CACHE_KEY_PREFIX = config("CACHE_KEY_PREFIX", default="denuncias")
+CACHE_VERSION = config("CACHE_VERSION", cast=int, default=1)
+# segundos que cada proceso recuerda la versión de un espacio (0 = leerla en
+# cada operación); una invalidación tarda como mucho esto en verse en otro worker
+CACHE_VERSION_MEMO = config("CACHE_VERSION_MEMO", cast=float, default=2)
+# /metrics/ sin sesión de superusuario (header X-Metrics-Token)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+if REDIS_URL:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {"socket_connect_timeout": 1, "socket_timeout": 1},
+    }
+else:
+    _default_cache = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": 50_000},
+    }
+
+# "select2" va en BD: los widgets se registran en un worker y el AJAX
+# puede llegar a otro. Tabla: createcachetable.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-    }
+        **_default_cache,
+        "KEY_PREFIX": CACHE_KEY_PREFIX,
+        "VERSION": CACHE_VERSION,
+        "TIMEOUT": 300,
+    },
+    "select2": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "select2_cache",
+        "TIMEOUT": 60 * 60 * 6,
+    },
 }
-SELECT2_CACHE_BACKEND = "default"
+SELECT2_CACHE_BACKEND = "select2"
 
 # ------------------------------------------------------------
 # Firebase / OpenAI env
@@ -239,9 +359,78 @@ FIREBASE_SERVICE_ACCOUNT_PATH = config(
     "FIREBASE_SERVICE_ACCOUNT_PATH",
     default=str(BASE_DIR / "serviceAccountKey.json"),
 )
+# hilos que mandan lotes de 500 tokens en paralelo (notificaciones/fcm.py)
+FCM_HILOS = config("FCM_HILOS", cast=int, default=4)
+# topic al que se suscribe cada token de ciudadano (avisos generales)
+FCM_TOPIC_CIUDADANOS = config("FCM_TOPIC_CIUDADANOS", default="ciudadanos")
+# tokens sin registro de la app ni envío exitoso en estos días no reciben push y se podan
+FCM_TOKEN_DIAS = config("FCM_TOKEN_DIAS", cast=int, default=60)
+# fallos transitorios seguidos antes de dar el token por muerto
+FCM_MAX_FALLOS = config("FCM_MAX_FALLOS", cast=int, default=5)
+# bandeja en la app (notificaciones/bandeja.py): vida del contador de no leídas en cache
+NOTIF_CONTADOR_TTL = config("NOTIF_CONTADOR_TTL", cast=int, default=3600)
+NOTIF_PAGINA_MAX = config("NOTIF_PAGINA_MAX", cast=int, default=50)
+
+# ------------------------------------------------------------
+# Listados de denuncias en vivo (web/tiempo_real.py, SSE + LISTEN/NOTIFY)
+# ------------------------------------------------------------
+# gthread: cada conexión SSE ocupa un hilo; tope por proceso (el resto sondea
+# el buffer). Por defecto uno de cada cuatro hilos del worker.
+SSE_MAX_CONEXIONES = config("SSE_MAX_CONEXIONES", cast=int, default=max(1, GUNICORN_THREADS // 4))
+SSE_DURACION = config("SSE_DURACION", cast=int, default=30)
+SSE_LATIDO = config("SSE_LATIDO", cast=int, default=15)
+SSE_RETRY_MS = config("SSE_RETRY_MS", cast=int, default=1000)
+SSE_RETRY_SATURADO_MS = config("SSE_RETRY_SATURADO_MS", cast=int, default=5000)
+# eventos recientes que se reenvían al reconectar (Last-Event-ID)
+SSE_BUFFER = config("SSE_BUFFER", cast=int, default=500)
+# el id del evento es la hora del trigger, no la del commit: al reconectar se
+# reenvía también este margen anterior a Last-Event-ID (el navegador descarta
+# los ids que ya vio). Debe cubrir la transacción más larga que toca denuncias.
+SSE_REPLAY_MS = config("SSE_REPLAY_MS", cast=int, default=10000)
 
 OPENAI_API_KEY = config("OPENAI_API_KEY", default="")
 OPENAI_MODEL = config("OPENAI_MODEL", default="gpt-5")
+# vacío = API oficial; apuntar a manage.py mock_openai para benchmarks/CI
+OPENAI_BASE_URL = config("OPENAI_BASE_URL", default="")
+
+# Llamadas a OpenAI en el event loop dedicado (config/llm.py)
+# tope de llamadas en vuelo por proceso; lleno -> respuesta degradada al instante.
+# Cada llamada retiene su hilo de gunicorn: por defecto la mitad de los hilos.
+LLM_MAX_INFLIGHT = config("LLM_MAX_INFLIGHT", cast=int, default=max(1, GUNICORN_THREADS // 2))
+# deadline por llamada (seg) y del turno completo del chatbot (todas las rondas)
+LLM_DEADLINE = config("LLM_DEADLINE", cast=float, default=25)
+CHATBOT_TURNO_DEADLINE = config("CHATBOT_TURNO_DEADLINE", cast=float, default=40)
+
+# Memoria del chatbot (chatbot_api/memoria.py). Tokens estimados (~4 chars/token).
+# ventana de mensajes recientes que se reenvían y su presupuesto de tokens
+CHATBOT_MEMORIA_TURNOS = config("CHATBOT_MEMORIA_TURNOS", cast=int, default=12)
+CHATBOT_MEMORIA_TOKENS = config("CHATBOT_MEMORIA_TOKENS", cast=int, default=1500)
+# tope del resumen acumulado de lo que quedó fuera de la ventana
+CHATBOT_RESUMEN_TOKENS = config("CHATBOT_RESUMEN_TOKENS", cast=int, default=300)
+# modelo chico para el resumen (tarea simple, corre en cada turno que desborda la ventana);
+# vacío = OPENAI_MODEL
+CHATBOT_RESUMEN_MODEL = config("CHATBOT_RESUMEN_MODEL", default="gpt-5-mini")
+# encadenar con previous_response_id mientras el contexto guardado en OpenAI
+# no pase de estos tokens ni de esta antigüedad (seg); si no, se rearma
+CHATBOT_CADENA_MAX_TOKENS = config("CHATBOT_CADENA_MAX_TOKENS", cast=int, default=6000)
+CHATBOT_CADENA_TTL = config("CHATBOT_CADENA_TTL", cast=int, default=6 * 3600)
+
+# Motor local de intenciones (chatbot_api/intenciones.py): turnos rutinarios
+# sin LLM. Modelo generado con: python manage.py entrenar_intenciones
+CHATBOT_MOTOR_LOCAL = config("CHATBOT_MOTOR_LOCAL", cast=bool, default=True)
+CHATBOT_INTENCION_UMBRAL = config("CHATBOT_INTENCION_UMBRAL", cast=float, default=0.8)
+CHATBOT_INTENCIONES_MODELO = config(
+    "CHATBOT_INTENCIONES_MODELO",
+    default=str(BASE_DIR / "chatbot_api" / "intenciones_modelo.json"),
+)
+
+# chat_mensajes particionada por mes (chatbot_api/archivo_chat.py).
+# Cron: python manage.py mantener_chat_mensajes
+CHAT_PARTICIONES_ADELANTE = config("CHAT_PARTICIONES_ADELANTE", cast=int, default=3)
+# meses que quedan en chat_mensajes; lo anterior pasa a chat_mensajes_archivo
+CHAT_ARCHIVO_MESES = config("CHAT_ARCHIVO_MESES", cast=int, default=12)
+# tablespace (disco barato) para lo archivado; vacío = no se mueve
+CHAT_ARCHIVO_TABLESPACE = config("CHAT_ARCHIVO_TABLESPACE", default="")
 
 # ------------------------------------------------------------
 # Email (use env vars on Render; never hardcode secrets)
@@ -300,6 +489,7 @@ LOGGING = {
     "web": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
     "denuncias_api": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
     "usuarios_api": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
+    "config.db_router": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
   },
 }
 
@@ -0,0 +1,234 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from config import externos
+from config.conditional import combinar, condicional
+
+
+# =========================================================
+# GET condicional (config/conditional.py)
+# =========================================================
+_ESTADO = {"version": "1:-", "last_modified": None, "llamadas": 0}
+
+
+def _validador(request):
+    return _ESTADO["version"], _ESTADO["last_modified"]
+
+
+class _Vista(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @condicional(_validador)
+    def get(self, request):
+        _ESTADO["llamadas"] += 1
+        return Response({"ok": True})
+
+
+class CondicionalTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.vista = _Vista.as_view()
+        _ESTADO.update(
+            version="3:2026-03-01T12:00:00+00:00",
+            last_modified=datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc),
+            llamadas=0,
+        )
+
+    def _get(self, path="/web/api/x/", **headers):
+        return self.vista(self.factory.get(path, headers=headers))
+
+    def test_primera_respuesta_trae_validadores(self):
+        resp = self._get()
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp["ETag"].startswith('"'))
+        self.assertEqual(resp["Last-Modified"], http_date(_ESTADO["last_modified"].timestamp()))
+        self.assertEqual(resp["Cache-Control"], "private, no-cache")
+
+    def test_etag_igual_responde_304_sin_ejecutar_la_vista(self):
+        etag = self._get()["ETag"]
+        resp = self._get(**{"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+        self.assertEqual(_ESTADO["llamadas"], 1)
+
+    def test_etag_debil_tambien_vale(self):
+        etag = self._get()["ETag"]
+        self.assertEqual(self._get(**{"If-None-Match": f"W/{etag}"}).status_code, 304)
+
+    def test_cambio_de_version_invalida_el_etag(self):
+        etag = self._get()["ETag"]
+        # una actualización sube max(updated_at) y con eso la versión
+        _ESTADO["version"] = "3:2026-03-01T12:05:00+00:00"
+        _ESTADO["last_modified"] += timedelta(minutes=5)
+        resp = self._get(**{"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(_ESTADO["llamadas"], 2)
+
+    def test_etag_depende_del_querystring(self):
+        self.assertNotEqual(self._get("/web/api/x/?estado=a")["ETag"], self._get("/web/api/x/?estado=b")["ETag"])
+
+    def test_if_modified_since(self):
+        lm = _ESTADO["last_modified"]
+        self.assertEqual(self._get(**{"If-Modified-Since": http_date(lm.timestamp())}).status_code, 304)
+        antes = http_date((lm - timedelta(seconds=1)).timestamp())
+        self.assertEqual(self._get(**{"If-Modified-Since": antes}).status_code, 200)
+
+    def test_if_none_match_tiene_prioridad_sobre_if_modified_since(self):
+        lm = _ESTADO["last_modified"]
+        resp = self._get(**{"If-None-Match": '"otro"', "If-Modified-Since": http_date(lm.timestamp())})
+        self.assertEqual(resp.status_code, 200)
+
+    def test_validador_none_o_con_error_responde_completo(self):
+        def _falla(request):
+            raise RuntimeError("bd caída")
+
+        for validador in (lambda request: None, _falla):
+            class Vista(APIView):
+                authentication_classes = []
+                permission_classes = []
+
+                @condicional(validador)
+                def get(self, request):
+                    return Response({"ok": True})
+
+            resp = Vista.as_view()(self.factory.get("/web/api/x/", headers={"If-None-Match": "*"}))
+            self.assertEqual(resp.status_code, 200)
+            self.assertFalse(resp.has_header("ETag"))
+
+    def test_combinar(self):
+        a = ("1:x", datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        b = ("2:y", datetime(2026, 2, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(combinar(a, b, ("0:-", None)), ("1:x|2:y|0:-", b[1]))
+
+
+# =========================================================
+# Rate limit y circuit breaker (config/externos.py)
+# =========================================================
+_CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "externos-tests"}}
+
+
+class _Reloj:
+    """time.time() controlado (también lo usa LocMemCache para expirar)."""
+
+    def __init__(self, t: float = 1_000_000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+class _ErrorHTTP(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@override_settings(
+    CACHES=_CACHE_LOCAL,
+    CACHE_VERSION_MEMO=0,
+    SERVICIOS_EXTERNOS={
+        "bucket": {"rate": 1.0, "burst": 2, "espera_max": 0},
+        "prueba": {"rate": 0, "fallos": 2, "ventana": 60, "enfriamiento": 30},
+    },
+)
+class ExternosTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.reloj = _Reloj()
+        patcher = mock.patch("time.time", self.reloj)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _falla(self):
+        raise RuntimeError("503")
+
+    def _fallar(self, veces: int):
+        for _ in range(veces):
+            with self.assertRaises(RuntimeError):
+                externos.llamar("prueba", self._falla)
+
+    # ---------- token bucket ----------
+    def test_bucket_deja_pasar_la_rafaga_y_luego_corta(self):
+        self.assertTrue(externos.adquirir("bucket"))
+        self.assertTrue(externos.adquirir("bucket"))
+        self.assertFalse(externos.adquirir("bucket"))
+
+    def test_bucket_se_recarga_a_rate_por_segundo(self):
+        for _ in range(2):
+            externos.adquirir("bucket")
+        self.reloj.t += 1.0
+        self.assertTrue(externos.adquirir("bucket"))
+        self.assertFalse(externos.adquirir("bucket"))
+        # nunca acumula más que burst
+        self.reloj.t += 100
+        self.assertTrue(externos.adquirir("bucket"))
+        self.assertTrue(externos.adquirir("bucket"))
+        self.assertFalse(externos.adquirir("bucket"))
+
+    def test_rate_limit_no_llama_al_servicio(self):
+        fn = mock.Mock(return_value="ok")
+        externos.llamar("bucket", fn)
+        externos.llamar("bucket", fn)
+        with self.assertRaises(externos.ServicioNoDisponible) as ctx:
+            externos.llamar("bucket", fn)
+        self.assertEqual(ctx.exception.motivo, "rate_limit")
+        self.assertEqual(fn.call_count, 2)
+
+    # ---------- circuito ----------
+    def test_fallos_abren_el_circuito(self):
+        self._fallar(2)
+        fn = mock.Mock()
+        with self.assertRaises(externos.ServicioNoDisponible) as ctx:
+            externos.llamar("prueba", fn)
+        self.assertEqual(ctx.exception.motivo, "circuito_abierto")
+        fn.assert_not_called()
+
+    def test_medio_abierto_deja_una_prueba_y_cierra_si_sale_bien(self):
+        self._fallar(2)
+        self.reloj.t += 31
+        self.assertFalse(externos.circuito_abierto("prueba"))  # pasa la llamada de prueba
+        self.assertTrue(externos.circuito_abierto("prueba"))   # el resto sigue esperando
+        self.reloj.t += 11  # vence el candado de la prueba
+        self.assertEqual(externos.llamar("prueba", lambda: "ok"), "ok")
+        # cerrado: todo pasa
+        for _ in range(3):
+            self.assertEqual(externos.llamar("prueba", lambda: "ok"), "ok")
+
+    def test_medio_abierto_vuelve_a_abrir_si_la_prueba_falla(self):
+        self._fallar(2)
+        self.reloj.t += 31
+        self._fallar(1)
+        with self.assertRaises(externos.ServicioNoDisponible):
+            externos.llamar("prueba", lambda: "ok")
+
+    def test_errores_4xx_no_abren_el_circuito(self):
+        for status in (400, 404, 422):
+            for _ in range(3):
+                with self.assertRaises(_ErrorHTTP):
+                    externos.llamar("prueba", mock.Mock(side_effect=_ErrorHTTP(status)))
+        self.assertEqual(externos.llamar("prueba", lambda: "ok"), "ok")
+
+    def test_429_y_5xx_si_cuentan(self):
+        for status in (429, 503):
+            with self.assertRaises(_ErrorHTTP):
+                externos.llamar("prueba", mock.Mock(side_effect=_ErrorHTTP(status)))
+        with self.assertRaises(externos.ServicioNoDisponible):
+            externos.llamar("prueba", lambda: "ok")
+
+    def test_error_del_cliente(self):
+        respuesta = mock.Mock(status_code=404)
+        self.assertTrue(externos.error_del_cliente(_ErrorHTTP(400)))
+        self.assertTrue(externos.error_del_cliente(mock.Mock(spec=["response"], response=respuesta)))
+        self.assertTrue(externos.error_del_cliente(mock.Mock(spec=["http_response"], http_response=respuesta)))
+        self.assertFalse(externos.error_del_cliente(_ErrorHTTP(408)))
+        self.assertFalse(externos.error_del_cliente(_ErrorHTTP(500)))
+        self.assertFalse(externos.error_del_cliente(RuntimeError("sin status")))
@@ -22,6 +22,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
 
+from config.metrics import metrics_view
+
 # Handlers de error personalizados
 handler403 = 'web.views.permission_denied_view'
 handler404 = 'web.views.page_not_found_view'
@@ -29,6 +31,7 @@ handler500 = 'web.views.server_error_view'
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path("metrics/", metrics_view, name="metrics"),
     path('web/select2/', include('django_select2.urls')),
     path("web/api/auth/", include("usuarios_api.urls")),
     path("web/api/catalogos/", include("catalogos_api.urls")),
@@ -5,6 +5,7 @@ from .models import *
 admin.site.register(Auditoria)
 admin.site.register(ChatConversaciones)
 admin.site.register(ChatMensajes)
+admin.site.register(ChatMensajesArchivo)
 admin.site.register(CiudadanoDocumentos)
 admin.site.register(Ciudadanos)
 admin.site.register(DenunciaBorradores)
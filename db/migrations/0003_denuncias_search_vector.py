@@ -0,0 +1,120 @@
+# Búsqueda de texto completo sobre denuncias (tablas no gestionadas por Django).
+# Mismo SQL que la sección 16 de tesis/schema.sql; aquí para BDs ya existentes.
+
+from django.db import migrations
+
+
+FTS_SQL = r"""
+CREATE EXTENSION IF NOT EXISTS "unaccent";
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+    CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+    ALTER TEXT SEARCH CONFIGURATION es_unaccent
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+  END IF;
+
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'simple_unaccent') THEN
+    CREATE TEXT SEARCH CONFIGURATION simple_unaccent (COPY = simple);
+    ALTER TEXT SEARCH CONFIGURATION simple_unaccent
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+  END IF;
+END $$;
+
+ALTER TABLE denuncias ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE denuncias ADD COLUMN IF NOT EXISTS search_vector_ciudadano tsvector;
+
+CREATE OR REPLACE FUNCTION denuncias_ciudadano_tsvector(p_ciudadano_id UUID)
+RETURNS tsvector AS $$
+  SELECT setweight(to_tsvector('simple', coalesce(c.cedula, '')), 'A')
+      || setweight(to_tsvector('simple_unaccent',
+                               coalesce(c.nombres, '') || ' ' || coalesce(c.apellidos, '')), 'B')
+  FROM ciudadanos c
+  WHERE c.usuario_id = p_ciudadano_id;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION denuncias_search_vector_refresh()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.search_vector :=
+       setweight(to_tsvector('es_unaccent', coalesce(NEW.descripcion, '')), 'A')
+    || setweight(to_tsvector('es_unaccent', coalesce(NEW.referencia, '')), 'B')
+    || setweight(to_tsvector('es_unaccent', coalesce(NEW.direccion_texto, '')), 'C');
+  NEW.search_vector_ciudadano := denuncias_ciudadano_tsvector(NEW.ciudadano_id);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_denuncias_search_vector ON denuncias;
+CREATE TRIGGER tr_denuncias_search_vector
+BEFORE INSERT OR UPDATE OF descripcion, referencia, direccion_texto, ciudadano_id ON denuncias
+FOR EACH ROW
+EXECUTE FUNCTION denuncias_search_vector_refresh();
+
+-- Si el ciudadano cambia nombre/cédula, refrescar sus denuncias
+CREATE OR REPLACE FUNCTION ciudadanos_refresh_denuncias_search()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.cedula IS DISTINCT FROM OLD.cedula
+     OR NEW.nombres IS DISTINCT FROM OLD.nombres
+     OR NEW.apellidos IS DISTINCT FROM OLD.apellidos THEN
+    UPDATE denuncias
+    SET search_vector_ciudadano = denuncias_ciudadano_tsvector(NEW.usuario_id)
+    WHERE ciudadano_id = NEW.usuario_id;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_ciudadanos_refresh_denuncias_search ON ciudadanos;
+CREATE TRIGGER tr_ciudadanos_refresh_denuncias_search
+AFTER UPDATE ON ciudadanos
+FOR EACH ROW
+EXECUTE FUNCTION ciudadanos_refresh_denuncias_search();
+
+CREATE INDEX IF NOT EXISTS idx_denuncias_search
+ON denuncias USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_denuncias_search_ciudadano
+ON denuncias USING GIN (search_vector_ciudadano);
+"""
+
+# Backfill sin tocar updated_at (no es un cambio real de la denuncia)
+BACKFILL_SQL = r"""
+ALTER TABLE denuncias DISABLE TRIGGER tr_denuncias_updated;
+
+UPDATE denuncias SET
+  search_vector =
+       setweight(to_tsvector('es_unaccent', coalesce(descripcion, '')), 'A')
+    || setweight(to_tsvector('es_unaccent', coalesce(referencia, '')), 'B')
+    || setweight(to_tsvector('es_unaccent', coalesce(direccion_texto, '')), 'C'),
+  search_vector_ciudadano = denuncias_ciudadano_tsvector(ciudadano_id)
+WHERE search_vector IS NULL OR search_vector_ciudadano IS NULL;
+
+ALTER TABLE denuncias ENABLE TRIGGER tr_denuncias_updated;
+"""
+
+REVERSE_SQL = r"""
+DROP TRIGGER IF EXISTS tr_ciudadanos_refresh_denuncias_search ON ciudadanos;
+DROP TRIGGER IF EXISTS tr_denuncias_search_vector ON denuncias;
+DROP FUNCTION IF EXISTS ciudadanos_refresh_denuncias_search();
+DROP FUNCTION IF EXISTS denuncias_search_vector_refresh();
+DROP INDEX IF EXISTS idx_denuncias_search;
+DROP INDEX IF EXISTS idx_denuncias_search_ciudadano;
+ALTER TABLE denuncias DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE denuncias DROP COLUMN IF EXISTS search_vector_ciudadano;
+DROP FUNCTION IF EXISTS denuncias_ciudadano_tsvector(UUID);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0002_borradorarchivo_denunciaarchivo'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FTS_SQL, reverse_sql=REVERSE_SQL),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
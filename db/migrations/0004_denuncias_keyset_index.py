@@ -0,0 +1,26 @@
+# Índices para paginación por cursor (created_at, id) en los listados del panel.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0003_denuncias_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            CREATE INDEX IF NOT EXISTS idx_denuncias_fecha_id
+            ON denuncias(created_at DESC, id DESC);
+
+            CREATE INDEX IF NOT EXISTS idx_denuncias_depto_fecha_id
+            ON denuncias(asignado_departamento_id, created_at DESC, id DESC);
+            """,
+            reverse_sql="""
+            DROP INDEX IF EXISTS idx_denuncias_depto_fecha_id;
+            DROP INDEX IF EXISTS idx_denuncias_fecha_id;
+            """,
+        ),
+    ]
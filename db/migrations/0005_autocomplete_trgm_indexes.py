@@ -0,0 +1,38 @@
+# Índices pg_trgm para el autocompletado del panel (ver web/services/autocomplete.py).
+# Misma expresión que genera icontains en Postgres: UPPER(col::text).
+
+from django.db import migrations
+
+
+TRGM_INDEXES = [
+    ("idx_trgm_usuarios_correo", "usuarios", "correo"),
+    ("idx_trgm_funcionarios_nombres", "funcionarios", "nombres"),
+    ("idx_trgm_funcionarios_apellidos", "funcionarios", "apellidos"),
+    ("idx_trgm_funcionarios_cedula", "funcionarios", "cedula"),
+    ("idx_trgm_ciudadanos_nombres", "ciudadanos", "nombres"),
+    ("idx_trgm_ciudadanos_apellidos", "ciudadanos", "apellidos"),
+    ("idx_trgm_ciudadanos_cedula", "ciudadanos", "cedula"),
+    ("idx_trgm_auth_user_username", "auth_user", "username"),
+    ("idx_trgm_auth_user_email", "auth_user", "email"),
+    ("idx_trgm_auth_user_first_name", "auth_user", "first_name"),
+    ("idx_trgm_auth_user_last_name", "auth_user", "last_name"),
+]
+
+FORWARD_SQL = ['CREATE EXTENSION IF NOT EXISTS "pg_trgm";'] + [
+    f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING GIN (UPPER({col}::text) gin_trgm_ops);"
+    for name, table, col in TRGM_INDEXES
+]
+
+REVERSE_SQL = [f"DROP INDEX IF EXISTS {name};" for name, _, _ in TRGM_INDEXES]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0004_denuncias_keyset_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, reverse_sql=REVERSE_SQL),
+    ]
@@ -0,0 +1,34 @@
+# Índices para el sync incremental de la app (denuncias_api/views_sync.py).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0005_autocomplete_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='denunciaarchivo',
+            index=models.Index(fields=['denuncia', 'created_at'], name='idx_denuncia_archivos_sync'),
+        ),
+        migrations.RunSQL(
+            """
+            CREATE INDEX IF NOT EXISTS idx_denuncias_ciudadano_updated
+            ON denuncias(ciudadano_id, updated_at);
+
+            CREATE INDEX IF NOT EXISTS idx_denuncia_historial_denuncia_fecha
+            ON denuncia_historial(denuncia_id, created_at);
+
+            CREATE INDEX IF NOT EXISTS idx_denuncia_respuestas_denuncia_updated
+            ON denuncia_respuestas(denuncia_id, updated_at);
+            """,
+            reverse_sql="""
+            DROP INDEX IF EXISTS idx_denuncia_respuestas_denuncia_updated;
+            DROP INDEX IF EXISTS idx_denuncia_historial_denuncia_fecha;
+            DROP INDEX IF EXISTS idx_denuncias_ciudadano_updated;
+            """,
+        ),
+    ]
@@ -0,0 +1,27 @@
+# usuarios.token_version: versión de revocación de los JWT (claim "tv").
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0006_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuarios',
+            name='token_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            """
+            ALTER TABLE usuarios
+              ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+            """,
+            reverse_sql="""
+            ALTER TABLE usuarios DROP COLUMN IF EXISTS token_version;
+            """,
+        ),
+    ]
@@ -0,0 +1,56 @@
+# chat_conversaciones: resumen acumulado + última respuesta de OpenAI (chatbot_api/memoria.py).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0007_usuarios_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatconversaciones',
+            name='resumen',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatconversaciones',
+            name='resumen_hasta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatconversaciones',
+            name='ultima_respuesta_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatconversaciones',
+            name='ultima_respuesta_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatconversaciones',
+            name='ultima_respuesta_tokens',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            """
+            ALTER TABLE chat_conversaciones
+              ADD COLUMN IF NOT EXISTS resumen TEXT,
+              ADD COLUMN IF NOT EXISTS resumen_hasta TIMESTAMPTZ,
+              ADD COLUMN IF NOT EXISTS ultima_respuesta_id VARCHAR(100),
+              ADD COLUMN IF NOT EXISTS ultima_respuesta_at TIMESTAMPTZ,
+              ADD COLUMN IF NOT EXISTS ultima_respuesta_tokens INTEGER NOT NULL DEFAULT 0;
+            """,
+            reverse_sql="""
+            ALTER TABLE chat_conversaciones
+              DROP COLUMN IF EXISTS resumen,
+              DROP COLUMN IF EXISTS resumen_hasta,
+              DROP COLUMN IF EXISTS ultima_respuesta_id,
+              DROP COLUMN IF EXISTS ultima_respuesta_at,
+              DROP COLUMN IF EXISTS ultima_respuesta_tokens;
+            """,
+        ),
+    ]
@@ -0,0 +1,27 @@
+# tipos_denuncia.sinonimos: sinónimos para el índice de tipos del chatbot.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0008_chat_memoria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tiposdenuncia',
+            name='sinonimos',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.RunSQL(
+            """
+            ALTER TABLE tipos_denuncia
+              ADD COLUMN IF NOT EXISTS sinonimos TEXT;
+            """,
+            reverse_sql="""
+            ALTER TABLE tipos_denuncia DROP COLUMN IF EXISTS sinonimos;
+            """,
+        ),
+    ]
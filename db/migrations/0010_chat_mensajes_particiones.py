@@ -0,0 +1,122 @@
+# chat_mensajes particionada por mes + chat_mensajes_archivo para los meses fríos
+# (chatbot_api/archivo_chat.py, manage.py mantener_chat_mensajes).
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0009_tipos_denuncia_sinonimos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatMensajesArchivo',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('emisor', models.CharField(max_length=10)),
+                ('mensaje', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('conversacion', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='db.chatconversaciones')),
+            ],
+            options={
+                'db_table': 'chat_mensajes_archivo',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(
+            """
+            CREATE OR REPLACE FUNCTION chat_mensajes_particion(mes DATE) RETURNS TEXT AS $$
+            DECLARE
+              inicio DATE := make_date(extract(year FROM mes)::int, extract(month FROM mes)::int, 1);
+              nombre TEXT := 'chat_mensajes_' || to_char(mes, 'YYYYMM');
+            BEGIN
+              IF to_regclass(nombre) IS NULL AND to_regclass('chat_mensajes_archivo_' || to_char(mes, 'YYYYMM')) IS NULL THEN
+                EXECUTE format(
+                  'CREATE TABLE %I PARTITION OF chat_mensajes FOR VALUES FROM (%L) TO (%L)',
+                  nombre,
+                  inicio::timestamp AT TIME ZONE 'UTC',
+                  (inicio + interval '1 month') AT TIME ZONE 'UTC'
+                );
+              END IF;
+              RETURN nombre;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DO $$
+            DECLARE
+              primero TIMESTAMPTZ;
+              mes DATE;
+            BEGIN
+              IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'chat_mensajes'::regclass) THEN
+                RETURN;
+              END IF;
+
+              ALTER TABLE chat_mensajes RENAME TO chat_mensajes_plana;
+              ALTER INDEX IF EXISTS chat_mensajes_pkey RENAME TO chat_mensajes_plana_pkey;
+              DROP INDEX IF EXISTS idx_chat_mensajes_conversacion;
+
+              -- la PK de una tabla particionada debe incluir la llave de partición
+              CREATE TABLE chat_mensajes (
+                id              UUID NOT NULL DEFAULT gen_random_uuid(),
+                conversacion_id UUID NOT NULL REFERENCES chat_conversaciones(id) ON DELETE CASCADE,
+                emisor          VARCHAR(10) NOT NULL CHECK (emisor IN ('usuario','bot')),
+                mensaje         TEXT NOT NULL,
+                created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+              ) PARTITION BY RANGE (created_at);
+
+              CREATE INDEX idx_chat_mensajes_conversacion_fecha
+              ON chat_mensajes(conversacion_id, created_at);
+
+              SELECT COALESCE(min(created_at), now()) INTO primero FROM chat_mensajes_plana;
+              FOR mes IN
+                SELECT generate_series(
+                  date_trunc('month', primero AT TIME ZONE 'UTC'),
+                  date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 month',
+                  interval '1 month'
+                )::date
+              LOOP
+                PERFORM chat_mensajes_particion(mes);
+              END LOOP;
+
+              -- red de seguridad: lo que caiga fuera de los meses creados
+              CREATE TABLE chat_mensajes_default PARTITION OF chat_mensajes DEFAULT;
+
+              INSERT INTO chat_mensajes (id, conversacion_id, emisor, mensaje, created_at)
+              SELECT id, conversacion_id, emisor, mensaje, created_at FROM chat_mensajes_plana;
+
+              DROP TABLE chat_mensajes_plana;
+            END $$;
+
+            -- meses archivados: fuera de chat_mensajes, igual de consultables aquí
+            CREATE TABLE IF NOT EXISTS chat_mensajes_archivo (LIKE chat_mensajes INCLUDING ALL)
+            PARTITION BY RANGE (created_at);
+            """,
+            reverse_sql="""
+            CREATE TABLE chat_mensajes_plana (
+              id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+              conversacion_id UUID NOT NULL REFERENCES chat_conversaciones(id) ON DELETE CASCADE,
+              emisor          VARCHAR(10) NOT NULL CHECK (emisor IN ('usuario','bot')),
+              mensaje         TEXT NOT NULL,
+              created_at      TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+
+            INSERT INTO chat_mensajes_plana (id, conversacion_id, emisor, mensaje, created_at)
+            SELECT id, conversacion_id, emisor, mensaje, created_at FROM chat_mensajes
+            UNION ALL
+            SELECT id, conversacion_id, emisor, mensaje, created_at FROM chat_mensajes_archivo;
+
+            DROP TABLE chat_mensajes_archivo;
+            DROP TABLE chat_mensajes;
+            DROP FUNCTION IF EXISTS chat_mensajes_particion(DATE);
+
+            ALTER TABLE chat_mensajes_plana RENAME TO chat_mensajes;
+            ALTER INDEX chat_mensajes_plana_pkey RENAME TO chat_mensajes_pkey;
+            CREATE INDEX IF NOT EXISTS idx_chat_mensajes_conversacion
+            ON chat_mensajes(conversacion_id);
+            """,
+        ),
+    ]
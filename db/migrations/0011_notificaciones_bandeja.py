@@ -0,0 +1,39 @@
+# notificaciones.datos + índices de la bandeja en la app (notificaciones/bandeja.py).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0010_chat_mensajes_particiones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificaciones',
+            name='datos',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunSQL(
+            """
+            ALTER TABLE notificaciones
+              ADD COLUMN IF NOT EXISTS datos JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+            CREATE INDEX IF NOT EXISTS idx_notificaciones_usuario_id
+            ON notificaciones(usuario_id, id DESC);
+
+            CREATE INDEX IF NOT EXISTS idx_notificaciones_no_leidas
+            ON notificaciones(usuario_id) WHERE NOT leido;
+
+            DROP INDEX IF EXISTS idx_notificaciones_usuario;
+            """,
+            reverse_sql="""
+            CREATE INDEX IF NOT EXISTS idx_notificaciones_usuario
+            ON notificaciones(usuario_id);
+            DROP INDEX IF EXISTS idx_notificaciones_no_leidas;
+            DROP INDEX IF EXISTS idx_notificaciones_usuario_id;
+            ALTER TABLE notificaciones DROP COLUMN IF EXISTS datos;
+            """,
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Avisos en vivo de denuncias: triggers con pg_notify (web/tiempo_real.py).
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('db', '0011_notificaciones_bandeja'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            CREATE OR REPLACE FUNCTION notificar_denuncia_cambio() RETURNS trigger AS $$
+            DECLARE
+              d_id UUID;
+              evento TEXT;
+              dep_antes BIGINT;
+              func_extra UUID;
+              fila denuncias%ROWTYPE;
+            BEGIN
+              IF TG_TABLE_NAME = 'denuncias' THEN
+                fila := NEW;
+                IF TG_OP = 'INSERT' THEN
+                  evento := 'creada';
+                ELSIF NEW.asignado_departamento_id IS DISTINCT FROM OLD.asignado_departamento_id
+                   OR NEW.asignado_funcionario_id IS DISTINCT FROM OLD.asignado_funcionario_id THEN
+                  evento := 'asignada';
+                  dep_antes := OLD.asignado_departamento_id;
+                ELSIF NEW.estado IS DISTINCT FROM OLD.estado THEN
+                  evento := 'estado';
+                ELSE
+                  RETURN NULL;  -- otros campos (descripción, search_vector...) no cambian la fila del listado
+                END IF;
+              ELSE
+                d_id := NEW.denuncia_id;
+                IF TG_TABLE_NAME = 'denuncia_asignaciones' THEN
+                  evento := 'asignada';
+                  -- solo aquí: denuncias no tiene funcionario_id y PL/pgSQL resuelve
+                  -- los campos de NEW al preparar cada expresión
+                  func_extra := NEW.funcionario_id;
+                ELSE
+                  evento := 'respuesta';
+                END IF;
+                SELECT * INTO fila FROM denuncias WHERE id = d_id;
+                IF NOT FOUND THEN
+                  RETURN NULL;
+                END IF;
+              END IF;
+
+              -- el id del evento lo ponen todos los workers igual: microsegundos del reloj de la BD
+              PERFORM pg_notify('denuncias_cambios', json_build_object(
+                'ev', (extract(epoch FROM clock_timestamp()) * 1000000)::bigint,
+                'id', fila.id,
+                'evento', evento,
+                'estado', fila.estado,
+                'dep', fila.asignado_departamento_id,
+                'dep_antes', dep_antes,
+                'func', fila.asignado_funcionario_id,
+                'func_extra', func_extra
+              )::text);
+              RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS tr_denuncias_notificar ON denuncias;
+            CREATE TRIGGER tr_denuncias_notificar
+            AFTER INSERT OR UPDATE ON denuncias
+            FOR EACH ROW EXECUTE FUNCTION notificar_denuncia_cambio();
+
+            DROP TRIGGER IF EXISTS tr_denuncia_respuestas_notificar ON denuncia_respuestas;
+            CREATE TRIGGER tr_denuncia_respuestas_notificar
+            AFTER INSERT ON denuncia_respuestas
+            FOR EACH ROW EXECUTE FUNCTION notificar_denuncia_cambio();
+
+            DROP TRIGGER IF EXISTS tr_denuncia_asignaciones_notificar ON denuncia_asignaciones;
+            CREATE TRIGGER tr_denuncia_asignaciones_notificar
+            AFTER INSERT OR UPDATE ON denuncia_asignaciones
+            FOR EACH ROW EXECUTE FUNCTION notificar_denuncia_cambio();
+            """,
+            reverse_sql="""
+            DROP TRIGGER IF EXISTS tr_denuncia_asignaciones_notificar ON denuncia_asignaciones;
+            DROP TRIGGER IF EXISTS tr_denuncia_respuestas_notificar ON denuncia_respuestas;
+            DROP TRIGGER IF EXISTS tr_denuncias_notificar ON denuncias;
+            DROP FUNCTION IF EXISTS notificar_denuncia_cambio();
+            """,
+        ),
+    ]
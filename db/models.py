@@ -37,6 +37,12 @@ class ChatConversaciones(models.Model):
     denuncia = models.ForeignKey('Denuncias', models.DO_NOTHING, db_column='denuncia_id', to_field='id', blank=True, null=True)
     created_at = models.DateTimeField()
     updated_at = models.DateTimeField()
+    # memoria del chatbot (chatbot_api/memoria.py)
+    resumen = models.TextField(blank=True, null=True)
+    resumen_hasta = models.DateTimeField(blank=True, null=True)
+    ultima_respuesta_id = models.CharField(max_length=100, blank=True, null=True)
+    ultima_respuesta_at = models.DateTimeField(blank=True, null=True)
+    ultima_respuesta_tokens = models.IntegerField(default=0)
 
     class Meta:
         managed=False
@@ -61,6 +67,22 @@ class ChatMensajes(models.Model):
         return f"Mensaje {self.emisor}: {self.mensaje[:50]}... - {self.created_at}"
 
 
+class ChatMensajesArchivo(models.Model):
+    # meses de chat_mensajes movidos por manage.py mantener_chat_mensajes
+    id = models.UUIDField(primary_key=True)
+    conversacion = models.ForeignKey(ChatConversaciones, models.DO_NOTHING)
+    emisor = models.CharField(max_length=10)
+    mensaje = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        managed=False
+        db_table = 'chat_mensajes_archivo'
+
+    def __str__(self):
+        return f"Mensaje archivado {self.emisor}: {self.mensaje[:50]}... - {self.created_at}"
+
+
 class CiudadanoDocumentos(models.Model):
     id = models.UUIDField(primary_key=True)
     #ciudadano = models.ForeignKey('Ciudadanos', models.DO_NOTHING)
@@ -345,6 +367,7 @@ class Notificaciones(models.Model):
     mensaje = models.TextField()
     tipo = models.CharField(max_length=30)
     leido = models.BooleanField()
+    datos = models.JSONField(default=dict)
     created_at = models.DateTimeField()
     updated_at = models.DateTimeField()
 
@@ -406,6 +429,8 @@ class TiposDenuncia(models.Model):
     id = models.BigAutoField(primary_key=True)
     nombre = models.CharField(unique=True, max_length=120)
     descripcion = models.TextField(blank=True, null=True)
+    # sinónimos separados por coma para el chatbot (catalogos_api/tipos_index.py)
+    sinonimos = models.TextField(blank=True, null=True)
     activo = models.BooleanField()
     created_at = models.DateTimeField()
     updated_at = models.DateTimeField()
@@ -442,6 +467,8 @@ class Usuarios(models.Model):
     password_hash = models.TextField()
     activo = models.BooleanField(default=True)
     correo_verificado = models.BooleanField(default=False)
+    # se incrementa al desactivar / cambiar contraseña: revoca los JWT ("tv")
+    token_version = models.IntegerField(default=0)
 
     created_at = models.DateTimeField(default=timezone.now)  # ✅
     updated_at = models.DateTimeField(default=timezone.now)  # ✅
@@ -541,3 +568,6 @@ class DenunciaArchivo(models.Model):
     class Meta:
         db_table = "denuncia_archivos"   # tabla nueva
         managed = True
+        indexes = [
+            models.Index(fields=["denuncia", "created_at"], name="idx_denuncia_archivos_sync"),
+        ]
@@ -0,0 +1,69 @@
+# db/search.py
+"""
+Búsqueda de denuncias con Postgres FTS (ver sección 16 de tesis/schema.sql).
+
+- search_vector: descripción/referencia/dirección, config "es_unaccent" (stemming + sin tildes)
+- search_vector_ciudadano: cédula + nombres, config "simple_unaccent" con prefijo
+  ("1712" encuentra la cédula 1712345678, "jua per" encuentra a Juan Pérez)
+
+Las columnas no están en el modelo Denuncias (managed=False) para no traerlas
+en cada SELECT; se referencian con RawSQL solo cuando hay búsqueda.
+"""
+from __future__ import annotations
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+FTS_CONFIG = "es_unaccent"
+NOMBRES_CONFIG = "simple_unaccent"
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _vector(columna: str):
+    return RawSQL(f'"denuncias"."{columna}"', [], output_field=SearchVectorField())
+
+
+def _prefijo_tsquery(q: str) -> str:
+    """'Juan Pér' -> 'juan:* & pér:*' (tokens limpios, sin operadores del usuario)."""
+    tokens = _TOKEN_RE.findall((q or "").lower())[:6]
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def buscar_denuncias(qs, q: str, *, incluir_ciudadano: bool = True, ordenar_por_relevancia: bool = True):
+    """
+    Filtra un queryset de Denuncias por texto.
+
+    incluir_ciudadano=False para APIs públicas (mapa): no se busca por
+    nombres/cédula de otros ciudadanos.
+    Si ordenar_por_relevancia, anota "rank" y ordena por (-rank, -created_at).
+    """
+    q = (q or "").strip()
+    if not q:
+        return qs
+
+    contenido = SearchQuery(q, search_type="websearch", config=FTS_CONFIG)
+    qs = qs.alias(_fts=_vector("search_vector"))
+    cond = Q(_fts=contenido)
+    rank = SearchRank(_vector("search_vector"), contenido)
+
+    if incluir_ciudadano:
+        prefijo = _prefijo_tsquery(q)
+        if prefijo:
+            persona = SearchQuery(prefijo, search_type="raw", config=NOMBRES_CONFIG)
+            qs = qs.alias(_fts_ciudadano=_vector("search_vector_ciudadano"))
+            cond |= Q(_fts_ciudadano=persona)
+            rank = rank + SearchRank(_vector("search_vector_ciudadano"), persona)
+
+    qs = qs.filter(cond)
+
+    if ordenar_por_relevancia:
+        # ts_rank devuelve real (float4); el cursor keyset vuelve como float8 y
+        # real vs float8 no compara igual en los empates -> se castea a float8
+        qs = qs.annotate(rank=Cast(rank, FloatField())).order_by("-rank", "-created_at")
+
+    return qs
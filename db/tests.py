@@ -1,3 +1,88 @@
+import uuid
+from unittest import SkipTest
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+
+def _hay_esquema() -> bool:
+    """Las tablas las crea tesis/schema.sql; sin él no hay triggers que probar."""
+    return "denuncias" in connection.introspection.table_names()
+
+
+class NotificarDenunciaCambioTests(TestCase):
+    """
+    notificar_denuncia_cambio() (migración 0012) corre en los triggers
+    de denuncias, denuncia_respuestas y denuncia_asignaciones: ninguno debe
+    romper la escritura que lo dispara.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        if not _hay_esquema():
+            raise SkipTest("requiere la base de pruebas creada con tesis/schema.sql")
+        super().setUpClass()
+
+    def setUp(self):
+        self.ciudadano = uuid.uuid4()
+        self.funcionario = uuid.uuid4()
+        with connection.cursor() as cur:
+            cur.execute(
+                "INSERT INTO usuarios (id, tipo, correo, password_hash) VALUES "
+                "(%s, 'ciudadano', %s, 'x'), (%s, 'funcionario', %s, 'x')",
+                [self.ciudadano, f"{self.ciudadano}@test.local", self.funcionario, f"{self.funcionario}@test.local"],
+            )
+            cur.execute(
+                "INSERT INTO ciudadanos (usuario_id, cedula, nombres, apellidos) VALUES (%s, %s, 'Ana', 'Pérez')",
+                [self.ciudadano, str(self.ciudadano.int)[:10]],
+            )
+            cur.execute("INSERT INTO departamentos (nombre) VALUES (%s) RETURNING id", [f"dep {uuid.uuid4()}"])
+            self.departamento = cur.fetchone()[0]
+            cur.execute(
+                "INSERT INTO funcionarios (usuario_id, cedula, nombres, apellidos, departamento_id) "
+                "VALUES (%s, %s, 'Luis', 'Mora', %s)",
+                [self.funcionario, str(self.funcionario.int)[:10], self.departamento],
+            )
+            cur.execute("INSERT INTO tipos_denuncia (nombre) VALUES (%s) RETURNING id", [f"tipo {uuid.uuid4()}"])
+            self.tipo = cur.fetchone()[0]
+
+    def _crear_denuncia(self):
+        with connection.cursor() as cur:
+            cur.execute(
+                "INSERT INTO denuncias (ciudadano_id, tipo_denuncia_id, descripcion, latitud, longitud) "
+                "VALUES (%s, %s, 'bache en la vía', -2.9, -79.0) RETURNING id",
+                [self.ciudadano, self.tipo],
+            )
+            return cur.fetchone()[0]
+
+    def test_insert_denuncia(self):
+        self.assertIsNotNone(self._crear_denuncia())
+
+    def test_update_estado_y_asignacion(self):
+        d_id = self._crear_denuncia()
+        with connection.cursor() as cur:
+            cur.execute("UPDATE denuncias SET estado = 'en_revision' WHERE id = %s", [d_id])
+            cur.execute(
+                "UPDATE denuncias SET asignado_departamento_id = %s, asignado_funcionario_id = %s WHERE id = %s",
+                [self.departamento, self.funcionario, d_id],
+            )
+            cur.execute("UPDATE denuncias SET descripcion = 'sin cambio de fila' WHERE id = %s", [d_id])
+            cur.execute("SELECT estado, asignado_funcionario_id FROM denuncias WHERE id = %s", [d_id])
+            estado, funcionario = cur.fetchone()
+        self.assertEqual(estado, "en_revision")
+        self.assertEqual(funcionario, self.funcionario)
+
+    def test_asignacion_y_respuesta(self):
+        d_id = self._crear_denuncia()
+        with connection.cursor() as cur:
+            cur.execute(
+                "INSERT INTO denuncia_asignaciones (denuncia_id, funcionario_id) VALUES (%s, %s)",
+                [d_id, self.funcionario],
+            )
+            cur.execute("UPDATE denuncia_asignaciones SET activo = FALSE WHERE denuncia_id = %s", [d_id])
+            cur.execute(
+                "INSERT INTO denuncia_respuestas (denuncia_id, funcionario_id, mensaje) VALUES (%s, %s, 'visto')",
+                [d_id, self.funcionario],
+            )
+            cur.execute("SELECT count(*) FROM denuncia_respuestas WHERE denuncia_id = %s", [d_id])
+            self.assertEqual(cur.fetchone()[0], 1)
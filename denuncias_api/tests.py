@@ -1,3 +1,101 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import SkipTest, mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from denuncias_api import views_sync
+from denuncias_api.views_sync import DenunciasSyncView, _encode_cursor, _parse_cursor
+
+
+class CursorSyncTests(SimpleTestCase):
+    def test_ida_y_vuelta(self):
+        cortes = {"denuncias": (timezone.now(), uuid.uuid4())}
+        self.assertEqual(_parse_cursor(_encode_cursor(cortes)), cortes)
+        self.assertEqual(_parse_cursor(""), {})
+
+    def test_cursor_invalido(self):
+        for raw in ("no-es-base64!!", _encode_cursor({}) + "x", "W10"):
+            with self.assertRaises(ValueError):
+                _parse_cursor(raw)
+
+
+class DenunciasSyncTests(TestCase):
+    """
+    Paginación del sync con muchas filas en el mismo updated_at (un UPDATE
+    masivo las sella con el mismo now()). Requiere tesis/schema.sql.
+    """
+
+    LIMITE = 3
+
+    @classmethod
+    def setUpClass(cls):
+        if "denuncias" not in connection.introspection.table_names():
+            raise SkipTest("requiere la base de pruebas creada con tesis/schema.sql")
+        super().setUpClass()
+
+    def setUp(self):
+        self.uid = uuid.uuid4()
+        with connection.cursor() as cur:
+            cur.execute(
+                "INSERT INTO usuarios (id, tipo, correo, password_hash) VALUES (%s, 'ciudadano', %s, 'x')",
+                [self.uid, f"{self.uid}@test.local"],
+            )
+            cur.execute(
+                "INSERT INTO ciudadanos (usuario_id, cedula, nombres, apellidos) VALUES (%s, %s, 'Ana', 'Pérez')",
+                [self.uid, str(self.uid.int)[:10]],
+            )
+            cur.execute("INSERT INTO tipos_denuncia (nombre) VALUES (%s) RETURNING id", [f"tipo {uuid.uuid4()}"])
+            tipo = cur.fetchone()[0]
+            for _ in range(self.LIMITE + 1):
+                cur.execute(
+                    "INSERT INTO denuncias (ciudadano_id, tipo_denuncia_id, descripcion, latitud, longitud) "
+                    "VALUES (%s, %s, 'prueba', -1.0, -78.5)",
+                    [self.uid, tipo],
+                )
+            # dentro de la transacción del test now() es fijo: todas quedan con el mismo
+            # updated_at, y el cambio de estado deja LIMITE + 1 filas de historial iguales
+            cur.execute("UPDATE denuncias SET estado = 'en_revision' WHERE ciudadano_id = %s", [self.uid])
+            cur.execute("SELECT now()")
+            self.ahora = cur.fetchone()[0]
+
+        patcher = mock.patch.object(views_sync, "SYNC_LIMITE", self.LIMITE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _sync(self, **params):
+        request = APIRequestFactory().get("/web/api/denuncias/sync/", params)
+        force_authenticate(
+            request,
+            user=SimpleNamespace(is_authenticated=True, pk=str(self.uid)),
+            token={"uid": str(self.uid), "tipo": "ciudadano"},
+        )
+        return DenunciasSyncView.as_view()(request)
+
+    def test_mismo_updated_at_no_repite_pagina(self):
+        params = {"since": (self.ahora - timedelta(hours=1)).isoformat()}
+        vistos, historial, paginas = [], [], 0
+        while True:
+            resp = self._sync(**params)
+            self.assertEqual(resp.status_code, 200)
+            vistos.extend(d["id"] for d in resp.data["denuncias"])
+            historial.extend(h["id"] for h in resp.data["historial"])
+            paginas += 1
+            self.assertLess(paginas, 5, "el sync no avanza")
+            if not resp.data["more"]:
+                break
+            params = {"since": resp.data["watermark"], "cursor": resp.data["cursor"]}
+
+        self.assertEqual(paginas, 2)
+        self.assertEqual(len(vistos), self.LIMITE + 1)
+        self.assertEqual(len(set(vistos)), self.LIMITE + 1)
+        self.assertEqual(len(set(historial)), self.LIMITE + 1)
+        self.assertEqual(len(resp.data["vigentes"]["denuncias"]), self.LIMITE + 1)
+        self.assertNotIn("cursor", resp.data)
+
+    def test_cursor_invalido(self):
+        self.assertEqual(self._sync(cursor="basura").status_code, 400)
@@ -6,6 +6,7 @@ from .views import CrearDenunciaView, MisDenunciasView, MapaDenunciasView
 from .views_detalle import DenunciaDetalleView
 from .views_respuestas import DenunciaRespuestasView
 from .views_historial import DenunciaHistorialView
+from .views_sync import DenunciasSyncView
 
 from .views_borradores import (
     BorradoresCreateView,
@@ -35,6 +36,7 @@ urlpatterns = [
     path("", CrearDenunciaView.as_view(), name="crear_denuncia"),
     path("mias/", MisDenunciasView.as_view(), name="mis_denuncias"),
     path("mapa/", MapaDenunciasView.as_view(), name="denuncias_mapa"),
+    path("sync/", DenunciasSyncView.as_view(), name="denuncias_sync"),
     path("<uuid:denuncia_id>/detalle/", DenunciaDetalleView.as_view(), name="denuncia_detalle"),
     path("<uuid:denuncia_id>/respuestas/", DenunciaRespuestasView.as_view(), name="denuncia_respuestas"),
     path("<uuid:denuncia_id>/historial/", DenunciaHistorialView.as_view(), name="denuncia_historial"),
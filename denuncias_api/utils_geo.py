@@ -1,7 +1,18 @@
 import requests
 
+from config import externos
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/reverse"
+NOMINATIM_HEADERS = {
+    "User-Agent": "DenunciasSalcedo/1.0 (contacto: tukackerfav9@gmail.com)"
+}
+
+
+# Nominatim pide máximo 1 req/s por aplicación: el token bucket es compartido
+# entre workers (config/externos.py). Con el circuito abierto o sin token
+# se devuelve None al instante y la denuncia sigue sin dirección.
+@externos.protegido("nominatim", fallback=None)
 def reverse_geocode_nominatim(lat: float, lng: float) -> str | None:
-    url = "https://nominatim.openstreetmap.org/reverse"
     params = {
         "format": "jsonv2",
         "lat": lat,
@@ -9,10 +20,13 @@ def reverse_geocode_nominatim(lat: float, lng: float) -> str | None:
         "zoom": 18,
         "addressdetails": 1,
     }
-    headers = {
-        "User-Agent": "DenunciasSalcedo/1.0 (contacto: tukackerfav9@gmail.com)"
-    }
-    r = requests.get(url, params=params, headers=headers, timeout=6)
+    r = requests.get(
+        NOMINATIM_URL, params=params, headers=NOMINATIM_HEADERS,
+        timeout=externos.timeout_de("nominatim"),
+    )
+    if r.status_code == 429 or r.status_code >= 500:
+        # cuenta como fallo para el circuito
+        r.raise_for_status()
     if r.status_code != 200:
         return None
     data = r.json()
@@ -1,7 +1,6 @@
 from django.shortcuts import render
 import uuid
 from django.utils import timezone
-from django.db.models import Q
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -10,28 +9,11 @@ from rest_framework.permissions import IsAuthenticated
 
 from db.models import Denuncias, Ciudadanos, DenunciaRespuestas  #   aquí está el modelo real
 from .serializers import DenunciaCreateSerializer
+from config.conditional import condicional, version_de
+from config.db_router import ReplicaReadMixin
+from db.search import buscar_denuncias
 
-import requests
-
-
-def reverse_geocode_nominatim(lat: float, lng: float) -> str | None:
-    try:
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
-            "format": "jsonv2",
-            "lat": lat,
-            "lon": lng,
-            "zoom": 18,
-            "addressdetails": 1,
-        }
-        headers = {"User-Agent": "DenunciasSalcedo/1.0 (contacto: admin@gad.gob.ec)"}
-        r = requests.get(url, params=params, headers=headers, timeout=6)
-        if r.status_code != 200:
-            return None
-        data = r.json()
-        return data.get("display_name")
-    except Exception:
-        return None
+from .utils_geo import reverse_geocode_nominatim
 
 
 def get_claim(request, key: str, default=None):
@@ -93,9 +75,17 @@ class CrearDenunciaView(APIView):
         )
 
 
-class MisDenunciasView(APIView):
+def _version_mis_denuncias(request):
+    uid = get_claim(request, "uid")
+    if not uid or get_claim(request, "tipo") != "ciudadano":
+        return None
+    return version_de(Denuncias.objects.filter(ciudadano_id=uid))
+
+
+class MisDenunciasView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    @condicional(_version_mis_denuncias)
     def get(self, request):
         uid = get_claim(request, "uid")
         tipo = get_claim(request, "tipo")
@@ -142,7 +132,7 @@ def _haversine_km(lat1, lon1, lat2, lon2):
     return R * c
 
 
-class MapaDenunciasView(APIView):
+class MapaDenunciasView(ReplicaReadMixin, APIView):
     """
     GET /api/denuncias/mapa/?lat=-0.93&lng=-78.61&radio_km=2&solo_hoy=true&solo_mias=false&tipo_denuncia_id=1
     """
@@ -161,7 +151,7 @@ class MapaDenunciasView(APIView):
         solo_hoy = _to_bool(request.query_params.get("solo_hoy"))
         solo_mias = _to_bool(request.query_params.get("solo_mias"))
         tipo_denuncia_id = request.query_params.get("tipo_denuncia_id")
-        q = (request.query_params.get("q") or "").strip().lower()
+        q = (request.query_params.get("q") or "").strip()
 
         try:
             radio_km = float(radio_km)
@@ -184,8 +174,8 @@ class MapaDenunciasView(APIView):
             qs = qs.filter(created_at__date=hoy)
 
         if q:
-            #qs = qs.filter(descripcion__icontains=q) | qs.filter(referencia__icontains=q)
-            qs = qs.filter(Q(descripcion__icontains=q) | Q(referencia__icontains=q))
+            # FTS solo sobre el contenido (no nombres/cédula de otros ciudadanos)
+            qs = buscar_denuncias(qs, q, incluir_ciudadano=False)
 
 
         use_geo = False
@@ -3,7 +3,6 @@
 import uuid
 from datetime import timedelta
 
-import requests
 from django.db import transaction
 from django.utils import timezone
 
@@ -28,29 +27,7 @@ from .serializers_borradores import (
 )
 
 from .utils import get_claim
-
-
-# =========================================================
-# GEO
-# =========================================================
-def reverse_geocode_nominatim(lat: float, lng: float) -> str | None:
-    try:
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
-            "format": "jsonv2",
-            "lat": lat,
-            "lon": lng,
-            "zoom": 18,
-            "addressdetails": 1,
-        }
-        headers = {"User-Agent": "DenunciasSalcedo/1.0 (contacto: admin@gad.gob.ec)"}
-        r = requests.get(url, params=params, headers=headers, timeout=6)
-        if r.status_code != 200:
-            return None
-        data = r.json()
-        return data.get("display_name")
-    except Exception:
-        return None
+from .utils_geo import reverse_geocode_nominatim
 
 
 # =========================================================
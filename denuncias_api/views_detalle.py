@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from config.conditional import combinar, condicional, version_de
 from db.models import Denuncias, Ciudadanos, DenunciaFirmas, DenunciaEvidencias
 from .utils import get_claim
 
@@ -27,9 +28,25 @@ def _abs_url(request, url: str | None):
     return request.build_absolute_uri(url)
 
 
+def _version_detalle(request, denuncia_id):
+    uid = get_claim(request, "uid")
+    if not uid or get_claim(request, "tipo") != "ciudadano":
+        return None
+    d = Denuncias.objects.filter(id=denuncia_id, ciudadano_id=uid).values("updated_at").first()
+    if d is None:
+        return None  # la vista responde 404
+    return combinar(
+        (d["updated_at"].isoformat(), d["updated_at"]),
+        version_de(Ciudadanos.objects.filter(usuario_id=uid)),
+        version_de(DenunciaFirmas.objects.filter(denuncia_id=denuncia_id)),
+        version_de(DenunciaEvidencias.objects.filter(denuncia_id=denuncia_id)),
+    )
+
+
 class DenunciaDetalleView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @condicional(_version_detalle)
     def get(self, request, denuncia_id):
         uid = get_claim(request, "uid")
         tipo = get_claim(request, "tipo")
@@ -3,13 +3,26 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from config.conditional import condicional, version_de
 from db.models import Denuncias, DenunciaHistorial
 
 from .utils import get_claim
 
+
+def _version_historial(request, denuncia_id):
+    uid = get_claim(request, "uid")
+    if not uid or get_claim(request, "tipo") != "ciudadano":
+        return None
+    if not Denuncias.objects.filter(id=denuncia_id, ciudadano_id=uid).exists():
+        return None
+    # el historial solo se inserta (no tiene updated_at)
+    return version_de(DenunciaHistorial.objects.filter(denuncia_id=denuncia_id), "created_at")
+
+
 class DenunciaHistorialView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @condicional(_version_historial)
     def get(self, request, denuncia_id):
         uid = get_claim(request, "uid")
         tipo = get_claim(request, "tipo")
@@ -21,13 +34,13 @@ class DenunciaHistorialView(APIView):
         except Denuncias.DoesNotExist:
             return Response({"detail": "Denuncia no existe"}, status=404)
 
-        qs = DenunciaHistorial.objects.filter(denuncia_id=d.id).order_by("fecha_cambio")
+        qs = DenunciaHistorial.objects.filter(denuncia_id=d.id).order_by("created_at")
         items = []
         for h in qs:
             items.append({
                 "id": str(h.id),
                 "estado_anterior": h.estado_anterior,
                 "estado_nuevo": h.estado_nuevo,
-                "fecha": h.fecha_cambio,
+                "fecha": h.created_at,
             })
         return Response({"count": len(items), "historial": items}, status=200)
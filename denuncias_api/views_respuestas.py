@@ -4,13 +4,25 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
   
+from config.conditional import condicional, version_de
 from db.models import Denuncias, DenunciaRespuestas
 
 from .utils import get_claim
 
+
+def _version_respuestas(request, denuncia_id):
+    uid = get_claim(request, "uid")
+    if not uid or get_claim(request, "tipo") != "ciudadano":
+        return None
+    if not Denuncias.objects.filter(id=denuncia_id, ciudadano_id=uid).exists():
+        return None
+    return version_de(DenunciaRespuestas.objects.filter(denuncia_id=denuncia_id))
+
+
 class DenunciaRespuestasView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @condicional(_version_respuestas)
     def get(self, request, denuncia_id):
         uid = get_claim(request, "uid")
         tipo = get_claim(request, "tipo")
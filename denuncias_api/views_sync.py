@@ -0,0 +1,240 @@
+# denuncias_api/views_sync.py
+"""
+Sincronización incremental para la app móvil.
+
+GET /web/api/denuncias/sync/?since=<watermark>
+
+Devuelve solo lo que cambió desde el watermark (denuncias, respuestas,
+historial y metadatos de archivos) + un watermark nuevo. Sin "since" = carga completa.
+
+- Se lee de la BD principal, no de la réplica: con réplica atrasada, lo
+  comiteado durante el atraso quedaría por debajo del watermark y no se
+  sincronizaría nunca.
+- El watermark sale del reloj de la BD (no del de la app) menos SYNC_SOLAPE,
+  para no perder filas de transacciones que comitean tarde; la app hace
+  upsert por id, así que los repetidos no molestan.
+- Si alguna lista llega al límite, "more": true y la app vuelve a llamar con el
+  watermark y el "cursor" devueltos (?since=<watermark>&cursor=<cursor>). El
+  cursor guarda (fecha, id) de la última fila de cada lista cortada: un UPDATE
+  masivo deja cientos de filas con el mismo now() y cortar solo por fecha
+  devolvería la misma página para siempre.
+- Borrados: en la última página (more = false) de un sync incremental va
+  "vigentes" con los ids que siguen existiendo; la app elimina lo local que
+  no esté ahí.
+"""
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from db.models import DenunciaArchivo, DenunciaHistorial, DenunciaRespuestas, Denuncias
+
+from .utils import get_claim
+from .views_detalle import _abs_url
+
+SYNC_LIMITE = 300
+SYNC_SOLAPE = timedelta(seconds=5)
+
+
+def _parse_since(raw: str | None):
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    # en querystring el "+" del offset llega como espacio
+    dt = parse_datetime(raw.replace(" ", "+"))
+    if dt is None:
+        raise ValueError("since inválido")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone.get_default_timezone())
+    return dt
+
+
+def _encode_cursor(cortes: dict) -> str:
+    raw = json.dumps(
+        {lista: [fecha.isoformat(), str(pk)] for lista, (fecha, pk) in cortes.items()},
+        separators=(",", ":"),
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _parse_cursor(raw: str | None) -> dict:
+    """{"denuncias": (fecha, id), ...} de las listas cortadas en la página anterior."""
+    raw = (raw or "").strip()
+    if not raw:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+        return {lista: (datetime.fromisoformat(f), uuid.UUID(pk)) for lista, (f, pk) in data.items()}
+    except (ValueError, TypeError, AttributeError, binascii.Error):
+        raise ValueError("cursor inválido")
+
+
+def _cortar(qs, campo_fecha: str, since, despues=None):
+    """
+    Filtra por fecha >= since (o después de (fecha, id) si la lista venía
+    cortada), orden ascendente y límite + 1 para saber si hay más.
+    """
+    if despues is not None:
+        fecha, pk = despues
+        qs = qs.filter(Q(**{f"{campo_fecha}__gt": fecha}) | Q(**{campo_fecha: fecha, "id__gt": pk}))
+    elif since is not None:
+        qs = qs.filter(**{f"{campo_fecha}__gte": since})
+    rows = list(qs.order_by(campo_fecha, "id")[: SYNC_LIMITE + 1])
+    more = len(rows) > SYNC_LIMITE
+    rows = rows[:SYNC_LIMITE]
+    corte = (getattr(rows[-1], campo_fecha), rows[-1].id) if (more and rows) else None
+    return rows, more, corte
+
+
+def _ahora_bd():
+    """now() de la BD principal: el mismo reloj que escribe updated_at/created_at."""
+    with connection.cursor() as cur:
+        cur.execute("SELECT now()")
+        return cur.fetchone()[0]
+
+
+def _vigentes(uid, mis_ids) -> dict:
+    """Ids que existen hoy (solo ids: la app borra lo que no esté aquí)."""
+    return {
+        "denuncias": [str(i) for i in Denuncias.objects.filter(ciudadano_id=uid).values_list("id", flat=True)],
+        "respuestas": [
+            str(i) for i in DenunciaRespuestas.objects.filter(denuncia_id__in=mis_ids).values_list("id", flat=True)
+        ],
+        "archivos": [
+            str(i) for i in DenunciaArchivo.objects.filter(denuncia_id__in=mis_ids).values_list("id", flat=True)
+        ],
+    }
+
+
+class DenunciasSyncView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        uid = get_claim(request, "uid")
+        tipo = get_claim(request, "tipo")
+        if not uid or tipo != "ciudadano":
+            return Response({"detail": "Solo ciudadanos"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            since = _parse_since(request.query_params.get("since"))
+        except ValueError:
+            return Response({"detail": "Parámetro since inválido (ISO 8601)"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            despues = _parse_cursor(request.query_params.get("cursor"))
+        except ValueError:
+            return Response({"detail": "Parámetro cursor inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        inicio = _ahora_bd()
+
+        mis_ids = Denuncias.objects.filter(ciudadano_id=uid).values("id")
+
+        denuncias, more_d, corte_d = _cortar(
+            Denuncias.objects.filter(ciudadano_id=uid).select_related("tipo_denuncia"),
+            "updated_at", since, despues.get("denuncias"),
+        )
+        respuestas, more_r, corte_r = _cortar(
+            DenunciaRespuestas.objects.filter(denuncia_id__in=mis_ids).select_related("funcionario"),
+            "updated_at", since, despues.get("respuestas"),
+        )
+        historial, more_h, corte_h = _cortar(
+            DenunciaHistorial.objects.filter(denuncia_id__in=mis_ids),
+            "created_at", since, despues.get("historial"),
+        )
+        archivos, more_a, corte_a = _cortar(
+            DenunciaArchivo.objects.filter(denuncia_id__in=mis_ids).defer("data"),
+            "created_at", since, despues.get("archivos"),
+        )
+
+        cortes = {
+            lista: corte
+            for lista, corte in (
+                ("denuncias", corte_d), ("respuestas", corte_r), ("historial", corte_h), ("archivos", corte_a),
+            )
+            if corte is not None
+        }
+        more = more_d or more_r or more_h or more_a
+        # si algo quedó cortado, las listas completas siguen desde el corte más
+        # antiguo y las cortadas desde su (fecha, id) en el cursor
+        watermark = min(fecha for fecha, _ in cortes.values()) if cortes else inicio - SYNC_SOLAPE
+
+        extra = {}
+        if cortes:
+            extra["cursor"] = _encode_cursor(cortes)
+        if since is not None and not more:
+            extra["vigentes"] = _vigentes(uid, mis_ids)
+
+        return Response(
+            {
+                "watermark": watermark.isoformat(),
+                "more": more,
+                **extra,
+                "denuncias": [
+                    {
+                        "id": str(d.id),
+                        "tipo_denuncia_id": d.tipo_denuncia_id,
+                        "tipo_denuncia_nombre": getattr(d.tipo_denuncia, "nombre", None),
+                        "descripcion": d.descripcion,
+                        "referencia": d.referencia,
+                        "direccion_texto": d.direccion_texto,
+                        "estado": str(d.estado),
+                        "latitud": d.latitud,
+                        "longitud": d.longitud,
+                        "created_at": d.created_at,
+                        "updated_at": d.updated_at,
+                    }
+                    for d in denuncias
+                ],
+                "respuestas": [
+                    {
+                        "id": str(r.id),
+                        "denuncia_id": str(r.denuncia_id),
+                        "mensaje": r.mensaje,
+                        "fecha": r.created_at,
+                        "updated_at": r.updated_at,
+                        "funcionario": {
+                            "id": str(r.funcionario_id) if r.funcionario_id else None,
+                            "nombre": getattr(r.funcionario, "nombres", "") if r.funcionario else "",
+                            "apellido": getattr(r.funcionario, "apellidos", "") if r.funcionario else "",
+                        },
+                    }
+                    for r in respuestas
+                ],
+                "historial": [
+                    {
+                        "id": str(h.id),
+                        "denuncia_id": str(h.denuncia_id),
+                        "estado_anterior": h.estado_anterior,
+                        "estado_nuevo": h.estado_nuevo,
+                        "comentario": h.comentario,
+                        "fecha": h.created_at,
+                    }
+                    for h in historial
+                ],
+                "archivos": [
+                    {
+                        "id": str(a.id),
+                        "denuncia_id": str(a.denuncia_id),
+                        "tipo": a.tipo,
+                        "filename": a.filename,
+                        "content_type": a.content_type,
+                        "size_bytes": a.size_bytes,
+                        "url": _abs_url(request, reverse("denuncias_api:denuncia_archivo_ver", args=[a.id])),
+                        "created_at": a.created_at,
+                    }
+                    for a in archivos
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -3,6 +3,7 @@ set -e
 
 echo "Aplicando migraciones..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "Recolectando estáticos..."
 python manage.py collectstatic --noinput
@@ -40,7 +41,7 @@ echo "Levantando Gunicorn..."
 exec gunicorn config.wsgi:application \
   --bind 0.0.0.0:8000 \
   --workers 2 \
-  --threads 4 \
+  --threads "${GUNICORN_THREADS:-4}" \
   --timeout 180 \
   --graceful-timeout 30 \
   --access-logfile - \
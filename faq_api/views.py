@@ -12,6 +12,12 @@ from rest_framework.permissions import IsAuthenticated
 from db.models import Faq
 from .serializers import FaqListSerializer, FaqCreateUpdateSerializer
 from .permissions import IsAdminTIC
+from config.conditional import condicional, version_de
+
+
+def _version_faq(request):
+    # el filtro "q" entra en el ETag por el querystring
+    return version_de(Faq.objects.filter(visible=True))
 
 
 class FaqListCreateView(APIView):
@@ -21,6 +27,7 @@ class FaqListCreateView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @condicional(_version_faq)
     def get(self, request):
         q = (request.query_params.get("q") or "").strip()
 
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DeviceToken
+
+
+@admin.register(DeviceToken)
+class DeviceTokenAdmin(admin.ModelAdmin):
+    list_display = ("usuario_id", "platform", "updated_at", "last_success_at", "failure_count", "last_error")
+    list_filter = ("platform", "last_error")
+    search_fields = ("usuario_id", "fcm_token")
@@ -0,0 +1,141 @@
+# notificaciones/bandeja.py
+"""
+Bandeja de notificaciones en la app (tabla notificaciones, schema.sql 22).
+
+Cada push deja su fila aquí, así la app ve lo que cambió sin volver a
+consultar denuncias. El contador de no leídas (badge) es un entero en cache
+por usuario que se mantiene con incr/decr:
+
+- crear*: +n al contador de cada usuario, después del commit. Si la clave
+  no existe no se crea: el próximo no_leidas() la recalcula.
+- marcar_leidas: -filas marcadas.
+- no_leidas(): lee el entero; si no está (expiró, cache reiniciado) hace el
+  COUNT(*) una vez con idx_notificaciones_no_leidas y lo guarda.
+
+Cualquier desfase (admin, incr perdido con el backend de BD) dura como
+mucho NOTIF_CONTADOR_TTL segundos.
+"""
+from __future__ import annotations
+
+import json
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from config.cache import espacio
+from db.models import Notificaciones
+
+logger = logging.getLogger(__name__)
+
+TIPO_PUSH = "push"
+TIPO_SISTEMA = "sistema"
+
+# por encima de esto no se ajusta usuario por usuario: se invalida el espacio
+MAX_INCR_POR_ENVIO = 500
+
+_CONTADOR = espacio("notif_no_leidas", timeout=getattr(settings, "NOTIF_CONTADOR_TTL", 3600))
+
+
+def _ajustar(por_usuario: dict[str, int]):
+    """Suma (o resta) a cada contador; muchos usuarios a la vez -> invalidar el espacio."""
+    if len(por_usuario) > MAX_INCR_POR_ENVIO:
+        _CONTADOR.invalidar()
+        return
+    for uid, n in por_usuario.items():
+        valor = _CONTADOR.incr(uid, n)
+        if valor is not None and valor < 0:
+            _CONTADOR.delete(uid)  # desfasado: que se recalcule
+
+
+# =========================================================
+# Escritura
+# =========================================================
+def crear_muchas(filas, tipo: str = TIPO_PUSH) -> int:
+    """filas = [(usuario_id, titulo, mensaje, datos)] en un bulk_create."""
+    now = timezone.now()
+    objs = [
+        Notificaciones(
+            usuario_id=uid,
+            titulo=titulo[:150],
+            mensaje=mensaje,
+            tipo=tipo,
+            leido=False,
+            datos={k: str(v) for k, v in (datos or {}).items()},
+            created_at=now,
+            updated_at=now,
+        )
+        for uid, titulo, mensaje, datos in filas
+    ]
+    if not objs:
+        return 0
+    # savepoint: si falla, la transacción de quien notifica sigue usable
+    with transaction.atomic():
+        Notificaciones.objects.bulk_create(objs, batch_size=1000)
+
+    por_usuario: dict[str, int] = {}
+    for o in objs:
+        por_usuario[str(o.usuario_id)] = por_usuario.get(str(o.usuario_id), 0) + 1
+
+    transaction.on_commit(lambda: _ajustar(por_usuario))
+    return len(objs)
+
+
+def crear(usuario_ids, titulo: str, mensaje: str, tipo: str = TIPO_PUSH, datos: dict | None = None) -> int:
+    """La misma notificación para cada usuario."""
+    return crear_muchas([(uid, titulo, mensaje, datos) for uid in dict.fromkeys(usuario_ids)], tipo)
+
+
+def crear_para_ciudadanos(titulo: str, mensaje: str, tipo: str = TIPO_PUSH, datos: dict | None = None) -> int:
+    """Una fila por ciudadano en un solo INSERT ... SELECT (avisos generales)."""
+    datos = {k: str(v) for k, v in (datos or {}).items()}
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO notificaciones (usuario_id, titulo, mensaje, tipo, leido, datos)
+            SELECT c.usuario_id, %s, %s, %s, FALSE, %s::jsonb
+            FROM ciudadanos c
+            """,
+            [titulo[:150], mensaje, tipo, json.dumps(datos)],
+        )
+        n = cur.rowcount
+    transaction.on_commit(_CONTADOR.invalidar)
+    logger.info("[BANDEJA] aviso general para %s ciudadanos", n)
+    return n
+
+
+def marcar_leidas(uid, ids=None) -> int:
+    """Marca como leídas las `ids` del usuario (o todas si ids es None). Devuelve cuántas cambiaron."""
+    qs = Notificaciones.objects.filter(usuario_id=uid, leido=False)
+    if ids is not None:
+        qs = qs.filter(id__in=ids)
+    n = qs.update(leido=True, updated_at=timezone.now())
+    if n:
+        transaction.on_commit(lambda: _ajustar({str(uid): -n}))
+    return n
+
+
+# =========================================================
+# Lectura
+# =========================================================
+def no_leidas(uid) -> int:
+    return _CONTADOR.get_or_set(
+        str(uid),
+        lambda: Notificaciones.objects.filter(usuario_id=uid, leido=False).count(),
+    )
+
+
+def pagina(uid, antes: int | None = None, limite: int = 20, solo_no_leidas: bool = False):
+    """(filas, siguiente): keyset por id descendente; siguiente = id para ?antes= o None."""
+    qs = Notificaciones.objects.filter(usuario_id=uid)
+    if solo_no_leidas:
+        qs = qs.filter(leido=False)
+    if antes is not None:
+        qs = qs.filter(id__lt=antes)
+    filas = list(
+        qs.order_by("-id")
+        .only("id", "titulo", "mensaje", "tipo", "leido", "datos", "created_at")[: limite + 1]
+    )
+    siguiente = filas[limite - 1].id if len(filas) > limite else None
+    return filas[:limite], siguiente
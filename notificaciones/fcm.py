@@ -1,13 +1,60 @@
-import os
+# notificaciones/fcm.py
+"""
+Envío de push por Firebase Cloud Messaging.
+
+- enviar_multicast(): el mismo aviso a muchos tokens. Lotes de 500 (límite
+  de FCM por multicast) que salen en paralelo desde un pool chico
+  (FCM_HILOS); cada lote es UNA llamada a externos.llamar("fcm"), así el
+  rate limit y el circuito cuentan lotes, no tokens.
+- enviar_mensajes(): mensajes distintos por token (p. ej. una respuesta por
+  denuncia), también en lotes de 500 con send_each.
+- enviar_a_topic() / suscribir() / desuscribir(): difusión por topic; FCM
+  hace el fan-out, aquí se envía un solo mensaje.
+
+Todas devuelven ResultadoEnvio con el resultado de cada token. Los tokens
+de vuelta actualizan el registro de tokens (notificaciones/tokens.py):
+éxitos, fallos transitorios y borrado de los muertos, en pocas consultas.
+"""
+from __future__ import annotations
+
 import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 import firebase_admin
 from firebase_admin import credentials, messaging
 from django.conf import settings
 
+from config import externos
+from notificaciones import tokens as registro
+
 logger = logging.getLogger(__name__)
 
 _initialized = False
 
+# límites de FCM: 500 tokens por multicast/send_each, 1000 por (des)suscripción a topic
+MAX_POR_LOTE = 500
+MAX_POR_TOPIC = 1000
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+def _inc(key: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        return dict(_metrics)
+
 
 def init_firebase():
     global _initialized
@@ -25,7 +72,7 @@ def init_firebase():
 
     try:
         cred = credentials.Certificate(path)
-        firebase_admin.initialize_app(cred)
+        firebase_admin.initialize_app(cred, {"httpTimeout": externos.timeout_de("fcm")})
         logger.info("[FCM] Inicializado correctamente")
     except Exception as e:
         logger.exception(f"[FCM] Error inicializando Firebase: {e}")
@@ -33,56 +80,209 @@ def init_firebase():
         _initialized = True
 
 
-def send_push(tokens: list[str], title: str, body: str, data: dict | None = None) -> int:
-    if not tokens:
-        return 0
+@dataclass
+class ResultadoToken:
+    token: str
+    ok: bool
+    message_id: str | None = None
+    error: str | None = None  # código de FCM (p. ej. UNREGISTERED) o "no_disponible"
+    clase: str | None = None  # registro.MUERTO / TRANSITORIO / OTRO; None si no llegó a FCM
+
+
+@dataclass
+class ResultadoEnvio:
+    resultados: list[ResultadoToken] = field(default_factory=list)
+
+    @property
+    def enviados(self) -> int:
+        return sum(1 for r in self.resultados if r.ok)
+
+    @property
+    def fallidos(self) -> int:
+        return sum(1 for r in self.resultados if not r.ok)
+
+    @property
+    def invalidos(self) -> list[str]:
+        return [r.token for r in self.resultados if r.clase == registro.MUERTO]
+
+    def a_dict(self) -> dict:
+        errores = Counter(r.error for r in self.resultados if r.error)
+        return {"enviados": self.enviados, "fallidos": self.fallidos, "errores": dict(errores)}
+
+
+def _lotes(items: list, n: int):
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=int(getattr(settings, "FCM_HILOS", 4)),
+                    thread_name_prefix="fcm",
+                )
+    return _pool
 
-    init_firebase()
 
+def _listo() -> bool:
+    init_firebase()
     # Si Firebase no se inicializó (por ejemplo falta el JSON)
     if not firebase_admin._apps:
         logger.warning("[FCM] Firebase no inicializado. Push omitido.")
-        return 0
+        return False
+    return True
 
-    messages = [
-        messaging.Message(
-            notification=messaging.Notification(title=title, body=body),
-            data={k: str(v) for k, v in (data or {}).items()},
-            token=token,
-        )
-        for token in tokens
-    ]
 
+def _datos(data: dict | None) -> dict:
+    # FCM solo acepta valores string en data
+    return {k: str(v) for k, v in (data or {}).items()}
+
+
+def _enviar_lote(fn, arg, tokens: list[str]) -> list[ResultadoToken]:
+    """Una llamada a FCM para un lote; errores de la llamada marcan todo el lote."""
     try:
-        response = messaging.send_each(messages)
+        # rate limit + circuito compartidos: con FCM caído no se espera en cada lote
+        response = externos.llamar("fcm", fn, arg)
+    except externos.ServicioNoDisponible as e:
+        logger.warning(f"[FCM] Lote de {len(tokens)} omitido: {e}")
+        return [ResultadoToken(t, False, error="no_disponible") for t in tokens]
+    except Exception as e:
+        logger.exception(f"[FCM] Error enviando lote de {len(tokens)}: {e}")
+        return [ResultadoToken(t, False, error=registro.codigo(e)) for t in tokens]
 
-        bad_tokens = []
+    out = []
+    for resp, token in zip(response.responses, tokens):
+        if resp.success:
+            out.append(ResultadoToken(token, True, message_id=resp.message_id))
+        else:
+            logger.warning(f"[FCM] Error token {token[:12]}...: {resp.exception}")
+            out.append(ResultadoToken(
+                token, False,
+                error=registro.codigo(resp.exception),
+                clase=registro.clasificar(resp.exception),
+            ))
+    return out
 
-        for resp, token in zip(response.responses, tokens):
-            if not resp.success:
-                error_msg = str(resp.exception).lower()
-                logger.warning(f"[FCM] Error token {token}: {resp.exception}")
 
-                # Tokens inválidos o no registrados
-                if any(err in error_msg for err in [
-                    "requested entity was not found",
-                    "unregistered",
-                    "not found",
-                    "invalid registration token"
-                ]):
-                    bad_tokens.append(token)
+def _en_paralelo(trabajos: list[tuple]) -> ResultadoEnvio:
+    """trabajos = [(fn, arg, tokens)]; el primero corre en el hilo actual."""
+    if not trabajos:
+        return ResultadoEnvio()
+    futuros = [_executor().submit(_enviar_lote, *t) for t in trabajos[1:]]
+    resultado = ResultadoEnvio(_enviar_lote(*trabajos[0]))
+    for f in futuros:
+        resultado.resultados.extend(f.result())
+
+    _inc("lotes", len(trabajos))
+    _inc("enviados", resultado.enviados)
+    _inc("fallidos", resultado.fallidos)
+    for r in resultado.resultados:
+        if r.error:
+            _inc(f"error.{r.error}")
+    _inc("tokens_borrados", registro.registrar(resultado.resultados)["borrados"])
+    return resultado
+
+
+# =========================================================
+# API
+# =========================================================
+def enviar_multicast(tokens: list[str], title: str, body: str, data: dict | None = None) -> ResultadoEnvio:
+    """El mismo aviso a todos los tokens (sin repetidos), en lotes concurrentes de 500."""
+    tokens = list(dict.fromkeys(t for t in tokens if t))
+    if not tokens or not _listo():
+        return ResultadoEnvio()
+
+    notificacion = messaging.Notification(title=title, body=body)
+    datos = _datos(data)
+    trabajos = [
+        (
+            messaging.send_each_for_multicast,
+            messaging.MulticastMessage(notification=notificacion, data=datos, tokens=lote),
+            lote,
+        )
+        for lote in _lotes(tokens, MAX_POR_LOTE)
+    ]
+    return _en_paralelo(trabajos)
+
 
-        # 🔥 Eliminación automática de tokens inválidos
-        if bad_tokens:
-            from notificaciones.models import DeviceToken  # Ajusta si es necesario
-            deleted_count, _ = DeviceToken.objects.filter(
-                fcm_token__in=bad_tokens
-            ).delete()
+def enviar_mensajes(mensajes: list[tuple[str, str, str, dict | None]]) -> ResultadoEnvio:
+    """Mensajes distintos: [(token, title, body, data)], en lotes concurrentes de 500."""
+    mensajes = [m for m in mensajes if m[0]]
+    if not mensajes or not _listo():
+        return ResultadoEnvio()
 
-            logger.info(f"[FCM] Tokens inválidos eliminados: {deleted_count}")
+    trabajos = []
+    for lote in _lotes(mensajes, MAX_POR_LOTE):
+        msgs = [
+            messaging.Message(
+                notification=messaging.Notification(title=title, body=body),
+                data=_datos(data),
+                token=token,
+            )
+            for token, title, body, data in lote
+        ]
+        trabajos.append((messaging.send_each, msgs, [m[0] for m in lote]))
+    return _en_paralelo(trabajos)
 
-        return response.success_count
 
+def enviar_a_topic(topic: str, title: str, body: str, data: dict | None = None,
+                   condicion: str | None = None) -> str | None:
+    """
+    Un mensaje a un topic (o a una condición, p. ej. "'a' in topics && 'b' in topics").
+    Devuelve el message_id o None si no se pudo enviar.
+    """
+    if not _listo():
+        return None
+    msg = messaging.Message(
+        notification=messaging.Notification(title=title, body=body),
+        data=_datos(data),
+        **({"condition": condicion} if condicion else {"topic": topic}),
+    )
+    try:
+        message_id = externos.llamar("fcm", messaging.send, msg)
+    except externos.ServicioNoDisponible as e:
+        logger.warning(f"[FCM] Topic {condicion or topic} omitido: {e}")
+        return None
     except Exception as e:
-        logger.exception(f"[FCM] Error enviando push: {e}")
+        logger.exception(f"[FCM] Error enviando a topic {condicion or topic}: {e}")
+        return None
+    _inc("topics")
+    return message_id
+
+
+def _gestionar_topic(fn, tokens: list[str], topic: str) -> int:
+    if not tokens or not _listo():
         return 0
+    ok = 0
+    for lote in _lotes(list(dict.fromkeys(tokens)), MAX_POR_TOPIC):
+        try:
+            resp = externos.llamar("fcm", fn, lote, topic)
+        except externos.ServicioNoDisponible as e:
+            logger.warning(f"[FCM] Topic {topic}: {e}")
+            break
+        except Exception as e:
+            logger.exception(f"[FCM] Error con topic {topic}: {e}")
+            continue
+        ok += resp.success_count
+    return ok
+
+
+def suscribir(tokens: list[str], topic: str) -> int:
+    return _gestionar_topic(messaging.subscribe_to_topic, tokens, topic)
+
+
+def desuscribir(tokens: list[str], topic: str) -> int:
+    return _gestionar_topic(messaging.unsubscribe_from_topic, tokens, topic)
+
+
+def suscribir_en_segundo_plano(tokens: list[str], topic: str):
+    """Para vistas: la suscripción no bloquea la respuesta."""
+    _executor().submit(suscribir, tokens, topic)
+
+
+def send_push(tokens: list[str], title: str, body: str, data: dict | None = None) -> int:
+    """Compatibilidad: cantidad de envíos exitosos."""
+    return enviar_multicast(tokens, title, body, data).enviados
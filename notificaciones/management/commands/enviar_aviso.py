@@ -0,0 +1,62 @@
+# notificaciones/management/commands/enviar_aviso.py
+"""
+Aviso push masivo a ciudadanos (cortes de agua, cierres de vías, ...).
+
+    python manage.py enviar_aviso --titulo "Corte de agua" --cuerpo "..." --todos
+    python manage.py enviar_aviso --titulo "..." --cuerpo "..." --cerca -1.0453,-78.5901,2
+    python manage.py enviar_aviso --titulo "..." --cuerpo "..." --usuarios <uuid> <uuid>
+
+--todos va por topic (FCM reparte); --cerca y --usuarios arman el segmento
+de tokens y se envía en lotes de 500 en paralelo (notificaciones/fcm.py).
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from notificaciones import services
+
+
+class Command(BaseCommand):
+    help = "Envía un aviso push a todos los ciudadanos o a un segmento."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titulo", required=True)
+        parser.add_argument("--cuerpo", required=True)
+        destino = parser.add_mutually_exclusive_group(required=True)
+        destino.add_argument("--todos", action="store_true", help="topic FCM_TOPIC_CIUDADANOS")
+        destino.add_argument("--cerca", default="", help="lat,lng,km: ciudadanos con denuncias en la zona")
+        destino.add_argument("--usuarios", nargs="+", default=None, help="usuario_id de los ciudadanos")
+        parser.add_argument("--dato", action="append", default=[], help="clave=valor para data (repetible)")
+        parser.add_argument("--simular", action="store_true", help="solo cuenta destinatarios")
+
+    def handle(self, *args, **opts):
+        data = {}
+        for par in opts["dato"]:
+            clave, sep, valor = par.partition("=")
+            if not sep:
+                raise CommandError(f"--dato debe ser clave=valor: {par}")
+            data[clave] = valor
+
+        if opts["todos"]:
+            topic = services.topic_ciudadanos()
+            if opts["simular"]:
+                self.stdout.write(f"Se enviaría al topic {topic}")
+                return
+            message_id = services.avisar_a_todos(opts["titulo"], opts["cuerpo"], data)
+            if not message_id:
+                raise CommandError("FCM no aceptó el mensaje (ver logs)")
+            self.stdout.write(self.style.SUCCESS(f"Enviado al topic {topic}: {message_id}"))
+            return
+
+        if opts["cerca"]:
+            try:
+                lat, lng, km = (float(x) for x in opts["cerca"].split(","))
+            except ValueError:
+                raise CommandError("--cerca debe ser lat,lng,km")
+            usuarios = services.ciudadanos_cerca(lat, lng, km)
+        else:
+            usuarios = set(opts["usuarios"])
+
+        self.stdout.write(f"Ciudadanos en el segmento: {len(usuarios)}")
+        if opts["simular"] or not usuarios:
+            return
+        resultado = services.notificar_segmento(usuarios, opts["titulo"], opts["cuerpo"], data)
+        self.stdout.write(self.style.SUCCESS(str(resultado.a_dict())))
@@ -0,0 +1,29 @@
+# notificaciones/management/commands/podar_tokens.py
+"""
+Borra los tokens FCM sin señal de vida en N días (cron diario).
+
+    python manage.py podar_tokens
+    python manage.py podar_tokens --dias 30 --simular
+
+Señal de vida: la app re-registra su token al abrirse
+(POST /web/api/notificaciones/token/) o FCM aceptó un envío a ese token
+(last_success_at). Sin ninguna de las dos en FCM_TOKEN_DIAS es casi siempre
+una app desinstalada. vivos() ya los excluye de los envíos; esto libera las
+filas.
+"""
+from django.core.management.base import BaseCommand
+
+from notificaciones import tokens
+
+
+class Command(BaseCommand):
+    help = "Elimina tokens FCM sin registro ni envío exitoso en FCM_TOKEN_DIAS días."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=None, help="default: FCM_TOKEN_DIAS")
+        parser.add_argument("--simular", action="store_true", help="solo cuenta")
+
+    def handle(self, *args, **opts):
+        n = tokens.podar(opts["dias"], simular=opts["simular"])
+        verbo = "Se eliminarían" if opts["simular"] else "Eliminados"
+        self.stdout.write(self.style.SUCCESS(f"{verbo}: {n} tokens"))
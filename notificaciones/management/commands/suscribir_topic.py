@@ -0,0 +1,41 @@
+# notificaciones/management/commands/suscribir_topic.py
+"""
+Suscribe al topic de ciudadanos (FCM_TOPIC_CIUDADANOS) los tokens vivos.
+
+    python manage.py suscribir_topic
+    python manage.py suscribir_topic --simular
+
+Una sola vez tras activar los avisos por topic: los tokens registrados
+antes no estaban suscritos y no recibían avisar_a_todos / enviar_aviso
+--todos. Los nuevos se suscriben al registrarse. Repetirlo no hace daño
+(FCM ignora las suscripciones existentes).
+"""
+from django.core.management.base import BaseCommand
+
+from notificaciones import fcm, services, tokens
+
+
+class Command(BaseCommand):
+    help = "Suscribe los tokens vivos al topic FCM_TOPIC_CIUDADANOS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--simular", action="store_true", help="solo cuenta")
+
+    def handle(self, *args, **opts):
+        qs = tokens.vivos().values_list("fcm_token", flat=True)
+        if opts["simular"]:
+            self.stdout.write(self.style.SUCCESS(f"Se suscribirían: {qs.count()} tokens"))
+            return
+
+        topic = services.topic_ciudadanos()
+        lote, total, ok = [], 0, 0
+        for token in qs.iterator(chunk_size=fcm.MAX_POR_TOPIC):
+            lote.append(token)
+            if len(lote) == fcm.MAX_POR_TOPIC:
+                ok += fcm.suscribir(lote, topic)
+                total += len(lote)
+                lote = []
+        if lote:
+            ok += fcm.suscribir(lote, topic)
+            total += len(lote)
+        self.stdout.write(self.style.SUCCESS(f"Suscritos a '{topic}': {ok} de {total} tokens"))
@@ -7,5 +7,15 @@ class DeviceToken(models.Model):
     usuario_id = models.UUIDField(db_index=True)
     fcm_token = models.TextField(unique=True)
     platform = models.CharField(max_length=20, default="android")
+    # ciclo de vida (notificaciones/tokens.py): último envío aceptado y fallos seguidos
+    last_success_at = models.DateTimeField(null=True, blank=True)
+    failure_count = models.PositiveIntegerField(default=0)
+    last_error = models.CharField(max_length=40, blank=True, default="")
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # poda de tokens que la app no refrescó en N días
+            models.Index(fields=["updated_at"], name="devicetoken_updated_idx"),
+        ]
@@ -1,57 +1,100 @@
-from notificaciones.models import DeviceToken
-from notificaciones.fcm import send_push
+import logging
+import math
 
-def notificar_respuesta(denuncia):
-    uid = str(denuncia.ciudadano_id)
-    tokens = list(DeviceToken.objects.filter(usuario_id=uid).values_list("fcm_token", flat=True))
+from django.conf import settings
 
-    print("[PUSH] denuncia:", denuncia.id, "uid:", uid, "tokens:", len(tokens))
-    if tokens:
-        print("[PUSH] ejemplo token:", tokens[0][:12], "...")
+from db.models import Denuncias
+from notificaciones import bandeja
+from notificaciones import tokens as registro
+from notificaciones.fcm import ResultadoEnvio, enviar_a_topic, enviar_mensajes, enviar_multicast
 
-    if not tokens:
-        return 0
+logger = logging.getLogger(__name__)
+
+# ~111 km por grado de latitud; el radio se aproxima con una caja
+KM_POR_GRADO = 111.0
+
+
+def topic_ciudadanos() -> str:
+    return getattr(settings, "FCM_TOPIC_CIUDADANOS", "ciudadanos")
 
+
+def _titulo_cuerpo(denuncia) -> tuple[str, str]:
     titulo = "📩 Respuesta a tu denuncia"
     cuerpo = (
         f"Tipo: {denuncia.tipo_denuncia.nombre}\n"
         f"Estado: {denuncia.estado.replace('_', ' ').title()}"
     )
+    return titulo, cuerpo
+
+
+def notificar_respuesta(denuncia):
+    uid = str(denuncia.ciudadano_id)
+    titulo, cuerpo = _titulo_cuerpo(denuncia)
+    data = {"denuncia_id": str(denuncia.id)}
+    # la bandeja se llena aunque el ciudadano no tenga dispositivos
+    bandeja.crear([uid], titulo, cuerpo, datos=data)
 
-    ok = send_push(tokens=tokens, title=titulo, body=cuerpo, data={"denuncia_id": str(denuncia.id)})
-    print("[PUSH] enviados_ok:", ok)
+    tokens = list(registro.vivos().filter(usuario_id=uid).values_list("fcm_token", flat=True))
+    logger.info("[PUSH] denuncia: %s uid: %s tokens: %s", denuncia.id, uid, len(tokens))
+    if not tokens:
+        return 0
+
+    ok = enviar_multicast(tokens, titulo, cuerpo, data=data).enviados
+    logger.info("[PUSH] enviados_ok: %s", ok)
     return ok
 
-#def notificar_respuesta(denuncia):
-#    ciudadano = denuncia.ciudadano
-#    uid = str(denuncia.ciudadano_id)#
-
-#    tokens = list(
-#        DeviceToken.objects.filter(usuario_id=uid)
-#        .values_list("fcm_token", flat=True)
-#    )#
-
-#    
-#    if not tokens:
-#        return 0#
-
-#    #  MENSAJE de psuh notication
-#    titulo = "📩 Respuesta a tu denuncia"
-#    cuerpo = (
-#        f"Tipo: {denuncia.tipo_denuncia.nombre}\n"
-#        f"Estado: {denuncia.estado.replace('_', ' ').title()}"
-#    )#
-
-#    data = {
-#        "denuncia_id": str(denuncia.id),
-#        "tipo": denuncia.tipo_denuncia.nombre,
-#        "estado": denuncia.estado,
-#        "accion": "ver_denuncia",
-#    }#
-
-#    return send_push(
-#        tokens=tokens,
-#        title=titulo,
-#        body=cuerpo,
-#        data=data,
-#    )
+
+def notificar_respuestas(denuncias) -> ResultadoEnvio:
+    """Varias denuncias (cada una a su ciudadano) con una consulta de tokens y lotes de 500."""
+    denuncias = list(denuncias)
+    uids = {str(d.ciudadano_id) for d in denuncias}
+    por_usuario: dict[str, list[str]] = {}
+    for usuario_id, token in registro.vivos().filter(usuario_id__in=uids).values_list("usuario_id", "fcm_token"):
+        por_usuario.setdefault(str(usuario_id), []).append(token)
+
+    mensajes, filas = [], []
+    for d in denuncias:
+        titulo, cuerpo = _titulo_cuerpo(d)
+        data = {"denuncia_id": str(d.id)}
+        filas.append((str(d.ciudadano_id), titulo, cuerpo, data))
+        mensajes.extend((t, titulo, cuerpo, data) for t in por_usuario.get(str(d.ciudadano_id), []))
+    bandeja.crear_muchas(filas)
+    return enviar_mensajes(mensajes)
+
+
+# =========================================================
+# Segmentos y difusión
+# =========================================================
+def ciudadanos_cerca(latitud: float, longitud: float, km: float) -> set[str]:
+    """Ciudadanos con alguna denuncia dentro de ~km del punto (p. ej. corte de agua en un sector)."""
+    dlat = km / KM_POR_GRADO
+    dlng = dlat / max(math.cos(math.radians(latitud)), 0.01)
+    ids = (
+        Denuncias.objects
+        .filter(
+            latitud__range=(latitud - dlat, latitud + dlat),
+            longitud__range=(longitud - dlng, longitud + dlng),
+        )
+        .values_list("ciudadano_id", flat=True)
+        .distinct()
+    )
+    return {str(i) for i in ids}
+
+
+def notificar_segmento(usuario_ids, titulo: str, cuerpo: str, data: dict | None = None) -> ResultadoEnvio:
+    """El mismo aviso a todos los dispositivos de esos usuarios."""
+    bandeja.crear(usuario_ids, titulo, cuerpo, datos=data)
+    tokens = list(
+        registro.vivos()
+        .filter(usuario_id__in=[str(u) for u in usuario_ids])
+        .values_list("fcm_token", flat=True)
+    )
+    resultado = enviar_multicast(tokens, titulo, cuerpo, data)
+    logger.info("[PUSH] segmento: %s usuarios, %s", len(usuario_ids), resultado.a_dict())
+    return resultado
+
+
+def avisar_a_todos(titulo: str, cuerpo: str, data: dict | None = None) -> str | None:
+    """Difusión a todos los ciudadanos por topic: un solo mensaje, FCM reparte."""
+    bandeja.crear_para_ciudadanos(titulo, cuerpo, datos=data)
+    return enviar_a_topic(topic_ciudadanos(), titulo, cuerpo, data)
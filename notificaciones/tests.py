@@ -1,3 +1,113 @@
-from django.test import TestCase
+import uuid
+from unittest import SkipTest
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from notificaciones import bandeja
+
+_CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bandeja-tests"}}
+
+
+@override_settings(CACHES=_CACHE_LOCAL, CACHE_VERSION_MEMO=0)
+class AjustarContadorTests(SimpleTestCase):
+    """_ajustar: incr/decr del badge sin crear claves ni dejar negativos."""
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_sin_clave_no_se_crea(self):
+        bandeja._ajustar({"u1": 2})
+        self.assertIsNone(bandeja._CONTADOR.get("u1"))
+
+    def test_suma_y_resta(self):
+        bandeja._CONTADOR.set("u1", 3)
+        bandeja._ajustar({"u1": 2})
+        self.assertEqual(bandeja._CONTADOR.get("u1"), 5)
+        bandeja._ajustar({"u1": -5})
+        self.assertEqual(bandeja._CONTADOR.get("u1"), 0)
+
+    def test_negativo_se_borra_para_recalcular(self):
+        bandeja._CONTADOR.set("u1", 1)
+        bandeja._ajustar({"u1": -2})
+        self.assertIsNone(bandeja._CONTADOR.get("u1"))
+
+    def test_envio_masivo_invalida_el_espacio(self):
+        bandeja._CONTADOR.set("u1", 4)
+        bandeja._ajustar({f"otro{i}": 1 for i in range(bandeja.MAX_INCR_POR_ENVIO + 1)})
+        self.assertIsNone(bandeja._CONTADOR.get("u1"))
+
+
+@override_settings(CACHES=_CACHE_LOCAL, CACHE_VERSION_MEMO=0)
+class BandejaTests(TestCase):
+    """Flujo completo contra la tabla notificaciones. Requiere tesis/schema.sql."""
+
+    @classmethod
+    def setUpClass(cls):
+        if "notificaciones" not in connection.introspection.table_names():
+            raise SkipTest("requiere la base de pruebas creada con tesis/schema.sql")
+        super().setUpClass()
+
+    def setUp(self):
+        caches["default"].clear()
+        self.uid = uuid.uuid4()
+        with connection.cursor() as cur:
+            cur.execute(
+                "INSERT INTO usuarios (id, tipo, correo, password_hash) VALUES (%s, 'ciudadano', %s, 'x')",
+                [self.uid, f"{self.uid}@test.local"],
+            )
+
+    def _crear(self, n: int):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(n):
+                bandeja.crear([self.uid], f"Aviso {i}", "mensaje", datos={"denuncia_id": i})
+
+    def test_crear_suma_al_badge(self):
+        self.assertEqual(bandeja.no_leidas(self.uid), 0)  # COUNT y queda en cache
+        self._crear(3)
+        with self.assertNumQueries(0):
+            self.assertEqual(bandeja.no_leidas(self.uid), 3)
+
+    def test_marcar_leidas_resta(self):
+        self._crear(3)
+        self.assertEqual(bandeja.no_leidas(self.uid), 3)
+        filas, _ = bandeja.pagina(self.uid, limite=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            n = bandeja.marcar_leidas(self.uid, [f.id for f in filas])
+        self.assertEqual(n, 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(bandeja.no_leidas(self.uid), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(bandeja.marcar_leidas(self.uid), 1)
+        self.assertEqual(bandeja.no_leidas(self.uid), 0)
+
+    def test_sin_clave_se_recuenta(self):
+        self._crear(2)
+        bandeja._CONTADOR.delete(str(self.uid))
+        with self.assertNumQueries(1):
+            self.assertEqual(bandeja.no_leidas(self.uid), 2)
+
+    def test_pagina_keyset_por_id(self):
+        self._crear(5)
+        primera, siguiente = bandeja.pagina(self.uid, limite=2)
+        self.assertEqual(len(primera), 2)
+        self.assertEqual(siguiente, primera[-1].id)
+        self.assertGreater(primera[0].id, primera[1].id)
+
+        segunda, siguiente = bandeja.pagina(self.uid, antes=siguiente, limite=2)
+        self.assertTrue(all(f.id < primera[-1].id for f in segunda))
+
+        ultima, siguiente = bandeja.pagina(self.uid, antes=siguiente, limite=2)
+        self.assertEqual(len(ultima), 1)
+        self.assertIsNone(siguiente)
+
+    def test_pagina_solo_no_leidas(self):
+        self._crear(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            bandeja.marcar_leidas(self.uid)
+        self._crear(1)
+        filas, siguiente = bandeja.pagina(self.uid, solo_no_leidas=True)
+        self.assertEqual([f.titulo for f in filas], ["Aviso 0"])
+        self.assertIsNone(siguiente)
@@ -0,0 +1,160 @@
+# notificaciones/tokens.py
+"""
+Registro de tokens FCM: qué dispositivos siguen vivos.
+
+- clasificar(): error de FCM por token -> MUERTO / TRANSITORIO / OTRO,
+  por tipo de excepción y código (antes: buscar texto en el mensaje).
+- registrar(): tras cada envío, en pocas consultas: éxitos ponen
+  last_success_at y failure_count=0; fallos transitorios suman
+  failure_count; los muertos (o con FCM_MAX_FALLOS seguidos) se borran en
+  lotes.
+- vivos(): tokens a los que vale la pena enviar: con señal de vida en los
+  últimos FCM_TOKEN_DIAS y sin demasiados fallos.
+- podar(): job programado (manage.py podar_tokens) que borra los que no
+  dan señal de vida en N días.
+
+Señal de vida = lo más reciente entre updated_at (la app lo registró) y
+last_success_at (FCM aceptó un envío): un dispositivo que recibe push a
+diario sigue vivo aunque la app no vuelva a registrar el token.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from notificaciones.models import DeviceToken
+
+logger = logging.getLogger(__name__)
+
+MUERTO = "muerto"            # desinstalada / token de otro proyecto: borrar
+TRANSITORIO = "transitorio"  # FCM/APNs con problemas: reintentar más tarde
+OTRO = "otro"                # mensaje o configuración: el token no tiene la culpa
+
+LOTE_BORRADO = 1000
+
+# códigos de firebase_admin.exceptions
+_CODIGOS_TRANSITORIOS = {"UNAVAILABLE", "INTERNAL", "RESOURCE_EXHAUSTED", "DEADLINE_EXCEEDED", "UNKNOWN"}
+
+
+def dias_vigencia() -> int:
+    return int(getattr(settings, "FCM_TOKEN_DIAS", 60))
+
+
+def max_fallos() -> int:
+    return int(getattr(settings, "FCM_MAX_FALLOS", 5))
+
+
+def codigo(exc) -> str:
+    """Código corto para logs y last_error (p. ej. UNREGISTERED, UNAVAILABLE)."""
+    from firebase_admin import messaging
+
+    if isinstance(exc, messaging.UnregisteredError):
+        return "UNREGISTERED"
+    if isinstance(exc, messaging.SenderIdMismatchError):
+        return "SENDER_ID_MISMATCH"
+    if isinstance(exc, messaging.QuotaExceededError):
+        return "QUOTA_EXCEEDED"
+    if isinstance(exc, messaging.ThirdPartyAuthError):
+        return "THIRD_PARTY_AUTH_ERROR"
+    return str(getattr(exc, "code", None) or type(exc).__name__)[:40]
+
+
+def clasificar(exc) -> str:
+    from firebase_admin import messaging
+
+    cod = codigo(exc)
+    if cod in ("UNREGISTERED", "SENDER_ID_MISMATCH", "NOT_FOUND"):
+        return MUERTO
+    if cod == "INVALID_ARGUMENT":
+        # en multicast el mensaje es el mismo para todos: si falla uno, es su token
+        texto = str(exc).lower()
+        return MUERTO if "registration token" in texto else OTRO
+    if cod in _CODIGOS_TRANSITORIOS or isinstance(exc, messaging.QuotaExceededError):
+        return TRANSITORIO
+    return OTRO
+
+
+# =========================================================
+# Consultas
+# =========================================================
+def _con_vida_desde(desde) -> Q:
+    """greatest(updated_at, last_success_at) >= desde (last_success_at puede ser NULL)."""
+    return Q(updated_at__gte=desde) | Q(last_success_at__gte=desde)
+
+
+def vivos():
+    """DeviceToken a los que se envía: con señal de vida reciente y sin fallos seguidos de más."""
+    desde = timezone.now() - timedelta(days=dias_vigencia())
+    return DeviceToken.objects.filter(_con_vida_desde(desde), failure_count__lt=max_fallos())
+
+
+def _borrar(tokens: list[str]) -> int:
+    total = 0
+    for i in range(0, len(tokens), LOTE_BORRADO):
+        n, _ = DeviceToken.objects.filter(fcm_token__in=tokens[i:i + LOTE_BORRADO]).delete()
+        total += n
+    return total
+
+
+def registrar(resultados) -> dict:
+    """
+    Aplica los resultados de un envío (ResultadoToken de fcm.py). Devuelve
+    {"exitos", "fallos", "borrados"} para las métricas.
+    """
+    ok, fallos, muertos = [], {}, []
+    for r in resultados:
+        if r.ok:
+            ok.append(r.token)
+        elif r.clase == MUERTO:
+            muertos.append(r.token)
+        elif r.clase == TRANSITORIO:
+            fallos.setdefault(r.error, []).append(r.token)
+        # OTRO / sin clase (circuito abierto, rate limit): el token no tiene la culpa
+
+    ahora = timezone.now()
+    # update() no toca updated_at (auto_now solo aplica en save): sigue siendo "la app lo refrescó"
+    for i in range(0, len(ok), LOTE_BORRADO):
+        DeviceToken.objects.filter(fcm_token__in=ok[i:i + LOTE_BORRADO]).update(
+            last_success_at=ahora, failure_count=0, last_error="",
+        )
+    n_fallos = 0
+    for error, tokens in fallos.items():
+        for i in range(0, len(tokens), LOTE_BORRADO):
+            lote = tokens[i:i + LOTE_BORRADO]
+            n_fallos += DeviceToken.objects.filter(fcm_token__in=lote).update(
+                failure_count=F("failure_count") + 1, last_error=error,
+            )
+            # los que ya fallaron demasiadas veces seguidas tampoco vuelven
+            muertos.extend(
+                DeviceToken.objects
+                .filter(fcm_token__in=lote, failure_count__gte=max_fallos())
+                .values_list("fcm_token", flat=True)
+            )
+
+    borrados = _borrar(list(dict.fromkeys(muertos)))
+    if borrados:
+        logger.info("[FCM] Tokens muertos eliminados: %s", borrados)
+    return {"exitos": len(ok), "fallos": n_fallos, "borrados": borrados}
+
+
+def podar(dias: int | None = None, simular: bool = False) -> int:
+    """Borra (en lotes) los tokens sin señal de vida en `dias`."""
+    dias = dias_vigencia() if dias is None else dias
+    limite = timezone.now() - timedelta(days=dias)
+    viejos = DeviceToken.objects.exclude(_con_vida_desde(limite))
+    if simular:
+        return viejos.count()
+
+    total = 0
+    while True:
+        ids = list(viejos.values_list("id", flat=True)[:LOTE_BORRADO])
+        if not ids:
+            break
+        n, _ = DeviceToken.objects.filter(id__in=ids).delete()
+        total += n
+    logger.info("[FCM] Tokens sin señal de vida en %s días eliminados: %s", dias, total)
+    return total
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import RegisterDeviceTokenView
+from .views import BandejaView, MarcarLeidasView, NoLeidasView, RegisterDeviceTokenView
 
 urlpatterns = [
     path("token/", RegisterDeviceTokenView.as_view(), name="register_device_token"),
+    # bandeja en la app
+    path("", BandejaView.as_view(), name="bandeja"),
+    path("no-leidas/", NoLeidasView.as_view(), name="bandeja_no_leidas"),
+    path("leidas/", MarcarLeidasView.as_view(), name="bandeja_marcar_leidas"),
 ]
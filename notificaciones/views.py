@@ -1,8 +1,12 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
 from django.utils import timezone
+from . import bandeja
 from .models import DeviceToken
+from .fcm import suscribir_en_segundo_plano
+from .services import topic_ciudadanos
 from denuncias_api.utils import get_claim
 
 class RegisterDeviceTokenView(APIView):
@@ -23,7 +27,109 @@ class RegisterDeviceTokenView(APIView):
 
         obj, _ = DeviceToken.objects.update_or_create(
             fcm_token=token,
-            defaults={"usuario_id": uid, "platform": platform, "updated_at": timezone.now()},
+            defaults={
+                "usuario_id": uid,
+                "platform": platform,
+                "updated_at": timezone.now(),
+                # la app lo volvió a registrar: cuenta como vivo de nuevo
+                "failure_count": 0,
+                "last_error": "",
+            },
         )
+        # avisos generales por topic (avisar_a_todos) en cada registro, no solo
+        # en el alta: FCM lo ignora si ya está suscrito y así se ponen al día
+        # los tokens de antes del topic. No bloquea la respuesta.
+        suscribir_en_segundo_plano([token], topic_ciudadanos())
 
         return Response({"detail": "Token guardado", "id": str(obj.id)}, status=200)
+
+
+# =========================================================
+# Bandeja en la app (notificaciones/bandeja.py)
+# =========================================================
+def _uid_ciudadano(request):
+    uid = get_claim(request, "uid")
+    return uid if uid and get_claim(request, "tipo") == "ciudadano" else None
+
+
+def _entero(raw, default=None):
+    return default if raw in (None, "") else int(raw)
+
+
+class BandejaView(APIView):
+    """GET ?antes=<id>&limite=20&no_leidas=1 -> página por id descendente + badge."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        uid = _uid_ciudadano(request)
+        if not uid:
+            return Response({"detail": "Solo ciudadanos"}, status=403)
+
+        try:
+            antes = _entero(request.query_params.get("antes"))
+            limite = _entero(request.query_params.get("limite"), 20)
+        except ValueError:
+            return Response({"detail": "antes y limite deben ser enteros"}, status=400)
+        limite = max(1, min(limite, getattr(settings, "NOTIF_PAGINA_MAX", 50)))
+
+        filas, siguiente = bandeja.pagina(
+            uid, antes=antes, limite=limite,
+            solo_no_leidas=request.query_params.get("no_leidas") == "1",
+        )
+        return Response(
+            {
+                "results": [
+                    {
+                        "id": n.id,
+                        "titulo": n.titulo,
+                        "mensaje": n.mensaje,
+                        "tipo": n.tipo,
+                        "leido": n.leido,
+                        "datos": n.datos or {},
+                        "created_at": n.created_at,
+                    }
+                    for n in filas
+                ],
+                "siguiente": siguiente,
+                "no_leidas": bandeja.no_leidas(uid),
+            },
+            status=200,
+        )
+
+
+class NoLeidasView(APIView):
+    """GET -> {"no_leidas": n} desde el contador en cache (badge de la app)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        uid = _uid_ciudadano(request)
+        if not uid:
+            return Response({"detail": "Solo ciudadanos"}, status=403)
+        return Response({"no_leidas": bandeja.no_leidas(uid)}, status=200)
+
+
+class MarcarLeidasView(APIView):
+    """POST {"ids": [..]} o {"todas": true}."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        uid = _uid_ciudadano(request)
+        if not uid:
+            return Response({"detail": "Solo ciudadanos"}, status=403)
+
+        if request.data.get("todas") is True:
+            ids = None
+        else:
+            ids = request.data.get("ids")
+            if not isinstance(ids, list) or not ids:
+                return Response({"detail": "Enviar ids (lista) o todas: true"}, status=400)
+            try:
+                ids = [int(i) for i in ids[:1000]]
+            except (TypeError, ValueError):
+                return Response({"detail": "ids deben ser enteros"}, status=400)
+
+        marcadas = bandeja.marcar_leidas(uid, ids)
+        return Response(
+            {"detail": "Notificaciones marcadas", "marcadas": marcadas, "no_leidas": bandeja.no_leidas(uid)},
+            status=200,
+        )
@@ -0,0 +1,21 @@
+#!/bin/sh
+# Se ejecuta una sola vez en el primario (docker-entrypoint-initdb.d).
+# Crea el rol de replicación y permite conexiones de streaming desde la red de docker.
+set -e
+
+REPL_USER="${DB_REPLICATION_USER:-replicator}"
+REPL_PASSWORD="${DB_REPLICATION_PASSWORD:-replicator}"
+
+psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<SQL
+DO \$\$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = '${REPL_USER}') THEN
+    CREATE ROLE ${REPL_USER} WITH REPLICATION LOGIN PASSWORD '${REPL_PASSWORD}';
+  END IF;
+END
+\$\$;
+SELECT pg_create_physical_replication_slot('replica_1')
+WHERE NOT EXISTS (SELECT 1 FROM pg_replication_slots WHERE slot_name = 'replica_1');
+SQL
+
+echo "host replication ${REPL_USER} all scram-sha-256" >> "$PGDATA/pg_hba.conf"
@@ -0,0 +1,19 @@
+#!/bin/sh
+# Arranque de la réplica: si el directorio de datos está vacío hace pg_basebackup
+# desde el primario (-R deja standby.signal + primary_conninfo) y luego levanta postgres.
+set -e
+
+REPL_USER="${DB_REPLICATION_USER:-replicator}"
+export PGPASSWORD="${DB_REPLICATION_PASSWORD:-replicator}"
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+  echo "Réplica vacía: clonando desde ${PRIMARY_HOST:-db}..."
+  until pg_isready -h "${PRIMARY_HOST:-db}" -p 5432 -U "$REPL_USER"; do
+    sleep 2
+  done
+  pg_basebackup -h "${PRIMARY_HOST:-db}" -p 5432 -U "$REPL_USER" \
+    -D "$PGDATA" -Fp -Xs -P -R -S replica_1
+  chmod 0700 "$PGDATA"
+fi
+
+exec docker-entrypoint.sh postgres -c hot_standby=on
@@ -218,6 +218,11 @@ CREATE INDEX IF NOT EXISTS idx_denuncias_estado ON denuncias(estado);
 CREATE INDEX IF NOT EXISTS idx_denuncias_tipo ON denuncias(tipo_denuncia_id);
 CREATE INDEX IF NOT EXISTS idx_denuncias_geo ON denuncias(latitud, longitud);
 CREATE INDEX IF NOT EXISTS idx_denuncias_fecha ON denuncias(created_at);
+-- paginación por cursor (created_at, id) en listados del panel
+CREATE INDEX IF NOT EXISTS idx_denuncias_fecha_id ON denuncias(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_denuncias_depto_fecha_id ON denuncias(asignado_departamento_id, created_at DESC, id DESC);
+-- sync incremental de la app (por ciudadano)
+CREATE INDEX IF NOT EXISTS idx_denuncias_ciudadano_updated ON denuncias(ciudadano_id, updated_at);
 
 -- Evidencias
 CREATE TABLE IF NOT EXISTS denuncia_evidencias (
@@ -267,6 +272,8 @@ CREATE TABLE IF NOT EXISTS denuncia_historial (
 
 CREATE INDEX IF NOT EXISTS idx_denuncia_historial_denuncia
 ON denuncia_historial(denuncia_id);
+CREATE INDEX IF NOT EXISTS idx_denuncia_historial_denuncia_fecha
+ON denuncia_historial(denuncia_id, created_at);
 
 -- Asignaciones (historial)
 CREATE TABLE IF NOT EXISTS denuncia_asignaciones (
@@ -297,6 +304,8 @@ FOR EACH ROW EXECUTE FUNCTION set_updated_at();
 
 CREATE INDEX IF NOT EXISTS idx_denuncia_respuestas_denuncia
 ON denuncia_respuestas(denuncia_id);
+CREATE INDEX IF NOT EXISTS idx_denuncia_respuestas_denuncia_updated
+ON denuncia_respuestas(denuncia_id, updated_at);
 
 -- =========================================================
 -- 6) RECUPERACIÓN CONTRASEÑA
@@ -783,3 +792,308 @@ ON registro_ciudadano_borrador(correo);
 CREATE INDEX IF NOT EXISTS idx_registro_borrador_cedula
 ON registro_ciudadano_borrador(cedula);
 
+
+-- =========================================================
+-- 16) BÚSQUEDA DE TEXTO COMPLETO (denuncias)
+--   - search_vector: descripción / referencia / dirección (español + unaccent)
+--   - search_vector_ciudadano: cédula + nombres (prefijo, sin stemming)
+--   Lo mantienen triggers; la app nunca los escribe.
+-- =========================================================
+CREATE EXTENSION IF NOT EXISTS "unaccent";
+
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+    CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+    ALTER TEXT SEARCH CONFIGURATION es_unaccent
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+  END IF;
+
+  IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'simple_unaccent') THEN
+    CREATE TEXT SEARCH CONFIGURATION simple_unaccent (COPY = simple);
+    ALTER TEXT SEARCH CONFIGURATION simple_unaccent
+      ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+  END IF;
+END $$;
+
+ALTER TABLE denuncias ADD COLUMN IF NOT EXISTS search_vector tsvector;
+ALTER TABLE denuncias ADD COLUMN IF NOT EXISTS search_vector_ciudadano tsvector;
+
+CREATE OR REPLACE FUNCTION denuncias_ciudadano_tsvector(p_ciudadano_id UUID)
+RETURNS tsvector AS $$
+  SELECT setweight(to_tsvector('simple', coalesce(c.cedula, '')), 'A')
+      || setweight(to_tsvector('simple_unaccent',
+                               coalesce(c.nombres, '') || ' ' || coalesce(c.apellidos, '')), 'B')
+  FROM ciudadanos c
+  WHERE c.usuario_id = p_ciudadano_id;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION denuncias_search_vector_refresh()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.search_vector :=
+       setweight(to_tsvector('es_unaccent', coalesce(NEW.descripcion, '')), 'A')
+    || setweight(to_tsvector('es_unaccent', coalesce(NEW.referencia, '')), 'B')
+    || setweight(to_tsvector('es_unaccent', coalesce(NEW.direccion_texto, '')), 'C');
+  NEW.search_vector_ciudadano := denuncias_ciudadano_tsvector(NEW.ciudadano_id);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_denuncias_search_vector ON denuncias;
+CREATE TRIGGER tr_denuncias_search_vector
+BEFORE INSERT OR UPDATE OF descripcion, referencia, direccion_texto, ciudadano_id ON denuncias
+FOR EACH ROW
+EXECUTE FUNCTION denuncias_search_vector_refresh();
+
+-- Si el ciudadano cambia nombre/cédula, refrescar sus denuncias
+CREATE OR REPLACE FUNCTION ciudadanos_refresh_denuncias_search()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.cedula IS DISTINCT FROM OLD.cedula
+     OR NEW.nombres IS DISTINCT FROM OLD.nombres
+     OR NEW.apellidos IS DISTINCT FROM OLD.apellidos THEN
+    UPDATE denuncias
+    SET search_vector_ciudadano = denuncias_ciudadano_tsvector(NEW.usuario_id)
+    WHERE ciudadano_id = NEW.usuario_id;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_ciudadanos_refresh_denuncias_search ON ciudadanos;
+CREATE TRIGGER tr_ciudadanos_refresh_denuncias_search
+AFTER UPDATE ON ciudadanos
+FOR EACH ROW
+EXECUTE FUNCTION ciudadanos_refresh_denuncias_search();
+
+CREATE INDEX IF NOT EXISTS idx_denuncias_search
+ON denuncias USING GIN (search_vector);
+
+CREATE INDEX IF NOT EXISTS idx_denuncias_search_ciudadano
+ON denuncias USING GIN (search_vector_ciudadano);
+
+-- =========================================================
+-- 17) AUTOCOMPLETADO (pg_trgm)
+--   Django genera icontains como UPPER(col::text) LIKE UPPER('%x%'),
+--   por eso los índices son sobre esa misma expresión.
+--   (auth_user lo crea Django: su índice está en db/migrations/0005)
+-- =========================================================
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+CREATE INDEX IF NOT EXISTS idx_trgm_usuarios_correo
+ON usuarios USING GIN (UPPER(correo::text) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_trgm_funcionarios_nombres
+ON funcionarios USING GIN (UPPER(nombres::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_trgm_funcionarios_apellidos
+ON funcionarios USING GIN (UPPER(apellidos::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_trgm_funcionarios_cedula
+ON funcionarios USING GIN (UPPER(cedula::text) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_trgm_ciudadanos_nombres
+ON ciudadanos USING GIN (UPPER(nombres::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_trgm_ciudadanos_apellidos
+ON ciudadanos USING GIN (UPPER(apellidos::text) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_trgm_ciudadanos_cedula
+ON ciudadanos USING GIN (UPPER(cedula::text) gin_trgm_ops);
+
+-- =========================================================
+-- 18) REVOCACIÓN DE JWT
+--   usuarios.token_version viaja en el token como claim "tv";
+--   al desactivar o cambiar contraseña se incrementa y los tokens
+--   emitidos antes dejan de valer (usuarios_api/principal.py).
+-- =========================================================
+ALTER TABLE usuarios
+  ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+-- =========================================================
+-- 19) MEMORIA DEL CHATBOT
+--   resumen acumulado de los mensajes que salieron de la ventana
+--   y la última respuesta de OpenAI para encadenar turnos con
+--   previous_response_id (chatbot_api/memoria.py).
+-- =========================================================
+ALTER TABLE chat_conversaciones
+  ADD COLUMN IF NOT EXISTS resumen TEXT,
+  ADD COLUMN IF NOT EXISTS resumen_hasta TIMESTAMPTZ,
+  ADD COLUMN IF NOT EXISTS ultima_respuesta_id VARCHAR(100),
+  ADD COLUMN IF NOT EXISTS ultima_respuesta_at TIMESTAMPTZ,
+  ADD COLUMN IF NOT EXISTS ultima_respuesta_tokens INTEGER NOT NULL DEFAULT 0;
+
+-- =========================================================
+-- 20) SINÓNIMOS DE TIPOS DE DENUNCIA
+--   palabras separadas por coma con las que el chatbot reconoce
+--   cada tipo (catalogos_api/tipos_index.py).
+-- =========================================================
+ALTER TABLE tipos_denuncia
+  ADD COLUMN IF NOT EXISTS sinonimos TEXT;
+
+-- =========================================================
+-- 21) CHAT_MENSAJES PARTICIONADA POR MES
+--   particiones chat_mensajes_YYYYMM (rango UTC de created_at) y
+--   chat_mensajes_default como red de seguridad. Los meses viejos
+--   se mueven a chat_mensajes_archivo (mismo formato, solo lectura
+--   en la práctica) con: python manage.py mantener_chat_mensajes
+--   Las consultas del chatbot filtran created_at >= inicio de la
+--   conversación para que el planner descarte meses anteriores.
+-- =========================================================
+CREATE OR REPLACE FUNCTION chat_mensajes_particion(mes DATE) RETURNS TEXT AS $$
+DECLARE
+  inicio DATE := make_date(extract(year FROM mes)::int, extract(month FROM mes)::int, 1);
+  nombre TEXT := 'chat_mensajes_' || to_char(mes, 'YYYYMM');
+BEGIN
+  IF to_regclass(nombre) IS NULL AND to_regclass('chat_mensajes_archivo_' || to_char(mes, 'YYYYMM')) IS NULL THEN
+    EXECUTE format(
+      'CREATE TABLE %I PARTITION OF chat_mensajes FOR VALUES FROM (%L) TO (%L)',
+      nombre,
+      inicio::timestamp AT TIME ZONE 'UTC',
+      (inicio + interval '1 month') AT TIME ZONE 'UTC'
+    );
+  END IF;
+  RETURN nombre;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+  primero TIMESTAMPTZ;
+  mes DATE;
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'chat_mensajes'::regclass) THEN
+    RETURN;
+  END IF;
+
+  ALTER TABLE chat_mensajes RENAME TO chat_mensajes_plana;
+  ALTER INDEX IF EXISTS chat_mensajes_pkey RENAME TO chat_mensajes_plana_pkey;
+  DROP INDEX IF EXISTS idx_chat_mensajes_conversacion;
+
+  -- la PK de una tabla particionada debe incluir la llave de partición
+  CREATE TABLE chat_mensajes (
+    id              UUID NOT NULL DEFAULT gen_random_uuid(),
+    conversacion_id UUID NOT NULL REFERENCES chat_conversaciones(id) ON DELETE CASCADE,
+    emisor          VARCHAR(10) NOT NULL CHECK (emisor IN ('usuario','bot')),
+    mensaje         TEXT NOT NULL,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+  ) PARTITION BY RANGE (created_at);
+
+  CREATE INDEX idx_chat_mensajes_conversacion_fecha
+  ON chat_mensajes(conversacion_id, created_at);
+
+  SELECT COALESCE(min(created_at), now()) INTO primero FROM chat_mensajes_plana;
+  FOR mes IN
+    SELECT generate_series(
+      date_trunc('month', primero AT TIME ZONE 'UTC'),
+      date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 month',
+      interval '1 month'
+    )::date
+  LOOP
+    PERFORM chat_mensajes_particion(mes);
+  END LOOP;
+
+  -- red de seguridad: lo que caiga fuera de los meses creados
+  CREATE TABLE chat_mensajes_default PARTITION OF chat_mensajes DEFAULT;
+
+  INSERT INTO chat_mensajes (id, conversacion_id, emisor, mensaje, created_at)
+  SELECT id, conversacion_id, emisor, mensaje, created_at FROM chat_mensajes_plana;
+
+  DROP TABLE chat_mensajes_plana;
+END $$;
+
+-- meses archivados: fuera de chat_mensajes, igual de consultables aquí
+CREATE TABLE IF NOT EXISTS chat_mensajes_archivo (LIKE chat_mensajes INCLUDING ALL)
+PARTITION BY RANGE (created_at);
+
+-- =========================================================
+-- 22) BANDEJA DE NOTIFICACIONES EN LA APP
+--   cada push deja su fila en notificaciones (notificaciones/bandeja.py).
+--   datos: lo mismo que viaja en el push (denuncia_id, ...) para que la
+--   app abra el detalle sin volver a consultar denuncias.
+--   La bandeja pagina por (usuario_id, id DESC); el índice parcial
+--   sirve para recalcular el contador de no leídas cuando expira del cache.
+-- =========================================================
+ALTER TABLE notificaciones
+  ADD COLUMN IF NOT EXISTS datos JSONB NOT NULL DEFAULT '{}'::jsonb;
+
+CREATE INDEX IF NOT EXISTS idx_notificaciones_usuario_id
+ON notificaciones(usuario_id, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_notificaciones_no_leidas
+ON notificaciones(usuario_id) WHERE NOT leido;
+
+-- cubierto por idx_notificaciones_usuario_id
+DROP INDEX IF EXISTS idx_notificaciones_usuario;
+
+-- =========================================================
+-- 23) AVISOS EN VIVO DE DENUNCIAS (LISTEN/NOTIFY)
+--   cada alta, asignación, cambio de estado o respuesta hace
+--   pg_notify('denuncias_cambios', json). NOTIFY sale al hacer COMMIT.
+--   Un hilo por worker escucha el canal y lo reparte por SSE a los
+--   listados del panel (web/tiempo_real.py).
+-- =========================================================
+CREATE OR REPLACE FUNCTION notificar_denuncia_cambio() RETURNS trigger AS $$
+DECLARE
+  d_id UUID;
+  evento TEXT;
+  dep_antes BIGINT;
+  func_extra UUID;
+  fila denuncias%ROWTYPE;
+BEGIN
+  IF TG_TABLE_NAME = 'denuncias' THEN
+    fila := NEW;
+    IF TG_OP = 'INSERT' THEN
+      evento := 'creada';
+    ELSIF NEW.asignado_departamento_id IS DISTINCT FROM OLD.asignado_departamento_id
+       OR NEW.asignado_funcionario_id IS DISTINCT FROM OLD.asignado_funcionario_id THEN
+      evento := 'asignada';
+      dep_antes := OLD.asignado_departamento_id;
+    ELSIF NEW.estado IS DISTINCT FROM OLD.estado THEN
+      evento := 'estado';
+    ELSE
+      RETURN NULL;  -- otros campos (descripción, search_vector...) no cambian la fila del listado
+    END IF;
+  ELSE
+    d_id := NEW.denuncia_id;
+    IF TG_TABLE_NAME = 'denuncia_asignaciones' THEN
+      evento := 'asignada';
+      -- solo aquí: denuncias no tiene funcionario_id y PL/pgSQL resuelve
+      -- los campos de NEW al preparar cada expresión
+      func_extra := NEW.funcionario_id;
+    ELSE
+      evento := 'respuesta';
+    END IF;
+    SELECT * INTO fila FROM denuncias WHERE id = d_id;
+    IF NOT FOUND THEN
+      RETURN NULL;
+    END IF;
+  END IF;
+
+  -- el id del evento lo ponen todos los workers igual: microsegundos del reloj de la BD
+  PERFORM pg_notify('denuncias_cambios', json_build_object(
+    'ev', (extract(epoch FROM clock_timestamp()) * 1000000)::bigint,
+    'id', fila.id,
+    'evento', evento,
+    'estado', fila.estado,
+    'dep', fila.asignado_departamento_id,
+    'dep_antes', dep_antes,
+    'func', fila.asignado_funcionario_id,
+    'func_extra', func_extra
+  )::text);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tr_denuncias_notificar ON denuncias;
+CREATE TRIGGER tr_denuncias_notificar
+AFTER INSERT OR UPDATE ON denuncias
+FOR EACH ROW EXECUTE FUNCTION notificar_denuncia_cambio();
+
+DROP TRIGGER IF EXISTS tr_denuncia_respuestas_notificar ON denuncia_respuestas;
+CREATE TRIGGER tr_denuncia_respuestas_notificar
+AFTER INSERT ON denuncia_respuestas
+FOR EACH ROW EXECUTE FUNCTION notificar_denuncia_cambio();
+
+DROP TRIGGER IF EXISTS tr_denuncia_asignaciones_notificar ON denuncia_asignaciones;
+CREATE TRIGGER tr_denuncia_asignaciones_notificar
+AFTER INSERT OR UPDATE ON denuncia_asignaciones
+FOR EACH ROW EXECUTE FUNCTION notificar_denuncia_cambio();
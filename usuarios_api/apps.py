@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UsuariosApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'usuarios_api'
+
+    def ready(self):
+        from . import signals  # noqa
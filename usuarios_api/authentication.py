@@ -1,15 +1,15 @@
-from types import SimpleNamespace
-
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
-from db.models import Usuarios
+from .principal import UsuarioPrincipal, cargar_principal
 
 
 class UsuariosJWTAuthentication(JWTAuthentication):
     """
     Autenticación JWT usando la tabla real `usuarios` (UUID),
     NO el auth_user de Django (int).
+
+    La fila se lee del cache de principal (ver principal.py), no en cada request.
     """
 
     def get_user(self, validated_token):
@@ -18,19 +18,24 @@ class UsuariosJWTAuthentication(JWTAuthentication):
         if not uid:
             raise AuthenticationFailed("Token sin uid", code="token_not_valid")
 
-        try:
-            usuario = Usuarios.objects.get(id=uid)
-        except Usuarios.DoesNotExist:
+        data = cargar_principal(uid)
+        if data is None:
             raise AuthenticationFailed("Usuario no existe", code="token_not_valid")
 
-        if not usuario.activo:
+        if not data["activo"]:
             raise AuthenticationFailed("Usuario inactivo", code="token_not_valid")
 
+        # tokens emitidos antes de un cambio de contraseña / baja quedan revocados
+        try:
+            tv = int(validated_token.get("tv", 0) or 0)
+        except (TypeError, ValueError):
+            tv = -1
+        if tv != data["token_version"]:
+            raise AuthenticationFailed("Token revocado", code="token_not_valid")
+
         # Creamos un "user" válido para DRF (is_authenticated=True)
-        return SimpleNamespace(
-            is_authenticated=True,
-            id=usuario.id,
-            tipo=usuario.tipo,
-            correo=usuario.correo,
-            usuario_db=usuario,   # por si necesitas el objeto entero
+        return UsuarioPrincipal(
+            id=data["id"],
+            tipo=data["tipo"],
+            correo=data["correo"],
         )
@@ -1,11 +1,18 @@
 import base64
+import logging
 from email.message import EmailMessage
 
+import httplib2
 from django.conf import settings
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 
+from config import externos
+
+logger = logging.getLogger(__name__)
+
 
 GMAIL_SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 
@@ -21,29 +28,35 @@ def _gmail_service():
     )
     # fuerza refresh del access token usando el refresh token
     creds.refresh(Request())
-    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+    # timeout explícito: httplib2 por defecto espera para siempre
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=externos.timeout_de("gmail")))
+    return build("gmail", "v1", http=http, cache_discovery=False)
+
+
+def _fallo_gmail(to_email: str, *args, **kwargs) -> bool:
+    logger.warning("Gmail API no disponible; correo a %s no enviado", to_email)
+    return False
 
 
+# rate limit + circuito compartidos (config/externos.py): con Gmail caído
+# se responde False al instante en vez de colgar el request
+@externos.protegido("gmail", fallback=_fallo_gmail)
 def send_gmail_html(to_email: str, subject: str, text_body: str, html_body: str) -> bool:
-    try:
-        service = _gmail_service()
+    service = _gmail_service()
 
-        msg = EmailMessage()
-        msg["To"] = to_email
-        msg["From"] = settings.GMAIL_SENDER
-        msg["Subject"] = subject
+    msg = EmailMessage()
+    msg["To"] = to_email
+    msg["From"] = settings.GMAIL_SENDER
+    msg["Subject"] = subject
 
-        msg.set_content(text_body)
-        msg.add_alternative(html_body, subtype="html")
+    msg.set_content(text_body)
+    msg.add_alternative(html_body, subtype="html")
 
-        raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
+    raw = base64.urlsafe_b64encode(msg.as_bytes()).decode("utf-8")
 
-        service.users().messages().send(
-            userId="me",
-            body={"raw": raw},
-        ).execute()
+    service.users().messages().send(
+        userId="me",
+        body={"raw": raw},
+    ).execute()
 
-        return True
-    except Exception as e:
-        print("❌ Error Gmail API:", e)
-        return False
+    return True
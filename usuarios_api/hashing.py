@@ -0,0 +1,141 @@
+# usuarios_api/hashing.py
+"""
+Verificación de contraseñas acotada + hashers calibrados.
+
+check_password() con PBKDF2 (Django 6) cuesta cientos de ms de CPU. Con
+2 workers x 4 hilos, una ráfaga de logins de la app ocupaba todos los hilos.
+
+- verificar_password() corre el hash en un pool pequeño
+  (PASSWORD_VERIFY_WORKERS) con cola acotada (PASSWORD_VERIFY_QUEUE).
+  Si está lleno -> VerificacionSaturada (LoginView responde 429) en vez de
+  encolar sin límite. El hilo del request espera el resultado, así que
+  hilos + cola nunca pasan de GUNICORN_THREADS - 1: el 429 llega antes de
+  que una ráfaga de logins ocupe todos los hilos del worker.
+- Si el hash guardado usa parámetros viejos (otro algoritmo / iteraciones),
+  el nuevo hash se calcula en el mismo pool y se devuelve para guardarlo:
+  la actualización es transparente en el login.
+- Los parámetros salen de settings (ver `manage.py calibrar_hashers`).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    check_password,
+    make_password,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# Hashers calibrados
+# =========================================================
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 con iteraciones de PASSWORD_PBKDF2_ITERATIONS (0 = default de Django)."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", 0) or PBKDF2PasswordHasher.iterations
+
+
+class CalibratedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id con PASSWORD_ARGON2_* (0 = default de Django). Requiere argon2-cffi."""
+
+    @property
+    def time_cost(self):
+        return getattr(settings, "PASSWORD_ARGON2_TIME_COST", 0) or Argon2PasswordHasher.time_cost
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", 0) or Argon2PasswordHasher.memory_cost
+
+    @property
+    def parallelism(self):
+        return getattr(settings, "PASSWORD_ARGON2_PARALLELISM", 0) or Argon2PasswordHasher.parallelism
+
+
+# =========================================================
+# Pool acotado
+# =========================================================
+class VerificacionSaturada(Exception):
+    """No hay lugar en el pool de verificación (o se pasó el tiempo)."""
+
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_cupos: threading.BoundedSemaphore | None = None
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+def _inc(key: str, n: float = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        m = dict(_metrics)
+    hechas = m.get("verificadas", 0)
+    m["avg_ms"] = round(m.get("tiempo_ms", 0) / hechas, 1) if hechas else None
+    return m
+
+
+def _pool():
+    global _executor, _cupos
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = int(getattr(settings, "PASSWORD_VERIFY_WORKERS", 2))
+                cola = int(getattr(settings, "PASSWORD_VERIFY_QUEUE", 1))
+                # cada cupo retiene un hilo de gunicorn esperando: dejar uno libre
+                hilos = int(getattr(settings, "GUNICORN_THREADS", 4))
+                _cupos = threading.BoundedSemaphore(max(1, min(workers + cola, hilos - 1)))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd-verify")
+    return _executor, _cupos
+
+
+def _verificar(password: str, encoded: str):
+    """Corre en el pool. Devuelve (ok, nuevo_hash | None)."""
+    nuevo = []
+    inicio = time.perf_counter()
+    ok = check_password(password, encoded, setter=lambda raw: nuevo.append(make_password(raw)))
+    _inc("verificadas")
+    _inc("tiempo_ms", (time.perf_counter() - inicio) * 1000)
+    return ok, (nuevo[0] if nuevo else None)
+
+
+def verificar_password(password: str, encoded: str) -> tuple[bool, str | None]:
+    """
+    (ok, nuevo_hash). nuevo_hash != None si hay que actualizar el guardado.
+    Lanza VerificacionSaturada si el pool está lleno o no responde a tiempo.
+    """
+    executor, cupos = _pool()
+
+    if not cupos.acquire(blocking=False):
+        _inc("rechazadas")
+        raise VerificacionSaturada()
+
+    try:
+        futuro = executor.submit(_verificar, password, encoded)
+    except Exception:
+        cupos.release()
+        raise
+    # el cupo se libera cuando termina el hash, aunque el request ya no espere
+    futuro.add_done_callback(lambda _f: cupos.release())
+
+    try:
+        return futuro.result(timeout=float(getattr(settings, "PASSWORD_VERIFY_TIMEOUT", 5)))
+    except FuturesTimeout:
+        _inc("timeouts")
+        raise VerificacionSaturada()
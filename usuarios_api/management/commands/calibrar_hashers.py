@@ -0,0 +1,112 @@
+# usuarios_api/management/commands/calibrar_hashers.py
+"""
+Calibra PBKDF2 / Argon2 para que un hash tarde ~--objetivo-ms en ESTE equipo.
+
+    python manage.py calibrar_hashers --objetivo-ms 150
+
+Imprime las variables para el .env (no modifica nada). Nunca baja de los
+mínimos de OWASP.
+"""
+import time
+
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+
+# mínimos OWASP (Password Storage Cheat Sheet)
+PBKDF2_MIN_ITERACIONES = 600_000
+ARGON2_MIN_MEMORIA_KIB = 19_456
+ARGON2_MIN_TIEMPO = 2
+
+MUESTRA = "calibracion-Denuncias-GAD"
+
+
+def _medir_ms(fn, repeticiones: int) -> float:
+    fn()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2]  # mediana
+
+
+class Command(BaseCommand):
+    help = "Calibra los parámetros de PBKDF2/Argon2 a una latencia objetivo en este hardware."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--objetivo-ms", type=float, default=150.0)
+        parser.add_argument("--algoritmo", choices=["pbkdf2", "argon2", "todos"], default="todos")
+        parser.add_argument("--repeticiones", type=int, default=5)
+
+    def handle(self, *args, **opts):
+        objetivo = opts["objetivo_ms"]
+        if objetivo <= 0:
+            raise CommandError("--objetivo-ms debe ser > 0")
+
+        lineas = []
+        if opts["algoritmo"] in ("pbkdf2", "todos"):
+            lineas += self._pbkdf2(objetivo, opts["repeticiones"])
+        if opts["algoritmo"] in ("argon2", "todos"):
+            lineas += self._argon2(objetivo, opts["repeticiones"])
+
+        if lineas:
+            self.stdout.write("\nAgregar al .env:\n")
+            for linea in lineas:
+                self.stdout.write(f"  {linea}")
+
+    # ---------------- PBKDF2 ----------------
+    def _pbkdf2(self, objetivo, repeticiones):
+        hasher = PBKDF2PasswordHasher()
+        base = 100_000
+        salt = hasher.salt()
+        ms = _medir_ms(lambda: hasher.encode(MUESTRA, salt, iterations=base), repeticiones)
+
+        # PBKDF2 escala lineal con las iteraciones
+        iteraciones = int(base * objetivo / ms) // 10_000 * 10_000
+        if iteraciones < PBKDF2_MIN_ITERACIONES:
+            self.stdout.write(self.style.WARNING(
+                f"PBKDF2: {iteraciones} iteraciones < mínimo OWASP; se usa {PBKDF2_MIN_ITERACIONES}"
+            ))
+            iteraciones = PBKDF2_MIN_ITERACIONES
+
+        real = _medir_ms(lambda: hasher.encode(MUESTRA, salt, iterations=iteraciones), repeticiones)
+        self.stdout.write(
+            f"PBKDF2-SHA256: {iteraciones} iteraciones -> {real:.0f} ms "
+            f"(Django por defecto: {PBKDF2PasswordHasher.iterations})"
+        )
+        return [f"PASSWORD_PBKDF2_ITERATIONS={iteraciones}"]
+
+    # ---------------- Argon2 ----------------
+    def _argon2(self, objetivo, repeticiones):
+        try:
+            from argon2 import PasswordHasher  # noqa: F401
+        except ImportError:
+            self.stdout.write(self.style.WARNING("Argon2: argon2-cffi no está instalado, se omite."))
+            return []
+
+        memoria = max(Argon2PasswordHasher.memory_cost, ARGON2_MIN_MEMORIA_KIB)
+        paralelismo = Argon2PasswordHasher.parallelism
+        tiempo = ARGON2_MIN_TIEMPO
+
+        def _hash(t):
+            h = Argon2PasswordHasher()
+            h.time_cost, h.memory_cost, h.parallelism = t, memoria, paralelismo
+            salt = h.salt()
+            return lambda: h.encode(MUESTRA, salt)
+
+        # memoria fija, se sube time_cost hasta alcanzar el objetivo
+        ms = _medir_ms(_hash(tiempo), repeticiones)
+        while ms < objetivo and tiempo < 20:
+            tiempo += 1
+            ms = _medir_ms(_hash(tiempo), repeticiones)
+
+        self.stdout.write(
+            f"Argon2id: time_cost={tiempo}, memory_cost={memoria} KiB, "
+            f"parallelism={paralelismo} -> {ms:.0f} ms"
+        )
+        return [
+            f"PASSWORD_ARGON2_TIME_COST={tiempo}",
+            f"PASSWORD_ARGON2_MEMORY_COST={memoria}",
+            f"PASSWORD_ARGON2_PARALLELISM={paralelismo}",
+        ]
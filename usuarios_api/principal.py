@@ -0,0 +1,109 @@
+# usuarios_api/principal.py
+"""
+Principal cacheado para UsuariosJWTAuthentication.
+
+Antes cada request autenticado hacía Usuarios.objects.get(id=uid).
+Ahora se guarda (activo, tipo, correo, token_version) en cache por uid con
+TTL corto (AUTH_PRINCIPAL_CACHE_TTL):
+
+- Desactivar usuario / cambiar contraseña -> revocar_tokens() sube
+  usuarios.token_version y borra la entrada: los JWT con "tv" viejo dejan
+  de valer en cuanto se relee la fila (inmediato en este proceso, <= TTL en otros).
+- El post_save de Usuarios también invalida (ver signals.py).
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from config.cache import espacio
+from db.models import Usuarios
+
+_NO_EXISTE = "__no_existe__"
+
+_PRINCIPALES = espacio("auth_principal", alias=getattr(settings, "AUTH_PRINCIPAL_CACHE", "default"))
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "AUTH_PRINCIPAL_CACHE_TTL", 15))
+
+
+def cargar_principal(uid) -> dict | None:
+    """{"id","tipo","correo","activo","token_version"} o None si no existe."""
+    data = _PRINCIPALES.get(uid)
+    if data == _NO_EXISTE:
+        return None
+    if data is not None:
+        return data
+
+    row = (
+        Usuarios.objects
+        .filter(id=uid)
+        .values("id", "tipo", "correo", "activo", "token_version")
+        .first()
+    )
+    if row is None:
+        _PRINCIPALES.set(uid, _NO_EXISTE, timeout=_ttl())
+        return None
+
+    data = {
+        "id": row["id"],
+        "tipo": str(row["tipo"]),
+        "correo": row["correo"],
+        "activo": bool(row["activo"]),
+        "token_version": int(row["token_version"] or 0),
+    }
+    _PRINCIPALES.set(uid, data, timeout=_ttl())
+    return data
+
+
+def invalidar_principal(*uids):
+    _PRINCIPALES.delete(*[uid for uid in uids if uid])
+
+
+def revocar_tokens(usuario_ids):
+    """Invalida todos los JWT emitidos a esos usuarios (sube token_version)."""
+    usuario_ids = [u for u in usuario_ids if u]
+    if not usuario_ids:
+        return
+    Usuarios.objects.filter(id__in=usuario_ids).update(token_version=F("token_version") + 1)
+    invalidar_principal(*usuario_ids)
+
+
+def emitir_tokens(user):
+    """(refresh, access) con los claims propios: uid, tipo, correo y tv."""
+    refresh = RefreshToken()
+    refresh["uid"] = str(user.id)
+    refresh["tipo"] = str(user.tipo)
+    refresh["correo"] = str(user.correo)
+    refresh["tv"] = int(user.token_version or 0)  # versión de revocación
+
+    access = refresh.access_token
+    access["uid"] = str(user.id)
+    access["tipo"] = str(user.tipo)
+    access["correo"] = str(user.correo)
+    access["tv"] = int(user.token_version or 0)
+    return refresh, access
+
+
+class UsuarioPrincipal:
+    """Lo que DRF ve como request.user para la app móvil."""
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, tipo, correo):
+        self.id = id
+        self.pk = id
+        self.tipo = tipo
+        self.correo = correo
+
+    @cached_property
+    def usuario_db(self):
+        # solo si alguna vista necesita la fila completa
+        return Usuarios.objects.get(id=self.id)
+
+    def __str__(self):
+        return f"{self.tipo}:{self.correo}"
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from db.models import Usuarios
+
+from .principal import invalidar_principal
+
+
+@receiver(post_save, sender=Usuarios)
+def usuarios_post_save(sender, instance, **kwargs):
+    # activo / tipo / correo pudieron cambiar
+    invalidar_principal(instance.pk)
+
+
+@receiver(post_delete, sender=Usuarios)
+def usuarios_post_delete(sender, instance, **kwargs):
+    invalidar_principal(instance.pk)
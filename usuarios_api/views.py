@@ -21,9 +21,10 @@ from db.models import Usuarios, Ciudadanos, CiudadanoDocumentos
 from .models import RegistroCiudadanoBorrador
 
 # Create your views here.
-from django.contrib.auth.hashers import check_password, make_password, identify_hasher
+from django.contrib.auth.hashers import make_password, identify_hasher
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from .hashing import VerificacionSaturada, verificar_password
+from .principal import emitir_tokens
 
 import bcrypt
 
@@ -59,24 +60,28 @@ class LoginView(APIView):
             return Response({"detail": "Usuario inactivo"}, status=status.HTTP_403_FORBIDDEN)
 
         #  Validar password con Django (soporta pbkdf2, argon2, bcrypt, etc.)
+        #  en el pool acotado: una ráfaga de logins no se come los hilos de la API
         try:
-            ok = check_password(password, user.password_hash)
+            ok, nuevo_hash = verificar_password(password, user.password_hash)
+        except VerificacionSaturada:
+            resp = Response(
+                {"detail": "Demasiados inicios de sesión simultáneos, intenta de nuevo en unos segundos"},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+            resp["Retry-After"] = "2"
+            return resp
         except Exception:
             return Response({"detail": "Error validando credenciales"}, status=status.HTTP_400_BAD_REQUEST)
 
         if not ok:
             return Response({"detail": "Credenciales inválidas"}, status=status.HTTP_401_UNAUTHORIZED)
 
+        # hash con parámetros viejos -> se guarda el recalculado (ya viene hecho del pool)
+        if nuevo_hash:
+            Usuarios.objects.filter(id=user.id).update(password_hash=nuevo_hash)
+
         # Generar JWT usando SimpleJWT pero con un "subject" custom
-        refresh = RefreshToken()
-        refresh["uid"] = str(user.id)
-        refresh["tipo"] = str(user.tipo)
-        refresh["correo"] = str(user.correo)
-
-        access = refresh.access_token
-        access["uid"] = str(user.id)
-        access["tipo"] = str(user.tipo)
-        access["correo"] = str(user.correo)
+        refresh, access = emitir_tokens(user)
 
         return Response(
             {
@@ -8,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 
 
 from db.models import Usuarios
+from .principal import emitir_tokens, revocar_tokens
 
 
 def get_claim(request, key: str, default=None):
@@ -74,4 +75,14 @@ class PasswordChangeView(APIView):
         u.updated_at = timezone.now()
         u.save(update_fields=["password_hash", "updated_at"])
 
-        return Response({"detail": "Contraseña actualizada  "}, status=200)
+        # cierra las otras sesiones (JWT emitidos antes del cambio)
+        revocar_tokens([u.id])
+
+        # este dispositivo sigue logueado con tokens nuevos
+        u.refresh_from_db(fields=["token_version"])
+        refresh, access = emitir_tokens(u)
+
+        return Response(
+            {"detail": "Contraseña actualizada  ", "access": str(access), "refresh": str(refresh)},
+            status=200,
+        )
@@ -11,6 +11,7 @@ from rest_framework.response import Response
 
 from db.models import PasswordResetTokens, Usuarios, Ciudadanos
 from usuarios_api.email_utils import enviar_codigo_reset
+from usuarios_api.principal import revocar_tokens
 
 
 def gen_codigo_6() -> str:
@@ -130,6 +131,7 @@ class ResetCambiarPasswordView(APIView):
         Usuarios.objects.filter(id=token.usuario_id).update(
             password_hash=make_password(p1)
         )
+        revocar_tokens([token.usuario_id])
 
         token.usado = True
         token.updated_at = timezone.now()
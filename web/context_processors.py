@@ -1,6 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+
+from web.utils.authz import staff_de
 from web.utils.menus import build_menus_for_user
 
+
 def menus_principales(request):
-    if request.user.is_authenticated:
-        return {"menus_principales": build_menus_for_user(request.user)}
-    return {"menus_principales": []}
+    if not request.user.is_authenticated:
+        return {"menus_principales": []}
+
+    # lazy: solo se arma si la plantilla recorre el sidebar
+    # (parciales AJAX y páginas de error no pagan nada)
+    def _menus():
+        return build_menus_for_user(request.user, staff_de(request).group_names)
+
+    return {"menus_principales": SimpleLazyObject(_menus)}
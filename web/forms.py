@@ -8,7 +8,6 @@ from django.contrib.auth.models import Group, Permission, User
 from django.shortcuts import render
 from django.urls import NoReverseMatch, reverse
 from django.utils import timezone
-from django_select2.forms import ModelSelect2MultipleWidget, ModelSelect2Widget
 
 from db.models import (
     DenunciaAsignaciones,
@@ -22,6 +21,7 @@ from db.models import (
     Usuarios,
 )
 from web.models import FuncionarioWebUser
+from web.services.autocomplete import AutocompleteSelect2MultipleWidget, AutocompleteSelect2Widget
 from web.services.webuser_domain import ensure_domain_for_web_user
 from .models import Menus
 
@@ -235,14 +235,16 @@ class MenuForm(forms.ModelForm):
         fields = ["nombre", "url", "icono", "padre", "orden", "permisos"]
         widgets = {
             "nombre": forms.TextInput(attrs={"class": "form-control", "placeholder": "Ej: Denuncias"}),
-            "padre": ModelSelect2Widget(
+            "padre": AutocompleteSelect2Widget(
                 model=Menus,
+                min_input_length=0,
                 search_fields=["nombre__icontains"],
                 attrs={"class": "form-control"},
             ),
             "orden": forms.NumberInput(attrs={"class": "form-control", "min": 0}),
-            "permisos": ModelSelect2MultipleWidget(
+            "permisos": AutocompleteSelect2MultipleWidget(
                 model=Group,
+                min_input_length=0,
                 search_fields=["name__icontains"],
                 attrs={"class": "form-control"},
             ),
@@ -274,7 +276,7 @@ class MenuForm(forms.ModelForm):
 # =========================
 # Grupos
 # =========================
-class GrupoFuncionariosWidget(ModelSelect2MultipleWidget):
+class GrupoFuncionariosWidget(AutocompleteSelect2MultipleWidget):
     model = User
     search_fields = [
         "username__icontains",
@@ -363,7 +365,7 @@ class FuncionarioForm(forms.ModelForm):
     usuario = forms.ModelChoiceField(
         queryset=Usuarios.objects.all(),
         label="Usuario (App móvil - UUID)",
-        widget=ModelSelect2Widget(
+        widget=AutocompleteSelect2Widget(
             model=Usuarios,
             search_fields=["correo__icontains"],
             attrs={"id": "id_usuario", "data-placeholder": "Buscar por correo...", "class": "form-control"},
@@ -375,7 +377,7 @@ class FuncionarioForm(forms.ModelForm):
         queryset=User.objects.all(),
         label="Usuario Web (Login - auth_user)",
         required=False,
-        widget=ModelSelect2Widget(
+        widget=AutocompleteSelect2Widget(
             model=User,
             search_fields=["username__icontains", "email__icontains"],
             attrs={"id": "id_web_user", "data-placeholder": "Buscar usuario web...", "class": "form-control"},
@@ -386,8 +388,9 @@ class FuncionarioForm(forms.ModelForm):
         queryset=Departamentos.objects.filter(activo=True),
         label="Departamento",
         required=False,
-        widget=ModelSelect2Widget(
+        widget=AutocompleteSelect2Widget(
             model=Departamentos,
+            min_input_length=0,
             search_fields=["nombre__icontains"],
             attrs={"data-placeholder": "Buscar departamento...", "class": "form-control"},
         ),
@@ -594,18 +597,20 @@ class DenunciaForm(forms.ModelForm):
             "referencia": forms.Textarea(attrs={"class": "form-control", "rows": 2}),
             "direccion_texto": forms.Textarea(attrs={"class": "form-control", "rows": 2}),
             "estado": forms.Select(attrs={"class": "form-select"}),
-            "asignado_departamento": ModelSelect2Widget(
+            "asignado_departamento": AutocompleteSelect2Widget(
                 model=Departamentos,
+                min_input_length=0,
                 search_fields=["nombre__icontains"],
                 attrs={"class": "form-control"},
             ),
-            "asignado_funcionario": ModelSelect2Widget(
+            "asignado_funcionario": AutocompleteSelect2Widget(
                 model=Funcionarios,
                 search_fields=["nombres__icontains", "apellidos__icontains", "cedula__icontains"],
                 attrs={"class": "form-control"},
             ),
-            "tipo_denuncia": ModelSelect2Widget(
+            "tipo_denuncia": AutocompleteSelect2Widget(
                 model=TiposDenuncia,
+                min_input_length=0,
                 search_fields=["nombre__icontains"],
                 attrs={"class": "form-control"},
             ),
@@ -650,7 +655,7 @@ class DenunciaAsignacionForm(forms.ModelForm):
         model = DenunciaAsignaciones
         fields = ["funcionario"]
         widgets = {
-            "funcionario": ModelSelect2Widget(
+            "funcionario": AutocompleteSelect2Widget(
                 model=Funcionarios,
                 search_fields=["nombres__icontains", "apellidos__icontains", "cedula__icontains"],
                 attrs={"class": "form-control"},
@@ -706,10 +711,11 @@ class TipoDenunciaDepartamentoForm(forms.ModelForm):
 class TiposDenunciaForm(forms.ModelForm):
     class Meta:
         model = TiposDenuncia
-        fields = ["nombre", "descripcion", "activo"]
+        fields = ["nombre", "descripcion", "sinonimos", "activo"]
         widgets = {
             "nombre": forms.TextInput(attrs={"class": "form-control", "placeholder": "Ej: Baches en la vía"}),
             "descripcion": forms.Textarea(attrs={"class": "form-control", "rows": 4}),
+            "sinonimos": forms.TextInput(attrs={"class": "form-control", "placeholder": "Ej: hueco, calle dañada, asfalto"}),
             "activo": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
 
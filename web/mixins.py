@@ -1,6 +1,9 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
 
+from web.utils.authz import staff_de
+
+
 class FuncionarioRequiredMixin(LoginRequiredMixin):
     """
     - Obliga login
@@ -16,15 +19,8 @@ class FuncionarioRequiredMixin(LoginRequiredMixin):
         if user.is_superuser:
             return super().dispatch(request, *args, **kwargs)
 
-        # Si tu modelo Funcionario se llama distinto, cámbialo
-        # y si tu relación es user->funcionario por FK/OneToOne, ajusta:
-        try:
-            from .models import Funcionarios
-            existe = Funcionarios.objects.filter(usuario=user).exists()
-        except Exception:
-            existe = True  # no bloquea si no puede validar (evita romper el proyecto)
-
-        if not existe:
+        # principal del request (web/utils/authz.py): sin query extra
+        if not staff_de(request).is_funcionario:
             raise PermissionDenied("No tienes un perfil de funcionario vinculado.")
 
         return super().dispatch(request, *args, **kwargs)
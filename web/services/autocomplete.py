@@ -0,0 +1,74 @@
+# web/services/autocomplete.py
+"""
+Autocompletado para los selects del panel (django_select2).
+
+- Los widgets se registran en el cache "select2" (DatabaseCache, compartido
+  entre workers de gunicorn). Con LocMemCache el worker que atendía el AJAX
+  no conocía el widget y respondía 404 al azar.
+- Búsqueda con icontains apoyada en índices pg_trgm sobre upper(col::text)
+  (ver sección 17 de tesis/schema.sql y db/migrations/0005).
+- Límite de resultados y mínimo de caracteres: nunca se listan tablas enteras.
+- La vista trae max_results + 1 filas para saber si hay "más", sin COUNT(*).
+"""
+from __future__ import annotations
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django_select2.forms import ModelSelect2MultipleWidget, ModelSelect2Widget
+from django_select2.views import AutoResponseView
+
+
+class AutocompleteMixin:
+    max_results = 20
+    # pg_trgm necesita >= 3 caracteres para usar el índice
+    min_input_length = 3
+
+    def __init__(self, *args, **kwargs):
+        self.min_input_length = kwargs.pop("min_input_length", self.min_input_length)
+        # ModelSelect2Mixin.__init__ pone data_view="django_select2:auto-json" por defecto
+        # y pisaría un atributo de clase: la vista propia va como kwarg
+        kwargs.setdefault("data_view", "web:autocomplete")
+        super().__init__(*args, **kwargs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs=extra_attrs)
+        attrs["data-minimum-input-length"] = self.min_input_length
+        return attrs
+
+
+class AutocompleteSelect2Widget(AutocompleteMixin, ModelSelect2Widget):
+    pass
+
+
+class AutocompleteSelect2MultipleWidget(AutocompleteMixin, ModelSelect2MultipleWidget):
+    pass
+
+
+class AutocompleteView(LoginRequiredMixin, AutoResponseView):
+    """Igual que AutoResponseView de django_select2 pero sin Paginator (sin COUNT)."""
+
+    def get(self, request, *args, **kwargs):
+        self.widget = self.get_widget_or_404()
+        self.term = kwargs.get("term", request.GET.get("term", ""))
+
+        limit = int(self.widget.max_results)
+        try:
+            page = max(int(request.GET.get("page") or 1), 1)
+        except (TypeError, ValueError):
+            page = 1
+        offset = (page - 1) * limit
+
+        qs = self.get_queryset()
+        if not qs.ordered:
+            qs = qs.order_by("pk")
+
+        rows = list(qs[offset: offset + limit + 1])
+
+        return JsonResponse(
+            {
+                "results": [self.widget.result_from_instance(obj, request) for obj in rows[:limit]],
+                "more": len(rows) > limit,
+            },
+            encoder=DjangoJSONEncoder,
+        )
@@ -8,6 +8,7 @@ from db.models import (
     Usuarios,  # <- tu tabla puente (funcionario_web_user)
 )
 from web.models import FuncionarioWebUser
+from usuarios_api.principal import revocar_tokens
 
 # -------------------------------
 # Obtener funcionarios ligados a un auth_user
@@ -70,5 +71,7 @@ def soft_disable_web_user(user: User):
         funcionarios.update(activo=False)
 
         # 3) Desactivar 'usuarios' (tabla dominio) por UUID (pk igual al funcionario.usuario)
-        usuario_ids = funcionarios.values_list("usuario", flat=True)
+        usuario_ids = list(funcionarios.values_list("usuario", flat=True))
         Usuarios.objects.filter(id__in=usuario_ids).update(activo=False)
+        # update() no dispara signals: revocar JWT e invalidar cache a mano
+        revocar_tokens(usuario_ids)
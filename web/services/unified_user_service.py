@@ -17,6 +17,7 @@ from db.models import (
     Denuncias,
 )
 from web.models import FuncionarioWebUser
+from usuarios_api.principal import revocar_tokens
 
 from django.db import IntegrityError
 
@@ -283,6 +284,8 @@ def upsert_unified_user(
 
         if changed_u:
             usuario_uuid.save()
+            if not activo:
+                revocar_tokens([usuario_uuid.id])
 
     # =========================================================
     # Funcionarios
@@ -405,6 +408,7 @@ def soft_disable_unified_user(user: User):
         if hasattr(usuario_uuid, "updated_at"):
             usuario_uuid.updated_at = now
         usuario_uuid.save()
+        revocar_tokens([usuario_uuid.id])
 
 
 # ------------------------------------------------------------
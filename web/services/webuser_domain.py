@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 
 from db.models import Usuarios, Funcionarios, Departamentos
 from web.models import FuncionarioWebUser
+from usuarios_api.principal import revocar_tokens
 
 
 def get_departamento(dep_id: int | None):
@@ -125,3 +126,4 @@ def soft_disable_web_user(user: User):
         if hasattr(u, "updated_at"):
             u.updated_at = now
         u.save()
+        revocar_tokens([u.id])
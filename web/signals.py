@@ -1,18 +1,80 @@
 # web/signals.py
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
 
+from db.models import Funcionarios
+from web.models import FuncionarioWebUser, Menus
 from web.services.webuser_domain import ensure_domain_for_web_user, detach_domain_for_web_user
+from web.utils.authz import invalidar_staff
+from web.utils.menus import invalidar_menus
 
 
 @receiver(post_save, sender=User)
 def on_user_saved(sender, instance: User, created, **kwargs):
     #   crea o sincroniza SI es staff
     ensure_domain_for_web_user(instance)
+    # is_superuser / is_active pudieron cambiar
+    invalidar_staff(instance.pk)
 
 
 @receiver(pre_delete, sender=User)
 def on_user_delete(sender, instance: User, **kwargs):
     #   limpieza en 3 tablas
     detach_domain_for_web_user(instance)
+
+
+# =========================================================
+# Invalidación del principal staff (web/utils/authz.py)
+# =========================================================
+@receiver(m2m_changed, sender=User.groups.through)
+def on_user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        # user.groups.add(...)
+        invalidar_staff(instance.pk)
+    elif action == "pre_clear":
+        # group.user_set.clear(): pk_set llega vacío, tomar usuarios antes
+        invalidar_staff(*instance.user_set.values_list("pk", flat=True))
+    elif pk_set:
+        # group.user_set.add(...)
+        invalidar_staff(*pk_set)
+
+
+@receiver(pre_delete, sender=Group)
+def on_group_delete(sender, instance: Group, **kwargs):
+    invalidar_staff(*instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=FuncionarioWebUser)
+@receiver(post_delete, sender=FuncionarioWebUser)
+def on_funcionario_link_changed(sender, instance, **kwargs):
+    invalidar_staff(instance.web_user_id)
+
+
+@receiver(post_save, sender=Funcionarios)
+def on_funcionario_saved(sender, instance, **kwargs):
+    # el departamento del funcionario va en el principal
+    invalidar_staff(
+        *FuncionarioWebUser.objects
+        .filter(funcionario_id=instance.pk)
+        .values_list("web_user_id", flat=True)
+    )
+
+
+# =========================================================
+# Invalidación del árbol de menús (web/utils/menus.py)
+# =========================================================
+@receiver(post_save, sender=Menus)
+@receiver(post_delete, sender=Menus)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def on_menus_changed(sender, **kwargs):
+    invalidar_menus()
+
+
+@receiver(m2m_changed, sender=Menus.permisos.through)
+def on_menus_permisos_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidar_menus()
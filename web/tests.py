@@ -1,3 +1,209 @@
-from django.test import TestCase
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import SkipTest, mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+
+from db.models import Denuncias, Departamentos
+from db.search import buscar_denuncias
+from web import tiempo_real
+from web.forms import GrupoFuncionariosWidget
+from web.services.autocomplete import AutocompleteSelect2Widget, AutocompleteView
+from web.utils.paginacion import decode_cursor, encode_cursor, paginar_keyset
+
+KEYS = ("created_at", "id")
+
+
+class CursorTests(SimpleTestCase):
+    def test_ida_y_vuelta(self):
+        valores = [datetime(2026, 3, 1, 10, 30, tzinfo=dt_timezone.utc), uuid.uuid4()]
+        self.assertEqual(decode_cursor(encode_cursor(valores), KEYS), valores)
+
+    def test_rank_se_decodifica_como_float(self):
+        valores = [0.25, datetime(2026, 3, 1, tzinfo=dt_timezone.utc), uuid.uuid4()]
+        self.assertEqual(decode_cursor(encode_cursor(valores), ("rank", "created_at", "id")), valores)
+
+    def test_cursor_invalido(self):
+        self.assertIsNone(decode_cursor("no-es-base64!!", KEYS))
+        self.assertIsNone(decode_cursor(encode_cursor([1]), KEYS))
+        self.assertIsNone(decode_cursor(encode_cursor(["ayer", "x"]), KEYS))
+
+
+class PaginarKeysetTests(TestCase):
+    """
+    paginar_keyset sobre denuncias reales: la comparación de fila
+    (created_at, id) < (...) es SQL de Postgres. Requiere tesis/schema.sql.
+    """
+
+    POR_PAGINA = 2
+
+    @classmethod
+    def setUpClass(cls):
+        if "denuncias" not in connection.introspection.table_names():
+            raise SkipTest("requiere la base de pruebas creada con tesis/schema.sql")
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ciudadano = uuid.uuid4()
+        with connection.cursor() as cur:
+            cur.execute(
+                "INSERT INTO usuarios (id, tipo, correo, password_hash) VALUES (%s, 'ciudadano', %s, 'x')",
+                [cls.ciudadano, f"{cls.ciudadano}@test.local"],
+            )
+            cur.execute(
+                "INSERT INTO ciudadanos (usuario_id, cedula, nombres, apellidos) VALUES (%s, %s, 'Ana', 'Pérez')",
+                [cls.ciudadano, str(cls.ciudadano.int)[:10]],
+            )
+            cur.execute("INSERT INTO tipos_denuncia (nombre) VALUES (%s) RETURNING id", [f"tipo {uuid.uuid4()}"])
+            tipo = cur.fetchone()[0]
+
+            base = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+            # tres denuncias con el mismo created_at: el id desempata
+            fechas = [base, base - timedelta(minutes=1), base - timedelta(minutes=1),
+                      base - timedelta(minutes=1), base - timedelta(minutes=2)]
+            cls.filas = []
+            for fecha in fechas:
+                d_id = uuid.uuid4()
+                cur.execute(
+                    "INSERT INTO denuncias (id, ciudadano_id, tipo_denuncia_id, descripcion, latitud, longitud, "
+                    "created_at, updated_at) VALUES (%s, %s, %s, 'prueba', -1.0, -78.5, %s, %s)",
+                    [d_id, cls.ciudadano, tipo, fecha, fecha],
+                )
+                cls.filas.append((fecha, d_id))
+
+            # otro ciudadano con textos que empatan en rank (y a veces en created_at)
+            cls.buscador = uuid.uuid4()
+            cur.execute(
+                "INSERT INTO usuarios (id, tipo, correo, password_hash) VALUES (%s, 'ciudadano', %s, 'x')",
+                [cls.buscador, f"{cls.buscador}@test.local"],
+            )
+            cur.execute(
+                "INSERT INTO ciudadanos (usuario_id, cedula, nombres, apellidos) VALUES (%s, %s, 'Eva', 'Ruiz')",
+                [cls.buscador, str(cls.buscador.int)[:10]],
+            )
+            textos = ["bache profundo", "bache profundo", "bache profundo",
+                      "hay un bache en la calle principal", "bache profundo"]
+            for i, texto in enumerate(textos):
+                fecha = base - timedelta(minutes=i // 2)
+                cur.execute(
+                    "INSERT INTO denuncias (ciudadano_id, tipo_denuncia_id, descripcion, latitud, longitud, "
+                    "created_at, updated_at) VALUES (%s, %s, %s, -1.0, -78.5, %s, %s)",
+                    [cls.buscador, tipo, texto, fecha, fecha],
+                )
+        # orden del listado: created_at DESC, id DESC
+        cls.esperado = [d_id for _, d_id in sorted(cls.filas, reverse=True)]
+
+    def _qs(self):
+        return Denuncias.objects.filter(ciudadano_id=self.ciudadano)
+
+    def _pagina(self, **params):
+        return paginar_keyset(self._qs(), params, self.POR_PAGINA, keys=KEYS)
+
+    def _ids(self, page):
+        return [d.id for d in page.object_list]
+
+    def test_primera_pagina(self):
+        page = self._pagina()
+        self.assertEqual(self._ids(page), self.esperado[:2])
+        self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+        self.assertEqual(page.total, 5)
+
+    def test_after_recorre_todo_sin_saltos_ni_repetidos(self):
+        vistos, params = [], {}
+        while True:
+            page = self._pagina(**params)
+            vistos.extend(self._ids(page))
+            if not page.has_next:
+                break
+            params = {"after": page.next_cursor}
+        self.assertEqual(vistos, self.esperado)
+
+    def test_empate_en_created_at_se_corta_por_id(self):
+        # la segunda página empieza en medio de las tres denuncias con la misma fecha
+        primera = self._pagina()
+        segunda = self._pagina(after=primera.next_cursor)
+        self.assertEqual(self._ids(segunda), self.esperado[2:4])
+        self.assertEqual(segunda.object_list[0].created_at, segunda.object_list[1].created_at)
+
+    def test_before_vuelve_a_la_pagina_anterior(self):
+        primera = self._pagina()
+        segunda = self._pagina(after=primera.next_cursor)
+        anterior = self._pagina(before=segunda.previous_cursor)
+        self.assertEqual(self._ids(anterior), self.esperado[:2])
+        self.assertFalse(anterior.has_previous)
+        self.assertTrue(anterior.has_next)
+
+    def test_ultima(self):
+        page = self._pagina(ultima="1")
+        self.assertEqual(self._ids(page), self.esperado[-2:])
+        self.assertFalse(page.has_next)
+        self.assertTrue(page.has_previous)
+
+    def test_cursor_invalido_es_primera_pagina(self):
+        self.assertEqual(self._ids(self._pagina(after="basura")), self.esperado[:2])
+
+    def test_busqueda_con_rank_empatado_recorre_todo(self):
+        # ts_rank es real: si el cursor volviera como float8 los empates se saltan
+        keys = ("rank", "created_at", "id")
+        qs = buscar_denuncias(
+            Denuncias.objects.filter(ciudadano_id=self.buscador), "bache", incluir_ciudadano=False
+        )
+        esperado = [d.id for d in qs.order_by("-rank", "-created_at", "-id")]
+        self.assertEqual(len(esperado), 5)
+
+        vistos, params = [], {}
+        while True:
+            page = paginar_keyset(qs, params, self.POR_PAGINA, keys=keys)
+            vistos.extend(self._ids(page))
+            if not page.has_next:
+                break
+            params = {"after": page.next_cursor}
+        self.assertEqual(vistos, esperado)
+
+        # y de vuelta con before desde la última página
+        ultima = paginar_keyset(qs, {"ultima": "1"}, self.POR_PAGINA, keys=keys)
+        anterior = paginar_keyset(qs, {"before": ultima.previous_cursor}, self.POR_PAGINA, keys=keys)
+        self.assertEqual(self._ids(anterior), esperado[1:3])
+
+
+class AutocompleteWidgetTests(SimpleTestCase):
+    """Los selects del panel piden a web:autocomplete (sin COUNT), no a la vista de django_select2."""
+
+    def test_widgets_usan_la_vista_propia(self):
+        widgets = [
+            AutocompleteSelect2Widget(model=Departamentos, search_fields=["nombre__icontains"]),
+            GrupoFuncionariosWidget(),
+        ]
+        for widget in widgets:
+            self.assertIs(resolve(widget.get_url()).func.view_class, AutocompleteView)
+
+    def test_data_view_explicito_se_respeta(self):
+        widget = AutocompleteSelect2Widget(
+            model=Departamentos, search_fields=["nombre__icontains"], data_view="django_select2:auto-json"
+        )
+        self.assertEqual(widget.data_view, "django_select2:auto-json")
+
+
+@override_settings(SSE_REPLAY_MS=1000)
+class PendientesTests(SimpleTestCase):
+    """Reconexión con Last-Event-ID: el id es la hora del trigger, no del commit."""
+
+    def _ev(self, ev, dep=1):
+        return {"ev": ev, "id": str(uuid.uuid4()), "_canales": {tiempo_real.TODOS, f"dep:{dep}"}}
+
+    def test_commit_tardio_con_id_menor_se_reenvia(self):
+        # B (id 5_000_000) llegó antes que A, que se disparó medio segundo antes pero confirmó después
+        b, a, viejo = self._ev(5_000_000), self._ev(4_500_000), self._ev(3_000_000)
+        with mock.patch.object(tiempo_real, "_buffer", deque([viejo, b, a])):
+            self.assertEqual(tiempo_real.pendientes({"dep:1"}, 5_000_000), [b, a])
+
+    def test_solo_los_canales_pedidos(self):
+        otro = self._ev(5_000_000, dep=2)
+        with mock.patch.object(tiempo_real, "_buffer", deque([otro])):
+            self.assertEqual(tiempo_real.pendientes({"dep:1"}, 4_000_000), [])
+            self.assertEqual(tiempo_real.pendientes({tiempo_real.TODOS}, 4_000_000), [otro])
@@ -0,0 +1,299 @@
+# web/tiempo_real.py
+"""
+Avisos en vivo de denuncias para el panel (SSE), alimentados por
+Postgres LISTEN/NOTIFY (schema.sql sección 23).
+
+- Un hilo por proceso (el "oyente") tiene UNA conexión propia a la BD
+  principal con LISTEN denuncias_cambios. Las peticiones SSE no tocan la
+  base: se suscriben a colas en memoria.
+- Canales: "todos" (administradores), "dep:<id>" (funcionarios del
+  departamento, también el departamento anterior al reasignar) y
+  "func:<id>" (Mis denuncias).
+- Cada evento trae un id (microsegundos del reloj de la BD al dispararse el
+  trigger, igual en todos los workers) y se guarda en un buffer corto: al
+  reconectar, EventSource manda Last-Event-ID y se reenvía lo que faltó,
+  aunque la reconexión caiga en otro worker.
+- Ese id no sigue el orden de commit: una transacción larga puede llegar
+  después de un evento con id mayor. Por eso al reconectar se reenvía también
+  SSE_REPLAY_MS antes de Last-Event-ID y el navegador descarta los ids ya
+  vistos. Solo se pierde un evento cuya transacción tardó más que ese margen
+  en confirmarse (o que ya salió del buffer).
+- Toda respuesta deja un id (el último evento visto por el oyente) aunque
+  no haya eventos: así la primera reconexión ya manda Last-Event-ID.
+- gthread: cada conexión abierta ocupa un hilo. Hay un tope por proceso
+  (SSE_MAX_CONEXIONES, por defecto una cuarta parte de GUNICORN_THREADS) y
+  cada conexión dura SSE_DURACION segundos; sin cupo se responde al instante
+  con lo pendiente, el id actual y un retry más largo (sondeo barato del
+  buffer, nunca del listado).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+CANAL = "denuncias_cambios"
+TODOS = "todos"
+
+_lock = threading.Lock()
+_suscripciones: set["Suscripcion"] = set()
+_buffer: deque = deque(maxlen=500)
+_oyente: threading.Thread | None = None
+# id del último evento recibido (o reloj de la BD al empezar a escuchar)
+_ultimo_ev: int | None = None
+_cupos: threading.BoundedSemaphore | None = None
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+def _inc(key: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        m = dict(_metrics)
+    with _lock:
+        m["conexiones_abiertas"] = len(_suscripciones)
+        m["buffer"] = len(_buffer)
+    m["oyente_vivo"] = bool(_oyente and _oyente.is_alive())
+    return m
+
+
+def _conf(nombre: str, default):
+    return type(default)(getattr(settings, nombre, default))
+
+
+# =========================================================
+# Canales
+# =========================================================
+def canales_de_evento(ev: dict) -> set[str]:
+    canales = {TODOS}
+    for clave in ("dep", "dep_antes"):
+        if ev.get(clave) is not None:
+            canales.add(f"dep:{ev[clave]}")
+    for clave in ("func", "func_extra"):
+        if ev.get(clave):
+            canales.add(f"func:{ev[clave]}")
+    return canales
+
+
+def canales_de_staff(staff) -> set[str]:
+    if staff.is_admin:
+        return {TODOS}
+    canales = set()
+    if staff.departamento_id:
+        canales.add(f"dep:{staff.departamento_id}")
+    if staff.funcionario_id:
+        canales.add(f"func:{staff.funcionario_id}")
+    return canales
+
+
+# =========================================================
+# Suscripciones
+# =========================================================
+class Suscripcion:
+    def __init__(self, canales: set[str]):
+        self.canales = canales
+        # una pestaña lenta no frena al oyente: si se llena, se descartan eventos
+        self.cola: queue.Queue = queue.Queue(maxsize=200)
+
+    def entregar(self, ev: dict):
+        try:
+            self.cola.put_nowait(ev)
+        except queue.Full:
+            _inc("descartados")
+
+    def cerrar(self):
+        with _lock:
+            _suscripciones.discard(self)
+
+
+def suscribir(canales: set[str]) -> Suscripcion:
+    _arrancar()
+    s = Suscripcion(canales)
+    with _lock:
+        _suscripciones.add(s)
+    return s
+
+
+def pendientes(canales: set[str], desde: int) -> list[dict]:
+    """
+    Eventos del buffer que le tocan a esos canales con id posterior a `desde`
+    menos SSE_REPLAY_MS (commits tardíos con id menor). Puede repetir eventos
+    ya entregados: el cliente los descarta por id.
+    """
+    margen = _conf("SSE_REPLAY_MS", 10000) * 1000
+    with _lock:
+        copia = list(_buffer)
+    return [ev for ev in copia if ev["ev"] > desde - margen and canales & ev["_canales"]]
+
+
+def cursor() -> int | None:
+    """Id a partir del cual pedir eventos; None si el oyente aún no conectó."""
+    with _lock:
+        return _ultimo_ev
+
+
+def _avanzar(ev_id: int):
+    global _ultimo_ev
+    with _lock:
+        if _ultimo_ev is None or ev_id > _ultimo_ev:
+            _ultimo_ev = ev_id
+
+
+def tomar_cupo() -> bool:
+    global _cupos
+    if _cupos is None:
+        with _lock:
+            if _cupos is None:
+                _cupos = threading.BoundedSemaphore(_conf("SSE_MAX_CONEXIONES", 2))
+    return _cupos.acquire(blocking=False)
+
+
+def soltar_cupo():
+    _cupos.release()
+
+
+def _repartir(ev: dict):
+    ev["_canales"] = canales_de_evento(ev)
+    _avanzar(ev["ev"])
+    with _lock:
+        _buffer.append(ev)
+        destinos = [s for s in _suscripciones if s.canales & ev["_canales"]]
+    for s in destinos:
+        s.entregar(ev)
+    _inc("eventos")
+
+
+# =========================================================
+# Oyente LISTEN
+# =========================================================
+def _conectar():
+    """Conexión psycopg2 propia (autocommit) con los mismos datos que "default"."""
+    import psycopg2
+    import psycopg2.extensions
+
+    params = connections["default"].get_connection_params()
+    conn = psycopg2.connect(**params)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {CANAL}")
+        # punto de partida del cursor: lo anterior a LISTEN no llega aquí
+        cur.execute("SELECT (extract(epoch FROM clock_timestamp()) * 1000000)::bigint")
+        _avanzar(cur.fetchone()[0])
+    return conn
+
+
+def _escuchar():
+    espera = 1.0
+    while True:
+        conn = None
+        try:
+            conn = _conectar()
+            espera = 1.0
+            logger.info("tiempo_real: escuchando %s", CANAL)
+            while True:
+                # select con timeout: detecta conexiones muertas sin ocupar CPU
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    n = conn.notifies.pop(0)
+                    try:
+                        _repartir(json.loads(n.payload))
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("tiempo_real: payload inválido: %r", n.payload[:200])
+        except Exception:
+            _inc("reconexiones")
+            logger.warning("tiempo_real: oyente caído, reintento en %.0fs", espera, exc_info=True)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        time.sleep(espera)
+        espera = min(espera * 2, 30.0)
+
+
+def _arrancar():
+    global _oyente, _buffer
+    if _oyente is not None:
+        return
+    with _lock:
+        if _oyente is not None:
+            return
+        _buffer = deque(maxlen=_conf("SSE_BUFFER", 500))
+        _oyente = threading.Thread(target=_escuchar, name="denuncias-listen", daemon=True)
+        _oyente.start()
+
+
+# =========================================================
+# Stream
+# =========================================================
+def _sse(ev: dict) -> str:
+    datos = {k: v for k, v in ev.items() if not k.startswith("_")}
+    return f"id: {ev['ev']}\nevent: denuncia\ndata: {json.dumps(datos, default=str)}\n\n"
+
+
+def _inicio(canales: set[str], desde: int | None, retry_ms: int):
+    """retry, lo pendiente desde Last-Event-ID y, si no hay, el id actual."""
+    yield f"retry: {retry_ms}\n\n"
+    ultimo = desde
+    if desde is not None:
+        for ev in pendientes(canales, desde):
+            ultimo = ev["ev"]
+            yield _sse(ev)
+    actual = cursor()
+    # el último id enviado fija Last-Event-ID (un commit tardío lo dejaría atrás)
+    if actual is not None and (ultimo is None or actual > ultimo):
+        # evento sin datos de denuncia: solo fija Last-Event-ID en el navegador
+        yield f"id: {actual}\nevent: cursor\ndata: {{}}\n\n"
+
+
+def eventos(canales: set[str], desde: int | None):
+    """Generador SSE: pendientes desde Last-Event-ID, luego en vivo hasta SSE_DURACION."""
+    retry_ms = _conf("SSE_RETRY_MS", 1000)
+    if not tomar_cupo():
+        # sin hilo libre para quedarse: lo pendiente y volver más tarde
+        _inc("sin_cupo")
+        _arrancar()
+        yield from _inicio(canales, desde, _conf("SSE_RETRY_SATURADO_MS", 5000))
+        return
+
+    # lo que la vista necesitaba de la BD (sesión, staff) ya se leyó: no
+    # retener una conexión ociosa durante todo el stream
+    connections.close_all()
+    sus = suscribir(canales)
+    _inc("conexiones")
+    try:
+        yield from _inicio(canales, desde, retry_ms)
+        limite = time.monotonic() + _conf("SSE_DURACION", 30)
+        latido = _conf("SSE_LATIDO", 15)
+        while True:
+            resta = limite - time.monotonic()
+            if resta <= 0:
+                break
+            try:
+                ev = sus.cola.get(timeout=min(latido, resta))
+            except queue.Empty:
+                yield ": latido\n\n"
+                continue
+            yield _sse(ev)
+    finally:
+        sus.cerrar()
+        soltar_cupo()
@@ -1,7 +1,9 @@
 from django.urls import path
 from django.contrib.auth.views import LogoutView
 
+from web.services.autocomplete import AutocompleteView
 from web.views_unified_users import UnifiedUserCreateView, UnifiedUserDeleteView, UnifiedUserDetailView, UnifiedUserListView, UnifiedUserUpdateView
+from web.views_tiempo_real import denuncia_fila, denuncias_eventos, mis_denuncia_fila
 
 
 from .views import (
@@ -32,6 +34,7 @@ urlpatterns = [
     path("login/", CustomLoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(next_page="web:login"), name="logout"),
     path("dashboard/", dashboard_view, name="dashboard"),
+    path("autocomplete/", AutocompleteView.as_view(), name="autocomplete"),
     path("api/denuncias/<uuid:denuncia_id>/respuestas/", api_respuestas_denuncia, name="api_respuestas_denuncia"),
     path("rechazar-denuncia/<uuid:denuncia_id>/", rechazar_denuncia, name="rechazar_denuncia"),
     path("api/generate-llm-rechazo/<uuid:denuncia_id>/", llm_rechazo_response, name="generate_llm_rechazo"),
@@ -47,6 +50,10 @@ urlpatterns = [
     # Denuncias
     path("denuncias/", DenunciaListView.as_view(), name="denuncia_list"),
     path("mis-denuncias/", MisDenunciasListView.as_view(), name="mis_denuncias"),
+    # en vivo: SSE + filas sueltas para parchar los listados
+    path("denuncias/eventos/", denuncias_eventos, name="denuncias_eventos"),
+    path("denuncias/<uuid:pk>/fila/", denuncia_fila, name="denuncia_fila"),
+    path("mis-denuncias/<uuid:pk>/fila/", mis_denuncia_fila, name="mis_denuncia_fila"),
     path("denuncias/<uuid:pk>/", DenunciaDetailView.as_view(), name="denuncia_detail"),
     path("denuncias/<uuid:pk>/respuestas/create/", crear_respuesta_denuncia, name="denuncia_respuesta_create"),
     path("denuncias/<uuid:pk>/update/", DenunciaUpdateView.as_view(), name="denuncia_update"),
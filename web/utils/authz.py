@@ -1,6 +1,37 @@
-# web/utils/authz.py (nuevo)
+# web/utils/authz.py
+"""
+Principal del panel (staff) resuelto una vez por request.
+
+Antes cada vista repetía get_funcionario_from_web_user() y
+user.groups.filter(name="TICS_ADMIN").exists() (2-4 veces por página).
+Ahora StaffPrincipalMiddleware deja en request.staff (lazy) un objeto con:
+
+- funcionario_id, departamento_id
+- group_names, is_admin, is_superuser
+- funcionario (instancia, solo si la vista la pide: 1 query como máximo)
+
+Los ids y grupos se guardan en la sesión. Se recalculan si:
+- cambia la versión del usuario en cache (signals en web/signals.py:
+  grupos, vínculo funcionario<->web_user, departamento del funcionario)
+- pasan STAFF_PRINCIPAL_TTL segundos (red de seguridad)
+"""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, cached_property
+
+from config.cache import espacio
+from db.models import Funcionarios
 from web.models import FuncionarioWebUser
 
+ADMIN_GROUP = "TICS_ADMIN"
+STAFF_SESSION_KEY = "_staff_principal"
+
+_STAFF = espacio("staff_principal")
+
+
 def get_funcionario_from_request_user(user):
     link = (
         FuncionarioWebUser.objects
@@ -9,3 +40,116 @@ def get_funcionario_from_request_user(user):
         .first()
     )
     return link.funcionario if link else None
+
+
+# =========================================================
+# Versión por usuario (invalidación)
+# =========================================================
+def _ttl() -> int:
+    return int(getattr(settings, "STAFF_PRINCIPAL_TTL", 300))
+
+
+def _version(user_id) -> str:
+    return str(_STAFF.get(f"v:{user_id}") or "0")
+
+
+def invalidar_staff(*user_ids):
+    """Marca como viejo el principal cacheado en sesión de esos usuarios."""
+    v = str(time.time_ns())
+    for uid in user_ids:
+        if uid:
+            _STAFF.set(f"v:{uid}", v, timeout=None)
+
+
+# =========================================================
+# Principal
+# =========================================================
+class StaffPrincipal:
+    def __init__(self, user, data: dict | None = None):
+        data = data or {}
+        self.user = user
+        self.funcionario_id = data.get("funcionario_id")
+        self.departamento_id = data.get("departamento_id")
+        self.group_names = frozenset(data.get("groups") or ())
+        self.is_superuser = bool(getattr(user, "is_superuser", False))
+        self.is_admin = self.is_superuser or ADMIN_GROUP in self.group_names
+
+    @property
+    def is_funcionario(self) -> bool:
+        return self.funcionario_id is not None
+
+    @cached_property
+    def funcionario(self):
+        if self.funcionario_id is None:
+            return None
+        return (
+            Funcionarios.objects
+            .select_related("departamento")
+            .filter(pk=self.funcionario_id)
+            .first()
+        )
+
+    def __repr__(self):
+        return f"<StaffPrincipal user={getattr(self.user, 'pk', None)} func={self.funcionario_id} admin={self.is_admin}>"
+
+
+def _calcular(user) -> dict:
+    groups = sorted(user.groups.values_list("name", flat=True))
+    row = (
+        FuncionarioWebUser.objects
+        .filter(web_user=user)
+        .values_list("funcionario_id", "funcionario__departamento_id")
+        .first()
+    )
+    funcionario_id, departamento_id = row if row else (None, None)
+    return {
+        "uid": user.pk,
+        "funcionario_id": str(funcionario_id) if funcionario_id else None,
+        "departamento_id": departamento_id,
+        "groups": groups,
+    }
+
+
+def resolver_staff(request) -> StaffPrincipal:
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return StaffPrincipal(user)
+
+    session = getattr(request, "session", None)
+    version = _version(user.pk)
+    data = session.get(STAFF_SESSION_KEY) if session is not None else None
+
+    vigente = (
+        isinstance(data, dict)
+        and data.get("uid") == user.pk
+        and data.get("v") == version
+        and data.get("exp", 0) > time.time()
+    )
+    if not vigente:
+        data = _calcular(user)
+        data["v"] = version
+        data["exp"] = time.time() + _ttl()
+        if session is not None:
+            session[STAFF_SESSION_KEY] = data
+
+    return StaffPrincipal(user, data)
+
+
+def staff_de(request) -> StaffPrincipal:
+    """request.staff si pasó por el middleware; si no, lo resuelve y lo memoriza."""
+    staff = getattr(request, "staff", None)
+    if staff is None:
+        staff = resolver_staff(request)
+        request.staff = staff
+    return staff
+
+
+class StaffPrincipalMiddleware:
+    """Va después de AuthenticationMiddleware. Lazy: la API JWT no paga nada."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.staff = SimpleLazyObject(lambda: resolver_staff(request))
+        return self.get_response(request)
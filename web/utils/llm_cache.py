@@ -0,0 +1,102 @@
+# web/utils/llm_cache.py
+"""
+Cache de borradores generados por IA en el panel (llm_response,
+llm_rechazo_response, resolver_denuncia).
+
+La clave es un hash de (plantilla, versión de la plantilla, modelo,
+mensajes, max_tokens). Los mensajes ya traen el contexto completo de la
+denuncia (datos, evidencias, respuestas), así que si algo cambia la clave
+cambia sola; si nada cambió, repetir el clic devuelve lo mismo sin llamar a
+OpenAI. Al cambiar el texto de un prompt hay que subir su versión.
+
+- TTL: LLM_CACHE_TTL segundos.
+- regenerar=True ignora el cache y guarda el resultado nuevo.
+- Hit rate por espacio "llm_respuestas" en /metrics/ (config/cache.py),
+  más tokens ahorrados en metrics_snapshot().
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+from config import llm
+from config.cache import espacio
+
+_LLM = espacio("llm_respuestas")
+
+_metrics_lock = threading.Lock()
+_metrics = Counter()
+
+
+def _inc(key: str, n: int = 1):
+    with _metrics_lock:
+        _metrics[key] += n
+
+
+def metrics_snapshot() -> dict:
+    with _metrics_lock:
+        m = dict(_metrics)
+    consultas = m.get("hits", 0) + m.get("misses", 0)
+    m["hit_rate"] = round(m.get("hits", 0) / consultas, 4) if consultas else None
+    return m
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "LLM_CACHE_TTL", 24 * 3600))
+
+
+def clave(plantilla: str, version: str, model: str, messages: list, max_tokens: int) -> str:
+    datos = json.dumps(
+        {"p": plantilla, "v": version, "m": model, "msgs": messages, "max": max_tokens},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return f"{plantilla}:{hashlib.sha256(datos.encode()).hexdigest()}"
+
+
+def quiere_regenerar(request) -> bool:
+    """?regenerar=1, POST regenerar=1 o {"regenerar": true} en el body JSON."""
+    valor = request.GET.get("regenerar") or request.POST.get("regenerar")
+    if valor is None and (request.content_type or "").startswith("application/json"):
+        try:
+            valor = (json.loads(request.body.decode("utf-8") or "{}") or {}).get("regenerar")
+        except (ValueError, AttributeError):
+            valor = None
+    return str(valor).lower() in ("1", "true", "si", "sí", "on")
+
+
+def completar(plantilla: str, version: str, *, model: str, messages: list,
+              max_tokens: int, regenerar: bool = False) -> tuple[str, bool]:
+    """
+    (texto, desde_cache). Llama a chat.completions vía config/llm.py solo si no
+    hay resultado cacheado (o si se pidió regenerar). Lanza lo mismo que llm.llamar.
+    """
+    k = clave(plantilla, version, model, messages, max_tokens)
+
+    if regenerar:
+        _inc("regeneraciones")
+    else:
+        guardado = _LLM.get(k)
+        if guardado is not None:
+            _inc("hits")
+            _inc("tokens_ahorrados", guardado.get("tokens", 0))
+            return guardado["texto"], True
+        _inc("misses")
+
+    resp = llm.llamar(
+        "chat.completions.create",
+        model=model,
+        messages=messages,
+        max_tokens=max_tokens,
+    )
+    texto = (resp.choices[0].message.content or "").strip()
+    if texto:
+        usage = getattr(resp, "usage", None)
+        tokens = int(getattr(usage, "total_tokens", 0) or 0)
+        _inc("tokens_llamadas", tokens)
+        _LLM.set(k, {"texto": texto, "tokens": tokens}, timeout=_ttl())
+    return texto, False
@@ -1,38 +1,83 @@
 # web/utils/menus.py
+"""
+Árbol de menús del sidebar.
+
+El árbol depende solo del conjunto de grupos del usuario, así que se cachea
+por (versión, grupos ordenados) como dicts simples (id, nombre, url, icono,
+orden, children). Los signals de Menus / Group (web/signals.py) invalidan
+el espacio "menus" completo; MENUS_CACHE_TTL es la red de seguridad.
+"""
+import hashlib
+
+from django.conf import settings
+
+from config.cache import espacio
 from web.models import Menus
 
+ADMIN_GROUP = "TICS_ADMIN"
+
+_MENUS = espacio("menus")
 
-def build_menus_for_user(user):
-    if not user.is_authenticated:
-        return []
 
+def _ttl() -> int:
+    return int(getattr(settings, "MENUS_CACHE_TTL", 300))
+
+
+def invalidar_menus():
+    _MENUS.invalidar()
+
+
+def _group_names(user, group_names=None):
     # nombres de grupos reales del usuario
-    group_names = list(user.groups.values_list("name", flat=True))
+    if group_names is None:
+        group_names = user.groups.values_list("name", flat=True)
+    group_names = set(group_names)
 
     # si es superuser, lo tratamos como TICS_ADMIN
     # pero NO como "ve todo"
-    if user.is_superuser and "TICS_ADMIN" not in group_names:
-        group_names.append("TICS_ADMIN")
+    if user.is_superuser:
+        group_names.add(ADMIN_GROUP)
 
-    if not group_names:
-        return []
+    return sorted(group_names)
 
+
+def _nodo(m):
+    return {"id": m.id, "nombre": m.nombre, "url": m.url, "icono": m.icono, "orden": m.orden}
+
+
+def _construir(group_names):
     menus = (
         Menus.objects.filter(permisos__name__in=group_names)
         .distinct()
-        .select_related("padre")
-        .prefetch_related("permisos")
         .order_by("orden", "nombre")
+        .only("id", "nombre", "url", "icono", "orden", "padre_id")
     )
 
-    padres = [m for m in menus if m.padre_id is None]
-    hijos = [m for m in menus if m.padre_id is not None]
-
+    padres = []
     hijos_por_padre = {}
-    for h in hijos:
-        hijos_por_padre.setdefault(h.padre_id, []).append(h)
+    for m in menus:
+        if m.padre_id is None:
+            padres.append(_nodo(m))
+        else:
+            hijos_por_padre.setdefault(m.padre_id, []).append(_nodo(m))
 
     for p in padres:
-        p.children = sorted(hijos_por_padre.get(p.id, []), key=lambda x: x.orden)
+        p["children"] = sorted(hijos_por_padre.get(p["id"], []), key=lambda x: x["orden"])
+
+    return sorted(padres, key=lambda x: x["orden"])
+
+
+def build_menus_for_user(user, group_names=None):
+    """
+    group_names: si ya se conocen (request.staff.group_names) se evita la
+    consulta de grupos.
+    """
+    if not user.is_authenticated:
+        return []
+
+    group_names = _group_names(user, group_names)
+    if not group_names:
+        return []
 
-    return sorted(padres, key=lambda x: x.orden)
\ No newline at end of file
+    digest = hashlib.sha1("|".join(group_names).encode()).hexdigest()
+    return _MENUS.get_or_set(digest, lambda: _construir(group_names), timeout=_ttl())
@@ -0,0 +1,229 @@
+# web/utils/paginacion.py
+"""
+Paginación por cursor (keyset) para listados grandes de denuncias.
+
+En vez de COUNT(*) + OFFSET (Paginator de Django), cada página pide
+"las N siguientes a (created_at, id)" y se apoya en el índice
+idx_denuncias_fecha_id. La página 500 cuesta lo mismo que la 1.
+
+Querystring:
+  ?after=<cursor>   página siguiente
+  ?before=<cursor>  página anterior
+  ?ultima=1         última página (orden inverso, sin OFFSET)
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from config.cache import espacio
+
+logger = logging.getLogger(__name__)
+
+CURSOR_PARAMS = ("page", "after", "before", "ultima")
+
+# por debajo de esto se cuenta exacto (y se cachea); por encima, estimación del planner
+CONTEO_EXACTO_MAX = 10_000
+CONTEO_CACHE_TTL = 60
+
+_CONTEOS = espacio("keyset_count", timeout=CONTEO_CACHE_TTL)
+
+
+# =========================================================
+# Cursor
+# =========================================================
+def _to_json(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    return v
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys) -> list | None:
+    """Devuelve los valores tipados o None si el cursor no es válido."""
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + pad))
+        if not isinstance(values, list) or len(values) != len(keys):
+            return None
+
+        out = []
+        for key, v in zip(keys, values):
+            if key.endswith("_at"):
+                out.append(datetime.fromisoformat(v))
+            elif key == "id":
+                out.append(uuid.UUID(str(v)))
+            elif key == "rank":
+                out.append(float(v))
+            else:
+                out.append(v)
+        return out
+    except (ValueError, TypeError, json.JSONDecodeError):
+        return None
+
+
+# =========================================================
+# Conteo aproximado
+# =========================================================
+def conteo_aproximado(qs) -> tuple[int, bool]:
+    """
+    (total, exacto)
+    - Estimación del planner (EXPLAIN) si el resultado es grande.
+    - COUNT(*) exacto cacheado CONTEO_CACHE_TTL segundos si es chico.
+    """
+    qs = qs.order_by()
+    try:
+        sql, params = qs.query.sql_with_params()
+    except Exception:
+        return 0, False
+
+    key = hashlib.md5((sql + repr(params)).encode()).hexdigest()
+    cached = _CONTEOS.get(key)
+    if cached is not None:
+        return cached, True
+
+    try:
+        with connections[qs.db].cursor() as cur:
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimado = int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        logger.exception("No se pudo estimar el conteo")
+        estimado = 0
+
+    if estimado > CONTEO_EXACTO_MAX:
+        return estimado, False
+
+    total = qs.count()
+    _CONTEOS.set(key, total)
+    return total, True
+
+
+# =========================================================
+# Página
+# =========================================================
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    has_next: bool = False
+    has_previous: bool = False
+    next_cursor: str = ""
+    previous_cursor: str = ""
+    total: int = 0
+    total_exacto: bool = True
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _row_compare(qs, keys, values, op):
+    """(created_at, id) < (%s, %s): comparación de fila, usa el índice compuesto."""
+    table = qs.model._meta.db_table
+    cols = ", ".join(f'"{table}"."{k}"' for k in keys)
+    marks = ", ".join(["%s"] * len(values))
+    return RawSQL(f"({cols}) {op} ({marks})", values, output_field=BooleanField())
+
+
+def _q_chain(keys, values, lookup):
+    """Para claves que no son columnas (ej: rank): k1 < v1 OR (k1 = v1 AND k2 < v2) ..."""
+    cond = Q()
+    for i, key in enumerate(keys):
+        part = Q(**{f"{key}__{lookup}": values[i]})
+        for j in range(i):
+            part &= Q(**{keys[j]: values[j]})
+        cond |= part
+    return cond
+
+
+def _despues_de(qs, keys, values, forward: bool):
+    # todas las claves van en orden descendente
+    if all(k in ("created_at", "id") for k in keys):
+        return qs.filter(_row_compare(qs, keys, values, "<" if forward else ">"))
+    return qs.filter(_q_chain(keys, values, "lt" if forward else "gt"))
+
+
+def paginar_keyset(qs, params, per_page: int, keys=("created_at", "id")) -> KeysetPage:
+    keys = list(keys)
+    desc = [f"-{k}" for k in keys]
+    asc = list(keys)
+
+    after = decode_cursor(params.get("after") or "", keys) if params.get("after") else None
+    before = decode_cursor(params.get("before") or "", keys) if params.get("before") else None
+    ultima = (params.get("ultima") or "") == "1"
+
+    total, exacto = conteo_aproximado(qs)
+
+    if before is not None:
+        rows = list(_despues_de(qs, keys, before, forward=False).order_by(*asc)[: per_page + 1])
+        has_previous = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_next = True
+    elif ultima:
+        rows = list(qs.order_by(*asc)[:per_page])
+        rows.reverse()
+        has_previous = total > len(rows)
+        has_next = False
+    else:
+        base = _despues_de(qs, keys, after, forward=True) if after is not None else qs
+        rows = list(base.order_by(*desc)[: per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = after is not None
+
+    page = KeysetPage(
+        object_list=rows,
+        has_next=has_next and bool(rows),
+        has_previous=has_previous and bool(rows),
+        total=total,
+        total_exacto=exacto,
+    )
+    if rows:
+        page.next_cursor = encode_cursor([getattr(rows[-1], k) for k in keys])
+        page.previous_cursor = encode_cursor([getattr(rows[0], k) for k in keys])
+    return page
+
+
+class KeysetPaginationMixin:
+    """
+    Reemplaza el Paginator de ListView.
+    En el template: page_obj.has_next / next_cursor / previous_cursor / total.
+    """
+
+    keyset_keys = ("created_at", "id")
+
+    def get_keyset_keys(self):
+        return self.keyset_keys
+
+    def paginate_queryset(self, queryset, page_size):
+        page = paginar_keyset(queryset, self.request.GET, page_size, keys=self.get_keyset_keys())
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_keyset_querystring(self, params=None):
+        """Querystring de filtros sin los parámetros de paginación."""
+        params = (params if params is not None else self.request.GET).copy()
+        for p in CURSOR_PARAMS:
+            params.pop(p, None)
+        return params.urlencode()
@@ -28,7 +28,6 @@ from django.urls import reverse
 
 from chartkick.django import BarChart, ColumnChart, LineChart, PieChart
 
-from openai import OpenAI
 
 from db.models import (
     Ciudadanos,
@@ -63,14 +62,23 @@ from .forms import (
 )
 from .models import FuncionarioWebUser, Menus
 from web.utils.menus import build_menus_for_user
+from web.utils.authz import staff_de
+from web.utils import llm_cache
 from notificaciones.services import notificar_respuesta
 from django.contrib import messages
 from django.utils.http import url_has_allowed_host_and_scheme
 from web.services.webuser_domain import soft_disable_web_user
 from web.services.delete_rules import can_hard_delete_user
+from config import externos, llm
+from config.db_router import ReplicaReadMixin, usar_replica
+from db.search import buscar_denuncias
+from web.utils.paginacion import KeysetPaginationMixin
+import logging
 import unicodedata
 from io import BytesIO
 
+logger = logging.getLogger(__name__)
+
 try:
     from PIL import Image, ImageOps
 except Exception:
@@ -94,13 +102,6 @@ def public_home_view(request):
     faqs = Faq.objects.filter(visible=True).order_by("-created_at")
     return render(request, "home.html", {"faqs": faqs})
 
-# =========================================
-# OpenAI client (safe if key missing)
-# =========================================
-api_key = getattr(settings, "OPENAI_API_KEY", None)
-client = OpenAI(api_key=api_key) if api_key else None
-
-
 # =========================================
 # ponerle funcioanrio a denuncia
 # =========================================
@@ -165,9 +166,10 @@ def tomar_denuncia_si_libre(denuncia, funcionario, motivo="Denuncia tomada para
 @login_required
 @require_POST
 def tomar_denuncia(request, denuncia_id):
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return JsonResponse({"success": False, "error": "No autorizado"}, status=403)
+    funcionario = staff.funcionario
 
     with transaction.atomic():
         denuncia = get_object_or_404(
@@ -221,9 +223,11 @@ class FuncionarioRequiredMixin(LoginRequiredMixin):
     login_url = "web:login"
 
     def dispatch(self, request, *args, **kwargs):
-        funcionario = get_funcionario_from_web_user(request.user)
-        if not (request.user.is_superuser or funcionario):
-            return render(request, "errors/403.html", status=403)
+        # anónimo: LoginRequiredMixin redirige al login
+        if request.user.is_authenticated:
+            staff = staff_de(request)
+            if not (staff.is_superuser or staff.is_funcionario):
+                return render(request, "errors/403.html", status=403)
         return super().dispatch(request, *args, **kwargs)
 
 
@@ -256,7 +260,7 @@ class CustomLoginView(LoginView):
         if request.user.is_authenticated:
             if request.user.is_superuser:
                 return redirect("web:dashboard")
-            is_funcionario = get_funcionario_from_web_user(request.user) is not None
+            is_funcionario = staff_de(request).is_funcionario
             return redirect("web:dashboard" if is_funcionario else "web:home")
         return super().get(request, *args, **kwargs)
 
@@ -264,7 +268,7 @@ class CustomLoginView(LoginView):
         if self.request.user.is_authenticated:
             if self.request.user.is_superuser:
                 return reverse_lazy("web:dashboard")
-            is_funcionario = get_funcionario_from_web_user(self.request.user) is not None
+            is_funcionario = staff_de(self.request).is_funcionario
             return reverse_lazy("web:dashboard" if is_funcionario else "web:home")
         return reverse_lazy("web:home")
 
@@ -298,20 +302,20 @@ from django.views.decorators.http import require_GET
 @require_GET
 def api_respuestas_denuncia(request, denuncia_id):
     #  Solo funcionarios/superuser (igual que tus otras protecciones)
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return JsonResponse({"success": False, "error": "No autorizado"}, status=403)
 
     denuncia = get_object_or_404(Denuncias, id=denuncia_id)
 
     #  Seguridad: si NO es admin, solo puede ver denuncias de su depto
-    if not (request.user.is_superuser or request.user.groups.filter(name="TICS_ADMIN").exists()):
-        if not funcionario or not funcionario.departamento_id:
+    if not staff.is_admin:
+        if not staff.departamento_id:
             return JsonResponse({"success": False, "error": "No autorizado"}, status=403)
         if denuncia.asignado_departamento_id is None:
             return JsonResponse({"success": False, "error": "Denuncia sin departamento asignado"}, status=400)
 
-        if denuncia.asignado_departamento_id != funcionario.departamento_id:
+        if denuncia.asignado_departamento_id != staff.departamento_id:
             return JsonResponse({"success": False, "error": "No autorizado"}, status=403)
 
     respuestas = (
@@ -352,6 +356,7 @@ from django.db.models.functions import TruncWeek, TruncMonth
 
 
 @login_required
+@usar_replica
 def dashboard_view(request):
     user = request.user
 
@@ -384,7 +389,7 @@ def dashboard_view(request):
         current_user_department = None
         map_scope_text = "Mostrando todas las denuncias con ubicación válida"
     else:
-        funcionario = get_funcionario_from_web_user(user)
+        funcionario = staff_de(request).funcionario
         if not funcionario:
             return render(request, "errors/403.html", status=403)
 
@@ -880,7 +885,7 @@ class FaqDetailView(FuncionarioRequiredMixin, DetailView):
 #------------------------------
 #denundia list
 #---------------------
-class DenunciaListView(FuncionarioRequiredMixin, ListView):
+class DenunciaListView(ReplicaReadMixin, KeysetPaginationMixin, FuncionarioRequiredMixin, ListView):
     model = Denuncias
     template_name = "denuncias/denuncia_list.html"
     context_object_name = "denuncias"
@@ -888,10 +893,16 @@ class DenunciaListView(FuncionarioRequiredMixin, ListView):
     ordering = ["-created_at"]
     paginate_by = 10
 
+    def get_keyset_keys(self):
+        # con búsqueda el orden es por relevancia
+        if (self.request.GET.get("q") or "").strip():
+            return ("rank", "created_at", "id")
+        return ("created_at", "id")
+
     def _is_admin(self, user):
-        return user.is_superuser or user.groups.filter(name="TICS_ADMIN").exists()
+        return staff_de(self.request).is_admin
 
-    def _effective_departamento_id(self, user, funcionario):
+    def _effective_departamento_id(self, user, staff):
         """
         Admin: usa el GET (puede ser vacío -> Todos)
         Funcionario: fuerza su departamento siempre
@@ -901,8 +912,8 @@ class DenunciaListView(FuncionarioRequiredMixin, ListView):
         if self._is_admin(user):
             return dep_get  # "" o "4" etc
 
-        if funcionario and funcionario.departamento_id:
-            return str(funcionario.departamento_id)
+        if staff.departamento_id:
+            return str(staff.departamento_id)
 
         return ""
 
@@ -912,19 +923,20 @@ class DenunciaListView(FuncionarioRequiredMixin, ListView):
         )
 
         user = self.request.user
-        funcionario = get_funcionario_from_web_user(user)
-        is_admin = self._is_admin(user)
+        # principal del request (ids en sesión): sin queries de funcionario/grupos
+        staff = staff_de(self.request)
+        is_admin = staff.is_admin
 
         # base por rol
         if is_admin:
             base = qs
-        elif funcionario and funcionario.departamento_id:
-            base = qs.filter(asignado_departamento_id=funcionario.departamento_id)
+        elif staff.departamento_id:
+            base = qs.filter(asignado_departamento_id=staff.departamento_id)
         else:
             return qs.none()
 
         # departamento efectivo
-        departamento_id = self._effective_departamento_id(user, funcionario)
+        departamento_id = self._effective_departamento_id(user, staff)
 
         # filtro estado
         estado = (self.request.GET.get("estado") or "").strip()
@@ -957,35 +969,30 @@ class DenunciaListView(FuncionarioRequiredMixin, ListView):
         # if funcionario_get:
         #     base = base.filter(asignado_funcionario_id=funcionario_get)
 
+        # búsqueda FTS (descripción/referencia + cédula/nombres por prefijo), ordenada por relevancia
         q = (self.request.GET.get("q") or "").strip()
         if q:
-            base = base.filter(
-                Q(ciudadano__nombres__icontains=q)
-                | Q(ciudadano__apellidos__icontains=q)
-                | Q(ciudadano__cedula__icontains=q)
-                | Q(descripcion__icontains=q)
-                | Q(referencia__icontains=q)
-            )
+            return buscar_denuncias(base, q)
 
-        return base.distinct().order_by("-created_at")
+        return base.order_by("-created_at")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         user = self.request.user
-        funcionario = get_funcionario_from_web_user(user)
-        is_admin = self._is_admin(user)
+        staff = staff_de(self.request)
+        is_admin = staff.is_admin
 
         # departamento efectivo
-        departamento_id = self._effective_departamento_id(user, funcionario)
+        departamento_id = self._effective_departamento_id(user, staff)
 
         # Departamentos por rol
         if is_admin:
             context["departamentos"] = Departamentos.objects.filter(activo=True).order_by("nombre")
         else:
-            if funcionario and funcionario.departamento_id:
+            if staff.departamento_id:
                 context["departamentos"] = Departamentos.objects.filter(
-                    id=funcionario.departamento_id, activo=True
+                    id=staff.departamento_id, activo=True
                 )
             else:
                 context["departamentos"] = Departamentos.objects.none()
@@ -1014,9 +1021,8 @@ class DenunciaListView(FuncionarioRequiredMixin, ListView):
             tipo_actual = ""
         context["tipo_actual"] = tipo_actual
 
-        # querystring seguro (SIN page) para paginación
+        # querystring seguro (SIN page/cursor) para paginación
         params = self.request.GET.copy()
-        params.pop("page", None)
 
         # si es funcionario, asegurar que su departamento vaya en la URL (consistencia)
         if not is_admin and departamento_id:
@@ -1026,7 +1032,7 @@ class DenunciaListView(FuncionarioRequiredMixin, ListView):
         if not context["tipo_actual"]:
             params.pop("tipo", None)
 
-        context["querystring"] = params.urlencode()
+        context["querystring"] = self.get_keyset_querystring(params)
 
         return context
     
@@ -1041,7 +1047,7 @@ class DenunciaDetailView(FuncionarioRequiredMixin, DetailView):
     login_url = "web:login"
 
     def _is_admin(self, user):
-        return user.is_superuser or user.groups.filter(name="TICS_ADMIN").exists()
+        return staff_de(self.request).is_admin
 
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
@@ -1052,11 +1058,11 @@ class DenunciaDetailView(FuncionarioRequiredMixin, DetailView):
             return obj
 
         # Funcionario solo ve su departamento
-        funcionario = get_funcionario_from_web_user(user)
-        if not funcionario or not funcionario.departamento_id:
+        staff = staff_de(self.request)
+        if not staff.departamento_id:
             raise Http404("No autorizado")
 
-        if obj.asignado_departamento_id != funcionario.departamento_id:
+        if obj.asignado_departamento_id != staff.departamento_id:
             raise Http404("No autorizado")
 
         return obj
@@ -1073,7 +1079,6 @@ class DenunciaDetailView(FuncionarioRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         denuncia = self.object
-        user = self.request.user
 
         doc_ciudadano = (
             CiudadanoDocumentos.objects
@@ -1155,15 +1160,15 @@ class DenunciaDetailView(FuncionarioRequiredMixin, DetailView):
         # =========================
         # Lock: puede responder?
         # =========================
-        funcionario = get_funcionario_from_web_user(user)
+        staff = staff_de(self.request)
 
-        if self._is_admin(user):
+        if staff.is_admin:
             puede_responder = True
         else:
             puede_responder = bool(
-                funcionario and (
+                staff.is_funcionario and (
                     (not denuncia.asignado_funcionario_id)
-                    or (denuncia.asignado_funcionario_id == funcionario.pk)
+                    or (str(denuncia.asignado_funcionario_id) == staff.funcionario_id)
                 )
             )
 
@@ -1190,16 +1195,15 @@ class DenunciaUpdateView(CrudMessageMixin, FuncionarioRequiredMixin, UpdateView)
 
     def dispatch(self, request, *args, **kwargs):
         obj = self.get_object()
-        user = request.user
+        staff = staff_de(request)
 
-        if user.is_superuser or user.groups.filter(name="TICS_ADMIN").exists():
+        if staff.is_admin:
             return super().dispatch(request, *args, **kwargs)
 
-        funcionario = get_funcionario_from_web_user(request.user)
-        if not (request.user.is_superuser or funcionario):
+        if not (staff.is_superuser or staff.is_funcionario):
             return render(request, "errors/403.html", status=403)
 
-        if obj.asignado_departamento_id != funcionario.departamento_id:
+        if obj.asignado_departamento_id != staff.departamento_id:
             return render(request, "errors/403.html", status=403)
 
         return super().dispatch(request, *args, **kwargs)
@@ -1251,7 +1255,7 @@ class DenunciaUpdateView(CrudMessageMixin, FuncionarioRequiredMixin, UpdateView)
                 estado_anterior=estado_anterior,
                 estado_nuevo=form.instance.estado,
                 comentario="Actualización",
-                cambiado_por_funcionario=get_funcionario_from_web_user(self.request.user),
+                cambiado_por_funcionario=staff_de(self.request).funcionario,
                 created_at=timezone.now(),
                 denuncia_id=self.object.id,
             )
@@ -1271,9 +1275,10 @@ class DenunciaDeleteView(CrudMessageMixin, FuncionarioRequiredMixin, DeleteView)
 #  Cambio: quitamos @permission_required("db....") y validamos funcionario
 @login_required
 def crear_respuesta_denuncia(request, pk):
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return render(request, "errors/403.html", status=403)
+    funcionario = staff.funcionario
 
     if request.method != "POST":
         return redirect("web:denuncia_detail", pk=pk)
@@ -1299,8 +1304,8 @@ def crear_respuesta_denuncia(request, pk):
         denuncia = Denuncias.objects.select_for_update().get(pk=pk)
         estado_anterior = denuncia.estado
 
-        if not (request.user.is_superuser or request.user.groups.filter(name="TICS_ADMIN").exists()):
-            if not funcionario.departamento_id or denuncia.asignado_departamento_id != funcionario.departamento_id:
+        if not staff.is_admin:
+            if not staff.departamento_id or denuncia.asignado_departamento_id != staff.departamento_id:
                 return render(request, "errors/403.html", status=403)
 
         if denuncia.asignado_funcionario_id is None:
@@ -1356,7 +1361,7 @@ def crear_respuesta_denuncia(request, pk):
     messages.success(request, " Respuesta enviada correctamente.")
     return redirect("web:denuncia_detail", pk=pk)
 
-class MisDenunciasListView(LoginRequiredMixin, ListView):
+class MisDenunciasListView(ReplicaReadMixin, KeysetPaginationMixin, LoginRequiredMixin, ListView):
     """
     Vista “Mis Denuncias” (para funcionario).
     Si quieres que sea para ciudadano, se cambia el filtro al ciudadano del usuario.
@@ -1368,7 +1373,7 @@ class MisDenunciasListView(LoginRequiredMixin, ListView):
     login_url = "web:login"
 
     def get_queryset(self):
-        funcionario = get_funcionario_from_web_user(self.request.user)
+        funcionario = staff_de(self.request).funcionario
         if not funcionario:
             return Denuncias.objects.none()
 
@@ -1395,17 +1400,23 @@ class MisDenunciasListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        funcionario = get_funcionario_from_web_user(self.request.user)
+        funcionario = staff_de(self.request).funcionario
         context["funcionario"] = funcionario
 
+        # Conteos del queryset (del funcionario) en una sola consulta
         qs = self.get_queryset()
-        context["total_denuncias"] = qs.count()
-
-        # Conteos del queryset (del funcionario)
-        context["denuncias_asignadas"] = qs.filter(estado="asignada").count()
-        context["denuncias_en_proceso"] = qs.filter(estado="en_proceso").count()
-        context["denuncias_resueltas"] = qs.filter(estado="resuelta").count()
-        context["denuncias_rechazadas"] = qs.filter(estado="rechazada").count()  #  nuevo
+        conteos = qs.order_by().aggregate(
+            total=Count("id", distinct=True),
+            asignadas=Count("id", filter=Q(estado="asignada"), distinct=True),
+            en_proceso=Count("id", filter=Q(estado="en_proceso"), distinct=True),
+            resueltas=Count("id", filter=Q(estado="resuelta"), distinct=True),
+            rechazadas=Count("id", filter=Q(estado="rechazada"), distinct=True),
+        )
+        context["total_denuncias"] = conteos["total"]
+        context["denuncias_asignadas"] = conteos["asignadas"]
+        context["denuncias_en_proceso"] = conteos["en_proceso"]
+        context["denuncias_resueltas"] = conteos["resueltas"]
+        context["denuncias_rechazadas"] = conteos["rechazadas"]
 
         # Faltantes del DEPARTAMENTO (estado=asignada)
         faltantes_dep = 0
@@ -1429,6 +1440,7 @@ class MisDenunciasListView(LoginRequiredMixin, ListView):
 
         context["estado_actual"] = self.request.GET.get("estado", "")
         context["tipo_denuncia_actual"] = self.request.GET.get("tipo_denuncia", "")
+        context["querystring"] = self.get_keyset_querystring()
 
         return context
 
@@ -1838,9 +1850,31 @@ def _build_friendly_rejection_message(denuncia, submitted_text: str) -> str:
         "GAD Municipal de Salcedo"
     )
 
+def _build_plantilla_respuesta(denuncia) -> str:
+    """Respuesta oficial sin IA: se usa cuando OpenAI no contesta a tiempo."""
+    ciudadano_nombre = "Estimado/a ciudadano/a"
+    if getattr(denuncia, "ciudadano", None):
+        full = f"{denuncia.ciudadano.nombres or ''} {denuncia.ciudadano.apellidos or ''}".strip()
+        if full:
+            ciudadano_nombre = f"Estimado/a {full}"
+
+    tipo = denuncia.tipo_denuncia.nombre if denuncia.tipo_denuncia else "su denuncia"
+    area = denuncia.asignado_departamento.nombre if denuncia.asignado_departamento else "el área competente"
+    return (
+        f"{ciudadano_nombre}:\n\n"
+        f"Le informamos que su denuncia sobre «{tipo}» fue recibida y está siendo revisada por {area}. "
+        "Le mantendremos informado/a sobre los avances de su caso.\n\n"
+        "Gracias por su colaboración.\n"
+        "GAD Municipal de Salcedo"
+    )
+
 # =========================================
 # IA (LLM)
 # =========================================
+# subir al cambiar el texto de los prompts: invalida el cache de web/utils/llm_cache.py
+LLM_PROMPT_VERSION = "1"
+
+
 def _extract_json_object(text: str):
     """Intenta sacar el primer objeto JSON de un texto (por si el modelo mete texto extra)."""
     match = re.search(r"\{.*\}", text, re.DOTALL)
@@ -1850,12 +1884,13 @@ def _extract_json_object(text: str):
 @login_required
 @require_POST
 def llm_response(request, denuncia_id):
-    if not client:
+    if not llm.configurado():
         return JsonResponse({"success": False, "error": "Servicio de IA no configurado (falta OPENAI_API_KEY)"}, status=503)
 
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return JsonResponse({"success": False, "error": "No autorizado"}, status=403)
+    funcionario = staff.funcionario
 
     try:
         denuncia = Denuncias.objects.select_related(
@@ -1896,7 +1931,8 @@ CONTEXTO COMPLETO:
 Devuelve únicamente el mensaje final.
 """.strip()
 
-        resp = client.chat.completions.create(
+        raw_text, cacheado = llm_cache.completar(
+            "respuesta", LLM_PROMPT_VERSION,
             model="gpt-4o-mini",
             messages=[
                 {
@@ -1906,13 +1942,16 @@ Devuelve únicamente el mensaje final.
                 {"role": "user", "content": prompt},
             ],
             max_tokens=400,
+            regenerar=llm_cache.quiere_regenerar(request),
         )
-
-        raw_text = (resp.choices[0].message.content or "").strip()
-        return JsonResponse({"success": True, "response": raw_text})
+        return JsonResponse({"success": True, "response": raw_text, "cached": cacheado})
 
     except Denuncias.DoesNotExist:
         return JsonResponse({"success": False, "error": "Denuncia no encontrada"}, status=404)
+    except externos.ServicioNoDisponible as e:
+        # lento/saturado/circuito abierto: borrador con plantilla para que el funcionario lo edite
+        logger.warning("llm_response: IA no disponible (%s), se usa plantilla", e.motivo)
+        return JsonResponse({"success": True, "response": _build_plantilla_respuesta(denuncia), "degradado": True})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
     
@@ -1922,9 +1961,10 @@ Devuelve únicamente el mensaje final.
 @require_POST
 def resolver_denuncia(request, denuncia_id):
     # 1) proteger: solo funcionarios/superuser
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return render(request, "errors/403.html", status=403)
+    funcionario = staff.funcionario
 
     denuncia = get_object_or_404(
         Denuncias.objects.select_related(
@@ -1962,7 +2002,7 @@ def resolver_denuncia(request, denuncia_id):
 
     # 4) IA (solo si está configurada)
     raw_text = ""
-    if client:
+    if llm.configurado():
         func_name = get_web_user_name_from_funcionario(denuncia.asignado_funcionario)
         prompt = f"""
 Eres un asistente especializado en gestión de denuncias ciudadanas para la Municipalidad de Salcedo, Cotopaxi, Ecuador.
@@ -1979,16 +2019,22 @@ Datos de la denuncia:
 Responde en español, solo texto plano, con tono empático.
 """.strip()
 
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Responde siempre en texto plano."},
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=500,
-        )
-        raw_text = (resp.choices[0].message.content or "").strip()
-    else:
+        try:
+            raw_text, _ = llm_cache.completar(
+                "resolucion", LLM_PROMPT_VERSION,
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "Responde siempre en texto plano."},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=500,
+                regenerar=llm_cache.quiere_regenerar(request),
+            )
+        except Exception:
+            # IA caída / circuito abierto: la denuncia se resuelve igual con el texto fijo
+            raw_text = ""
+
+    if not raw_text:
         raw_text = "Denuncia resuelta. Gracias por reportar. Su caso fue atendido."
 
     # 5) respuesta automática
@@ -2018,9 +2064,10 @@ Responde en español, solo texto plano, con tono empático.
 @login_required
 @require_POST
 def rechazar_denuncia(request, denuncia_id):
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return render(request, "errors/403.html", status=403)
+    funcionario = staff.funcionario
 
     motivo = (request.POST.get("motivo") or "").strip()
     if not motivo:
@@ -2094,12 +2141,13 @@ def rechazar_denuncia(request, denuncia_id):
 @login_required
 @require_POST
 def llm_rechazo_response(request, denuncia_id):
-    if not client:
+    if not llm.configurado():
         return JsonResponse({"success": False, "error": "Servicio de IA no configurado (falta OPENAI_API_KEY)"}, status=503)
 
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         return JsonResponse({"success": False, "error": "No autorizado"}, status=403)
+    funcionario = staff.funcionario
 
     try:
         denuncia = Denuncias.objects.select_related(
@@ -2156,7 +2204,8 @@ OBSERVACIÓN ESCRITA POR EL FUNCIONARIO (si existe):
 Devuelve únicamente el mensaje final para el ciudadano.
 """.strip()
 
-        resp = client.chat.completions.create(
+        raw_text, cacheado = llm_cache.completar(
+            "rechazo", LLM_PROMPT_VERSION,
             model="gpt-4o-mini",
             messages=[
                 {
@@ -2166,13 +2215,20 @@ Devuelve únicamente el mensaje final para el ciudadano.
                 {"role": "user", "content": prompt},
             ],
             max_tokens=450,
+            regenerar=llm_cache.quiere_regenerar(request),
         )
-
-        raw_text = (resp.choices[0].message.content or "").strip()
-        return JsonResponse({"success": True, "response": raw_text})
+        return JsonResponse({"success": True, "response": raw_text, "cached": cacheado})
 
     except Denuncias.DoesNotExist:
         return JsonResponse({"success": False, "error": "Denuncia no encontrada"}, status=404)
+    except externos.ServicioNoDisponible as e:
+        logger.warning("llm_rechazo_response: IA no disponible (%s), se usa plantilla", e.motivo)
+        motivo = motivo_digitado or "; ".join(motivos_detectados) or "información insuficiente para continuar el trámite"
+        return JsonResponse({
+            "success": True,
+            "response": _build_friendly_rejection_message(denuncia, motivo),
+            "degradado": True,
+        })
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
     
@@ -2776,6 +2832,7 @@ def _evidencia_is_image(evidencia, pdf_path=""):
     )
 
 
+@usar_replica
 def denuncia_pdf(request, pk):
     denuncia = get_object_or_404(
         Denuncias.objects.select_related(
@@ -2916,8 +2973,8 @@ def web_denuncia_archivo_ver(request, archivo_id):
     WEB: sirve evidencias BIN para funcionarios/superuser (session auth).
     """
     # solo funcionarios o superuser (tu regla)
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         raise Http404("No autorizado")
 
     try:
@@ -2926,12 +2983,11 @@ def web_denuncia_archivo_ver(request, archivo_id):
         raise Http404("Archivo no existe")
 
     # Admin/TICS ve todo
-    is_admin = request.user.is_superuser or request.user.groups.filter(name="TICS_ADMIN").exists()
-    if not is_admin:
+    if not staff.is_admin:
         # funcionario SOLO puede ver denuncias de su depto
-        if not funcionario or not funcionario.departamento_id:
+        if not staff.departamento_id:
             raise Http404("No autorizado")
-        if obj.denuncia.asignado_departamento_id != funcionario.departamento_id:
+        if obj.denuncia.asignado_departamento_id != staff.departamento_id:
             raise Http404("No autorizado")
 
     return _file_response(obj)
@@ -2941,19 +2997,18 @@ def web_denuncia_firma_ver(request, denuncia_id):
     """
     WEB: sirve la firma BIN para funcionarios/superuser (session auth).
     """
-    funcionario = get_funcionario_from_web_user(request.user)
-    if not (request.user.is_superuser or funcionario):
+    staff = staff_de(request)
+    if not (staff.is_superuser or staff.is_funcionario):
         raise Http404("No autorizado")
 
     denuncia = get_object_or_404(Denuncias, id=denuncia_id)
     firma = get_object_or_404(DenunciaFirmas, denuncia_id=denuncia_id)
 
     # Admin/TICS ve todo
-    is_admin = request.user.is_superuser or request.user.groups.filter(name="TICS_ADMIN").exists()
-    if not is_admin:
-        if not funcionario or not funcionario.departamento_id:
+    if not staff.is_admin:
+        if not staff.departamento_id:
             raise Http404("No autorizado")
-        if denuncia.asignado_departamento_id != funcionario.departamento_id:
+        if denuncia.asignado_departamento_id != staff.departamento_id:
             raise Http404("No autorizado")
 
     # Caso 1: la firma guarda binario directo
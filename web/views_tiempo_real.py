@@ -0,0 +1,77 @@
+# web/views_tiempo_real.py
+"""
+Listados de denuncias en vivo (web/tiempo_real.py).
+
+- denuncias_eventos: SSE con los cambios del departamento del funcionario
+  (o de todos, para administradores) y de sus denuncias asignadas.
+- denuncia_fila / mis_denuncia_fila: una fila del listado, ya renderizada,
+  con los mismos permisos y filtros (querystring) que el listado. 204 si la
+  denuncia ya no entra en ese listado. Una consulta por pk en lugar de
+  recargar la página entera.
+"""
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
+
+from web import tiempo_real
+from web.utils.authz import staff_de
+from web.views import DenunciaListView, MisDenunciasListView
+
+
+def _es_staff(request) -> bool:
+    staff = staff_de(request)
+    return staff.is_superuser or staff.is_funcionario
+
+
+@login_required
+@require_GET
+def denuncias_eventos(request):
+    if not _es_staff(request):
+        return JsonResponse({"detail": "No autorizado"}, status=403)
+
+    canales = tiempo_real.canales_de_staff(staff_de(request))
+    if not canales:
+        return JsonResponse({"detail": "Sin departamento asignado"}, status=403)
+
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("desde") or ""
+    desde = int(raw) if raw.isdigit() else None
+
+    response = StreamingHttpResponse(tiempo_real.eventos(canales, desde), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx: no acumular el stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _fila(request, vista_cls, pk, template: str, extra: dict | None = None):
+    if not _es_staff(request):
+        return JsonResponse({"detail": "No autorizado"}, status=403)
+
+    # misma lógica de rol y filtros que el listado, sin dispatch (ni réplica:
+    # el aviso llega al commit y la réplica puede ir atrasada)
+    vista = vista_cls()
+    vista.setup(request)
+    denuncia = vista.get_queryset().filter(pk=pk).first()
+    if denuncia is None:
+        return HttpResponse(status=204)
+
+    contexto = {"denuncia": denuncia, "querystring": vista.get_keyset_querystring(), **(extra or {})}
+    response = HttpResponse(render_to_string(template, contexto, request=request))
+    response["X-Denuncia-Fila"] = "1"
+    return response
+
+
+@login_required
+@require_GET
+def denuncia_fila(request, pk):
+    return _fila(
+        request, DenunciaListView, pk, "denuncias/_denuncia_fila.html",
+        {"is_admin": staff_de(request).is_admin},
+    )
+
+
+@login_required
+@require_GET
+def mis_denuncia_fila(request, pk):
+    return _fila(request, MisDenunciasListView, pk, "denuncias/_mis_denuncia_fila.html")